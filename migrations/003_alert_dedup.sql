@@ -0,0 +1,17 @@
+-- Migration: Add deduplication columns to alerts table
+-- Repeated alerts with the same fingerprint inside the dedup window are folded
+-- into the first alert instead of creating new rows.
+
+ALTER TABLE alerts
+ADD COLUMN IF NOT EXISTS fingerprint VARCHAR(64);
+
+ALTER TABLE alerts
+ADD COLUMN IF NOT EXISTS occurrence_count INTEGER DEFAULT 1;
+
+ALTER TABLE alerts
+ADD COLUMN IF NOT EXISTS last_seen_at TIMESTAMP;
+
+-- Update existing records to have 1 for occurrence_count if null
+UPDATE alerts SET occurrence_count = 1 WHERE occurrence_count IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_alerts_fingerprint ON alerts(fingerprint);
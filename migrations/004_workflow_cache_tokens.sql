@@ -0,0 +1,13 @@
+-- Migration: Add prompt cache token totals to workflow_logs
+-- Tokens read from / written to the LLM provider's prompt cache are billed at
+-- different rates than regular input tokens, so they are tracked separately.
+
+ALTER TABLE workflow_logs
+ADD COLUMN IF NOT EXISTS total_cache_read_tokens INTEGER DEFAULT 0;
+
+ALTER TABLE workflow_logs
+ADD COLUMN IF NOT EXISTS total_cache_write_tokens INTEGER DEFAULT 0;
+
+-- Update existing records to have 0 if null
+UPDATE workflow_logs SET total_cache_read_tokens = 0 WHERE total_cache_read_tokens IS NULL;
+UPDATE workflow_logs SET total_cache_write_tokens = 0 WHERE total_cache_write_tokens IS NULL;
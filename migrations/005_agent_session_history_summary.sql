@@ -0,0 +1,12 @@
+-- Migration: Add rolling history summary to agent_sessions
+-- Long sessions fold older turns into a summary so the agent does not resend
+-- the full transcript; messages covered by the summary are not reloaded.
+
+ALTER TABLE agent_sessions
+ADD COLUMN IF NOT EXISTS history_summary TEXT;
+
+ALTER TABLE agent_sessions
+ADD COLUMN IF NOT EXISTS summarized_message_count INTEGER DEFAULT 0;
+
+-- Update existing records to have 0 for summarized_message_count if null
+UPDATE agent_sessions SET summarized_message_count = 0 WHERE summarized_message_count IS NULL;
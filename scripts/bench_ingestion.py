@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+"""
+End-to-end load benchmark for the ingestion service.
+
+Runs the ingestion pipeline (forwarder, SNMP trap receiver, Kafka and Redis
+Streams adapters) fully offline:
+
+- a stub alerts API (separate process) accepts POST /api/alerts/bulk and
+  measures forward latency from each event's generation timestamp
+- a trap sender (separate process) replays synthetic SNMPv2c traps over UDP
+  to the trap receiver at a fixed rate
+- Kafka and Redis are replaced by in-process fakes of the client objects the
+  adapters use, producing JSON messages at a fixed rate
+
+Reports sustained throughput, p50/p99 forward latency, drop rate per source
+and CPU time of the ingestion process (plus trap worker processes) per 1k
+events. Requires the ingestion service dependencies (pysnmp for traps).
+
+Usage:
+    python scripts/bench_ingestion.py [--duration 30] [--trap-rate 2000]
+        [--kafka-rate 5000] [--redis-rate 5000] [--snmp-workers 1]
+        [--api-latency-ms 0] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import resource
+import socket
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+INGESTION_DIR = Path(__file__).parent.parent / "services" / "ingestion"
+SHARED_DIR = Path(__file__).parent.parent / "shared"
+
+# Varbind carrying the generation timestamp in synthetic traps
+BENCH_TS_OID = "1.3.6.1.4.1.99999.1.1"
+TS_PLACEHOLDER = b"0" * 20
+
+TopicPartition = namedtuple("TopicPartition", "topic partition")
+ConsumerRecord = namedtuple("ConsumerRecord", "topic partition offset timestamp key value")
+
+
+def free_port(kind: int = socket.SOCK_STREAM) -> int:
+    with socket.socket(socket.AF_INET, kind) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def process_cpu_seconds(pid: int) -> Optional[float]:
+    """User + system CPU time of a live process (Linux /proc)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def bench_message(index: int) -> Dict[str, Any]:
+    return {
+        "title": f"Bench alert {index % 50}",
+        "severity": ("critical", "warning", "info")[index % 3],
+        "host": f"bench-device-{index % 200}",
+        "type": "bench",
+        "bench_ts": time.time(),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Stub alerts API
+# ---------------------------------------------------------------------------
+
+def _alert_timestamp(alert: Dict[str, Any]) -> Optional[float]:
+    raw = alert.get("raw_data") or {}
+    original = raw.get("original_message")
+    if isinstance(original, dict) and "bench_ts" in original:
+        return float(original["bench_ts"])
+    varbinds = raw.get("varbinds") or {}
+    if BENCH_TS_OID in varbinds:
+        return float(varbinds[BENCH_TS_OID])
+    return None
+
+
+def run_stub_api(port: int, latency: float, ready, stop, received, result_conn):
+    """Minimal HTTP/1.1 keep-alive server for POST /api/alerts/bulk."""
+    counts: Dict[str, int] = {}
+    latencies: List[float] = []
+    window = {"first": None, "last": None}
+    response_body = b'{"status": "created"}'
+    response = (
+        b"HTTP/1.1 201 Created\r\nContent-Type: application/json\r\n"
+        b"Content-Length: %d\r\n\r\n" % len(response_body)
+    ) + response_body
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n")[1:]:
+                    name, _, value = line.partition(b":")
+                    if name.strip().lower() == b"content-length":
+                        length = int(value)
+                body = await reader.readexactly(length) if length else b""
+
+                now = time.time()
+                alerts = json.loads(body) if body else []
+                for alert in alerts:
+                    source = alert.get("source", "unknown")
+                    counts[source] = counts.get(source, 0) + 1
+                    ts = _alert_timestamp(alert)
+                    if ts is not None:
+                        latencies.append(now - ts)
+                if alerts:
+                    window["first"] = window["first"] or now
+                    window["last"] = now
+                    received.value += len(alerts)
+
+                if latency:
+                    await asyncio.sleep(latency)
+                writer.write(response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve():
+        server = await asyncio.start_server(handle, "127.0.0.1", port, backlog=512)
+        ready.set()
+        while not stop.is_set():
+            await asyncio.sleep(0.1)
+        server.close()
+        latencies.sort()
+        result_conn.send({
+            "counts": counts,
+            "latencies": latencies,
+            "first": window["first"],
+            "last": window["last"],
+        })
+
+    asyncio.run(serve())
+
+
+# ---------------------------------------------------------------------------
+# SNMP trap sender
+# ---------------------------------------------------------------------------
+
+def build_trap_templates(community: str) -> List[bytes]:
+    """Encode SNMPv2c traps with a fixed-width timestamp placeholder."""
+    from pyasn1.codec.ber import encoder
+    from pysnmp.proto import api
+
+    p_mod = api.protoModules[api.protoVersion2c]
+    templates = []
+    for trap_oid in (
+        "1.3.6.1.6.3.1.1.5.3",      # linkDown
+        "1.3.6.1.6.3.1.1.5.4",      # linkUp
+        "1.3.6.1.6.3.1.1.5.1",      # coldStart
+        "1.3.6.1.4.1.9.9.41.2.0.1",  # Cisco syslog notification
+    ):
+        pdu = p_mod.TrapPDU()
+        p_mod.apiTrapPDU.setDefaults(pdu)
+        p_mod.apiTrapPDU.setVarBinds(pdu, [
+            (p_mod.ObjectIdentifier("1.3.6.1.2.1.1.3.0"), p_mod.TimeTicks(12345)),
+            (p_mod.ObjectIdentifier("1.3.6.1.6.3.1.1.4.1.0"), p_mod.ObjectIdentifier(trap_oid)),
+            (p_mod.ObjectIdentifier("1.3.6.1.2.1.2.2.1.1.3"), p_mod.Integer(3)),
+            (p_mod.ObjectIdentifier(BENCH_TS_OID), p_mod.OctetString(TS_PLACEHOLDER)),
+        ])
+        message = p_mod.Message()
+        p_mod.apiMessage.setDefaults(message)
+        p_mod.apiMessage.setCommunity(message, community)
+        p_mod.apiMessage.setPDU(message, pdu)
+        templates.append(encoder.encode(message))
+    return templates
+
+
+def run_trap_sender(port: int, rate: float, duration: float, community: str, go, sent):
+    """Send traps at a fixed rate from several source ports."""
+    templates = build_trap_templates(community)
+    # Several sockets so SO_REUSEPORT can spread load across trap workers
+    sockets = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in range(16)]
+    go.wait()
+
+    started = time.monotonic()
+    count = 0
+    while True:
+        elapsed = time.monotonic() - started
+        if elapsed >= duration:
+            break
+        due = int(elapsed * rate) - count
+        if due <= 0:
+            time.sleep(0.0005)
+            continue
+        for _ in range(min(due, 1000)):
+            datagram = templates[count % len(templates)].replace(
+                TS_PLACEHOLDER, b"%020.6f" % time.time()
+            )
+            sockets[count % len(sockets)].sendto(datagram, ("127.0.0.1", port))
+            count += 1
+        sent.value = count
+    sent.value = count
+
+
+# ---------------------------------------------------------------------------
+# Kafka and Redis fakes
+# ---------------------------------------------------------------------------
+
+class RateSource:
+    """Produces a number of due messages for a fixed rate and duration."""
+
+    def __init__(self, rate: float, duration: float):
+        self.rate = rate
+        self.duration = duration
+        self.started = time.monotonic()
+        self.produced = 0
+
+    def due(self, limit: int) -> int:
+        elapsed = min(time.monotonic() - self.started, self.duration)
+        return max(0, min(int(elapsed * self.rate) - self.produced, limit))
+
+
+class FakeKafkaConsumer:
+    """In-process stand-in for AIOKafkaConsumer (getmany/commit/seek)."""
+
+    def __init__(self, topic: str, rate: float, duration: float, partitions: int = 4):
+        self.source = RateSource(rate, duration)
+        self.partitions = [TopicPartition(topic, p) for p in range(partitions)]
+        self.positions = {tp: 0 for tp in self.partitions}
+        self.committed: Dict[TopicPartition, int] = {}
+
+    async def getmany(self, timeout_ms: int = 0, max_records: Optional[int] = None):
+        due = self.source.due(max_records or 500)
+        if not due:
+            await asyncio.sleep(min(timeout_ms / 1000, 0.005))
+            return {}
+        batches: Dict[TopicPartition, list] = {}
+        for _ in range(due):
+            index = self.source.produced
+            tp = self.partitions[index % len(self.partitions)]
+            offset = self.positions[tp]
+            self.positions[tp] = offset + 1
+            batches.setdefault(tp, []).append(ConsumerRecord(
+                tp.topic, tp.partition, offset, int(time.time() * 1000), None,
+                json.dumps(bench_message(index)).encode(),
+            ))
+            self.source.produced += 1
+        return batches
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            batches = await self.getmany(timeout_ms=5, max_records=1)
+            for records in batches.values():
+                return records[0]
+
+    async def commit(self, offsets=None):
+        self.committed.update(offsets or {})
+
+    def seek(self, tp, offset: int):
+        self.positions[tp] = offset
+
+    def assignment(self):
+        return set(self.partitions)
+
+    def highwater(self, tp) -> int:
+        return self.positions[tp]
+
+    async def stop(self):
+        pass
+
+
+class _FakePipeline:
+    def __init__(self, redis: "FakeRedis"):
+        self.redis = redis
+        self.acks: List[int] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def xack(self, stream, group, *ids):
+        self.acks.append(len(ids))
+
+    async def execute(self):
+        self.redis.acked += sum(self.acks)
+        return self.acks
+
+
+class FakeRedis:
+    """In-process stand-in for redis.asyncio.Redis stream consumer calls."""
+
+    def __init__(self, rate: float, duration: float):
+        self.source = RateSource(rate, duration)
+        self.acked = 0
+
+    async def xreadgroup(self, groupname, consumername, streams, count=None, block=None):
+        stream, start_id = next(iter(streams.items()))
+        if start_id != ">":
+            return []
+        due = self.source.due(count or 10)
+        if not due:
+            await asyncio.sleep(0.005)
+            return []
+        entries = []
+        millis = int(time.time() * 1000)
+        for _ in range(due):
+            index = self.source.produced
+            entries.append((f"{millis}-{index}", {"data": json.dumps(bench_message(index))}))
+            self.source.produced += 1
+        return [[stream, entries]]
+
+    async def xautoclaim(self, name, groupname, consumername, min_idle_time, start_id="0-0", count=None):
+        return ["0-0", [], []]
+
+    def pipeline(self, transaction: bool = True) -> _FakePipeline:
+        return _FakePipeline(self)
+
+    async def close(self):
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Benchmark driver
+# ---------------------------------------------------------------------------
+
+async def run_ingestion(args, go, trap_sent, api_received) -> Dict[str, Any]:
+    """Run the ingestion components under load. Returns local measurements."""
+    from app.adapters.base import DatabusSourceConfig
+    from app.adapters.kafka_adapter import KafkaAdapter
+    from app.adapters.redis_adapter import RedisStreamsAdapter
+    from app.forwarder import get_forwarder
+
+    class BenchKafkaAdapter(KafkaAdapter):
+        async def connect(self) -> bool:
+            self._consumer = FakeKafkaConsumer(self.config.topic_or_stream, args.kafka_rate, args.duration)
+            return True
+
+    class BenchRedisAdapter(RedisStreamsAdapter):
+        async def connect(self) -> bool:
+            self._redis = FakeRedis(args.redis_rate, args.duration)
+            return True
+
+    loop = asyncio.get_running_loop()
+    forwarder = get_forwarder()
+    await forwarder.start()
+
+    receiver = None
+    if args.trap_rate:
+        if args.snmp_workers > 1:
+            from app.trap_workers import TrapWorkerPool
+            receiver = TrapWorkerPool(forwarder.api_url, args.snmp_workers)
+        else:
+            from app.trap_receiver import SNMPTrapReceiver
+            receiver = SNMPTrapReceiver(forwarder.api_url)
+        await receiver.start(loop)
+        # Let worker processes bind before traps arrive
+        await asyncio.sleep(2.0 if args.snmp_workers > 1 else 0.2)
+
+    adapters = []
+    if args.kafka_rate:
+        adapters.append(BenchKafkaAdapter(DatabusSourceConfig(
+            source_id="bench-kafka", name="Bench Kafka", source_type="kafka",
+            connection_config={}, topic_or_stream="bench-alerts",
+        ), forwarder.api_url))
+    if args.redis_rate:
+        adapters.append(BenchRedisAdapter(DatabusSourceConfig(
+            source_id="bench-redis", name="Bench Redis", source_type="redis_stream",
+            connection_config={}, topic_or_stream="bench-alerts",
+        ), forwarder.api_url))
+
+    worker_pids = [p.pid for p in getattr(receiver, "_processes", {}).values()]
+    cpu_start = resource.getrusage(resource.RUSAGE_SELF)
+    worker_cpu_start = sum(process_cpu_seconds(pid) or 0.0 for pid in worker_pids)
+
+    for adapter in adapters:
+        await adapter.start()
+    go.set()
+    started = time.monotonic()
+
+    await asyncio.sleep(args.duration)
+
+    # Drain: wait until the API stops receiving or the drain timeout passes
+    deadline = time.monotonic() + args.drain
+    last = -1
+    while time.monotonic() < deadline and api_received.value != last:
+        last = api_received.value
+        await asyncio.sleep(0.5)
+    elapsed = time.monotonic() - started
+
+    cpu_end = resource.getrusage(resource.RUSAGE_SELF)
+    worker_cpu_end = sum(process_cpu_seconds(pid) or 0.0 for pid in worker_pids)
+
+    generated = {"snmp_trap": trap_sent.value}
+    for adapter in adapters:
+        fake = getattr(adapter, "_consumer", None) or getattr(adapter, "_redis", None)
+        generated[f"databus:{adapter.source_type}"] = fake.source.produced
+
+    receiver_stats = receiver.get_stats() if receiver else None
+    adapter_stats = {adapter.source_id: adapter.get_stats() for adapter in adapters}
+    forwarder_stats = forwarder.get_stats()
+
+    for adapter in adapters:
+        await adapter.stop()
+    if receiver:
+        await receiver.stop()
+    await forwarder.stop()
+
+    return {
+        "elapsed": elapsed,
+        "generated": {k: v for k, v in generated.items() if v},
+        "cpu_seconds": (cpu_end.ru_utime + cpu_end.ru_stime) - (cpu_start.ru_utime + cpu_start.ru_stime)
+                       + (worker_cpu_end - worker_cpu_start),
+        "receiver": receiver_stats,
+        "adapters": adapter_stats,
+        "forwarder": forwarder_stats,
+    }
+
+
+def report(args, local: Dict[str, Any], api: Dict[str, Any]) -> Dict[str, Any]:
+    generated = local["generated"]
+    counts = api["counts"]
+    total_generated = sum(generated.values())
+    total_forwarded = sum(counts.get(source, 0) for source in generated)
+    latencies = api["latencies"]
+    window = (api["last"] - api["first"]) if api["first"] and api["last"] else 0
+
+    forwarder = local["forwarder"]
+    result = {
+        "duration_seconds": args.duration,
+        "rates": {"snmp_trap": args.trap_rate, "kafka": args.kafka_rate, "redis_stream": args.redis_rate},
+        "sources": {
+            source: {
+                "generated": count,
+                "forwarded": counts.get(source, 0),
+                "drop_rate": round(1 - counts.get(source, 0) / count, 4) if count else None,
+            }
+            for source, count in generated.items()
+        },
+        "generated": total_generated,
+        "forwarded": total_forwarded,
+        "drop_rate": round(1 - total_forwarded / total_generated, 4) if total_generated else None,
+        "throughput_per_second": round(total_forwarded / window, 1) if window else None,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+            "p99": round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+            "max": round(latencies[-1] * 1000, 2) if latencies else None,
+        },
+        "cpu_seconds": round(local["cpu_seconds"], 3),
+        "cpu_ms_per_1k_events": round(local["cpu_seconds"] * 1e6 / total_forwarded, 2) if total_forwarded else None,
+        "forwarder": {
+            "batches": forwarder["batch_count"],
+            "avg_batch_size": forwarder["batch_size"]["avg"],
+            "dropped": forwarder["dropped_count"],
+            "failed": forwarder["failed_count"],
+            "retries": forwarder["retry_count"],
+        },
+    }
+    if local["receiver"]:
+        result["trap_receiver"] = {
+            k: local["receiver"].get(k) for k in ("trap_count", "error_count", "worker_count")
+            if k in local["receiver"]
+        }
+    return result
+
+
+def print_report(result: Dict[str, Any]):
+    print(f"\nIngestion benchmark ({result['duration_seconds']}s)")
+    print(f"{'source':<22}  {'generated':>10}  {'forwarded':>10}  {'drop %':>7}")
+    for source, stats in result["sources"].items():
+        drop = f"{stats['drop_rate'] * 100:.2f}" if stats["drop_rate"] is not None else "-"
+        print(f"{source:<22}  {stats['generated']:>10,}  {stats['forwarded']:>10,}  {drop:>7}")
+    drop = f"{result['drop_rate'] * 100:.2f}" if result["drop_rate"] is not None else "-"
+    print(f"{'total':<22}  {result['generated']:>10,}  {result['forwarded']:>10,}  {drop:>7}")
+    print()
+    print(f"throughput:        {result['throughput_per_second']} alerts/s")
+    latency = result["latency_ms"]
+    print(f"forward latency:   p50 {latency['p50']} ms, p99 {latency['p99']} ms, max {latency['max']} ms")
+    print(f"CPU:               {result['cpu_seconds']} s, {result['cpu_ms_per_1k_events']} ms per 1k events")
+    fwd = result["forwarder"]
+    print(f"forwarder:         {fwd['batches']} batches (avg {fwd['avg_batch_size']}), "
+          f"{fwd['dropped']} dropped, {fwd['failed']} failed, {fwd['retries']} retries")
+    if "trap_receiver" in result:
+        print(f"trap receiver:     {result['trap_receiver']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--duration", type=float, default=30.0, help="Load duration (seconds)")
+    parser.add_argument("--trap-rate", type=float, default=2000, help="SNMP traps/sec (0 disables)")
+    parser.add_argument("--kafka-rate", type=float, default=5000, help="Kafka messages/sec (0 disables)")
+    parser.add_argument("--redis-rate", type=float, default=5000, help="Redis stream entries/sec (0 disables)")
+    parser.add_argument("--snmp-workers", type=int, default=1, help="Trap receiver processes")
+    parser.add_argument("--api-latency-ms", type=float, default=0, help="Stub API response delay")
+    parser.add_argument("--drain", type=float, default=10.0, help="Max seconds to wait for queues to drain")
+    parser.add_argument("--community", default="public")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args()
+
+    api_port = free_port()
+    trap_port = free_port(socket.SOCK_DGRAM)
+
+    # Settings are read from the environment when the app is first imported,
+    # in this process and in spawned trap workers alike.
+    os.environ.update({
+        "INGESTION_NETSTACKS_API_URL": f"http://127.0.0.1:{api_port}",
+        "INGESTION_SNMP_TRAP_ADDRESS": "127.0.0.1",
+        "INGESTION_SNMP_TRAP_PORT": str(trap_port),
+        "INGESTION_SNMP_COMMUNITY_STRINGS": args.community,
+        "INGESTION_SNMP_WORKERS": str(args.snmp_workers),
+        "INGESTION_SPOOL_ENABLED": "false",
+        "INGESTION_LOG_LEVEL": os.environ.get("INGESTION_LOG_LEVEL", "WARNING"),
+    })
+    sys.path.insert(0, str(INGESTION_DIR))
+    sys.path.insert(0, str(SHARED_DIR))
+    import logging
+    logging.basicConfig(level=os.environ["INGESTION_LOG_LEVEL"])
+
+    ctx = multiprocessing.get_context("spawn")
+    ready, stop, go = ctx.Event(), ctx.Event(), ctx.Event()
+    api_received = ctx.Value("q", 0, lock=False)
+    trap_sent = ctx.Value("q", 0, lock=False)
+    result_recv, result_send = ctx.Pipe(duplex=False)
+
+    api = ctx.Process(target=run_stub_api, name="stub-alerts-api", daemon=True, args=(
+        api_port, args.api_latency_ms / 1000, ready, stop, api_received, result_send))
+    api.start()
+    if not ready.wait(10):
+        sys.exit("Stub alerts API did not start")
+
+    sender = None
+    if args.trap_rate:
+        sender = ctx.Process(target=run_trap_sender, name="trap-sender", daemon=True, args=(
+            trap_port, args.trap_rate, args.duration, args.community, go, trap_sent))
+        sender.start()
+
+    try:
+        local = asyncio.run(run_ingestion(args, go, trap_sent, api_received))
+    finally:
+        stop.set()
+        if sender is not None:
+            sender.join(5)
+
+    api_result = result_recv.recv()
+    api.join(5)
+
+    result = report(args, local, api_result)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark databus message transforms in the ingestion service.
+
+Compiles a transform per type (json, syslog RFC 3164 / RFC 5424, cef, raw)
+with compile_transform() and reports messages/sec for each. JSON is measured
+with both the stdlib decoder and orjson (when installed).
+
+Usage:
+    python scripts/bench_transforms.py [--messages 50000]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Make the ingestion app importable
+sys.path.insert(0, str(Path(__file__).parent.parent / "services" / "ingestion"))
+
+from app import transforms  # noqa: E402
+from app.adapters.base import DatabusSourceConfig  # noqa: E402
+
+SAMPLES = {
+    "json": [
+        json.dumps({
+            "message": f"Interface GigabitEthernet0/{i} down",
+            "level": "error",
+            "hostname": f"router{i}",
+            "category": "interface",
+            "details": {"ifIndex": i, "ifOperStatus": 2},
+        }).encode()
+        for i in range(100)
+    ],
+    "syslog-3164": [
+        f"<187>Oct 11 22:14:{i % 60:02d} router{i} %LINK-3-UPDOWN: Interface Gi0/{i}, changed state to down".encode()
+        for i in range(100)
+    ],
+    "syslog-5424": [
+        (f'<165>1 2024-10-11T22:14:{i % 60:02d}.003Z router{i}.example.com linkd - LINK '
+         f'[meta@32473 ifIndex="{i}" state="down"] Interface Gi0/{i} changed state to down').encode()
+        for i in range(100)
+    ],
+    "cef": [
+        (f"CEF:0|Palo Alto Networks|PAN-OS|10.1|threat|Vulnerability exploit attempt|8|"
+         f"src=10.0.{i}.1 dst=192.168.1.{i} spt={1024 + i} dpt=443 proto=TCP "
+         f"msg=Blocked exploit attempt from 10.0.{i}.1 cs1Label=Rule cs1=block-all dvchost=fw{i}").encode()
+        for i in range(100)
+    ],
+    "raw": [f"free-form message number {i}".encode() for i in range(100)],
+}
+
+
+def measure(transform, samples, count: int) -> float:
+    n = len(samples)
+    started = time.perf_counter()
+    for i in range(count):
+        transform(samples[i % n])
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--messages", type=int, default=50000, help="Messages per transform")
+    args = parser.parse_args()
+
+    print(f"{'transform':<16}  {'msgs/s':>12}")
+    for name, samples in SAMPLES.items():
+        config = DatabusSourceConfig(
+            source_id="bench",
+            name="bench",
+            source_type="kafka",
+            connection_config={},
+            topic_or_stream="alerts",
+            transform_type=name.split("-")[0],
+            field_mappings={"title": "message"} if name == "json" else None,
+        )
+        transform = transforms.compile_transform(config)
+
+        if name == "json":
+            fast_loads = transforms.json_loads
+            transforms.json_loads = json.loads
+            rate = measure(transform, samples, args.messages)
+            print(f"{'json (stdlib)':<16}  {rate:>12,.0f}")
+            if transforms.orjson is None:
+                print(f"{'json (orjson)':<16}  {'not installed':>12}")
+                continue
+            transforms.json_loads = fast_loads
+            name = "json (orjson)"
+
+        rate = measure(transform, samples, args.messages)
+        print(f"{name:<16}  {rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
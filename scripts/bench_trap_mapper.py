@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark SNMP trap OID -> mapping lookup in the ingestion service.
+
+Compares the original linear scan (re.match against every TrapMapping in
+order) with the compiled prefix-trie matcher used by TrapMapper, for 10,
+100 and 1000 mappings. Reports traps/sec for each.
+
+The linear scan slows down sharply past ~500 mappings because re.match
+then misses Python's internal pattern cache and recompiles on every call,
+so it is measured on a smaller sample (--linear-traps).
+
+Usage:
+    python scripts/bench_trap_mapper.py [--traps 20000] [--linear-traps 1000] [--sizes 10,100,1000]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+# Make the ingestion app importable
+sys.path.insert(0, str(Path(__file__).parent.parent / "services" / "ingestion"))
+
+from app.trap_mappings import (  # noqa: E402
+    DEFAULT_TRAP_MAPPINGS,
+    TrapMapper,
+    TrapMapping,
+    CompiledTrapMatcher,
+)
+
+
+def build_mappings(count: int, rng: random.Random) -> list:
+    """Build count mappings: the defaults plus synthetic vendor trap OIDs.
+
+    About 10% of the synthetic mappings are regexes, the rest literal OIDs,
+    similar to a real vendor MIB mapping set.
+    """
+    mappings = list(DEFAULT_TRAP_MAPPINGS[:count])
+    while len(mappings) < count:
+        enterprise = rng.randint(1, 60000)
+        oid = f"1.3.6.1.4.1.{enterprise}.{rng.randint(1, 50)}.0.{rng.randint(1, 200)}"
+        if rng.random() < 0.1:
+            pattern = re.escape(f"1.3.6.1.4.1.{enterprise}.") + r"\d+\.0\." + str(rng.randint(1, 200))
+        else:
+            pattern = re.escape(oid)
+        mappings.append(TrapMapping(
+            oid_pattern=pattern,
+            alert_type="vendor",
+            title_template="Vendor trap: {agent_address}",
+        ))
+    return mappings
+
+
+def build_traps(mappings: list, count: int, rng: random.Random) -> list:
+    """Build trap OIDs: mostly mapped OIDs, plus some unmapped ones."""
+    literal_oids = [
+        m.oid_pattern.replace("\\.", ".") for m in mappings
+        if re.fullmatch(r"(?:\d|\\\.)+", m.oid_pattern)
+    ]
+    traps = []
+    for _ in range(count):
+        if literal_oids and rng.random() < 0.8:
+            traps.append(rng.choice(literal_oids))
+        else:
+            traps.append(f"1.3.6.1.4.1.{rng.randint(1, 60000)}.{rng.randint(1, 50)}.0.{rng.randint(1, 200)}")
+    return traps
+
+
+def linear_find(mappings: list, trap_oid: str):
+    """The original TrapMapper.find_mapping implementation."""
+    for mapping in mappings:
+        if re.match(mapping.oid_pattern, trap_oid):
+            return mapping
+    return None
+
+
+def measure(func, traps: list) -> float:
+    started = time.perf_counter()
+    for trap_oid in traps:
+        func(trap_oid)
+    return len(traps) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--traps", type=int, default=20000, help="Trap lookups per run")
+    parser.add_argument("--linear-traps", type=int, default=1000,
+                        help="Trap lookups for the (slow) linear scan")
+    parser.add_argument("--sizes", default="10,100,1000", help="Comma-separated mapping counts")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'mappings':>8}  {'linear/s':>12}  {'trie/s':>12}  {'trie+cache/s':>13}  {'speedup':>8}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        mappings = build_mappings(size, rng)
+        traps = build_traps(mappings, args.traps, rng)
+
+        mapper = TrapMapper()
+        mapper.mappings = mappings
+        mapper.compile()
+        matcher = CompiledTrapMatcher([m.oid_pattern for m in mappings])
+
+        # Sanity check: identical results to the linear scan
+        for trap_oid in traps[:args.linear_traps]:
+            expected = linear_find(mappings, trap_oid)
+            index = matcher.match(trap_oid)
+            assert (mappings[index] if index is not None else None) is expected, trap_oid
+
+        linear = measure(lambda oid: linear_find(mappings, oid), traps[:args.linear_traps])
+        trie = measure(matcher.match, traps)
+        cached = measure(mapper.find_mapping, traps)
+        print(f"{size:>8}  {linear:>12,.0f}  {trie:>12,.0f}  {cached:>13,.0f}  {trie / linear:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,48 @@ class Settings(BaseSettings):
     REDIS_URL: str = "redis://redis:6379/0"
     CORS_ORIGINS: str = "*"
 
+    # Bulk alert ingest (POST /api/alerts/bulk)
+    ALERT_BULK_MAX_ALERTS: int = 5000
+
+    # Alert triage scheduler
+    TRIAGE_CONCURRENCY: int = 4
+    TRIAGE_RESUME_MAX_AGE_HOURS: float = 24
+
+    # Per-provider LLM request limits, e.g. "anthropic=50,openrouter=200" (requests/minute)
+    LLM_PROVIDER_RATE_LIMITS: str = ""
+
+    # Pooled LLM provider HTTP clients (one per provider, keep-alive, HTTP/2)
+    LLM_HTTP_MAX_CONNECTIONS: int = 20
+    LLM_HTTP_MAX_KEEPALIVE: int = 10
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 120.0
+    LLM_HTTP_TIMEOUT: float = 120.0
+
+    # Retries on 429/5xx and connection errors (jittered exponential backoff, honors Retry-After)
+    LLM_MAX_RETRIES: int = 3
+    LLM_RETRY_BACKOFF_BASE: float = 1.0
+    LLM_RETRY_BACKOFF_MAX: float = 30.0
+    LLM_RETRY_MAX_WAIT: float = 60.0
+
+    # Mark system prompt, tool schemas and recent turns as cacheable (Anthropic cache_control)
+    LLM_PROMPT_CACHING: bool = True
+
+    # Alert deduplication / storm suppression
+    ALERT_DEDUP_ENABLED: bool = True
+    ALERT_DEDUP_WINDOW_SECONDS: int = 300
+    ALERT_DEDUP_FINGERPRINT: str = "device_name,alert_type,title"
+    ALERT_DEDUP_MAX_ENTRIES: int = 100000
+    ALERT_DEDUP_FLUSH_INTERVAL: float = 5.0
+
+    # Live chat session executors kept in memory (0 disables the cache)
+    CHAT_EXECUTOR_CACHE_SIZE: int = 256
+    CHAT_EXECUTOR_IDLE_SECONDS: float = 1800
+
+    # Seconds between heartbeat events on an otherwise idle chat SSE stream
+    CHAT_SSE_HEARTBEAT_SECONDS: float = 15.0
+
+    # Workflow logging: seconds between batched writes of in-progress workflow steps
+    WORKFLOW_FLUSH_INTERVAL: float = 2.0
+
     class Config:
         env_file = ".env"
 
@@ -10,9 +10,13 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from netstacks_core.db import init_db
+from netstacks_core.db import init_db, dispose_async_engine
 
 from app.config import get_settings
+from app.services.alert_dedup import get_alert_deduplicator
+from app.services.executor_cache import get_executor_cache
+from app.services.llm_transport import close_clients as close_llm_clients
+from app.services.triage_scheduler import get_triage_scheduler
 from app.routes import agents, alerts, databus, incidents, knowledge, approvals, sessions, llm, chat, workflows
 
 logging.basicConfig(level=logging.INFO)
@@ -26,8 +30,16 @@ async def lifespan(app: FastAPI):
     log.info(f"Starting {settings.SERVICE_NAME} on port {settings.SERVICE_PORT}")
     init_db()
     log.info("Database initialized")
+    get_alert_deduplicator().start()
+    get_executor_cache().start()
+    await get_triage_scheduler().start()
     yield
     log.info("Shutting down AI service")
+    await get_triage_scheduler().stop()
+    await get_alert_deduplicator().stop()
+    await get_executor_cache().stop()
+    await close_llm_clients()
+    await dispose_async_engine()
 
 
 app = FastAPI(
@@ -74,6 +86,7 @@ async def root():
         "endpoints": [
             "/api/agents",
             "/api/alerts",
+            "/api/alerts/bulk",
             "/api/alerts/webhooks/generic",
             "/api/alerts/webhooks/prometheus",
             "/api/incidents",
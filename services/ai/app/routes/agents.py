@@ -9,6 +9,8 @@ import logging
 from netstacks_core.db import get_session, Agent as AgentModel
 from netstacks_core.auth import get_current_user
 
+from app.services.executor_cache import get_executor_cache
+
 log = logging.getLogger(__name__)
 router = APIRouter()
 
@@ -164,6 +166,7 @@ async def create_custom_tool(tool: CustomToolCreate, user=Depends(get_current_us
         "created_at": datetime.utcnow().isoformat(),
     }
     _custom_tools.append(new_tool)
+    get_executor_cache().invalidate_all()
     log.info(f"Created custom tool: {tool.name}")
 
     return {"success": True, "id": new_tool["id"]}
@@ -187,6 +190,7 @@ async def delete_custom_tool(tool_id: str, user=Depends(get_current_user)):
         raise HTTPException(status_code=404, detail="Tool not found")
 
     _custom_tools = [t for t in _custom_tools if t["id"] != tool_id]
+    get_executor_cache().invalidate_all()
     log.info(f"Deleted custom tool: {tool['name']}")
 
     return {"success": True, "message": "Tool deleted"}
@@ -224,6 +228,7 @@ async def create_mcp_server(server: MCPServerCreate, user=Depends(get_current_us
         "created_at": datetime.utcnow().isoformat(),
     }
     _mcp_servers.append(new_server)
+    get_executor_cache().invalidate_all()
     log.info(f"Added MCP server: {server.name}")
 
     return {"success": True, "id": new_server["id"]}
@@ -247,6 +252,7 @@ async def connect_mcp_server(server_id: str, user=Depends(get_current_user)):
 
     # TODO: Implement actual MCP connection
     server["is_connected"] = True
+    get_executor_cache().invalidate_all()
     log.info(f"Connected to MCP server: {server['name']}")
 
     return {"success": True, "message": "Connected"}
@@ -261,6 +267,7 @@ async def delete_mcp_server(server_id: str, user=Depends(get_current_user)):
         raise HTTPException(status_code=404, detail="Server not found")
 
     _mcp_servers = [s for s in _mcp_servers if s["id"] != server_id]
+    get_executor_cache().invalidate_all()
     log.info(f"Deleted MCP server: {server['name']}")
 
     return {"success": True, "message": "Server deleted"}
@@ -381,6 +388,7 @@ async def update_agent(agent_id: str, updates: dict, user=Depends(get_current_us
                 setattr(agent, db_key, value)
 
         session.commit()
+        get_executor_cache().invalidate_agent(agent_id)
         return {"success": True, "message": "Agent updated"}
     finally:
         session.close()
@@ -396,6 +404,7 @@ async def delete_agent(agent_id: str, user=Depends(get_current_user)):
             raise HTTPException(status_code=404, detail="Agent not found")
         session.delete(agent)
         session.commit()
+        get_executor_cache().invalidate_agent(agent_id)
         return {"success": True, "message": "Agent deleted"}
     finally:
         session.close()
@@ -411,6 +420,7 @@ async def toggle_agent(agent_id: str, user=Depends(get_current_user)):
             raise HTTPException(status_code=404, detail="Agent not found")
         agent.is_enabled = not agent.is_enabled
         session.commit()
+        get_executor_cache().invalidate_agent(agent_id)
         return {"success": True, "is_active": agent.is_enabled}
     finally:
         session.close()
@@ -1,17 +1,25 @@
 # services/ai/app/routes/alerts.py
 import asyncio
+import json
 import logging
-from fastapi import APIRouter, HTTPException, Depends, Query, BackgroundTasks
-from typing import List, Optional
-from pydantic import BaseModel
+import uuid
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import JSONResponse
+from typing import List, Optional, Any, AsyncIterator, Tuple
+from pydantic import BaseModel, Field, ValidationError
 from datetime import datetime
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from netstacks_core.db import get_session, Alert as AlertModel
+from netstacks_core.db import get_async_db, async_session_scope, Alert as AlertModel, AgentSession
 from netstacks_core.auth import get_current_user
 
-from app.services.alert_processor import process_alert_async, TriageResult
+from app.config import get_settings
+from app.services.alert_dedup import get_alert_deduplicator, DedupEntry
+from app.services.triage_scheduler import get_triage_scheduler
 
 log = logging.getLogger(__name__)
+settings = get_settings()
 
 router = APIRouter()
 
@@ -25,6 +33,8 @@ class AlertCreate(BaseModel):
     alert_type: Optional[str] = None
     raw_data: Optional[dict] = None
     skip_ai: bool = False
+    # Repeats dropped by the ingestion rate limiter before this alert
+    rate_limited_dropped: int = Field(default=0, ge=0)
 
 
 class AlertResponse(BaseModel):
@@ -46,275 +56,480 @@ async def list_alerts(
     severity: Optional[str] = Query(None),
     source: Optional[str] = Query(None),
     limit: int = Query(100, le=500),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user)
 ):
     """List alerts with optional filters."""
-    session = get_session()
-    try:
-        query = session.query(AlertModel)
-        if status:
-            query = query.filter(AlertModel.status == status)
-        if severity:
-            query = query.filter(AlertModel.severity == severity)
-        if source:
-            query = query.filter(AlertModel.source == source)
-
-        alerts = query.order_by(AlertModel.created_at.desc()).limit(limit).all()
-        return {
-            "success": True,
-            "alerts": [
-                {
-                    "alert_id": a.alert_id,
-                    "title": a.title,
-                    "severity": a.severity,
-                    "status": a.status,
-                    "source": a.source,
-                    "device_name": a.device_name,
-                    "alert_type": a.alert_type,
-                    "description": a.description,
-                    "created_at": a.created_at.isoformat() if a.created_at else None,
-                }
-                for a in alerts
-            ]
-        }
-    finally:
-        session.close()
+    query = select(AlertModel)
+    if status:
+        query = query.where(AlertModel.status == status)
+    if severity:
+        query = query.where(AlertModel.severity == severity)
+    if source:
+        query = query.where(AlertModel.source == source)
+
+    alerts = (await db.execute(
+        query.order_by(AlertModel.created_at.desc()).limit(limit)
+    )).scalars().all()
+    return {
+        "success": True,
+        "alerts": [
+            {
+                "alert_id": a.alert_id,
+                "title": a.title,
+                "severity": a.severity,
+                "status": a.status,
+                "source": a.source,
+                "device_name": a.device_name,
+                "alert_type": a.alert_type,
+                "description": a.description,
+                "occurrence_count": a.occurrence_count or 1,
+                "last_seen_at": a.last_seen_at.isoformat() if a.last_seen_at else None,
+                "created_at": a.created_at.isoformat() if a.created_at else None,
+            }
+            for a in alerts
+        ]
+    }
 
 
-async def _trigger_ai_processing(alert_id: str, skip_ai: bool):
-    """Background task to trigger AI processing for an alert."""
-    if skip_ai:
-        log.info(f"Skipping AI processing for alert {alert_id} per request")
-        return
+async def _get_alert(db: AsyncSession, alert_id: str) -> AlertModel:
+    """Load an alert or raise 404."""
+    alert = (await db.execute(
+        select(AlertModel).where(AlertModel.alert_id == alert_id)
+    )).scalars().first()
+    if not alert:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    return alert
 
-    try:
-        log.info(f"Starting AI triage for alert {alert_id}")
-        result = await process_alert_async(alert_id, skip_ai=False)
-        log.info(f"AI triage completed for alert {alert_id}: status={result.status}")
-    except Exception as e:
-        log.error(f"AI processing failed for alert {alert_id}: {e}", exc_info=True)
+
+def _deduplicated_response(entry: DedupEntry) -> dict:
+    """Response for an alert folded into an existing alert."""
+    return {
+        "status": "deduplicated",
+        "alert_id": entry.alert_id,
+        "occurrence_count": entry.occurrences,
+        "ai_processing": False
+    }
 
 
 @router.post("/", response_model=dict)
-async def create_alert(alert: AlertCreate, background_tasks: BackgroundTasks):
+async def create_alert(alert: AlertCreate):
     """Create alert (webhook endpoint - no auth required).
 
-    Automatically triggers AI triage in the background unless skip_ai=True.
+    Automatically queues AI triage unless skip_ai=True.
+    Repeats of an alert inside the dedup window are folded into the first
+    alert's occurrence count and do not trigger another triage run.
     """
-    session = get_session()
+    dedup = get_alert_deduplicator()
+    alert_id = str(uuid.uuid4())
+    fingerprint = dedup.fingerprint(alert.model_dump())
+    existing = dedup.fold(fingerprint, alert_id, alert.severity, extra=alert.rate_limited_dropped)
+    if existing:
+        return _deduplicated_response(existing)
+
     try:
-        import uuid
-        alert_id = str(uuid.uuid4())
-        new_alert = AlertModel(
-            alert_id=alert_id,
-            title=alert.title,
-            severity=alert.severity,
-            description=alert.description,
-            source=alert.source or "manual",
-            device_name=alert.device_name,
-            alert_type=alert.alert_type,
-            raw_data=alert.raw_data or {},
-            status="new",
-        )
-        session.add(new_alert)
-        session.commit()
-
-        # Trigger AI processing in background
-        if not alert.skip_ai:
-            background_tasks.add_task(_trigger_ai_processing, alert_id, alert.skip_ai)
+        async with async_session_scope() as session:
+            session.add(AlertModel(
+                alert_id=alert_id,
+                title=alert.title,
+                severity=alert.severity,
+                description=alert.description,
+                source=alert.source or "manual",
+                device_name=alert.device_name,
+                alert_type=alert.alert_type,
+                raw_data=alert.raw_data or {},
+                status="new",
+                auto_triage=not alert.skip_ai,
+                fingerprint=fingerprint,
+                occurrence_count=1 + alert.rate_limited_dropped,
+            ))
+    except Exception:
+        dedup.forget(fingerprint, alert_id)
+        raise
+
+    # Queue AI triage
+    if not alert.skip_ai:
+        get_triage_scheduler().submit(alert_id, alert.severity)
+
+    return {
+        "status": "received",
+        "alert_id": alert_id,
+        "ai_processing": not alert.skip_ai
+    }
+
+
+async def _iter_ndjson(request: Request) -> AsyncIterator[Any]:
+    """Yield parsed objects from an NDJSON request body as it streams in."""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    if buffer.strip():
+        yield json.loads(buffer)
+
+
+async def _read_bulk_payloads(request: Request) -> Tuple[List[Optional[AlertCreate]], List[dict]]:
+    """
+    Parse a bulk request body (JSON array, {"alerts": [...]} or NDJSON).
+
+    Items are validated one at a time. Returns one entry per item (None for
+    an invalid item) and the per-index validation errors.
+    """
+    content_type = request.headers.get("content-type", "")
+    max_alerts = settings.ALERT_BULK_MAX_ALERTS
+    alerts: List[Optional[AlertCreate]] = []
+    errors: List[dict] = []
+
+    async def _items() -> AsyncIterator[Any]:
+        if "ndjson" in content_type or "jsonl" in content_type:
+            async for item in _iter_ndjson(request):
+                yield item
+            return
+        body = json.loads(await request.body() or b"[]")
+        if isinstance(body, dict):
+            body = body.get("alerts", [])
+        if not isinstance(body, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of alerts")
+        for item in body:
+            yield item
 
-        return {
-            "status": "received",
+    try:
+        async for item in _items():
+            if len(alerts) >= max_alerts:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Too many alerts in one request (max {max_alerts})"
+                )
+            try:
+                alerts.append(AlertCreate.model_validate(item))
+            except ValidationError as e:
+                errors.append({
+                    "index": len(alerts),
+                    "errors": e.errors(include_url=False, include_context=False),
+                })
+                alerts.append(None)
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+
+    return alerts, errors
+
+
+@router.post("/bulk", response_model=dict)
+async def create_alerts_bulk(request: Request):
+    """Create many alerts in one statement (webhook endpoint - no auth required).
+
+    Accepts a JSON array of AlertCreate payloads (or {"alerts": [...]}), or
+    an NDJSON stream with Content-Type application/x-ndjson. All alerts are
+    inserted with a single executemany INSERT in one transaction, and AI
+    triage for the whole batch is queued at once. Alerts
+    with skip_ai=True are stored but not triaged.
+
+    Alerts folded into an existing alert by deduplication are not inserted;
+    their position in alert_ids holds the existing alert's ID. An alert's
+    rate_limited_dropped count is added to the occurrence count of the alert
+    it is stored as or folded into.
+
+    Items that fail validation do not reject the batch: the valid alerts are
+    inserted, the invalid positions in alert_ids are null, and the response
+    is a 207 listing the validation errors by index.
+    """
+    alerts, errors = await _read_bulk_payloads(request)
+    if not alerts:
+        return {"status": "received", "count": 0, "deduplicated": 0, "alert_ids": [], "ai_processing": False}
+
+    dedup = get_alert_deduplicator()
+    rows = []
+    alert_ids = []
+    registered = []
+    triage_ids = []
+    for alert in alerts:
+        if alert is None:
+            alert_ids.append(None)
+            continue
+
+        alert_id = str(uuid.uuid4())
+        fingerprint = dedup.fingerprint(alert.model_dump())
+        existing = dedup.fold(fingerprint, alert_id, alert.severity, extra=alert.rate_limited_dropped)
+        if existing:
+            alert_ids.append(existing.alert_id)
+            continue
+
+        alert_ids.append(alert_id)
+        registered.append((fingerprint, alert_id))
+        rows.append({
             "alert_id": alert_id,
-            "ai_processing": not alert.skip_ai
-        }
-    finally:
-        session.close()
+            "title": alert.title,
+            "severity": alert.severity,
+            "description": alert.description,
+            "source": alert.source or "manual",
+            "device_name": alert.device_name,
+            "alert_type": alert.alert_type,
+            "raw_data": alert.raw_data or {},
+            "status": "new",
+            "auto_triage": not alert.skip_ai,
+            "fingerprint": fingerprint,
+            "occurrence_count": 1 + alert.rate_limited_dropped,
+        })
+        if not alert.skip_ai:
+            triage_ids.append((alert_id, alert.severity))
+
+    if rows:
+        try:
+            async with async_session_scope() as session:
+                await session.execute(insert(AlertModel), rows)
+        except Exception:
+            for fingerprint, alert_id in registered:
+                dedup.forget(fingerprint, alert_id)
+            raise
+
+    if triage_ids:
+        get_triage_scheduler().submit_many(triage_ids)
+
+    result = {
+        "status": "received",
+        "count": len(rows),
+        "deduplicated": len(alerts) - len(errors) - len(rows),
+        "alert_ids": alert_ids,
+        "ai_processing": bool(triage_ids),
+    }
+    if errors:
+        log.warning(f"Bulk alert request had {len(errors)} invalid of {len(alerts)} alerts")
+        result.update(status="partial", rejected=len(errors), errors=errors)
+        return JSONResponse(status_code=207, content=result)
+    return result
+
+
+@router.get("/triage/stats", response_model=dict)
+async def get_triage_stats(user=Depends(get_current_user)):
+    """Get AI triage queue and worker pool statistics."""
+    return {
+        "success": True,
+        "stats": get_triage_scheduler().get_stats()
+    }
+
+
+@router.get("/dedup/stats", response_model=dict)
+async def get_dedup_stats(user=Depends(get_current_user)):
+    """Get alert deduplication / storm suppression statistics."""
+    return {
+        "success": True,
+        "stats": get_alert_deduplicator().get_stats()
+    }
 
 
 @router.get("/{alert_id}", response_model=dict)
-async def get_alert(alert_id: str, user=Depends(get_current_user)):
+async def get_alert(
+    alert_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_user)
+):
     """Get alert by ID."""
-    session = get_session()
-    try:
-        alert = session.query(AlertModel).filter(AlertModel.alert_id == alert_id).first()
-        if not alert:
-            raise HTTPException(status_code=404, detail="Alert not found")
-        return {
-            "success": True,
-            "alert": {
-                "alert_id": alert.alert_id,
-                "title": alert.title,
-                "severity": alert.severity,
-                "status": alert.status,
-                "description": alert.description,
-                "source": alert.source,
-                "device_name": alert.device_name,
-                "alert_type": alert.alert_type,
-                "raw_data": alert.raw_data,
-                "incident_id": alert.incident_id,
-                "created_at": alert.created_at.isoformat() if alert.created_at else None,
-                "acknowledged_at": alert.acknowledged_at.isoformat() if alert.acknowledged_at else None,
-                "resolved_at": alert.resolved_at.isoformat() if alert.resolved_at else None,
-            }
+    alert = await _get_alert(db, alert_id)
+    return {
+        "success": True,
+        "alert": {
+            "alert_id": alert.alert_id,
+            "title": alert.title,
+            "severity": alert.severity,
+            "status": alert.status,
+            "description": alert.description,
+            "source": alert.source,
+            "device_name": alert.device_name,
+            "alert_type": alert.alert_type,
+            "raw_data": alert.raw_data,
+            "incident_id": alert.incident_id,
+            "fingerprint": alert.fingerprint,
+            "occurrence_count": alert.occurrence_count or 1,
+            "last_seen_at": alert.last_seen_at.isoformat() if alert.last_seen_at else None,
+            "created_at": alert.created_at.isoformat() if alert.created_at else None,
+            "acknowledged_at": alert.acknowledged_at.isoformat() if alert.acknowledged_at else None,
+            "resolved_at": alert.resolved_at.isoformat() if alert.resolved_at else None,
         }
-    finally:
-        session.close()
+    }
 
 
 @router.post("/{alert_id}/acknowledge")
-async def acknowledge_alert(alert_id: str, user=Depends(get_current_user)):
+async def acknowledge_alert(
+    alert_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_user)
+):
     """Acknowledge an alert."""
-    session = get_session()
-    try:
-        alert = session.query(AlertModel).filter(AlertModel.alert_id == alert_id).first()
-        if not alert:
-            raise HTTPException(status_code=404, detail="Alert not found")
-        alert.status = "acknowledged"
-        session.commit()
-        return {"success": True, "message": "Alert acknowledged"}
-    finally:
-        session.close()
+    alert = await _get_alert(db, alert_id)
+    alert.status = "acknowledged"
+    await db.commit()
+    get_alert_deduplicator().close(alert_id)
+    return {"success": True, "message": "Alert acknowledged"}
 
 
 @router.post("/{alert_id}/process")
-async def process_alert(alert_id: str, background_tasks: BackgroundTasks, user=Depends(get_current_user)):
+async def process_alert(
+    alert_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_user)
+):
     """Trigger AI processing for alert."""
-    session = get_session()
-    try:
-        alert = session.query(AlertModel).filter(AlertModel.alert_id == alert_id).first()
-        if not alert:
-            raise HTTPException(status_code=404, detail="Alert not found")
+    alert = await _get_alert(db, alert_id)
 
-        # Trigger AI processing in background
-        background_tasks.add_task(_trigger_ai_processing, alert_id, False)
+    # Queue AI processing (regardless of the alert's current status)
+    get_triage_scheduler().submit(alert_id, alert.severity, force=True)
 
-        return {
-            "success": True,
-            "message": "AI processing triggered",
-            "alert_id": alert_id
-        }
-    finally:
-        session.close()
+    return {
+        "success": True,
+        "message": "AI processing triggered",
+        "alert_id": alert_id
+    }
 
 
 @router.get("/{alert_id}/sessions")
-async def get_alert_sessions(alert_id: str, user=Depends(get_current_user)):
+async def get_alert_sessions(
+    alert_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_user)
+):
     """Get AI sessions for alert."""
-    from netstacks_core.db import AgentSession
-
-    session = get_session()
-    try:
-        # Get sessions triggered by this alert
-        sessions = session.query(AgentSession).filter(
+    # Get sessions triggered by this alert
+    sessions = (await db.execute(
+        select(AgentSession).where(
             AgentSession.trigger_type == "alert",
             AgentSession.trigger_id == alert_id,
-        ).order_by(AgentSession.created_at.desc()).all()
-
-        return {
-            "success": True,
-            "alert_id": alert_id,
-            "sessions": [
-                {
-                    "session_id": s.session_id,
-                    "agent_id": s.agent_id,
-                    "status": s.status,
-                    "initial_prompt": s.initial_prompt,
-                    "summary": s.summary,
-                    "resolution_status": s.resolution_status,
-                    "started_by": s.started_by,
-                    "created_at": s.created_at.isoformat() if s.created_at else None,
-                    "completed_at": s.completed_at.isoformat() if s.completed_at else None,
-                }
-                for s in sessions
-            ]
-        }
-    finally:
-        session.close()
+        ).order_by(AgentSession.created_at.desc())
+    )).scalars().all()
+
+    return {
+        "success": True,
+        "alert_id": alert_id,
+        "sessions": [
+            {
+                "session_id": s.session_id,
+                "agent_id": s.agent_id,
+                "status": s.status,
+                "initial_prompt": s.initial_prompt,
+                "summary": s.summary,
+                "resolution_status": s.resolution_status,
+                "started_by": s.started_by,
+                "created_at": s.created_at.isoformat() if s.created_at else None,
+                "completed_at": s.completed_at.isoformat() if s.completed_at else None,
+            }
+            for s in sessions
+        ]
+    }
 
 
 # Webhook endpoints
 @router.post("/webhooks/generic", response_model=dict)
-async def generic_webhook(data: dict, background_tasks: BackgroundTasks):
+async def generic_webhook(data: dict):
     """Generic alert webhook.
 
-    Automatically triggers AI triage for each alert unless skip_ai=true in data.
+    Automatically queues AI triage for each alert unless skip_ai=true in data.
+    Repeats inside the dedup window are folded into the first alert.
     """
-    session = get_session()
+    alert_id = str(uuid.uuid4())
+    skip_ai = data.get("skip_ai", False)
+    fields = {
+        "title": data.get("title", "Untitled Alert"),
+        "severity": data.get("severity", "warning"),
+        "description": data.get("description"),
+        "source": data.get("source", "generic"),
+        "device_name": data.get("device_name") or data.get("device"),
+        "alert_type": data.get("alert_type"),
+    }
+
+    dedup = get_alert_deduplicator()
+    fingerprint = dedup.fingerprint({**fields, "raw_data": data})
+    existing = dedup.fold(fingerprint, alert_id, fields["severity"])
+    if existing:
+        return _deduplicated_response(existing)
+
     try:
-        import uuid
-        alert_id = str(uuid.uuid4())
-        skip_ai = data.get("skip_ai", False)
-
-        alert = AlertModel(
-            alert_id=alert_id,
-            title=data.get("title", "Untitled Alert"),
-            severity=data.get("severity", "warning"),
-            description=data.get("description"),
-            source=data.get("source", "generic"),
-            device_name=data.get("device_name") or data.get("device"),
-            alert_type=data.get("alert_type"),
-            raw_data=data,
-            status="new",
-        )
-        session.add(alert)
-        session.commit()
-
-        # Trigger AI processing
-        if not skip_ai:
-            background_tasks.add_task(_trigger_ai_processing, alert_id, skip_ai)
-
-        return {
-            "status": "received",
-            "alert_id": alert_id,
-            "ai_processing": not skip_ai
-        }
-    finally:
-        session.close()
+        async with async_session_scope() as session:
+            session.add(AlertModel(
+                alert_id=alert_id,
+                raw_data=data,
+                status="new",
+                auto_triage=not skip_ai,
+                fingerprint=fingerprint,
+                occurrence_count=1,
+                **fields,
+            ))
+    except Exception:
+        dedup.forget(fingerprint, alert_id)
+        raise
+
+    # Queue AI triage
+    if not skip_ai:
+        get_triage_scheduler().submit(alert_id, fields["severity"])
+
+    return {
+        "status": "received",
+        "alert_id": alert_id,
+        "ai_processing": not skip_ai
+    }
 
 
 @router.post("/webhooks/prometheus", response_model=dict)
-async def prometheus_webhook(data: dict, background_tasks: BackgroundTasks):
+async def prometheus_webhook(data: dict):
     """Prometheus AlertManager webhook.
 
-    Automatically triggers AI triage for each alert.
+    Automatically queues AI triage for each alert.
+    Repeats inside the dedup window are folded into the first alert; their
+    position in alert_ids holds the existing alert's ID.
     """
-    session = get_session()
-    try:
-        import uuid
-        alerts_data = data.get("alerts", [])
-        created_ids = []
-
-        for alert_data in alerts_data:
-            labels = alert_data.get("labels", {})
-            annotations = alert_data.get("annotations", {})
-            alert_id = str(uuid.uuid4())
+    alerts_data = data.get("alerts", [])
+    dedup = get_alert_deduplicator()
+    alert_ids = []
+    registered = []
+    triage = []
 
-            alert = AlertModel(
-                alert_id=alert_id,
-                title=labels.get("alertname", "Prometheus Alert"),
-                severity=labels.get("severity", "warning"),
-                description=annotations.get("summary") or annotations.get("description"),
-                source="prometheus",
-                device_name=labels.get("instance"),
-                alert_type=labels.get("alertname"),
-                raw_data=alert_data,
-                status="new",
-            )
-            session.add(alert)
-            created_ids.append(alert_id)
-
-        session.commit()
-
-        # Trigger AI processing for each alert
-        for alert_id in created_ids:
-            background_tasks.add_task(_trigger_ai_processing, alert_id, False)
+    try:
+        async with async_session_scope() as session:
+            for alert_data in alerts_data:
+                labels = alert_data.get("labels", {})
+                annotations = alert_data.get("annotations", {})
+                alert_id = str(uuid.uuid4())
+                fields = {
+                    "title": labels.get("alertname", "Prometheus Alert"),
+                    "severity": labels.get("severity", "warning"),
+                    "description": annotations.get("summary") or annotations.get("description"),
+                    "source": "prometheus",
+                    "device_name": labels.get("instance"),
+                    "alert_type": labels.get("alertname"),
+                }
 
-        return {
-            "status": "received",
-            "count": len(created_ids),
-            "alert_ids": created_ids,
-            "ai_processing": True
-        }
-    finally:
-        session.close()
+                fingerprint = dedup.fingerprint({**fields, "raw_data": alert_data})
+                existing = dedup.fold(fingerprint, alert_id, fields["severity"])
+                if existing:
+                    alert_ids.append(existing.alert_id)
+                    continue
+
+                registered.append((fingerprint, alert_id))
+                session.add(AlertModel(
+                    alert_id=alert_id,
+                    raw_data=alert_data,
+                    status="new",
+                    auto_triage=True,
+                    fingerprint=fingerprint,
+                    occurrence_count=1,
+                    **fields,
+                ))
+                alert_ids.append(alert_id)
+                triage.append((alert_id, fields["severity"]))
+    except Exception:
+        for fingerprint, alert_id in registered:
+            dedup.forget(fingerprint, alert_id)
+        raise
+
+    # Queue AI triage for each new alert
+    if triage:
+        get_triage_scheduler().submit_many(triage)
+
+    return {
+        "status": "received",
+        "count": len(triage),
+        "deduplicated": len(alert_ids) - len(triage),
+        "alert_ids": alert_ids,
+        "ai_processing": bool(triage)
+    }
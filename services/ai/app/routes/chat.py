@@ -5,26 +5,33 @@ Agent Chat Routes
 Provides HTTP endpoints for agent chat with Server-Sent Events (SSE) streaming.
 """
 
+import asyncio
 import logging
 import json
-from typing import Optional
+from contextlib import suppress
+from typing import Optional, Tuple
 from datetime import datetime
 
 from fastapi import APIRouter, HTTPException, Depends, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from netstacks_core.db import get_session, Agent as AgentModel, AgentSession
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from netstacks_core.db import get_async_db, async_session_scope, Agent as AgentModel, AgentSession
 from netstacks_core.auth import get_current_user
 
+from app.config import get_settings
 from app.services import (
     AgentExecutor,
     ExecutorContext,
-    create_agent_session,
-    end_agent_session,
-    get_session_messages,
+    create_agent_session_async,
+    end_agent_session_async,
+    get_session_messages_async,
     EventType,
 )
+from app.services.executor_cache import get_executor_cache, CachedExecutor
 
 log = logging.getLogger(__name__)
 
@@ -55,9 +62,105 @@ class EndSessionRequest(BaseModel):
     resolution_status: Optional[str] = None
 
 
+async def _get_agent(db: AsyncSession, agent_id: str) -> Optional[AgentModel]:
+    return (await db.execute(
+        select(AgentModel).where(AgentModel.agent_id == agent_id)
+    )).scalars().first()
+
+
+async def _get_session(db: AsyncSession, session_id: str) -> AgentSession:
+    """Load a chat session or raise 404."""
+    session = (await db.execute(
+        select(AgentSession).where(AgentSession.session_id == session_id)
+    )).scalars().first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session
+
+
+async def _get_active_session(db: AsyncSession, session_id: str) -> AgentSession:
+    """Load an active chat session, raising 404/400 otherwise."""
+    session = await _get_session(db, session_id)
+    if session.status != "active":
+        raise HTTPException(status_code=400, detail="Session is not active")
+    return session
+
+
+async def _load_executor(session: AgentSession, agent: AgentModel) -> AgentExecutor:
+    """
+    Create an executor for the agent with the session's conversation history.
+
+    Messages already folded into the session's rolling summary are not
+    reloaded; the summary stands in for them.
+    """
+    from app.services.llm_client import Message
+
+    try:
+        executor = AgentExecutor.from_agent(agent)
+    except Exception as e:
+        log.error(f"Failed to create executor: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to initialize agent: {e}")
+
+    executor.summary = session.history_summary
+    executor.summarized_count = session.summarized_message_count or 0
+
+    messages = await get_session_messages_async(session.session_id, offset=executor.summarized_count)
+    for msg in messages:
+        executor.messages.append(Message(
+            role=msg["role"],
+            content=msg["content"],
+        ))
+    return executor
+
+
+async def _build_session_executor(session_id: str) -> Tuple[str, AgentExecutor]:
+    """
+    Load a session's agent and history into a new executor.
+
+    Uses its own database session: rebuilds can happen while a streamed
+    response runs, after the request's session has been closed.
+    """
+    async with async_session_scope() as db:
+        session = await _get_session(db, session_id)
+        agent = await _get_agent(db, session.agent_id)
+        if not agent:
+            raise HTTPException(status_code=404, detail="Agent not found")
+        return agent.agent_id, await _load_executor(session, agent)
+
+
+async def _get_session_executor(session_id: str) -> CachedExecutor:
+    """
+    Get the live executor for a session.
+
+    Hot sessions reuse their cached executor; otherwise the agent and
+    history are loaded from the database and the new executor is cached.
+    Concurrent messages on a cold session wait for a single build.
+    """
+    return await get_executor_cache().get_or_create(
+        session_id, lambda: _build_session_executor(session_id)
+    )
+
+
+def _run_session_executor(session_id: str):
+    """Hold the session's current executor for one run (see ExecutorCache.acquire)."""
+    return get_executor_cache().acquire(
+        session_id, lambda: _build_session_executor(session_id)
+    )
+
+
+@router.get("/cache/stats", response_model=dict)
+async def get_executor_cache_stats(user=Depends(get_current_user)):
+    """Get live session executor cache statistics."""
+    return {
+        "success": True,
+        "stats": get_executor_cache().get_stats()
+    }
+
+
 @router.post("/start", response_model=StartSessionResponse)
 async def start_chat_session(
     request: StartSessionRequest,
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user)
 ):
     """
@@ -65,37 +168,31 @@ async def start_chat_session(
 
     Returns a session_id to use for subsequent messages.
     """
-    db_session = get_session()
-    try:
-        # Get the agent
-        agent = db_session.query(AgentModel).filter(
-            AgentModel.agent_id == request.agent_id
-        ).first()
+    # Get the agent
+    agent = await _get_agent(db, request.agent_id)
 
-        if not agent:
-            raise HTTPException(status_code=404, detail="Agent not found")
+    if not agent:
+        raise HTTPException(status_code=404, detail="Agent not found")
 
-        if not agent.is_enabled:
-            raise HTTPException(status_code=400, detail="Agent is not active")
+    if not agent.is_enabled:
+        raise HTTPException(status_code=400, detail="Agent is not active")
 
-        # Create session
-        username = user.get("sub", "unknown") if isinstance(user, dict) else getattr(user, "sub", "unknown")
-        session_id = create_agent_session(
-            agent_id=request.agent_id,
-            username=username,
-            trigger_type="user",
-        )
+    # Create session
+    username = user.get("sub", "unknown") if isinstance(user, dict) else getattr(user, "sub", "unknown")
+    session_id = await create_agent_session_async(
+        agent_id=request.agent_id,
+        username=username,
+        trigger_type="user",
+    )
 
-        log.info(f"Started chat session {session_id} with agent {agent.name}")
+    log.info(f"Started chat session {session_id} with agent {agent.name}")
 
-        return StartSessionResponse(
-            success=True,
-            session_id=session_id,
-            agent_name=agent.name,
-            agent_type=agent.agent_type,
-        )
-    finally:
-        db_session.close()
+    return StartSessionResponse(
+        success=True,
+        session_id=session_id,
+        agent_name=agent.name,
+        agent_type=agent.agent_type,
+    )
 
 
 @router.post("/{session_id}/message")
@@ -103,58 +200,29 @@ async def send_message(
     session_id: str,
     request: SendMessageRequest,
     http_request: Request,
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user)
 ):
     """
     Send a message to the agent and get a streaming response.
 
-    Returns a Server-Sent Events stream with agent events.
+    Returns a Server-Sent Events stream with agent events as they happen:
+    text and tool-call argument deltas while the LLM generates, then tool
+    results. A heartbeat event is sent while nothing else is. If the client
+    disconnects, the run is cancelled, which also aborts the upstream LLM
+    request.
     """
-    db_session = get_session()
-    try:
-        # Verify session exists and is active
-        session = db_session.query(AgentSession).filter(
-            AgentSession.session_id == session_id
-        ).first()
+    # Verify session exists and is active
+    session = await _get_active_session(db, session_id)
 
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
+    username = user.get("sub", "unknown") if isinstance(user, dict) else getattr(user, "sub", "unknown")
 
-        if session.status != "active":
-            raise HTTPException(status_code=400, detail="Session is not active")
+    # Get auth token from request
+    auth_header = http_request.headers.get("Authorization", "")
+    auth_token = auth_header.replace("Bearer ", "") if auth_header.startswith("Bearer ") else None
 
-        # Get the agent
-        agent = db_session.query(AgentModel).filter(
-            AgentModel.agent_id == session.agent_id
-        ).first()
-
-        if not agent:
-            raise HTTPException(status_code=404, detail="Agent not found")
-
-        username = user.get("sub", "unknown") if isinstance(user, dict) else getattr(user, "sub", "unknown")
-
-        # Get auth token from request
-        auth_header = http_request.headers.get("Authorization", "")
-        auth_token = auth_header.replace("Bearer ", "") if auth_header.startswith("Bearer ") else None
-
-    finally:
-        db_session.close()
-
-    # Create executor from agent config
-    try:
-        executor = AgentExecutor.from_agent_config(session.agent_id)
-    except Exception as e:
-        log.error(f"Failed to create executor: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to initialize agent: {e}")
-
-    # Load existing conversation history
-    existing_messages = get_session_messages(session_id)
-    for msg in existing_messages:
-        from app.services.llm_client import Message
-        executor.messages.append(Message(
-            role=msg["role"],
-            content=msg["content"],
-        ))
+    # Load the live executor up front so a missing agent fails the request
+    await _get_session_executor(session_id)
 
     # Create execution context
     context = ExecutorContext(
@@ -165,18 +233,46 @@ async def send_message(
         trigger_type="user",
     )
 
-    async def event_generator():
-        """Generate SSE events from agent execution."""
-        try:
-            async for event in executor.run(request.message, context):
-                # Format as SSE
-                event_data = json.dumps(event.to_dict())
-                yield f"data: {event_data}\n\n"
+    heartbeat_seconds = get_settings().CHAT_SSE_HEARTBEAT_SECONDS
 
+    async def run_agent(queue: asyncio.Queue):
+        """Run the agent, queueing serialized events; None marks the end."""
+        try:
+            # One run at a time per session: runs share the executor's history
+            async with _run_session_executor(session_id) as cached:
+                async for event in cached.executor.stream_run(request.message, context):
+                    await queue.put(event.to_dict())
         except Exception as e:
             log.error(f"Error during agent execution: {e}", exc_info=True)
-            error_event = {"type": "error", "content": str(e)}
-            yield f"data: {json.dumps(error_event)}\n\n"
+            await queue.put({"type": "error", "content": str(e)})
+        finally:
+            await queue.put(None)
+
+    async def event_generator():
+        """Generate SSE events from agent execution, with heartbeats."""
+        queue: asyncio.Queue = asyncio.Queue()
+        runner = asyncio.create_task(run_agent(queue))
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    if await http_request.is_disconnected():
+                        log.info(f"Client disconnected from chat session {session_id}")
+                        break
+                    yield f"data: {json.dumps({'type': 'heartbeat'})}\n\n"
+                    continue
+
+                if event is None:
+                    break
+                # Format as SSE
+                yield f"data: {json.dumps(event)}\n\n"
+        finally:
+            # Client gone or stream closed: stop the run and the LLM request
+            if not runner.done():
+                runner.cancel()
+                with suppress(asyncio.CancelledError):
+                    await runner
 
     return StreamingResponse(
         event_generator(),
@@ -194,6 +290,7 @@ async def send_message_sync(
     session_id: str,
     request: SendMessageRequest,
     http_request: Request,
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user)
 ):
     """
@@ -201,47 +298,15 @@ async def send_message_sync(
 
     Use this for simpler integrations that don't need streaming.
     """
-    db_session = get_session()
-    try:
-        # Verify session
-        session = db_session.query(AgentSession).filter(
-            AgentSession.session_id == session_id
-        ).first()
-
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
-
-        if session.status != "active":
-            raise HTTPException(status_code=400, detail="Session is not active")
-
-        agent = db_session.query(AgentModel).filter(
-            AgentModel.agent_id == session.agent_id
-        ).first()
-
-        if not agent:
-            raise HTTPException(status_code=404, detail="Agent not found")
+    # Verify session
+    session = await _get_active_session(db, session_id)
 
-        username = user.get("sub", "unknown") if isinstance(user, dict) else getattr(user, "sub", "unknown")
-        auth_header = http_request.headers.get("Authorization", "")
-        auth_token = auth_header.replace("Bearer ", "") if auth_header.startswith("Bearer ") else None
+    username = user.get("sub", "unknown") if isinstance(user, dict) else getattr(user, "sub", "unknown")
+    auth_header = http_request.headers.get("Authorization", "")
+    auth_token = auth_header.replace("Bearer ", "") if auth_header.startswith("Bearer ") else None
 
-    finally:
-        db_session.close()
-
-    # Create executor
-    try:
-        executor = AgentExecutor.from_agent_config(session.agent_id)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to initialize agent: {e}")
-
-    # Load history
-    existing_messages = get_session_messages(session_id)
-    for msg in existing_messages:
-        from app.services.llm_client import Message
-        executor.messages.append(Message(
-            role=msg["role"],
-            content=msg["content"],
-        ))
+    # Load the live executor up front so a missing agent fails the request
+    await _get_session_executor(session_id)
 
     context = ExecutorContext(
         session_id=session_id,
@@ -257,22 +322,23 @@ async def send_message_sync(
     tool_calls = []
 
     try:
-        async for event in executor.run(request.message, context):
-            events.append(event.to_dict())
-
-            if event.type == EventType.FINAL_RESPONSE:
-                final_response = event.content
-            elif event.type == EventType.TOOL_CALL:
-                tool_calls.append({
-                    "name": event.tool_name,
-                    "input": event.tool_input,
-                })
-            elif event.type == EventType.ERROR:
-                return {
-                    "success": False,
-                    "error": event.content,
-                    "events": events,
-                }
+        async with _run_session_executor(session_id) as cached:
+            async for event in cached.executor.run(request.message, context):
+                events.append(event.to_dict())
+
+                if event.type == EventType.FINAL_RESPONSE:
+                    final_response = event.content
+                elif event.type == EventType.TOOL_CALL:
+                    tool_calls.append({
+                        "name": event.tool_name,
+                        "input": event.tool_input,
+                    })
+                elif event.type == EventType.ERROR:
+                    return {
+                        "success": False,
+                        "error": event.content,
+                        "events": events,
+                    }
 
     except Exception as e:
         log.error(f"Error during agent execution: {e}", exc_info=True)
@@ -293,90 +359,64 @@ async def send_message_sync(
 @router.get("/{session_id}/messages")
 async def get_chat_messages(
     session_id: str,
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user)
 ):
     """Get all messages in a chat session."""
-    db_session = get_session()
-    try:
-        session = db_session.query(AgentSession).filter(
-            AgentSession.session_id == session_id
-        ).first()
-
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
+    await _get_session(db, session_id)
 
-        messages = get_session_messages(session_id)
+    messages = await get_session_messages_async(session_id)
 
-        return {
-            "success": True,
-            "session_id": session_id,
-            "messages": messages,
-        }
-    finally:
-        db_session.close()
+    return {
+        "success": True,
+        "session_id": session_id,
+        "messages": messages,
+    }
 
 
 @router.post("/{session_id}/end")
 async def end_chat_session(
     session_id: str,
     request: Optional[EndSessionRequest] = None,
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user)
 ):
     """End a chat session."""
-    db_session = get_session()
-    try:
-        session = db_session.query(AgentSession).filter(
-            AgentSession.session_id == session_id
-        ).first()
-
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
+    await _get_session(db, session_id)
 
-        end_agent_session(
-            session_id=session_id,
-            status="completed",
-            summary=request.summary if request else None,
-            resolution_status=request.resolution_status if request else None,
-        )
+    await end_agent_session_async(
+        session_id=session_id,
+        status="completed",
+        summary=request.summary if request else None,
+        resolution_status=request.resolution_status if request else None,
+    )
+    get_executor_cache().invalidate(session_id)
 
-        log.info(f"Ended chat session {session_id}")
+    log.info(f"Ended chat session {session_id}")
 
-        return {"success": True, "message": "Session ended"}
-    finally:
-        db_session.close()
+    return {"success": True, "message": "Session ended"}
 
 
 @router.get("/{session_id}")
 async def get_session_info(
     session_id: str,
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user)
 ):
     """Get information about a chat session."""
-    db_session = get_session()
-    try:
-        session = db_session.query(AgentSession).filter(
-            AgentSession.session_id == session_id
-        ).first()
+    session = await _get_session(db, session_id)
+    agent = await _get_agent(db, session.agent_id)
 
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
-
-        agent = db_session.query(AgentModel).filter(
-            AgentModel.agent_id == session.agent_id
-        ).first()
-
-        return {
-            "success": True,
-            "session": {
-                "session_id": session.session_id,
-                "agent_id": session.agent_id,
-                "agent_name": agent.name if agent else None,
-                "agent_type": agent.agent_type if agent else None,
-                "status": session.status,
-                "started_at": session.started_at.isoformat() if session.started_at else None,
-                "completed_at": session.completed_at.isoformat() if session.completed_at else None,
-                "started_by": session.started_by,
-            }
+    return {
+        "success": True,
+        "session": {
+            "session_id": session.session_id,
+            "agent_id": session.agent_id,
+            "agent_name": agent.name if agent else None,
+            "agent_type": agent.agent_type if agent else None,
+            "status": session.status,
+            "started_at": session.started_at.isoformat() if session.started_at else None,
+            "completed_at": session.completed_at.isoformat() if session.completed_at else None,
+            "started_by": session.started_by,
         }
-    finally:
-        db_session.close()
+    }
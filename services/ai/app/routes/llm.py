@@ -14,6 +14,10 @@ from pydantic import BaseModel, Field
 from netstacks_core.db import get_session, LLMProvider
 from netstacks_core.auth import get_current_user
 
+from app.services.executor_cache import get_executor_cache
+from app.services.llm_transport import get_transport_stats
+from app.services.rate_limiter import get_rate_limit_stats
+
 log = logging.getLogger(__name__)
 
 router = APIRouter()
@@ -78,6 +82,16 @@ async def list_providers(user=Depends(get_current_user)):
         session.close()
 
 
+@router.get("/stats", response_model=dict)
+async def get_llm_stats(user=Depends(get_current_user)):
+    """Get per-provider request latency, time to first token, retry and rate limit statistics."""
+    return {
+        "success": True,
+        "stats": get_transport_stats(),
+        "rate_limits": get_rate_limit_stats(),
+    }
+
+
 @router.get("/{name}", response_model=dict)
 async def get_provider(name: str, user=Depends(get_current_user)):
     """Get provider details by name."""
@@ -135,6 +149,7 @@ async def create_provider(request: LLMProviderCreate, user=Depends(get_current_u
             if request.config:
                 existing.config = request.config
             session.commit()
+            get_executor_cache().invalidate_all()
 
             log.info(f"Updated LLM provider: {request.name}")
             return {
@@ -157,6 +172,7 @@ async def create_provider(request: LLMProviderCreate, user=Depends(get_current_u
             )
             session.add(provider)
             session.commit()
+            get_executor_cache().invalidate_all()
 
             log.info(f"Created LLM provider: {request.name}")
             return {
@@ -202,6 +218,7 @@ async def update_provider(
             provider.config = request.config
 
         session.commit()
+        get_executor_cache().invalidate_all()
 
         log.info(f"Updated LLM provider: {name}")
         return {"success": True, "message": "Provider updated"}
@@ -223,6 +240,7 @@ async def delete_provider(name: str, user=Depends(get_current_user)):
 
         session.delete(provider)
         session.commit()
+        get_executor_cache().invalidate_all()
 
         log.info(f"Deleted LLM provider: {name}")
         return {"success": True, "message": "Provider deleted"}
@@ -7,6 +7,9 @@ Provides detailed visibility into AI agent processing, including:
 - Individual step details with tool calls
 - Token usage and cost tracking
 - Drill-down capability for step analysis
+
+Workflows still being processed are served from the alert processor's
+in-memory state, which is ahead of the database by up to one flush interval.
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Query
@@ -16,9 +19,34 @@ from datetime import datetime, timedelta
 from netstacks_core.db import get_session, WorkflowLog, WorkflowStep
 from netstacks_core.auth import get_current_user
 
+from app.services.alert_processor import get_alert_processor
+
 router = APIRouter()
 
 
+def _overlay_live(entry: dict) -> dict:
+    """Replace a listed workflow's progress fields with live in-memory values."""
+    live = get_alert_processor().get_live_workflow(entry["workflow_id"])
+    if live is None:
+        return entry
+    workflow, steps = live.snapshot()
+    entry.update(
+        status=workflow.status,
+        summary=workflow.summary,
+        outcome=workflow.outcome,
+        completed_at=workflow.completed_at.isoformat() if workflow.completed_at else None,
+        duration_ms=workflow.duration_ms,
+        total_tokens=workflow.total_tokens,
+        estimated_cost_usd=round(workflow.estimated_cost_usd, 6) if workflow.estimated_cost_usd else 0,
+        step_count=len(steps),
+        live=True,
+    )
+    for key in ("total_input_tokens", "total_output_tokens", "total_cache_read_tokens", "total_cache_write_tokens"):
+        if key in entry:
+            entry[key] = getattr(workflow, key)
+    return entry
+
+
 @router.get("/", response_model=dict)
 async def list_workflows(
     alert_id: Optional[str] = Query(None, description="Filter by alert ID"),
@@ -67,7 +95,7 @@ async def list_workflows(
             "offset": offset,
             "limit": limit,
             "workflows": [
-                {
+                _overlay_live({
                     "workflow_id": w.workflow_id,
                     "alert_id": w.alert_id,
                     "incident_id": w.incident_id,
@@ -82,11 +110,13 @@ async def list_workflows(
                     "total_tokens": w.total_tokens,
                     "total_input_tokens": w.total_input_tokens,
                     "total_output_tokens": w.total_output_tokens,
+                    "total_cache_read_tokens": w.total_cache_read_tokens or 0,
+                    "total_cache_write_tokens": w.total_cache_write_tokens or 0,
                     "estimated_cost_usd": round(w.estimated_cost_usd, 6) if w.estimated_cost_usd else 0,
                     "trigger_source": w.trigger_source,
                     "initiated_by": w.initiated_by,
                     "step_count": len(w.steps) if w.steps else 0,
-                }
+                })
                 for w in workflows
             ]
         }
@@ -94,6 +124,63 @@ async def list_workflows(
         session.close()
 
 
+def _workflow_detail(workflow, steps) -> dict:
+    """Full workflow with step summaries (ORM rows or live snapshot)."""
+    return {
+        "workflow_id": workflow.workflow_id,
+        "alert_id": workflow.alert_id,
+        "incident_id": workflow.incident_id,
+        "workflow_type": workflow.workflow_type,
+        "status": workflow.status,
+        "title": workflow.title,
+        "summary": workflow.summary,
+        "outcome": workflow.outcome,
+        "started_at": workflow.started_at.isoformat() if workflow.started_at else None,
+        "completed_at": workflow.completed_at.isoformat() if workflow.completed_at else None,
+        "duration_ms": workflow.duration_ms,
+        "total_tokens": workflow.total_tokens,
+        "total_input_tokens": workflow.total_input_tokens,
+        "total_output_tokens": workflow.total_output_tokens,
+        "total_cache_read_tokens": workflow.total_cache_read_tokens or 0,
+        "total_cache_write_tokens": workflow.total_cache_write_tokens or 0,
+        "estimated_cost_usd": round(workflow.estimated_cost_usd, 6) if workflow.estimated_cost_usd else 0,
+        "trigger_source": workflow.trigger_source,
+        "initiated_by": workflow.initiated_by,
+        "primary_session_id": workflow.primary_session_id,
+        "session_ids": workflow.session_ids or [],
+        "context_data": workflow.context_data or {},
+        "steps": [
+            {
+                "step_id": s.step_id,
+                "sequence": s.sequence,
+                "step_type": s.step_type,
+                "step_name": s.step_name,
+                "description": s.description,
+                "agent_type": s.agent_type,
+                "agent_name": s.agent_name,
+                "session_id": s.session_id,
+                "status": s.status,
+                "started_at": s.started_at.isoformat() if s.started_at else None,
+                "completed_at": s.completed_at.isoformat() if s.completed_at else None,
+                "duration_ms": s.duration_ms,
+                "input_tokens": s.input_tokens,
+                "output_tokens": s.output_tokens,
+                "total_tokens": s.total_tokens,
+                "model_used": s.model_used,
+                "tool_name": s.tool_name,
+                "risk_level": s.risk_level,
+                "error": s.error,
+                # Include input/output data for timeline preview
+                "has_input_data": bool(s.input_data),
+                "has_output_data": bool(s.output_data),
+                "has_tool_data": bool(s.tool_input or s.tool_output),
+                "has_reasoning": bool(s.reasoning),
+            }
+            for s in steps
+        ]
+    }
+
+
 @router.get("/{workflow_id}", response_model=dict)
 async def get_workflow(workflow_id: str, user=Depends(get_current_user)):
     """
@@ -102,6 +189,11 @@ async def get_workflow(workflow_id: str, user=Depends(get_current_user)):
     Returns the complete workflow with all steps, suitable for
     rendering a workflow timeline/diagram.
     """
+    live = get_alert_processor().get_live_workflow(workflow_id)
+    if live is not None:
+        workflow, steps = live.snapshot()
+        return {"success": True, "live": True, "workflow": _workflow_detail(workflow, steps)}
+
     session = get_session()
     try:
         workflow = session.query(WorkflowLog).filter(
@@ -116,64 +208,46 @@ async def get_workflow(workflow_id: str, user=Depends(get_current_user)):
             WorkflowStep.workflow_id == workflow_id
         ).order_by(WorkflowStep.sequence).all()
 
-        return {
-            "success": True,
-            "workflow": {
-                "workflow_id": workflow.workflow_id,
-                "alert_id": workflow.alert_id,
-                "incident_id": workflow.incident_id,
-                "workflow_type": workflow.workflow_type,
-                "status": workflow.status,
-                "title": workflow.title,
-                "summary": workflow.summary,
-                "outcome": workflow.outcome,
-                "started_at": workflow.started_at.isoformat() if workflow.started_at else None,
-                "completed_at": workflow.completed_at.isoformat() if workflow.completed_at else None,
-                "duration_ms": workflow.duration_ms,
-                "total_tokens": workflow.total_tokens,
-                "total_input_tokens": workflow.total_input_tokens,
-                "total_output_tokens": workflow.total_output_tokens,
-                "estimated_cost_usd": round(workflow.estimated_cost_usd, 6) if workflow.estimated_cost_usd else 0,
-                "trigger_source": workflow.trigger_source,
-                "initiated_by": workflow.initiated_by,
-                "primary_session_id": workflow.primary_session_id,
-                "session_ids": workflow.session_ids or [],
-                "context_data": workflow.context_data or {},
-                "steps": [
-                    {
-                        "step_id": s.step_id,
-                        "sequence": s.sequence,
-                        "step_type": s.step_type,
-                        "step_name": s.step_name,
-                        "description": s.description,
-                        "agent_type": s.agent_type,
-                        "agent_name": s.agent_name,
-                        "session_id": s.session_id,
-                        "status": s.status,
-                        "started_at": s.started_at.isoformat() if s.started_at else None,
-                        "completed_at": s.completed_at.isoformat() if s.completed_at else None,
-                        "duration_ms": s.duration_ms,
-                        "input_tokens": s.input_tokens,
-                        "output_tokens": s.output_tokens,
-                        "total_tokens": s.total_tokens,
-                        "model_used": s.model_used,
-                        "tool_name": s.tool_name,
-                        "risk_level": s.risk_level,
-                        "error": s.error,
-                        # Include input/output data for timeline preview
-                        "has_input_data": bool(s.input_data),
-                        "has_output_data": bool(s.output_data),
-                        "has_tool_data": bool(s.tool_input or s.tool_output),
-                        "has_reasoning": bool(s.reasoning),
-                    }
-                    for s in steps
-                ]
-            }
-        }
+        return {"success": True, "workflow": _workflow_detail(workflow, steps)}
     finally:
         session.close()
 
 
+def _step_detail(step) -> dict:
+    """Complete step data for drill-down (ORM row or live snapshot)."""
+    return {
+        "step_id": step.step_id,
+        "workflow_id": step.workflow_id,
+        "sequence": step.sequence,
+        "step_type": step.step_type,
+        "step_name": step.step_name,
+        "description": step.description,
+        "agent_type": step.agent_type,
+        "agent_name": step.agent_name,
+        "session_id": step.session_id,
+        "status": step.status,
+        "started_at": step.started_at.isoformat() if step.started_at else None,
+        "completed_at": step.completed_at.isoformat() if step.completed_at else None,
+        "duration_ms": step.duration_ms,
+        "input_tokens": step.input_tokens,
+        "output_tokens": step.output_tokens,
+        "total_tokens": step.total_tokens,
+        "model_used": step.model_used,
+        # Full data for drill-down
+        "input_data": step.input_data or {},
+        "output_data": step.output_data or {},
+        "tool_name": step.tool_name,
+        "tool_input": step.tool_input or {},
+        "tool_output": step.tool_output or {},
+        "reasoning": step.reasoning,
+        "error": step.error,
+        "error_details": step.error_details or {},
+        "risk_level": step.risk_level,
+        "requires_approval": step.requires_approval,
+        "approval_status": step.approval_status,
+    }
+
+
 @router.get("/{workflow_id}/steps/{step_id}", response_model=dict)
 async def get_workflow_step(
     workflow_id: str,
@@ -186,6 +260,12 @@ async def get_workflow_step(
     Returns the complete step data including tool inputs/outputs,
     AI reasoning, and error details. This is for drill-down views.
     """
+    live = get_alert_processor().get_live_workflow(workflow_id)
+    if live is not None:
+        step = next((s for s in live.snapshot()[1] if s.step_id == step_id), None)
+        if step is not None:
+            return {"success": True, "live": True, "step": _step_detail(step)}
+
     session = get_session()
     try:
         step = session.query(WorkflowStep).filter(
@@ -196,40 +276,7 @@ async def get_workflow_step(
         if not step:
             raise HTTPException(status_code=404, detail="Step not found")
 
-        return {
-            "success": True,
-            "step": {
-                "step_id": step.step_id,
-                "workflow_id": step.workflow_id,
-                "sequence": step.sequence,
-                "step_type": step.step_type,
-                "step_name": step.step_name,
-                "description": step.description,
-                "agent_type": step.agent_type,
-                "agent_name": step.agent_name,
-                "session_id": step.session_id,
-                "status": step.status,
-                "started_at": step.started_at.isoformat() if step.started_at else None,
-                "completed_at": step.completed_at.isoformat() if step.completed_at else None,
-                "duration_ms": step.duration_ms,
-                "input_tokens": step.input_tokens,
-                "output_tokens": step.output_tokens,
-                "total_tokens": step.total_tokens,
-                "model_used": step.model_used,
-                # Full data for drill-down
-                "input_data": step.input_data or {},
-                "output_data": step.output_data or {},
-                "tool_name": step.tool_name,
-                "tool_input": step.tool_input or {},
-                "tool_output": step.tool_output or {},
-                "reasoning": step.reasoning,
-                "error": step.error,
-                "error_details": step.error_details or {},
-                "risk_level": step.risk_level,
-                "requires_approval": step.requires_approval,
-                "approval_status": step.approval_status,
-            }
-        }
+        return {"success": True, "step": _step_detail(step)}
     finally:
         session.close()
 
@@ -258,7 +305,7 @@ async def get_workflows_by_alert(
                 WorkflowStep.workflow_id == w.workflow_id
             ).count()
 
-            result.append({
+            result.append(_overlay_live({
                 "workflow_id": w.workflow_id,
                 "workflow_type": w.workflow_type,
                 "status": w.status,
@@ -271,7 +318,7 @@ async def get_workflows_by_alert(
                 "total_tokens": w.total_tokens,
                 "estimated_cost_usd": round(w.estimated_cost_usd, 6) if w.estimated_cost_usd else 0,
                 "step_count": step_count,
-            })
+            }))
 
         return {
             "success": True,
@@ -306,7 +353,7 @@ async def get_workflows_by_incident(
                 WorkflowStep.workflow_id == w.workflow_id
             ).count()
 
-            result.append({
+            result.append(_overlay_live({
                 "workflow_id": w.workflow_id,
                 "alert_id": w.alert_id,
                 "workflow_type": w.workflow_type,
@@ -320,7 +367,7 @@ async def get_workflows_by_incident(
                 "total_tokens": w.total_tokens,
                 "estimated_cost_usd": round(w.estimated_cost_usd, 6) if w.estimated_cost_usd else 0,
                 "step_count": step_count,
-            })
+            }))
 
         return {
             "success": True,
@@ -362,6 +409,8 @@ async def get_workflow_stats(
         total_input_tokens = sum(w.total_input_tokens or 0 for w in workflows)
         total_output_tokens = sum(w.total_output_tokens or 0 for w in workflows)
         total_tokens = sum(w.total_tokens or 0 for w in workflows)
+        total_cache_read_tokens = sum(w.total_cache_read_tokens or 0 for w in workflows)
+        total_cache_write_tokens = sum(w.total_cache_write_tokens or 0 for w in workflows)
         total_cost = sum(w.estimated_cost_usd or 0 for w in workflows)
 
         # Outcome distribution
@@ -392,6 +441,8 @@ async def get_workflow_stats(
                 "tokens": {
                     "total_input": total_input_tokens,
                     "total_output": total_output_tokens,
+                    "total_cache_read": total_cache_read_tokens,
+                    "total_cache_write": total_cache_write_tokens,
                     "total": total_tokens,
                 },
                 "estimated_cost_usd": round(total_cost, 4),
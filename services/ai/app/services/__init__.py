@@ -31,6 +31,9 @@ from .agent_executor import (
     create_agent_session,
     end_agent_session,
     get_session_messages,
+    create_agent_session_async,
+    end_agent_session_async,
+    get_session_messages_async,
 )
 
 __all__ = [
@@ -56,4 +59,7 @@ __all__ = [
     "create_agent_session",
     "end_agent_session",
     "get_session_messages",
+    "create_agent_session_async",
+    "end_agent_session_async",
+    "get_session_messages_async",
 ]
@@ -6,15 +6,20 @@ Production-ready ReAct agent executor with tool use, streaming, and persistence.
 Implements the classic ReAct (Reason + Act) loop for network operations.
 """
 
+import asyncio
 import logging
 import uuid
 import json
+import weakref
 from datetime import datetime
 from typing import Optional, List, Dict, Any, AsyncGenerator
 from dataclasses import dataclass, field
 
+from sqlalchemy import select
+
 from netstacks_core.db import (
     get_session,
+    async_session_scope,
     Agent as AgentModel,
     AgentSession,
     AgentMessage,
@@ -28,6 +33,14 @@ from .agent_tools import (
     execute_tool,
     RiskLevel,
 )
+from .history_compaction import (
+    estimate_history_tokens,
+    is_persisted,
+    split_recent_turns,
+    summarize_history,
+    trim_tool_outputs,
+    with_summary,
+)
 
 log = logging.getLogger(__name__)
 
@@ -162,6 +175,10 @@ class ExecutorConfig:
     temperature: float = 0.1
     timeout_seconds: int = 120
     persist_messages: bool = True
+    max_parallel_tools: int = 4  # Concurrent tool executions per session
+    history_token_budget: int = 60000  # Estimated tokens of history sent per LLM call (0 = unlimited)
+    keep_recent_turns: int = 4  # Turns kept verbatim when older ones are summarized
+    max_tool_output_chars: int = 8000  # Older tool results are trimmed to this size
 
 
 @dataclass
@@ -175,6 +192,47 @@ class ExecutorContext:
     trigger_id: Optional[str] = None
 
 
+# Tools that end the run when they succeed. They are never executed
+# concurrently with other calls from the same turn.
+WORKFLOW_TOOLS = ("handoff_to_specialist", "escalate_to_human")
+
+# Per-session tool concurrency limits, shared by every executor working on
+# the same session and dropped once no run holds them.
+_session_tool_limits: "weakref.WeakValueDictionary[str, asyncio.Semaphore]" = weakref.WeakValueDictionary()
+
+
+def _get_tool_limit(session_id: str, max_parallel: int) -> asyncio.Semaphore:
+    """Get the tool concurrency semaphore for a session."""
+    semaphore = _session_tool_limits.get(session_id)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(1, max_parallel))
+        _session_tool_limits[session_id] = semaphore
+    return semaphore
+
+
+def _batch_tool_calls(tool_calls: List[Dict]) -> List[List[Dict]]:
+    """
+    Split one turn's tool calls into batches that can run concurrently.
+
+    Consecutive regular tools share a batch; each workflow tool gets a
+    batch of its own so nothing issued after a handoff or escalation runs
+    before it has been checked.
+    """
+    batches: List[List[Dict]] = []
+    current: List[Dict] = []
+    for tool_call in tool_calls:
+        if tool_call["name"] in WORKFLOW_TOOLS:
+            if current:
+                batches.append(current)
+                current = []
+            batches.append([tool_call])
+        else:
+            current.append(tool_call)
+    if current:
+        batches.append(current)
+    return batches
+
+
 class AgentExecutor:
     """
     ReAct agent executor for network operations.
@@ -205,6 +263,11 @@ class AgentExecutor:
         # Message history for the current conversation
         self.messages: List[Message] = []
 
+        # Rolling summary of turns compacted out of self.messages, and how
+        # many persisted session messages it covers
+        self.summary: Optional[str] = None
+        self.summarized_count = 0
+
         # Initialize LLM client
         try:
             self.llm = LLMClient(
@@ -217,6 +280,26 @@ class AgentExecutor:
             log.warning(f"Failed to initialize LLM client: {e}")
             self.llm = None
 
+    @classmethod
+    def from_agent(cls, agent: AgentModel) -> "AgentExecutor":
+        """Create executor from an already loaded agent row."""
+        agent_config = agent.config or {}
+        defaults = ExecutorConfig()
+        return cls(
+            agent_type=agent.agent_type,
+            llm_provider=agent.llm_provider,
+            llm_model=agent.llm_model,
+            system_prompt=agent.system_prompt,
+            allowed_tools=agent.allowed_tools,
+            config=ExecutorConfig(
+                max_iterations=agent.max_iterations or 10,
+                max_tokens=agent.max_tokens or 4096,
+                temperature=agent.temperature or 0.1,
+                history_token_budget=agent_config.get("history_token_budget", defaults.history_token_budget),
+                keep_recent_turns=agent_config.get("keep_recent_turns", defaults.keep_recent_turns),
+            ),
+        )
+
     @classmethod
     def from_agent_config(cls, agent_id: str) -> "AgentExecutor":
         """Create executor from database agent configuration."""
@@ -229,18 +312,7 @@ class AgentExecutor:
             if not agent:
                 raise ValueError(f"Agent not found: {agent_id}")
 
-            return cls(
-                agent_type=agent.agent_type,
-                llm_provider=agent.llm_provider,
-                llm_model=agent.llm_model,
-                system_prompt=agent.system_prompt,
-                allowed_tools=agent.allowed_tools,
-                config=ExecutorConfig(
-                    max_iterations=agent.max_iterations or 10,
-                    max_tokens=agent.max_tokens or 4096,
-                    temperature=agent.temperature or 0.1,
-                ),
-            )
+            return cls.from_agent(agent)
         finally:
             db_session.close()
 
@@ -280,7 +352,7 @@ class AgentExecutor:
 
         # Persist user message
         if self.config.persist_messages:
-            self._save_message(context.session_id, "user", user_message)
+            await self._save_message(context.session_id, "user", user_message)
 
         # Get available tools
         tools = self.get_tools()
@@ -290,97 +362,30 @@ class AgentExecutor:
             iteration += 1
 
             try:
+                await self._compact_history(context)
+
                 # Call the LLM
                 response = await self.llm.chat(
-                    messages=self.messages,
+                    messages=with_summary(self.messages, self.summary),
                     system_prompt=self.system_prompt,
                     tools=tools if tools else None,
                 )
 
+                if response.get("usage"):
+                    yield AgentEvent(type=EventType.TOKEN_USAGE, data=response["usage"])
+
                 # Check for tool calls
                 if response.get("tool_calls"):
-                    # Process each tool call
-                    for tool_call in response["tool_calls"]:
-                        tool_name = tool_call["name"]
-                        tool_input = tool_call["input"]
-                        tool_id = tool_call["id"]
-
-                        # Yield tool call event
-                        yield AgentEvent(
-                            type=EventType.TOOL_CALL,
-                            tool_name=tool_name,
-                            tool_input=tool_input,
-                            tool_call_id=tool_id,
-                        )
-
-                        # Save action to database
-                        action_id = self._save_action(
-                            context.session_id,
-                            iteration,
-                            "tool_call",
-                            tool_name,
-                            tool_input,
-                        )
-
-                        # Check if tool requires approval
-                        tool_info = get_tool_info(tool_name)
-                        if tool_info and tool_info.requires_approval:
-                            yield AgentEvent(
-                                type=EventType.ERROR,
-                                content=f"Tool '{tool_name}' requires approval. This feature is not yet implemented.",
-                                data={"requires_approval": True, "tool_name": tool_name}
-                            )
-                            # For now, skip tools requiring approval
-                            tool_result = {"error": "Approval required - skipped"}
-                        else:
-                            # Execute the tool
-                            tool_result = await execute_tool(
-                                tool_name,
-                                tool_input,
-                                {"auth_token": context.auth_token}
-                            )
-
-                        # Yield tool result event
-                        yield AgentEvent(
-                            type=EventType.TOOL_RESULT,
-                            tool_name=tool_name,
-                            tool_result=tool_result,
-                            tool_call_id=tool_id,
-                        )
-
-                        # Update action with result
-                        self._update_action(action_id, tool_result)
-
-                        # Check for handoff
-                        if tool_name == "handoff_to_specialist" and tool_result.get("success"):
-                            yield AgentEvent(
-                                type=EventType.DONE,
-                                content="Handoff initiated",
-                                data={"handoff": tool_result.get("handoff")}
-                            )
-                            return
-
-                        # Check for escalation
-                        if tool_name == "escalate_to_human" and tool_result.get("success"):
-                            yield AgentEvent(
-                                type=EventType.DONE,
-                                content="Escalated to human operator",
-                                data={"escalation": tool_result.get("escalation")}
-                            )
+                    async for event in self._process_tool_calls(
+                        response["tool_calls"],
+                        response.get("content", ""),
+                        context,
+                        iteration,
+                    ):
+                        yield event
+                        if event.type == EventType.DONE:
                             return
 
-                        # Add tool result to message history
-                        self.messages.append(Message(
-                            role="assistant",
-                            content=response.get("content", ""),
-                            tool_calls=[tool_call],
-                        ))
-                        self.messages.append(Message(
-                            role="tool",
-                            content=json.dumps(tool_result),
-                            tool_call_id=tool_id,
-                        ))
-
                 else:
                     # No tool calls - this is the final response
                     final_content = response.get("content", "")
@@ -391,7 +396,7 @@ class AgentExecutor:
 
                         # Persist assistant message
                         if self.config.persist_messages:
-                            self._save_message(context.session_id, "assistant", final_content)
+                            await self._save_message(context.session_id, "assistant", final_content)
 
                         yield AgentEvent(
                             type=EventType.FINAL_RESPONSE,
@@ -444,7 +449,7 @@ class AgentExecutor:
 
         # Persist user message
         if self.config.persist_messages:
-            self._save_message(context.session_id, "user", user_message)
+            await self._save_message(context.session_id, "user", user_message)
 
         # Get available tools
         tools = self.get_tools()
@@ -456,9 +461,13 @@ class AgentExecutor:
             try:
                 accumulated_text = ""
                 tool_calls = []
+                final_content = None
+                finished = False
+
+                await self._compact_history(context)
 
                 async for event in self.llm.stream_chat(
-                    messages=self.messages,
+                    messages=with_summary(self.messages, self.summary),
                     system_prompt=self.system_prompt,
                     tools=tools if tools else None,
                 ):
@@ -474,20 +483,15 @@ class AgentExecutor:
                         })
                         yield event
 
-                    elif event.type == EventType.FINAL_RESPONSE:
-                        # Add to message history
-                        self.messages.append(Message(role="assistant", content=event.content))
-
-                        # Persist
-                        if self.config.persist_messages:
-                            self._save_message(context.session_id, "assistant", event.content)
-
+                    elif event.type in (EventType.TOOL_CALL_DELTA, EventType.TOKEN_USAGE):
                         yield event
 
+                    elif event.type == EventType.FINAL_RESPONSE:
+                        # Only final if the response has no tool calls; decided below
+                        final_content = event.content
+
                     elif event.type == EventType.DONE:
-                        if not tool_calls:
-                            yield event
-                            return
+                        finished = True
 
                     elif event.type == EventType.ERROR:
                         yield event
@@ -495,64 +499,36 @@ class AgentExecutor:
 
                 # Process tool calls if any
                 if tool_calls:
-                    for tool_call in tool_calls:
-                        tool_name = tool_call["name"]
-                        tool_input = tool_call["input"]
-                        tool_id = tool_call["id"]
-
-                        # Save action
-                        action_id = self._save_action(
-                            context.session_id,
-                            iteration,
-                            "tool_call",
-                            tool_name,
-                            tool_input,
-                        )
-
-                        # Check approval
-                        tool_info = get_tool_info(tool_name)
-                        if tool_info and tool_info.requires_approval:
-                            tool_result = {"error": "Approval required - skipped"}
-                        else:
-                            tool_result = await execute_tool(
-                                tool_name,
-                                tool_input,
-                                {"auth_token": context.auth_token}
-                            )
-
-                        yield AgentEvent(
-                            type=EventType.TOOL_RESULT,
-                            tool_name=tool_name,
-                            tool_result=tool_result,
-                            tool_call_id=tool_id,
-                        )
+                    # TOOL_CALL events were already streamed above
+                    async for event in self._process_tool_calls(
+                        tool_calls,
+                        accumulated_text,
+                        context,
+                        iteration,
+                        announce=False,
+                    ):
+                        yield event
+                        if event.type == EventType.DONE:
+                            return
+                    continue
 
-                        self._update_action(action_id, tool_result)
+                if not finished:
+                    yield AgentEvent(type=EventType.ERROR, content="LLM stream ended unexpectedly")
+                    return
 
-                        # Check for workflow events
-                        if tool_name == "handoff_to_specialist" and tool_result.get("success"):
-                            yield AgentEvent(type=EventType.DONE, data={"handoff": tool_result.get("handoff")})
-                            return
+                # No tool calls - this is the final response
+                if final_content:
+                    # Add to message history
+                    self.messages.append(Message(role="assistant", content=final_content))
 
-                        if tool_name == "escalate_to_human" and tool_result.get("success"):
-                            yield AgentEvent(type=EventType.DONE, data={"escalation": tool_result.get("escalation")})
-                            return
+                    # Persist
+                    if self.config.persist_messages:
+                        await self._save_message(context.session_id, "assistant", final_content)
 
-                        # Add to history
-                        self.messages.append(Message(
-                            role="assistant",
-                            content=accumulated_text,
-                            tool_calls=[tool_call],
-                        ))
-                        self.messages.append(Message(
-                            role="tool",
-                            content=json.dumps(tool_result),
-                            tool_call_id=tool_id,
-                        ))
+                    yield AgentEvent(type=EventType.FINAL_RESPONSE, content=final_content)
 
-                else:
-                    # No tool calls and we've yielded DONE, so exit
-                    return
+                yield AgentEvent(type=EventType.DONE)
+                return
 
             except Exception as e:
                 log.error(f"Streaming agent error: {e}", exc_info=True)
@@ -564,22 +540,196 @@ class AgentExecutor:
             content=f"Maximum iterations ({self.config.max_iterations}) reached."
         )
 
-    def _save_message(self, session_id: str, role: str, content: str):
+    async def _process_tool_calls(
+        self,
+        tool_calls: List[Dict],
+        assistant_content: str,
+        context: ExecutorContext,
+        iteration: int,
+        announce: bool = True,
+    ) -> AsyncGenerator[AgentEvent, None]:
+        """
+        Execute the tool calls from one LLM response.
+
+        Independent calls run concurrently, at most config.max_parallel_tools
+        at a time per session. Events are still yielded in the order the LLM
+        issued the calls, and each result is added to history paired with
+        its own tool_call_id. A DONE event means a handoff or escalation
+        ended the run.
+
+        Args:
+            tool_calls: Tool calls from the LLM response
+            assistant_content: Assistant text that accompanied the calls
+            context: Execution context with auth and session info
+            iteration: Current ReAct iteration (action sequence number)
+            announce: Yield TOOL_CALL events (False when already streamed)
+        """
+        limit = _get_tool_limit(context.session_id, self.config.max_parallel_tools)
+
+        for batch in _batch_tool_calls(tool_calls):
+            if announce:
+                for tool_call in batch:
+                    yield AgentEvent(
+                        type=EventType.TOOL_CALL,
+                        tool_name=tool_call["name"],
+                        tool_input=tool_call["input"],
+                        tool_call_id=tool_call["id"],
+                    )
+
+                    tool_info = get_tool_info(tool_call["name"])
+                    if tool_info and tool_info.requires_approval:
+                        yield AgentEvent(
+                            type=EventType.ERROR,
+                            content=f"Tool '{tool_call['name']}' requires approval. This feature is not yet implemented.",
+                            data={"requires_approval": True, "tool_name": tool_call["name"]}
+                        )
+
+            results = await asyncio.gather(*(
+                self._run_tool_call(tool_call, context, iteration, limit)
+                for tool_call in batch
+            ))
+
+            for tool_call, tool_result in zip(batch, results):
+                tool_name = tool_call["name"]
+                tool_id = tool_call["id"]
+
+                yield AgentEvent(
+                    type=EventType.TOOL_RESULT,
+                    tool_name=tool_name,
+                    tool_result=tool_result,
+                    tool_call_id=tool_id,
+                )
+
+                # Check for handoff
+                if tool_name == "handoff_to_specialist" and tool_result.get("success"):
+                    yield AgentEvent(
+                        type=EventType.DONE,
+                        content="Handoff initiated",
+                        data={"handoff": tool_result.get("handoff")}
+                    )
+                    return
+
+                # Check for escalation
+                if tool_name == "escalate_to_human" and tool_result.get("success"):
+                    yield AgentEvent(
+                        type=EventType.DONE,
+                        content="Escalated to human operator",
+                        data={"escalation": tool_result.get("escalation")}
+                    )
+                    return
+
+                # Add tool result to message history
+                self.messages.append(Message(
+                    role="assistant",
+                    content=assistant_content,
+                    tool_calls=[tool_call],
+                ))
+                self.messages.append(Message(
+                    role="tool",
+                    content=json.dumps(tool_result),
+                    tool_call_id=tool_id,
+                ))
+
+    async def _run_tool_call(
+        self,
+        tool_call: Dict,
+        context: ExecutorContext,
+        iteration: int,
+        limit: asyncio.Semaphore,
+    ) -> Dict:
+        """Record and execute a single tool call, returning its result."""
+        tool_name = tool_call["name"]
+        tool_input = tool_call["input"]
+
+        action_id = await self._save_action(
+            context.session_id,
+            iteration,
+            "tool_call",
+            tool_name,
+            tool_input,
+        )
+
+        tool_info = get_tool_info(tool_name)
+        if tool_info and tool_info.requires_approval:
+            # For now, skip tools requiring approval
+            tool_result = {"error": "Approval required - skipped"}
+        else:
+            # execute_tool reports failures as {"error": ...}, so one failing
+            # call does not cancel its siblings in gather()
+            async with limit:
+                tool_result = await execute_tool(
+                    tool_name,
+                    tool_input,
+                    {"auth_token": context.auth_token}
+                )
+
+        await self._update_action(action_id, tool_result)
+        return tool_result
+
+    async def _compact_history(self, context: ExecutorContext):
+        """
+        Keep the history under config.history_token_budget.
+
+        First trims large tool outputs from earlier iterations, then folds
+        turns older than config.keep_recent_turns into the rolling summary,
+        which is persisted on the session.
+        """
+        budget = self.config.history_token_budget
+        if not budget or estimate_history_tokens(self.messages, self.summary) <= budget:
+            return
+
+        self.messages = trim_tool_outputs(self.messages, self.config.max_tool_output_chars)
+        if estimate_history_tokens(self.messages, self.summary) <= budget:
+            return
+
+        # Keep as many recent turns as fit, down to the current one
+        keep_turns = max(1, self.config.keep_recent_turns)
+        older, recent = split_recent_turns(self.messages, keep_turns)
+        while keep_turns > 1 and estimate_history_tokens(recent) > budget:
+            keep_turns -= 1
+            older, recent = split_recent_turns(self.messages, keep_turns)
+
+        if not older:
+            log.debug(f"Session {context.session_id} history over budget with nothing left to summarize")
+            return
+
+        self.summary = await summarize_history(self.llm, self.summary, older)
+        self.summarized_count += sum(1 for message in older if is_persisted(message))
+        self.messages = recent
+        log.info(
+            f"Compacted session {context.session_id} history: {len(older)} messages summarized, "
+            f"{len(recent)} kept (~{estimate_history_tokens(recent, self.summary)} tokens)"
+        )
+
+        if self.config.persist_messages:
+            await self._save_summary(context.session_id)
+
+    async def _save_summary(self, session_id: str):
+        """Persist the rolling history summary on the session."""
+        try:
+            async with async_session_scope() as db_session:
+                session = (await db_session.execute(
+                    select(AgentSession).where(AgentSession.session_id == session_id)
+                )).scalars().first()
+                if session:
+                    session.history_summary = self.summary
+                    session.summarized_message_count = self.summarized_count
+        except Exception as e:
+            log.error(f"Failed to save history summary: {e}")
+
+    async def _save_message(self, session_id: str, role: str, content: str):
         """Persist message to database."""
         try:
-            db_session = get_session()
-            message = AgentMessage(
-                session_id=session_id,
-                role=role,
-                content=content,
-            )
-            db_session.add(message)
-            db_session.commit()
-            db_session.close()
+            async with async_session_scope() as db_session:
+                db_session.add(AgentMessage(
+                    session_id=session_id,
+                    role=role,
+                    content=content,
+                ))
         except Exception as e:
             log.error(f"Failed to save message: {e}")
 
-    def _save_action(
+    async def _save_action(
         self,
         session_id: str,
         sequence: int,
@@ -590,35 +740,30 @@ class AgentExecutor:
         """Save action to database and return action_id."""
         action_id = str(uuid.uuid4())
         try:
-            db_session = get_session()
-            action = AgentAction(
-                action_id=action_id,
-                session_id=session_id,
-                sequence=sequence,
-                action_type=action_type,
-                tool_name=tool_name,
-                tool_input=tool_input,
-                status="pending",
-            )
-            db_session.add(action)
-            db_session.commit()
-            db_session.close()
+            async with async_session_scope() as db_session:
+                db_session.add(AgentAction(
+                    action_id=action_id,
+                    session_id=session_id,
+                    sequence=sequence,
+                    action_type=action_type,
+                    tool_name=tool_name,
+                    tool_input=tool_input,
+                    status="pending",
+                ))
         except Exception as e:
             log.error(f"Failed to save action: {e}")
         return action_id
 
-    def _update_action(self, action_id: str, tool_output: Dict):
+    async def _update_action(self, action_id: str, tool_output: Dict):
         """Update action with tool output."""
         try:
-            db_session = get_session()
-            action = db_session.query(AgentAction).filter(
-                AgentAction.action_id == action_id
-            ).first()
-            if action:
-                action.tool_output = tool_output
-                action.status = "completed" if not tool_output.get("error") else "failed"
-                db_session.commit()
-            db_session.close()
+            async with async_session_scope() as db_session:
+                action = (await db_session.execute(
+                    select(AgentAction).where(AgentAction.action_id == action_id)
+                )).scalars().first()
+                if action:
+                    action.tool_output = tool_output
+                    action.status = "completed" if not tool_output.get("error") else "failed"
         except Exception as e:
             log.error(f"Failed to update action: {e}")
 
@@ -697,14 +842,81 @@ def get_session_messages(session_id: str) -> List[Dict]:
             AgentMessage.session_id == session_id
         ).order_by(AgentMessage.created_at).all()
 
-        return [
-            {
-                "id": m.id,
-                "role": m.role,
-                "content": m.content,
-                "created_at": m.created_at.isoformat() if m.created_at else None,
-            }
-            for m in messages
-        ]
+        return [_message_to_dict(m) for m in messages]
     finally:
         db_session.close()
+
+
+def _message_to_dict(message: AgentMessage) -> Dict:
+    return {
+        "id": message.id,
+        "role": message.role,
+        "content": message.content,
+        "created_at": message.created_at.isoformat() if message.created_at else None,
+    }
+
+
+# Async variants for request handlers running on the event loop
+
+async def create_agent_session_async(
+    agent_id: str,
+    username: str,
+    trigger_type: str = "user",
+    trigger_id: Optional[str] = None,
+    initial_prompt: Optional[str] = None,
+) -> str:
+    """Create a new agent session and return session_id."""
+    session_id = str(uuid.uuid4())
+
+    async with async_session_scope() as db_session:
+        db_session.add(AgentSession(
+            session_id=session_id,
+            agent_id=agent_id,
+            trigger_type=trigger_type,
+            trigger_id=trigger_id,
+            status="active",
+            initial_prompt=initial_prompt,
+            started_by=username,
+        ))
+
+        # Update agent stats
+        agent = (await db_session.execute(
+            select(AgentModel).where(AgentModel.agent_id == agent_id)
+        )).scalars().first()
+        if agent:
+            agent.total_sessions = (agent.total_sessions or 0) + 1
+            agent.last_active = datetime.utcnow()
+
+    return session_id
+
+
+async def end_agent_session_async(
+    session_id: str,
+    status: str = "completed",
+    summary: Optional[str] = None,
+    resolution_status: Optional[str] = None,
+):
+    """End an agent session."""
+    async with async_session_scope() as db_session:
+        session = (await db_session.execute(
+            select(AgentSession).where(AgentSession.session_id == session_id)
+        )).scalars().first()
+        if session:
+            session.status = status
+            session.completed_at = datetime.utcnow()
+            if summary:
+                session.summary = summary
+            if resolution_status:
+                session.resolution_status = resolution_status
+
+
+async def get_session_messages_async(session_id: str, offset: int = 0) -> List[Dict]:
+    """Get a session's messages, skipping the first offset of them."""
+    async with async_session_scope() as db_session:
+        messages = (await db_session.execute(
+            select(AgentMessage)
+            .where(AgentMessage.session_id == session_id)
+            .order_by(AgentMessage.created_at)
+            .offset(offset)
+        )).scalars().all()
+        return [_message_to_dict(m) for m in messages]
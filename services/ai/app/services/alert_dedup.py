@@ -0,0 +1,314 @@
+# services/ai/app/services/alert_dedup.py
+"""
+Alert Deduplication Service
+
+Folds repeated alerts into the first alert of a storm before they reach the
+database or AI triage. Alerts are identified by a fingerprint built from
+configurable payload fields (by default device_name, alert_type and a
+normalized title). For window_seconds after the first alert of a
+fingerprint, new alerts only increment that alert's occurrence count - no
+new row is written and no new triage run is started. A repeat with a higher
+severity, or one arriving after the original alert was acknowledged or
+resolved, is stored as a new alert and starts a new window.
+
+The index lives in memory with TTL eviction. Occurrence counts are
+accumulated in memory and written back periodically with a single
+executemany UPDATE, so a storm of N repeats costs one write per flush.
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, select, update
+
+from netstacks_core.db import get_engine, Alert as AlertModel
+
+from app.config import get_settings
+
+log = logging.getLogger(__name__)
+
+# Timestamps and long numbers (counters, uptimes, sequence IDs) vary between
+# repeats of the same alert; short numbers (interfaces, IPs) do not.
+_TIMESTAMP_RE = re.compile(r"\d{4}-\d{2}-\d{2}[t ]\d{2}:\d{2}:\d{2}(\.\d+)?(z|[+-]\d{2}:?\d{2})?")
+_LONG_NUMBER_RE = re.compile(r"\b\d{4,}\b")
+_SPACE_RE = re.compile(r"\s+")
+
+# Alert statuses after which repeats must raise a new alert
+CLOSED_STATUSES = ("acknowledged", "resolved", "closed")
+
+# Severity ordering; unknown severities rank as "warning"
+SEVERITY_RANK = {
+    "info": 0, "low": 0,
+    "minor": 1, "warning": 1, "medium": 1,
+    "major": 2, "error": 2, "high": 2,
+    "critical": 3,
+}
+
+
+def severity_rank(severity: Optional[str]) -> int:
+    """Rank a severity string so escalations can be detected."""
+    return SEVERITY_RANK.get((severity or "warning").lower(), SEVERITY_RANK["warning"])
+
+
+def normalize_title(title: str) -> str:
+    """Normalize a title so repeats differing only in timestamps/counters match."""
+    title = _TIMESTAMP_RE.sub("#", title.lower())
+    title = _LONG_NUMBER_RE.sub("#", title)
+    return _SPACE_RE.sub(" ", title).strip()
+
+
+@dataclass
+class DedupEntry:
+    """A fingerprint currently inside its suppression window."""
+    alert_id: str
+    first_seen: float
+    last_seen: float
+    occurrences: int = 1
+    severity: int = SEVERITY_RANK["warning"]
+
+
+class AlertDeduplicator:
+    """
+    In-memory fixed-window alert deduplicator.
+
+    A fingerprint stays in the index for window_seconds after its first
+    alert; repeats do not extend the window, so a flapping condition raises
+    a fresh alert at least once per window. The index is capped at
+    max_entries, evicting the oldest fingerprint first.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 300,
+        fingerprint_fields: Sequence[str] = ("device_name", "alert_type", "title"),
+        max_entries: int = 100000,
+        flush_interval: float = 5.0,
+        enabled: bool = True,
+    ):
+        self.window_seconds = window_seconds
+        self.fingerprint_fields = tuple(fingerprint_fields)
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, DedupEntry]" = OrderedDict()
+        # alert_id -> (occurrences not yet persisted, last_seen)
+        self._pending: Dict[str, Tuple[int, float]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+        self._stats = {
+            "unique": 0,
+            "suppressed": 0,
+            "evicted": 0,
+            "escalated": 0,
+            "closed": 0,
+            "flushed_updates": 0,
+            "flush_errors": 0,
+        }
+
+    def fingerprint(self, alert: Dict[str, Any]) -> str:
+        """
+        Build the fingerprint for an alert payload.
+
+        Fields may be dotted paths into nested dicts (e.g. raw_data.trap_oid).
+        The title field is normalized with normalize_title().
+        """
+        parts = []
+        for field_name in self.fingerprint_fields:
+            value: Any = alert
+            for key in field_name.split("."):
+                value = value.get(key) if isinstance(value, dict) else None
+            value = "" if value is None else str(value)
+            if field_name == "title":
+                value = normalize_title(value)
+            parts.append(value)
+        return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+    def _evict_expired(self, now: float):
+        """Drop fingerprints whose window has elapsed (oldest first). Lock held."""
+        cutoff = now - self.window_seconds
+        while self._index:
+            fingerprint, entry = next(iter(self._index.items()))
+            if entry.first_seen >= cutoff:
+                break
+            del self._index[fingerprint]
+
+    def fold(self, fingerprint: str, alert_id: str, severity: Optional[str] = None,
+             extra: int = 0) -> Optional[DedupEntry]:
+        """
+        Fold an alert into an existing one, or register it as new.
+
+        Returns the existing entry (with its occurrence count already
+        incremented) if the fingerprint is inside its window and the alert
+        is not more severe than the existing one. Otherwise registers
+        alert_id as the first alert for the fingerprint and returns None.
+
+        extra counts occurrences the alert stands in for on top of itself
+        (e.g. repeats dropped by the ingestion rate limiter).
+        """
+        extra = max(0, extra)
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        rank = severity_rank(severity)
+        with self._lock:
+            self._evict_expired(now)
+
+            entry = self._index.get(fingerprint)
+            if entry is not None and rank <= entry.severity:
+                entry.occurrences += 1 + extra
+                entry.last_seen = now
+                pending, _ = self._pending.get(entry.alert_id, (0, now))
+                self._pending[entry.alert_id] = (pending + 1 + extra, now)
+                self._stats["suppressed"] += 1
+                return DedupEntry(entry.alert_id, entry.first_seen, entry.last_seen, entry.occurrences, entry.severity)
+
+            if entry is not None:
+                # Escalation: raise a new alert and start a new window for it
+                del self._index[fingerprint]
+                self._stats["escalated"] += 1
+            self._index[fingerprint] = DedupEntry(alert_id, now, now, 1 + extra, severity=rank)
+            self._stats["unique"] += 1
+            while len(self._index) > self.max_entries:
+                self._index.popitem(last=False)
+                self._stats["evicted"] += 1
+            return None
+
+    def forget(self, fingerprint: str, alert_id: str):
+        """Remove a registration, e.g. when inserting its alert failed."""
+        with self._lock:
+            entry = self._index.get(fingerprint)
+            if entry is not None and entry.alert_id == alert_id:
+                del self._index[fingerprint]
+            self._pending.pop(alert_id, None)
+
+    def close(self, *alert_ids: str):
+        """
+        Stop folding into alerts that were acknowledged or resolved.
+
+        The next repeat of their fingerprint raises a new alert. Pending
+        occurrence counts are kept so they are still persisted.
+        """
+        closed = set(alert_ids)
+        if not closed:
+            return
+        with self._lock:
+            for fingerprint in [f for f, e in self._index.items() if e.alert_id in closed]:
+                del self._index[fingerprint]
+                self._stats["closed"] += 1
+
+    def flush(self) -> int:
+        """Persist pending occurrence counts. Returns the number of alerts updated."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        rows = [
+            {
+                "b_alert_id": alert_id,
+                "b_count": count,
+                "b_last_seen": datetime.utcfromtimestamp(last_seen),
+            }
+            for alert_id, (count, last_seen) in pending.items()
+        ]
+        stmt = (
+            update(AlertModel)
+            .where(AlertModel.alert_id == bindparam("b_alert_id"))
+            .values(
+                occurrence_count=AlertModel.occurrence_count + bindparam("b_count"),
+                last_seen_at=bindparam("b_last_seen"),
+            )
+        )
+        try:
+            with get_engine().begin() as conn:
+                conn.execute(stmt, rows)
+                # Alerts closed through another API worker are only noticed here
+                closed = conn.execute(
+                    select(AlertModel.alert_id).where(
+                        AlertModel.alert_id.in_(list(pending)),
+                        AlertModel.status.in_(CLOSED_STATUSES),
+                    )
+                ).scalars().all()
+        except Exception as e:
+            log.error(f"Failed to persist occurrence counts for {len(rows)} alerts: {e}")
+            self._stats["flush_errors"] += 1
+            # Put the counts back so the next flush retries them
+            with self._lock:
+                for alert_id, (count, last_seen) in pending.items():
+                    newer_count, newer_seen = self._pending.get(alert_id, (0, last_seen))
+                    self._pending[alert_id] = (count + newer_count, max(last_seen, newer_seen))
+            return 0
+
+        self.close(*closed)
+        self._stats["flushed_updates"] += len(rows)
+        return len(rows)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                log.error(f"Alert dedup flush error: {e}", exc_info=True)
+
+    def start(self):
+        """Start the periodic occurrence-count flush (called on app startup)."""
+        if self.enabled and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the flush loop and persist any remaining counts."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await asyncio.to_thread(self.flush)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get deduplication counters and index size."""
+        with self._lock:
+            self._evict_expired(time.time())
+            stats = dict(self._stats)
+            stats["active_fingerprints"] = len(self._index)
+            stats["pending_updates"] = len(self._pending)
+        total = stats["unique"] + stats["suppressed"]
+        stats["suppression_rate"] = round(stats["suppressed"] / total, 4) if total else 0.0
+        stats["enabled"] = self.enabled
+        stats["window_seconds"] = self.window_seconds
+        stats["fingerprint_fields"] = list(self.fingerprint_fields)
+        return stats
+
+
+# Singleton instance
+_deduplicator: Optional[AlertDeduplicator] = None
+
+
+def get_alert_deduplicator() -> AlertDeduplicator:
+    """Get or create the alert deduplicator singleton."""
+    global _deduplicator
+    if _deduplicator is None:
+        settings = get_settings()
+        _deduplicator = AlertDeduplicator(
+            window_seconds=settings.ALERT_DEDUP_WINDOW_SECONDS,
+            fingerprint_fields=[
+                f.strip() for f in settings.ALERT_DEDUP_FINGERPRINT.split(",") if f.strip()
+            ],
+            max_entries=settings.ALERT_DEDUP_MAX_ENTRIES,
+            flush_interval=settings.ALERT_DEDUP_FLUSH_INTERVAL,
+            enabled=settings.ALERT_DEDUP_ENABLED,
+        )
+    return _deduplicator
@@ -12,17 +12,23 @@ Implements the full NOC automation workflow:
    - Escalates to human operator
 
 All processing is logged to WorkflowLog and WorkflowStep for full transparency.
+Workflow state is buffered in memory per run and flushed in batches (see
+WorkflowLogger).
 """
 
 import logging
 import asyncio
 import uuid
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from types import SimpleNamespace
+from typing import Optional, Dict, Any, List, Set, Tuple
 from dataclasses import dataclass, field
 
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
 from netstacks_core.db import (
     get_session,
+    async_session_scope,
     Alert as AlertModel,
     Incident as IncidentModel,
     Agent as AgentModel,
@@ -32,6 +38,7 @@ from netstacks_core.db import (
     WorkflowStep,
 )
 
+from app.config import get_settings
 from .agent_executor import (
     AgentExecutor,
     ExecutorContext,
@@ -40,6 +47,7 @@ from .agent_executor import (
     end_agent_session,
 )
 from .llm_client import EventType
+from .alert_dedup import get_alert_deduplicator, CLOSED_STATUSES
 
 log = logging.getLogger(__name__)
 
@@ -52,30 +60,58 @@ TOKEN_COSTS = {
     "default": {"input": 3.00, "output": 15.00},
 }
 
+# Prompt cache pricing relative to the model's input price
+CACHE_READ_COST_FACTOR = 0.1
+CACHE_WRITE_COST_FACTOR = 1.25
+
 
 @dataclass
 class TokenUsage:
-    """Token usage tracking for LLM calls."""
+    """
+    Token usage tracking for LLM calls.
+
+    input_tokens counts uncached prompt tokens only; prompt tokens read from
+    or written to the provider's prompt cache are counted separately.
+    """
     input_tokens: int = 0
     output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
     total_tokens: int = 0
     model: str = ""
     estimated_cost_usd: float = 0.0
 
-    def add(self, input_tokens: int, output_tokens: int, model: str = ""):
+    def add(
+        self,
+        input_tokens: int,
+        output_tokens: int,
+        model: str = "",
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
+    ):
         """Add token usage from an LLM call."""
         self.input_tokens += input_tokens
         self.output_tokens += output_tokens
-        self.total_tokens += input_tokens + output_tokens
+        self.cache_read_tokens += cache_read_tokens
+        self.cache_write_tokens += cache_write_tokens
+        self.total_tokens += input_tokens + output_tokens + cache_read_tokens + cache_write_tokens
         if model:
             self.model = model
         self._update_cost()
 
+    @property
+    def cache_hit_ratio(self) -> float:
+        """Share of prompt tokens served from the provider cache."""
+        prompt_tokens = self.input_tokens + self.cache_read_tokens + self.cache_write_tokens
+        return self.cache_read_tokens / prompt_tokens if prompt_tokens else 0.0
+
     def _update_cost(self):
         """Calculate estimated cost based on token usage."""
         costs = TOKEN_COSTS.get(self.model, TOKEN_COSTS["default"])
         self.estimated_cost_usd = (
             (self.input_tokens / 1_000_000) * costs["input"] +
+            (self.cache_read_tokens / 1_000_000) * costs["input"] * CACHE_READ_COST_FACTOR +
+            (self.cache_write_tokens / 1_000_000) * costs["input"] * CACHE_WRITE_COST_FACTOR +
             (self.output_tokens / 1_000_000) * costs["output"]
         )
 
@@ -97,16 +133,58 @@ class TriageResult:
             self.token_usage = TokenUsage()
 
 
+# Columns written for each workflow step; every buffered step row carries all
+# of them so a flush can upsert the batch in one multi-row statement.
+STEP_COLUMNS = (
+    "step_id", "workflow_id", "sequence", "step_type", "step_name", "description",
+    "agent_type", "agent_name", "session_id", "status", "started_at", "completed_at",
+    "duration_ms", "input_tokens", "output_tokens", "total_tokens", "model_used",
+    "input_data", "output_data", "tool_name", "tool_input", "tool_output",
+    "reasoning", "error", "risk_level",
+)
+
+# Rows per upsert statement (keeps bind parameters well under the PostgreSQL limit)
+FLUSH_CHUNK_SIZE = 500
+
+
+def _upsert(model, key: str, rows: List[Dict[str, Any]]):
+    """INSERT ... ON CONFLICT (key) DO UPDATE for a batch of full rows."""
+    stmt = pg_insert(model).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[key],
+        set_={column: stmt.excluded[column] for column in rows[0] if column != key},
+    )
+
+
 class WorkflowLogger:
     """
     Manages workflow logging for AI processing.
-    Creates and updates WorkflowLog and WorkflowStep records.
+
+    Workflow and step state is kept in memory for the life of the run and
+    written to WorkflowLog / WorkflowStep in batches: every flush_interval
+    seconds, at phase boundaries (flush()) and on completion (close()). A
+    flush upserts the workflow row and every step changed since the last
+    flush, so a triage run costs a handful of writes instead of several per
+    tool call. Live viewers read the in-memory state (snapshot()) while the
+    run is active.
     """
 
-    def __init__(self, workflow_id: str):
+    def __init__(self, workflow_id: str, flush_interval: Optional[float] = None):
         self.workflow_id = workflow_id
         self.current_sequence = 0
         self.token_usage = TokenUsage()
+        self.flush_interval = (
+            flush_interval if flush_interval is not None
+            else get_settings().WORKFLOW_FLUSH_INTERVAL
+        )
+
+        self.workflow: Dict[str, Any] = {}
+        self.steps: Dict[str, Dict[str, Any]] = {}  # step_id -> step columns, in sequence order
+        self._workflow_dirty = False
+        self._dirty_steps: Set[str] = set()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.flush_count = 0
 
     def create_workflow(
         self,
@@ -115,29 +193,36 @@ class WorkflowLogger:
         title: str = "",
         trigger_source: str = "webhook",
     ) -> str:
-        """Create a new workflow log entry."""
-        session = get_session()
-        try:
-            workflow = WorkflowLog(
-                workflow_id=self.workflow_id,
-                alert_id=alert_id,
-                workflow_type=workflow_type,
-                status="started",
-                title=title or f"Alert Triage: {alert_id[:8]}",
-                trigger_source=trigger_source,
-                initiated_by="system",
-                started_at=datetime.utcnow(),
-            )
-            session.add(workflow)
-            session.commit()
-            log.debug(f"Created workflow {self.workflow_id} for alert {alert_id}")
-            return self.workflow_id
-        except Exception as e:
-            log.error(f"Failed to create workflow: {e}")
-            session.rollback()
-            return ""
-        finally:
-            session.close()
+        """Create a new workflow log entry and start the periodic flush."""
+        self.workflow = {
+            "workflow_id": self.workflow_id,
+            "alert_id": alert_id,
+            "workflow_type": workflow_type,
+            "status": "started",
+            "title": title or f"Alert Triage: {alert_id[:8]}",
+            "trigger_source": trigger_source,
+            "initiated_by": "system",
+            "started_at": datetime.utcnow(),
+            "completed_at": None,
+            "duration_ms": None,
+            "summary": None,
+            "outcome": None,
+            "incident_id": None,
+            "primary_session_id": None,
+            "session_ids": [],
+            "total_input_tokens": 0,
+            "total_output_tokens": 0,
+            "total_tokens": 0,
+            "total_cache_read_tokens": 0,
+            "total_cache_write_tokens": 0,
+            "estimated_cost_usd": 0.0,
+        }
+        self._workflow_dirty = True
+
+        if self._flush_task is None and self.flush_interval > 0:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+        log.debug(f"Created workflow {self.workflow_id} for alert {alert_id}")
+        return self.workflow_id
 
     def add_step(
         self,
@@ -154,32 +239,31 @@ class WorkflowLogger:
         self.current_sequence += 1
         step_id = str(uuid.uuid4())
 
-        session = get_session()
-        try:
-            step = WorkflowStep(
-                step_id=step_id,
-                workflow_id=self.workflow_id,
-                sequence=self.current_sequence,
-                step_type=step_type,
-                step_name=step_name,
-                description=description,
-                agent_type=agent_type,
-                agent_name=agent_name,
-                session_id=session_id,
-                status=status,
-                started_at=datetime.utcnow(),
-                input_data=input_data or {},
-            )
-            session.add(step)
-            session.commit()
-            log.debug(f"Added workflow step {step_id}: {step_name}")
-            return step_id
-        except Exception as e:
-            log.error(f"Failed to add workflow step: {e}")
-            session.rollback()
-            return ""
-        finally:
-            session.close()
+        step = dict.fromkeys(STEP_COLUMNS)
+        step.update(
+            step_id=step_id,
+            workflow_id=self.workflow_id,
+            sequence=self.current_sequence,
+            step_type=step_type,
+            step_name=step_name,
+            description=description,
+            agent_type=agent_type,
+            agent_name=agent_name,
+            session_id=session_id,
+            status=status,
+            started_at=datetime.utcnow(),
+            input_tokens=0,
+            output_tokens=0,
+            total_tokens=0,
+            input_data=input_data or {},
+            output_data={},
+            tool_input={},
+            tool_output={},
+        )
+        self.steps[step_id] = step
+        self._dirty_steps.add(step_id)
+        log.debug(f"Added workflow step {step_id}: {step_name}")
+        return step_id
 
     def update_step(
         self,
@@ -193,61 +277,63 @@ class WorkflowLogger:
         error: str = None,
         input_tokens: int = 0,
         output_tokens: int = 0,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
         model_used: str = None,
         risk_level: str = None,
         session_id: str = None,
     ):
         """Update an existing workflow step."""
-        db_session = get_session()
-        try:
-            step = db_session.query(WorkflowStep).filter(
-                WorkflowStep.step_id == step_id
-            ).first()
-            if not step:
-                log.warning(f"Step {step_id} not found")
-                return
-
-            if status:
-                step.status = status
-                if status in ("completed", "failed", "skipped"):
-                    step.completed_at = datetime.utcnow()
-                    if step.started_at:
-                        step.duration_ms = int(
-                            (step.completed_at - step.started_at).total_seconds() * 1000
-                        )
+        step = self.steps.get(step_id)
+        if step is None:
+            log.warning(f"Step {step_id} not found")
+            return
+
+        if status:
+            step["status"] = status
+            if status in ("completed", "failed", "skipped"):
+                step["completed_at"] = datetime.utcnow()
+                if step["started_at"]:
+                    step["duration_ms"] = int(
+                        (step["completed_at"] - step["started_at"]).total_seconds() * 1000
+                    )
 
-            if output_data is not None:
-                step.output_data = output_data
-            if tool_name:
-                step.tool_name = tool_name
-            if tool_input is not None:
-                step.tool_input = tool_input
-            if tool_output is not None:
-                step.tool_output = tool_output
-            if reasoning:
-                step.reasoning = reasoning
-            if error:
-                step.error = error
-                step.status = "failed"
-            if input_tokens or output_tokens:
-                step.input_tokens = input_tokens
-                step.output_tokens = output_tokens
-                step.total_tokens = input_tokens + output_tokens
-                # Track totals
-                self.token_usage.add(input_tokens, output_tokens, model_used or "")
-            if model_used:
-                step.model_used = model_used
-            if risk_level:
-                step.risk_level = risk_level
-            if session_id:
-                step.session_id = session_id
-
-            db_session.commit()
-        except Exception as e:
-            log.error(f"Failed to update workflow step: {e}")
-            db_session.rollback()
-        finally:
-            db_session.close()
+        if output_data is not None:
+            step["output_data"] = output_data
+        if tool_name:
+            step["tool_name"] = tool_name
+        if tool_input is not None:
+            step["tool_input"] = tool_input
+        if tool_output is not None:
+            step["tool_output"] = tool_output
+        if reasoning:
+            step["reasoning"] = reasoning
+        if error:
+            step["error"] = error
+            step["status"] = "failed"
+        if input_tokens or output_tokens or cache_read_tokens or cache_write_tokens:
+            # A step spans every LLM call its agent makes, so usage accumulates
+            prompt_tokens = input_tokens + cache_read_tokens + cache_write_tokens
+            step["input_tokens"] = (step["input_tokens"] or 0) + prompt_tokens
+            step["output_tokens"] = (step["output_tokens"] or 0) + output_tokens
+            step["total_tokens"] = step["input_tokens"] + step["output_tokens"]
+            # Track totals
+            self.token_usage.add(
+                input_tokens,
+                output_tokens,
+                model_used or "",
+                cache_read_tokens=cache_read_tokens,
+                cache_write_tokens=cache_write_tokens,
+            )
+            self._update_token_totals()
+        if model_used:
+            step["model_used"] = model_used
+        if risk_level:
+            step["risk_level"] = risk_level
+        if session_id:
+            step["session_id"] = session_id
+
+        self._dirty_steps.add(step_id)
 
     def add_tool_call_step(
         self,
@@ -295,47 +381,105 @@ class WorkflowLogger:
         primary_session_id: str = None,
     ):
         """Update the main workflow record."""
-        session = get_session()
-        try:
-            workflow = session.query(WorkflowLog).filter(
-                WorkflowLog.workflow_id == self.workflow_id
-            ).first()
-            if not workflow:
-                log.warning(f"Workflow {self.workflow_id} not found")
-                return
-
-            if status:
-                workflow.status = status
-                if status in ("completed", "failed", "escalated"):
-                    workflow.completed_at = datetime.utcnow()
-                    if workflow.started_at:
-                        workflow.duration_ms = int(
-                            (workflow.completed_at - workflow.started_at).total_seconds() * 1000
-                        )
+        workflow = self.workflow
+        if not workflow:
+            log.warning(f"Workflow {self.workflow_id} not found")
+            return
+
+        if status:
+            workflow["status"] = status
+            if status in ("completed", "failed", "escalated"):
+                workflow["completed_at"] = datetime.utcnow()
+                if workflow["started_at"]:
+                    workflow["duration_ms"] = int(
+                        (workflow["completed_at"] - workflow["started_at"]).total_seconds() * 1000
+                    )
 
-            if summary:
-                workflow.summary = summary
-            if outcome:
-                workflow.outcome = outcome
-            if incident_id:
-                workflow.incident_id = incident_id
-            if session_ids:
-                workflow.session_ids = session_ids
-            if primary_session_id:
-                workflow.primary_session_id = primary_session_id
-
-            # Update token totals
-            workflow.total_input_tokens = self.token_usage.input_tokens
-            workflow.total_output_tokens = self.token_usage.output_tokens
-            workflow.total_tokens = self.token_usage.total_tokens
-            workflow.estimated_cost_usd = self.token_usage.estimated_cost_usd
+        if summary:
+            workflow["summary"] = summary
+        if outcome:
+            workflow["outcome"] = outcome
+        if incident_id:
+            workflow["incident_id"] = incident_id
+        if session_ids:
+            workflow["session_ids"] = session_ids
+        if primary_session_id:
+            workflow["primary_session_id"] = primary_session_id
+
+        self._update_token_totals()
+
+    def _update_token_totals(self):
+        if self.workflow:
+            self.workflow.update(
+                total_input_tokens=self.token_usage.input_tokens,
+                total_output_tokens=self.token_usage.output_tokens,
+                total_tokens=self.token_usage.total_tokens,
+                total_cache_read_tokens=self.token_usage.cache_read_tokens,
+                total_cache_write_tokens=self.token_usage.cache_write_tokens,
+                estimated_cost_usd=self.token_usage.estimated_cost_usd,
+            )
+            self._workflow_dirty = True
+
+    async def flush(self) -> int:
+        """Write pending workflow and step changes. Returns the number of steps written."""
+        async with self._flush_lock:
+            if not self._workflow_dirty and not self._dirty_steps:
+                return 0
+
+            workflow_row = dict(self.workflow) if self._workflow_dirty and self.workflow else None
+            dirty_steps, self._dirty_steps = self._dirty_steps, set()
+            self._workflow_dirty = False
+            step_rows = sorted(
+                (dict(self.steps[step_id]) for step_id in dirty_steps),
+                key=lambda step: step["sequence"],
+            )
 
-            session.commit()
-        except Exception as e:
-            log.error(f"Failed to update workflow: {e}")
-            session.rollback()
-        finally:
-            session.close()
+            try:
+                async with async_session_scope() as session:
+                    # Workflow first: steps reference it
+                    if workflow_row:
+                        await session.execute(_upsert(WorkflowLog, "workflow_id", [workflow_row]))
+                    for i in range(0, len(step_rows), FLUSH_CHUNK_SIZE):
+                        await session.execute(
+                            _upsert(WorkflowStep, "step_id", step_rows[i:i + FLUSH_CHUNK_SIZE])
+                        )
+            except Exception as e:
+                log.error(f"Failed to flush workflow {self.workflow_id}: {e}")
+                # Mark everything dirty again so the next flush retries it
+                self._workflow_dirty = self._workflow_dirty or workflow_row is not None
+                self._dirty_steps |= dirty_steps
+                return 0
+
+            self.flush_count += 1
+            return len(step_rows)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                log.error(f"Workflow flush error: {e}", exc_info=True)
+
+    async def close(self):
+        """Stop the periodic flush and write everything still pending."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    def snapshot(self) -> Tuple[SimpleNamespace, List[SimpleNamespace]]:
+        """Current in-memory workflow and steps, shaped like the ORM rows."""
+        workflow = SimpleNamespace(context_data={}, **self.workflow)
+        steps = [
+            SimpleNamespace(error_details={}, requires_approval=False, approval_status=None, **step)
+            for step in self.steps.values()
+        ]
+        return workflow, steps
 
 
 class AlertProcessor:
@@ -359,6 +503,17 @@ class AlertProcessor:
         self._active_sessions: Dict[str, str] = {}  # alert_id -> session_id
         self._active_workflows: Dict[str, WorkflowLogger] = {}  # alert_id -> workflow logger
 
+    def get_live_workflow(self, workflow_id: str) -> Optional[WorkflowLogger]:
+        """Workflow logger of a run still in progress, for live viewers."""
+        for workflow_logger in self._active_workflows.values():
+            if workflow_logger.workflow_id == workflow_id:
+                return workflow_logger
+        return None
+
+    def live_workflows(self) -> Dict[str, WorkflowLogger]:
+        """Workflow loggers of runs in progress, keyed by workflow_id."""
+        return {wl.workflow_id: wl for wl in self._active_workflows.values()}
+
     async def process_alert(
         self,
         alert_id: str,
@@ -424,10 +579,12 @@ class AlertProcessor:
         # Mark alert as being processed
         self._update_alert_status(alert_id, "processing")
         workflow_logger.update_workflow(status="in_progress")
+        await workflow_logger.flush()
 
         try:
             # Run triage agent with workflow logger
             triage_result = await self._run_triage(alert, workflow_logger)
+            await workflow_logger.flush()
 
             # If handoff requested, run specialist
             if triage_result.status == "handoff" and triage_result.specialist_type:
@@ -439,6 +596,7 @@ class AlertProcessor:
                     input_data={"target_specialist": triage_result.specialist_type},
                 )
                 workflow_logger.update_step(handoff_step, status="completed")
+                await workflow_logger.flush()
 
                 specialist_result = await self._run_specialist(
                     alert,
@@ -487,7 +645,8 @@ class AlertProcessor:
                 token_usage=workflow_logger.token_usage,
             )
         finally:
-            # Clean up
+            # Persist the rest of the workflow before it leaves live view
+            await workflow_logger.close()
             if alert_id in self._active_workflows:
                 del self._active_workflows[alert_id]
 
@@ -561,7 +720,7 @@ class AlertProcessor:
         handoff_info = None
         final_response = ""
         escalation_info = None
-        current_tool_step = None
+        tool_steps: Dict[str, str] = {}  # tool_call_id -> step_id
         model_used = triage_agent.llm_model or "claude-sonnet-4-20250514"
 
         try:
@@ -569,7 +728,7 @@ class AlertProcessor:
                 if event.type == EventType.TOOL_CALL:
                     actions_taken.append(f"Called tool: {event.tool_name}")
                     # Log tool call step
-                    current_tool_step = workflow_logger.add_tool_call_step(
+                    tool_steps[event.tool_call_id] = workflow_logger.add_tool_call_step(
                         tool_name=event.tool_name,
                         tool_input=event.tool_input or {},
                         agent_type="triage",
@@ -577,13 +736,13 @@ class AlertProcessor:
                     )
 
                 elif event.type == EventType.TOOL_RESULT:
-                    # Complete tool call step
-                    if current_tool_step:
+                    # Complete the step for this call (calls may run concurrently)
+                    tool_step = tool_steps.pop(event.tool_call_id, None)
+                    if tool_step:
                         workflow_logger.complete_tool_call_step(
-                            current_tool_step,
+                            tool_step,
                             tool_output=event.tool_result or {},
                         )
-                        current_tool_step = None
 
                     if event.tool_name == "handoff_to_specialist":
                         result = event.tool_result or {}
@@ -609,12 +768,12 @@ class AlertProcessor:
                 elif event.type == EventType.TOKEN_USAGE:
                     # Track token usage
                     if event.data:
-                        input_tokens = event.data.get("input_tokens", 0)
-                        output_tokens = event.data.get("output_tokens", 0)
                         workflow_logger.update_step(
                             triage_step,
-                            input_tokens=input_tokens,
-                            output_tokens=output_tokens,
+                            input_tokens=event.data.get("input_tokens", 0),
+                            output_tokens=event.data.get("output_tokens", 0),
+                            cache_read_tokens=event.data.get("cache_read_input_tokens", 0),
+                            cache_write_tokens=event.data.get("cache_creation_input_tokens", 0),
                             model_used=model_used,
                         )
 
@@ -850,7 +1009,7 @@ class AlertProcessor:
         incident_created = False
         incident_id = None
         escalation_info = None
-        current_tool_step = None
+        tool_steps: Dict[str, str] = {}  # tool_call_id -> step_id
         model_used = specialist_agent.llm_model or "claude-sonnet-4-20250514"
 
         try:
@@ -858,7 +1017,7 @@ class AlertProcessor:
                 if event.type == EventType.TOOL_CALL:
                     actions_taken.append(f"Called tool: {event.tool_name}")
                     # Log tool call step
-                    current_tool_step = workflow_logger.add_tool_call_step(
+                    tool_steps[event.tool_call_id] = workflow_logger.add_tool_call_step(
                         tool_name=event.tool_name,
                         tool_input=event.tool_input or {},
                         agent_type=specialist_type,
@@ -866,13 +1025,13 @@ class AlertProcessor:
                     )
 
                 elif event.type == EventType.TOOL_RESULT:
-                    # Complete tool call step
-                    if current_tool_step:
+                    # Complete the step for this call (calls may run concurrently)
+                    tool_step = tool_steps.pop(event.tool_call_id, None)
+                    if tool_step:
                         workflow_logger.complete_tool_call_step(
-                            current_tool_step,
+                            tool_step,
                             tool_output=event.tool_result or {},
                         )
-                        current_tool_step = None
 
                     if event.tool_name == "create_incident":
                         result = event.tool_result or {}
@@ -899,12 +1058,12 @@ class AlertProcessor:
                 elif event.type == EventType.TOKEN_USAGE:
                     # Track token usage
                     if event.data:
-                        input_tokens = event.data.get("input_tokens", 0)
-                        output_tokens = event.data.get("output_tokens", 0)
                         workflow_logger.update_step(
                             specialist_step,
-                            input_tokens=input_tokens,
-                            output_tokens=output_tokens,
+                            input_tokens=event.data.get("input_tokens", 0),
+                            output_tokens=event.data.get("output_tokens", 0),
+                            cache_read_tokens=event.data.get("cache_read_input_tokens", 0),
+                            cache_write_tokens=event.data.get("cache_creation_input_tokens", 0),
                             model_used=model_used,
                         )
 
@@ -1240,6 +1399,8 @@ Provide a detailed analysis and recommendation.
                 if status == "resolved":
                     alert.resolved_at = datetime.utcnow()
                 session.commit()
+                if status in CLOSED_STATUSES:
+                    get_alert_deduplicator().close(alert_id)
         except Exception as e:
             log.error(f"Failed to update alert status: {e}")
             session.rollback()
@@ -0,0 +1,263 @@
+# services/ai/app/services/executor_cache.py
+"""
+Agent Executor Cache
+
+Keeps live AgentExecutors for active chat sessions in memory, keyed by
+session_id, so follow-up messages in a hot session reuse the executor's
+LLM client, provider configuration and message history instead of
+rebuilding them from the database.
+
+The cache is a bounded LRU with idle eviction. Entries are invalidated
+when their agent, the custom tools, the MCP servers or the LLM provider
+configuration change through this service's API, and when the session
+ends. Other API workers only pick up such changes once their entry idles
+out, so the idle timeout also bounds how stale a cached executor can get.
+
+Runs hold their entry's lock (see acquire()). A locked entry is never
+evicted or dropped: invalidation marks it stale instead, and it is
+replaced once its lock is released, so a session never has two executors
+running at the same time.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.config import get_settings
+
+from .agent_executor import AgentExecutor
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedExecutor:
+    """A live executor and the lock serializing runs on its session."""
+    executor: AgentExecutor
+    agent_id: str
+    last_used: float = field(default_factory=time.monotonic)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # Invalidated while a run held the lock; replaced once it is released
+    stale: bool = False
+
+
+class ExecutorCache:
+    """Bounded LRU of AgentExecutors keyed by session_id."""
+
+    def __init__(self, max_entries: int = 256, idle_seconds: float = 1800):
+        self.max_entries = max_entries
+        self.idle_seconds = idle_seconds
+
+        self._entries: "OrderedDict[str, CachedExecutor]" = OrderedDict()
+        # session_id -> (build lock, number of requests using it)
+        self._builds: Dict[str, Tuple[asyncio.Lock, int]] = {}
+        self._sweep_task: Optional[asyncio.Task] = None
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evicted_lru": 0,
+            "evicted_idle": 0,
+            "invalidated": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, session_id: str) -> Optional[CachedExecutor]:
+        """Get the cached executor for a session, or None on a miss."""
+        entry = self._entries.get(session_id)
+        if entry is not None and not entry.lock.locked() and self._is_idle(entry, time.monotonic()):
+            self._remove(session_id, "evicted_idle")
+            entry = None
+
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(session_id)
+        entry.last_used = time.monotonic()
+        self._stats["hits"] += 1
+        return entry
+
+    async def get_or_create(
+        self,
+        session_id: str,
+        build: Callable[[], Awaitable[Tuple[str, AgentExecutor]]],
+    ) -> CachedExecutor:
+        """
+        Get the cached executor for a session, building it on a miss.
+
+        build() returns (agent_id, executor). Builds for the same session
+        are serialized, so concurrent first messages share one entry (and
+        one run lock) instead of each building and caching their own.
+        """
+        entry = self.get(session_id)
+        if entry is not None:
+            return entry
+
+        lock, users = self._builds.get(session_id, (asyncio.Lock(), 0))
+        self._builds[session_id] = (lock, users + 1)
+        try:
+            async with lock:
+                # Another request may have built it while this one waited
+                entry = self._entries.get(session_id)
+                if entry is not None:
+                    self._entries.move_to_end(session_id)
+                    entry.last_used = time.monotonic()
+                    return entry
+                agent_id, executor = await build()
+                return self.put(session_id, agent_id, executor)
+        finally:
+            lock, users = self._builds[session_id]
+            if users > 1:
+                self._builds[session_id] = (lock, users - 1)
+            else:
+                del self._builds[session_id]
+
+    @asynccontextmanager
+    async def acquire(
+        self,
+        session_id: str,
+        build: Callable[[], Awaitable[Tuple[str, AgentExecutor]]],
+    ) -> AsyncIterator[CachedExecutor]:
+        """
+        Hold the run lock of a session's current executor.
+
+        If the entry was evicted or invalidated while this request waited
+        for its lock, the lock is released and the current entry (rebuilt
+        by build() if needed) is used instead. A stale entry is dropped when
+        its run finishes, so the next run rebuilds it with the full history.
+        """
+        while True:
+            entry = await self.get_or_create(session_id, build)
+            await entry.lock.acquire()
+            if not entry.stale and (self._entries.get(session_id) is entry or not self.enabled):
+                break
+            entry.lock.release()
+            if entry.stale and self._entries.get(session_id) is entry:
+                self._remove(session_id, "invalidated")
+
+        try:
+            yield entry
+        finally:
+            entry.last_used = time.monotonic()
+            entry.lock.release()
+            if entry.stale and self._entries.get(session_id) is entry and not entry.lock.locked():
+                self._remove(session_id, "invalidated")
+
+    def put(self, session_id: str, agent_id: str, executor: AgentExecutor) -> CachedExecutor:
+        """Cache a freshly built executor and return its entry."""
+        entry = CachedExecutor(executor=executor, agent_id=agent_id)
+        if not self.enabled:
+            return entry
+
+        self._entries[session_id] = entry
+        self._entries.move_to_end(session_id)
+        excess = len(self._entries) - self.max_entries
+        if excess > 0:
+            # Oldest first, skipping sessions with a run in progress
+            evictable = [s for s, e in self._entries.items() if not e.lock.locked()]
+            for oldest in evictable[:excess]:
+                self._remove(oldest, "evicted_lru")
+        return entry
+
+    def invalidate(self, session_id: str):
+        """Drop a session's executor (e.g. when the session ends)."""
+        if session_id in self._entries:
+            self._invalidate(session_id)
+
+    def invalidate_agent(self, agent_id: str):
+        """Drop every executor built from an agent whose config changed."""
+        for session_id in [s for s, e in self._entries.items() if e.agent_id == agent_id]:
+            self._invalidate(session_id)
+
+    def invalidate_all(self):
+        """Drop every executor (e.g. when LLM provider config or tools changed)."""
+        for session_id in list(self._entries):
+            self._invalidate(session_id)
+
+    def _invalidate(self, session_id: str):
+        entry = self._entries[session_id]
+        if not entry.lock.locked():
+            self._remove(session_id, "invalidated")
+        else:
+            # A run is using it; acquire() drops it once the lock is released
+            entry.stale = True
+
+    def evict_idle(self) -> int:
+        """Drop executors unused for idle_seconds. Returns the number evicted."""
+        now = time.monotonic()
+        idle = [
+            session_id for session_id, entry in self._entries.items()
+            if not entry.lock.locked() and self._is_idle(entry, now)
+        ]
+        for session_id in idle:
+            self._remove(session_id, "evicted_idle")
+        return len(idle)
+
+    def _is_idle(self, entry: CachedExecutor, now: float) -> bool:
+        return now - entry.last_used > self.idle_seconds
+
+    def _remove(self, session_id: str, reason: str):
+        del self._entries[session_id]
+        self._stats[reason] += 1
+        log.debug(f"Executor cache dropped session {session_id} ({reason})")
+
+    async def _sweep_loop(self):
+        interval = max(1.0, min(60.0, self.idle_seconds / 4))
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.evict_idle()
+            except Exception as e:
+                log.error(f"Executor cache sweep error: {e}", exc_info=True)
+
+    def start(self):
+        """Start the periodic idle sweep (called on app startup)."""
+        if self.enabled and self._sweep_task is None:
+            self._sweep_task = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self):
+        """Stop the idle sweep and drop all executors."""
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            try:
+                await self._sweep_task
+            except asyncio.CancelledError:
+                pass
+            self._sweep_task = None
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit/eviction counters."""
+        stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats.update({
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "idle_seconds": self.idle_seconds,
+            "hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+        })
+        return stats
+
+
+# Singleton instance
+_cache: Optional[ExecutorCache] = None
+
+
+def get_executor_cache() -> ExecutorCache:
+    """Get or create the executor cache singleton."""
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        _cache = ExecutorCache(
+            max_entries=settings.CHAT_EXECUTOR_CACHE_SIZE,
+            idle_seconds=settings.CHAT_EXECUTOR_IDLE_SECONDS,
+        )
+    return _cache
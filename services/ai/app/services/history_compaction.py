@@ -0,0 +1,198 @@
+# services/ai/app/services/history_compaction.py
+"""
+Conversation History Compaction
+
+Keeps an agent's message history under a token budget so long chat sessions
+and long ReAct runs do not resend an ever-growing transcript on every LLM
+call. Compaction happens in two stages:
+
+1. Large tool outputs outside the latest tool batch are trimmed to a short
+   head plus a reference (the full output stays in the session's action log).
+2. Older turns are folded into a rolling summary; the most recent turns are
+   kept verbatim. The summary is sent ahead of the first kept message.
+
+Token counts are estimated from text length; they only need to be good
+enough to decide when to compact.
+"""
+
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from .llm_client import LLMClient, Message
+
+log = logging.getLogger(__name__)
+
+# Rough characters per token for English text and JSON tool output
+CHARS_PER_TOKEN = 4
+
+# Per-message overhead (role, separators) in tokens
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PREFIX = "Summary of the earlier conversation in this session:"
+
+SUMMARY_SYSTEM_PROMPT = """You maintain a running summary of a network operations conversation between an operator and an AI agent.
+
+Merge the existing summary (if any) with the new conversation excerpt into one updated summary.
+Keep:
+- Devices, interfaces, protocols, prefixes and other identifiers mentioned
+- Commands and tools that were run and what they showed
+- Findings, root cause hypotheses and decisions made
+- Changes made or proposed, and anything still open or pending
+
+Drop pleasantries and raw output that has already been interpreted.
+Write plain prose or short bullet points, at most 400 words. Reply with the summary only."""
+
+# Tool output included per message when building the summarization prompt
+SUMMARY_TOOL_OUTPUT_CHARS = 2000
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Estimate the token count of a string."""
+    if not text:
+        return 0
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def estimate_message_tokens(message: Message) -> int:
+    """Estimate the tokens a message adds to a request."""
+    tokens = MESSAGE_OVERHEAD_TOKENS + estimate_tokens(message.content)
+    if message.tool_calls:
+        tokens += estimate_tokens(json.dumps(message.tool_calls, default=str))
+    return tokens
+
+
+def estimate_history_tokens(messages: List[Message], summary: Optional[str] = None) -> int:
+    """Estimate the tokens of a history plus its rolling summary."""
+    return estimate_tokens(summary) + sum(estimate_message_tokens(m) for m in messages)
+
+
+def is_persisted(message: Message) -> bool:
+    """
+    Whether a message is stored as an AgentMessage row.
+
+    Only user messages and final assistant responses are persisted; tool
+    calls and tool results live in the session's action log instead.
+    """
+    return message.role in ("user", "assistant") and not message.tool_calls
+
+
+def _tool_names(messages: List[Message]) -> Dict[str, str]:
+    """Map tool_call_id -> tool name from assistant tool calls."""
+    names = {}
+    for message in messages:
+        for tool_call in message.tool_calls or []:
+            names[tool_call.get("id")] = tool_call.get("name")
+    return names
+
+
+def trim_tool_outputs(messages: List[Message], max_chars: int) -> List[Message]:
+    """
+    Trim tool results longer than max_chars, except the latest tool batch.
+
+    The latest batch (trailing tool calls and results) is what the LLM is
+    about to reason over, so it is always sent in full. Returns a new list;
+    trimmed messages are replaced, not modified.
+    """
+    # Trailing tool calls/results form the batch currently being worked on
+    protected = len(messages)
+    while protected > 0 and (messages[protected - 1].role == "tool" or messages[protected - 1].tool_calls):
+        protected -= 1
+
+    names = _tool_names(messages)
+    trimmed = list(messages)
+    for index, message in enumerate(messages[:protected]):
+        if message.role != "tool" or len(message.content or "") <= max_chars:
+            continue
+        tool_name = names.get(message.tool_call_id, "the tool")
+        omitted = len(message.content) - max_chars
+        trimmed[index] = Message(
+            role=message.role,
+            content=(
+                f"{message.content[:max_chars]}\n"
+                f"...[output truncated: {omitted} more characters omitted; the full result is in "
+                f"this session's action log. Re-run {tool_name} with a narrower request if needed.]"
+            ),
+            tool_call_id=message.tool_call_id,
+        )
+    return trimmed
+
+
+def split_recent_turns(messages: List[Message], keep_turns: int) -> Tuple[List[Message], List[Message]]:
+    """
+    Split history into (older, recent), keeping the last keep_turns turns.
+
+    A turn starts at a user message, so tool calls stay with their results.
+    """
+    starts = [i for i, message in enumerate(messages) if message.role == "user"]
+    if len(starts) <= keep_turns:
+        return [], list(messages)
+    cut = starts[-keep_turns] if keep_turns > 0 else len(messages)
+    return list(messages[:cut]), list(messages[cut:])
+
+
+def with_summary(messages: List[Message], summary: Optional[str]) -> List[Message]:
+    """Return the messages to send, with the rolling summary ahead of the first one."""
+    if not summary:
+        return messages
+    preamble = f"{SUMMARY_PREFIX}\n{summary}"
+    if messages and messages[0].role == "user" and not messages[0].tool_calls:
+        first = Message(role="user", content=f"{preamble}\n\n{messages[0].content}")
+        return [first] + messages[1:]
+    return [Message(role="user", content=preamble)] + messages
+
+
+def _render_transcript(messages: List[Message]) -> str:
+    names = _tool_names(messages)
+    lines = []
+    for message in messages:
+        if message.role == "tool":
+            output = message.content or ""
+            if len(output) > SUMMARY_TOOL_OUTPUT_CHARS:
+                output = output[:SUMMARY_TOOL_OUTPUT_CHARS] + " ...[truncated]"
+            lines.append(f"[tool result: {names.get(message.tool_call_id, 'tool')}] {output}")
+        elif message.tool_calls:
+            if message.content:
+                lines.append(f"assistant: {message.content}")
+            for tool_call in message.tool_calls:
+                lines.append(
+                    f"[tool call: {tool_call.get('name')}] {json.dumps(tool_call.get('input', {}), default=str)}"
+                )
+        else:
+            lines.append(f"{message.role}: {message.content}")
+    return "\n".join(lines)
+
+
+def _fallback_summary(previous: Optional[str], messages: List[Message], max_chars: int) -> str:
+    """Extractive summary used when the LLM summarization call fails."""
+    parts = [previous] if previous else []
+    for message in messages:
+        if is_persisted(message) and message.content:
+            parts.append(f"{message.role}: {message.content[:300]}")
+    text = "\n".join(parts)
+    return text[-max_chars:]
+
+
+async def summarize_history(
+    llm: LLMClient,
+    previous_summary: Optional[str],
+    messages: List[Message],
+    max_chars: int = 6000,
+) -> str:
+    """Fold messages into the rolling summary using the agent's LLM."""
+    prompt = (
+        f"Existing summary:\n{previous_summary or '(none)'}\n\n"
+        f"New conversation excerpt:\n{_render_transcript(messages)}"
+    )
+    try:
+        response = await llm.chat(
+            messages=[Message(role="user", content=prompt)],
+            system_prompt=SUMMARY_SYSTEM_PROMPT,
+        )
+        summary = (response.get("content") or "").strip()
+        if summary:
+            return summary[:max_chars]
+        log.warning("Empty history summary from LLM, using extractive summary")
+    except Exception as e:
+        log.warning(f"History summarization failed, using extractive summary: {e}")
+    return _fallback_summary(previous_summary, messages, max_chars)
@@ -8,6 +8,7 @@ Supports tool use, streaming, and proper error handling.
 
 import json
 import logging
+import time
 from typing import Optional, List, Dict, Any, Generator, AsyncGenerator
 from dataclasses import dataclass, field
 from enum import Enum
@@ -16,12 +17,21 @@ import httpx
 
 from netstacks_core.db import get_session, LLMProvider
 
+from app.config import get_settings
+from . import llm_transport
+
 log = logging.getLogger(__name__)
 
 # API Endpoints
 ANTHROPIC_API_URL = "https://api.anthropic.com/v1/messages"
 OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
 
+# Prompt cache breakpoint. Anthropic allows four per request: the tool block,
+# the system prompt and the two most recent turns (so each ReAct iteration
+# reads the prefix the previous one wrote).
+CACHE_CONTROL = {"type": "ephemeral"}
+CACHED_TURNS = 2
+
 
 class LLMError(Exception):
     """Base exception for LLM errors."""
@@ -52,6 +62,7 @@ class EventType(str, Enum):
     """Agent event types for streaming."""
     THINKING = "thinking"
     TOOL_CALL = "tool_call"
+    TOOL_CALL_DELTA = "tool_call_delta"
     TOOL_RESULT = "tool_result"
     TEXT = "text"
     FINAL_RESPONSE = "final_response"
@@ -92,6 +103,68 @@ class Message:
     tool_call_id: Optional[str] = None
 
 
+def normalize_usage(usage: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Normalize provider token usage to Anthropic-style counts.
+
+    input_tokens excludes prompt tokens read from or written to the prompt
+    cache, which are reported as cache_read_input_tokens and
+    cache_creation_input_tokens.
+    """
+    usage = usage or {}
+    if "prompt_tokens" in usage or "completion_tokens" in usage:
+        # OpenAI format (OpenRouter): prompt_tokens includes cached tokens
+        details = usage.get("prompt_tokens_details") or {}
+        cache_read = details.get("cached_tokens") or 0
+        cache_write = details.get("cache_write_tokens") or 0
+        return {
+            "input_tokens": max(0, (usage.get("prompt_tokens") or 0) - cache_read - cache_write),
+            "output_tokens": usage.get("completion_tokens") or 0,
+            "cache_read_input_tokens": cache_read,
+            "cache_creation_input_tokens": cache_write,
+        }
+    return {
+        "input_tokens": usage.get("input_tokens") or 0,
+        "output_tokens": usage.get("output_tokens") or 0,
+        "cache_read_input_tokens": usage.get("cache_read_input_tokens") or 0,
+        "cache_creation_input_tokens": usage.get("cache_creation_input_tokens") or 0,
+    }
+
+
+def _mark_cacheable(
+    messages: List[Dict],
+    count: int,
+    roles: Optional[tuple] = None,
+) -> List[Dict]:
+    """
+    Return messages with a cache breakpoint on the last block of the last
+    `count` messages (optionally only messages with one of `roles`).
+
+    The input list and its messages are not modified.
+    """
+    marked = list(messages)
+    remaining = count
+    for index in range(len(marked) - 1, -1, -1):
+        if not remaining:
+            break
+        msg = marked[index]
+        if roles and msg.get("role") not in roles:
+            continue
+
+        content = msg.get("content")
+        if isinstance(content, str) and content:
+            blocks = [{"type": "text", "text": content}]
+        elif isinstance(content, list) and content:
+            blocks = [dict(block) for block in content]
+        else:
+            continue
+
+        blocks[-1]["cache_control"] = CACHE_CONTROL
+        marked[index] = {**msg, "content": blocks}
+        remaining -= 1
+    return marked
+
+
 def get_provider_config(provider_name: str) -> tuple[str, str, str]:
     """
     Get provider configuration from database.
@@ -170,6 +243,7 @@ class LLMClient:
         api_key: Optional[str] = None,
         temperature: float = 0.1,
         max_tokens: int = 4096,
+        prompt_caching: Optional[bool] = None,
     ):
         self.provider = provider
         self.model = model
@@ -177,6 +251,9 @@ class LLMClient:
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.api_base_url = None
+        self.prompt_caching = (
+            get_settings().LLM_PROMPT_CACHING if prompt_caching is None else prompt_caching
+        )
 
         # Load from database if not provided
         if not self.api_key:
@@ -324,6 +401,42 @@ class LLMClient:
 
         return formatted
 
+    def _apply_anthropic_cache(self, payload: Dict[str, Any]):
+        """Mark the tool block, system prompt and latest turns as cacheable."""
+        if not self.prompt_caching:
+            return
+
+        if payload.get("tools"):
+            tools = list(payload["tools"])
+            tools[-1] = {**tools[-1], "cache_control": CACHE_CONTROL}
+            payload["tools"] = tools
+
+        if payload.get("system"):
+            payload["system"] = [{
+                "type": "text",
+                "text": payload["system"],
+                "cache_control": CACHE_CONTROL,
+            }]
+
+        payload["messages"] = _mark_cacheable(payload["messages"], CACHED_TURNS)
+
+    def _apply_openrouter_cache(self, payload: Dict[str, Any], model: str):
+        """
+        Mark the system prompt and latest turns as cacheable.
+
+        Only Anthropic models take explicit breakpoints through OpenRouter
+        (the tool block is cached as part of the system prefix); OpenAI
+        models cache long prefixes automatically.
+        """
+        if not self.prompt_caching or not model.startswith("anthropic/"):
+            return
+
+        payload["messages"] = _mark_cacheable(
+            _mark_cacheable(payload["messages"], 1, roles=("system",)),
+            CACHED_TURNS,
+            roles=("user", "assistant"),
+        )
+
     async def chat(
         self,
         messages: List[Message],
@@ -373,23 +486,24 @@ class LLMClient:
         if tools:
             payload["tools"] = self._format_tools_for_anthropic(tools)
 
+        self._apply_anthropic_cache(payload)
+
         url = self.api_base_url or ANTHROPIC_API_URL
 
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            try:
-                response = await client.post(url, json=payload, headers=headers)
+        try:
+            response = await llm_transport.post(self.provider, url, json=payload, headers=headers)
 
-                if response.status_code == 429:
-                    raise RateLimitError("Rate limit exceeded")
+            if response.status_code == 429:
+                raise RateLimitError("Rate limit exceeded")
 
-                response.raise_for_status()
-                data = response.json()
+            response.raise_for_status()
+            data = response.json()
 
-                return self._parse_anthropic_response(data)
+            return self._parse_anthropic_response(data)
 
-            except httpx.HTTPStatusError as e:
-                log.error(f"Anthropic API error: {e.response.text}")
-                raise LLMError(f"API error: {e.response.status_code}")
+        except httpx.HTTPStatusError as e:
+            log.error(f"Anthropic API error: {e.response.text}")
+            raise LLMError(f"API error: {e.response.status_code}")
 
     async def _chat_openrouter(
         self,
@@ -419,23 +533,24 @@ class LLMClient:
             payload["tools"] = self._format_tools_for_openrouter(tools)
             payload["tool_choice"] = "auto"
 
+        self._apply_openrouter_cache(payload, model)
+
         url = self.api_base_url or OPENROUTER_API_URL
 
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            try:
-                response = await client.post(url, json=payload, headers=headers)
+        try:
+            response = await llm_transport.post(self.provider, url, json=payload, headers=headers)
 
-                if response.status_code == 429:
-                    raise RateLimitError("Rate limit exceeded")
+            if response.status_code == 429:
+                raise RateLimitError("Rate limit exceeded")
 
-                response.raise_for_status()
-                data = response.json()
+            response.raise_for_status()
+            data = response.json()
 
-                return self._parse_openrouter_response(data)
+            return self._parse_openrouter_response(data)
 
-            except httpx.HTTPStatusError as e:
-                log.error(f"OpenRouter API error: {e.response.text}")
-                raise LLMError(f"API error: {e.response.status_code}")
+        except httpx.HTTPStatusError as e:
+            log.error(f"OpenRouter API error: {e.response.text}")
+            raise LLMError(f"API error: {e.response.status_code}")
 
     def _parse_anthropic_response(self, data: Dict) -> Dict[str, Any]:
         """Parse Anthropic API response."""
@@ -443,7 +558,7 @@ class LLMClient:
             "content": "",
             "tool_calls": [],
             "stop_reason": data.get("stop_reason"),
-            "usage": data.get("usage", {}),
+            "usage": normalize_usage(data.get("usage")),
         }
 
         for block in data.get("content", []):
@@ -467,7 +582,7 @@ class LLMClient:
             "content": message.get("content", ""),
             "tool_calls": [],
             "stop_reason": choice.get("finish_reason"),
-            "usage": data.get("usage", {}),
+            "usage": normalize_usage(data.get("usage")),
         }
 
         for tc in message.get("tool_calls", []):
@@ -539,71 +654,100 @@ class LLMClient:
         if tools:
             payload["tools"] = self._format_tools_for_anthropic(tools)
 
+        self._apply_anthropic_cache(payload)
+
         url = self.api_base_url or ANTHROPIC_API_URL
 
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            async with client.stream("POST", url, json=payload, headers=headers) as response:
-                if response.status_code == 429:
-                    yield AgentEvent(type=EventType.ERROR, content="Rate limit exceeded")
-                    return
+        started = time.monotonic()
+        first_token = True
 
-                if response.status_code >= 400:
-                    yield AgentEvent(type=EventType.ERROR, content=f"API error: {response.status_code}")
-                    return
+        async with llm_transport.stream(self.provider, url, json=payload, headers=headers) as response:
+            if response.status_code == 429:
+                yield AgentEvent(type=EventType.ERROR, content="Rate limit exceeded")
+                return
 
-                current_text = ""
-                current_tool = None
-                tool_input_json = ""
+            if response.status_code >= 400:
+                yield AgentEvent(type=EventType.ERROR, content=f"API error: {response.status_code}")
+                return
 
-                async for line in response.aiter_lines():
-                    if not line.startswith("data: "):
-                        continue
+            current_text = ""
+            current_tool = None
+            tool_input_json = ""
+            usage: Dict[str, Any] = {}
 
-                    try:
-                        data = json.loads(line[6:])
-                    except json.JSONDecodeError:
-                        continue
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
 
-                    event_type = data.get("type")
-
-                    if event_type == "content_block_start":
-                        block = data.get("content_block", {})
-                        if block.get("type") == "tool_use":
-                            current_tool = {
-                                "id": block.get("id"),
-                                "name": block.get("name"),
-                            }
-                            tool_input_json = ""
-
-                    elif event_type == "content_block_delta":
-                        delta = data.get("delta", {})
-                        if delta.get("type") == "text_delta":
-                            text = delta.get("text", "")
-                            current_text += text
-                            yield AgentEvent(type=EventType.TEXT, content=text)
-                        elif delta.get("type") == "input_json_delta":
-                            tool_input_json += delta.get("partial_json", "")
-
-                    elif event_type == "content_block_stop":
-                        if current_tool:
-                            try:
-                                tool_input = json.loads(tool_input_json) if tool_input_json else {}
-                            except json.JSONDecodeError:
-                                tool_input = {}
+                try:
+                    data = json.loads(line[6:])
+                except json.JSONDecodeError:
+                    continue
 
+                event_type = data.get("type")
+
+                if event_type == "message_start":
+                    usage.update(data.get("message", {}).get("usage") or {})
+
+                elif event_type == "message_delta":
+                    usage.update(data.get("usage") or {})
+
+                elif event_type == "content_block_start":
+                    block = data.get("content_block", {})
+                    if block.get("type") == "tool_use":
+                        current_tool = {
+                            "id": block.get("id"),
+                            "name": block.get("name"),
+                        }
+                        tool_input_json = ""
+                        yield AgentEvent(
+                            type=EventType.TOOL_CALL_DELTA,
+                            tool_name=current_tool["name"],
+                            tool_call_id=current_tool["id"],
+                        )
+
+                elif event_type == "content_block_delta":
+                    delta = data.get("delta", {})
+                    if first_token:
+                        llm_transport.record_first_token(self.provider, started)
+                        first_token = False
+                    if delta.get("type") == "text_delta":
+                        text = delta.get("text", "")
+                        current_text += text
+                        yield AgentEvent(type=EventType.TEXT, content=text)
+                    elif delta.get("type") == "input_json_delta":
+                        partial = delta.get("partial_json", "")
+                        tool_input_json += partial
+                        if current_tool and partial:
                             yield AgentEvent(
-                                type=EventType.TOOL_CALL,
+                                type=EventType.TOOL_CALL_DELTA,
+                                content=partial,
                                 tool_name=current_tool["name"],
-                                tool_input=tool_input,
                                 tool_call_id=current_tool["id"],
                             )
-                            current_tool = None
-                            tool_input_json = ""
 
-                    elif event_type == "message_stop":
-                        if current_text:
-                            yield AgentEvent(type=EventType.FINAL_RESPONSE, content=current_text)
-                        yield AgentEvent(type=EventType.DONE)
+                elif event_type == "content_block_stop":
+                    if current_tool:
+                        try:
+                            tool_input = json.loads(tool_input_json) if tool_input_json else {}
+                        except json.JSONDecodeError:
+                            tool_input = {}
+
+                        yield AgentEvent(
+                            type=EventType.TOOL_CALL,
+                            tool_name=current_tool["name"],
+                            tool_input=tool_input,
+                            tool_call_id=current_tool["id"],
+                        )
+                        current_tool = None
+                        tool_input_json = ""
+
+                elif event_type == "message_stop":
+                    if usage:
+                        yield AgentEvent(type=EventType.TOKEN_USAGE, data=normalize_usage(usage))
+                    if current_text:
+                        yield AgentEvent(type=EventType.FINAL_RESPONSE, content=current_text)
+                    yield AgentEvent(type=EventType.DONE)
 
     async def _stream_openrouter(
         self,
@@ -628,74 +772,102 @@ class LLMClient:
             "temperature": self.temperature,
             "messages": formatted_messages,
             "stream": True,
+            "stream_options": {"include_usage": True},
         }
 
         if tools:
             payload["tools"] = self._format_tools_for_openrouter(tools)
             payload["tool_choice"] = "auto"
 
-        url = self.api_base_url or OPENROUTER_API_URL
+        self._apply_openrouter_cache(payload, model)
 
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            async with client.stream("POST", url, json=payload, headers=headers) as response:
-                if response.status_code == 429:
-                    yield AgentEvent(type=EventType.ERROR, content="Rate limit exceeded")
-                    return
+        url = self.api_base_url or OPENROUTER_API_URL
 
-                if response.status_code >= 400:
-                    yield AgentEvent(type=EventType.ERROR, content=f"API error: {response.status_code}")
-                    return
+        started = time.monotonic()
+        first_token = True
 
-                current_text = ""
-                tool_calls = {}  # id -> {name, arguments}
+        async with llm_transport.stream(self.provider, url, json=payload, headers=headers) as response:
+            if response.status_code == 429:
+                yield AgentEvent(type=EventType.ERROR, content="Rate limit exceeded")
+                return
 
-                async for line in response.aiter_lines():
-                    if not line.startswith("data: "):
-                        continue
+            if response.status_code >= 400:
+                yield AgentEvent(type=EventType.ERROR, content=f"API error: {response.status_code}")
+                return
 
-                    if line == "data: [DONE]":
-                        if current_text:
-                            yield AgentEvent(type=EventType.FINAL_RESPONSE, content=current_text)
-                        yield AgentEvent(type=EventType.DONE)
-                        break
+            current_text = ""
+            tool_calls = {}  # id -> {name, arguments}
+            tool_call_ids = {}  # index -> id (only the first chunk of a call carries its id)
+            usage = None
 
-                    try:
-                        data = json.loads(line[6:])
-                    except json.JSONDecodeError:
-                        continue
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
 
-                    choice = data.get("choices", [{}])[0]
-                    delta = choice.get("delta", {})
-
-                    # Text content
-                    if delta.get("content"):
-                        text = delta["content"]
-                        current_text += text
-                        yield AgentEvent(type=EventType.TEXT, content=text)
+                if line == "data: [DONE]":
+                    if usage:
+                        yield AgentEvent(type=EventType.TOKEN_USAGE, data=normalize_usage(usage))
+                    if current_text:
+                        yield AgentEvent(type=EventType.FINAL_RESPONSE, content=current_text)
+                    yield AgentEvent(type=EventType.DONE)
+                    break
 
-                    # Tool calls
-                    for tc in delta.get("tool_calls", []):
-                        tc_id = tc.get("id")
-                        if tc_id and tc_id not in tool_calls:
-                            tool_calls[tc_id] = {"name": "", "arguments": ""}
-
-                        func = tc.get("function", {})
-                        if func.get("name"):
-                            tool_calls[tc_id]["name"] = func["name"]
-                        if func.get("arguments"):
-                            tool_calls[tc_id]["arguments"] += func["arguments"]
-
-                    # Check for finish
-                    if choice.get("finish_reason") == "tool_calls":
-                        for tc_id, tc_data in tool_calls.items():
-                            try:
-                                args = json.loads(tc_data["arguments"]) if tc_data["arguments"] else {}
-                            except json.JSONDecodeError:
-                                args = {}
-
-                            yield AgentEvent(
-                                type=EventType.TOOL_CALL,
-                                tool_name=tc_data["name"],
-                                tool_input=args,
-                                tool_call_id=tc_id,
-                            )
+                try:
+                    data = json.loads(line[6:])
+                except json.JSONDecodeError:
+                    continue
+
+                # The final chunk carries usage and no choices
+                if data.get("usage"):
+                    usage = data["usage"]
+
+                choice = (data.get("choices") or [{}])[0]
+                delta = choice.get("delta", {})
+
+                if first_token and (delta.get("content") or delta.get("tool_calls")):
+                    llm_transport.record_first_token(self.provider, started)
+                    first_token = False
+
+                # Text content
+                if delta.get("content"):
+                    text = delta["content"]
+                    current_text += text
+                    yield AgentEvent(type=EventType.TEXT, content=text)
+
+                # Tool calls
+                for tc in delta.get("tool_calls") or []:
+                    index = tc.get("index", 0)
+                    if tc.get("id"):
+                        tool_call_ids[index] = tc["id"]
+                    tc_id = tool_call_ids.get(index)
+                    if not tc_id:
+                        continue
+                    if tc_id not in tool_calls:
+                        tool_calls[tc_id] = {"name": "", "arguments": ""}
+
+                    func = tc.get("function", {})
+                    if func.get("name"):
+                        tool_calls[tc_id]["name"] = func["name"]
+                    if func.get("arguments"):
+                        tool_calls[tc_id]["arguments"] += func["arguments"]
+                        yield AgentEvent(
+                            type=EventType.TOOL_CALL_DELTA,
+                            content=func["arguments"],
+                            tool_name=tool_calls[tc_id]["name"],
+                            tool_call_id=tc_id,
+                        )
+
+                # Check for finish
+                if choice.get("finish_reason") == "tool_calls":
+                    for tc_id, tc_data in tool_calls.items():
+                        try:
+                            args = json.loads(tc_data["arguments"]) if tc_data["arguments"] else {}
+                        except json.JSONDecodeError:
+                            args = {}
+
+                        yield AgentEvent(
+                            type=EventType.TOOL_CALL,
+                            tool_name=tc_data["name"],
+                            tool_input=args,
+                            tool_call_id=tc_id,
+                        )
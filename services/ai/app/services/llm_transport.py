@@ -0,0 +1,253 @@
+# services/ai/app/services/llm_transport.py
+"""
+LLM HTTP Transport
+
+One pooled, keep-alive httpx.AsyncClient per LLM provider, shared by every
+LLMClient in the process, so a ReAct loop reuses its connection (and TLS
+session) instead of handshaking on every iteration. HTTP/2 is used when the
+h2 package is installed.
+
+Requests are retried with jittered exponential backoff on 429 and 5xx
+responses and on failures to connect, honoring Retry-After when the
+provider sends it. Every attempt takes a slot from the provider rate
+limiter. Per-provider request latency and time-to-first-token histograms
+are available from get_transport_stats().
+
+Clients are bound to the event loop they are first used on (the service's
+own loop).
+"""
+
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncGenerator, Dict, Optional
+
+import httpx
+
+from netstacks_core.metrics import Histogram
+
+from app.config import get_settings
+
+from .rate_limiter import acquire_provider_slot
+
+log = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504, 529}
+
+# Failures raised before the request was sent, so it is safe to send again.
+# Not RemoteProtocolError: it can also be raised after the request was fully
+# sent (e.g. the server dropped the connection mid-response), and resending
+# would repeat a billed, non-idempotent completion.
+RETRY_EXCEPTIONS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.PoolTimeout,
+)
+
+# Bucket upper bounds (seconds) for request latency and time to first token
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+
+class ProviderStats:
+    """Request counters and histograms for one provider."""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.status_codes: Dict[int, int] = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.time_to_first_token = Histogram(LATENCY_BUCKETS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "status_codes": {str(code): count for code, count in sorted(self.status_codes.items())},
+            "latency_seconds": self.latency.to_dict(),
+            "time_to_first_token_seconds": self.time_to_first_token.to_dict(),
+        }
+
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+_stats: Dict[str, ProviderStats] = {}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _get_stats(provider: Optional[str]) -> ProviderStats:
+    name = provider or "default"
+    if name not in _stats:
+        _stats[name] = ProviderStats()
+    return _stats[name]
+
+
+def get_client(provider: Optional[str]) -> httpx.AsyncClient:
+    """Get the shared HTTP client for a provider, creating it on first use."""
+    name = provider or "default"
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        settings = get_settings()
+        http2 = _http2_available()
+        if not http2:
+            log.warning("h2 not installed, LLM requests will use HTTP/1.1")
+        client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(settings.LLM_HTTP_TIMEOUT, connect=10.0),
+        )
+        _clients[name] = client
+    return client
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _backoff_delay(attempt: int, retry_after: Optional[float]) -> float:
+    """Seconds to wait before retry number `attempt` (1-based)."""
+    settings = get_settings()
+    base = settings.LLM_RETRY_BACKOFF_BASE
+    if retry_after is not None:
+        # Small jitter so clients told the same Retry-After do not return together
+        return retry_after + random.uniform(0, base)
+    # Full jitter exponential backoff
+    return random.uniform(0, min(settings.LLM_RETRY_BACKOFF_MAX, base * 2 ** (attempt - 1)))
+
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response]) -> Optional[float]:
+    """Return the delay before the next attempt, or None to give up."""
+    settings = get_settings()
+    if attempt > settings.LLM_MAX_RETRIES:
+        return None
+    retry_after = parse_retry_after(response.headers.get("retry-after")) if response is not None else None
+    if retry_after is not None and retry_after > settings.LLM_RETRY_MAX_WAIT:
+        return None
+    return _backoff_delay(attempt, retry_after)
+
+
+async def _send(
+    provider: Optional[str],
+    request: httpx.Request,
+    stream: bool,
+) -> httpx.Response:
+    """Send a request, retrying transient failures. Returns the last response."""
+    client = get_client(provider)
+    stats = _get_stats(provider)
+    attempt = 0
+
+    while True:
+        attempt += 1
+        await acquire_provider_slot(provider)
+        stats.requests += 1
+
+        try:
+            response = await client.send(request, stream=stream)
+        except RETRY_EXCEPTIONS as e:
+            delay = _retry_delay(attempt, None)
+            if delay is None:
+                stats.failures += 1
+                raise
+            log.warning(f"{provider} request failed ({e!r}), retrying in {delay:.1f}s")
+        else:
+            stats.status_codes[response.status_code] = stats.status_codes.get(response.status_code, 0) + 1
+            if response.status_code not in RETRY_STATUS_CODES:
+                return response
+            delay = _retry_delay(attempt, response)
+            if delay is None:
+                stats.failures += 1
+                return response
+            await response.aclose()
+            log.warning(f"{provider} returned {response.status_code}, retrying in {delay:.1f}s")
+
+        stats.retries += 1
+        await asyncio.sleep(delay)
+
+
+async def post(
+    provider: Optional[str],
+    url: str,
+    json: Dict[str, Any],
+    headers: Dict[str, str],
+) -> httpx.Response:
+    """
+    POST a JSON request to a provider over its pooled client.
+
+    Transient failures are retried; the final response is returned whatever
+    its status so the caller keeps its own error handling.
+    """
+    request = get_client(provider).build_request("POST", url, json=json, headers=headers)
+    started = time.monotonic()
+    try:
+        return await _send(provider, request, stream=False)
+    finally:
+        _get_stats(provider).latency.observe(time.monotonic() - started)
+
+
+@asynccontextmanager
+async def stream(
+    provider: Optional[str],
+    url: str,
+    json: Dict[str, Any],
+    headers: Dict[str, str],
+) -> AsyncGenerator[httpx.Response, None]:
+    """
+    Open a streaming POST to a provider over its pooled client.
+
+    Retries happen before the response body is read, so nothing is ever
+    replayed to the caller. Latency covers the whole stream.
+    """
+    request = get_client(provider).build_request("POST", url, json=json, headers=headers)
+    started = time.monotonic()
+    response = await _send(provider, request, stream=True)
+    try:
+        yield response
+    finally:
+        await response.aclose()
+        _get_stats(provider).latency.observe(time.monotonic() - started)
+
+
+def record_first_token(provider: Optional[str], started: float):
+    """Record time to first token for a request started at `started` (monotonic)."""
+    _get_stats(provider).time_to_first_token.observe(time.monotonic() - started)
+
+
+def get_transport_stats() -> Dict[str, Any]:
+    """Get per-provider request, retry and latency statistics."""
+    return {name: stats.to_dict() for name, stats in _stats.items()}
+
+
+async def close_clients():
+    """Close the pooled provider clients. Call on application shutdown."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
@@ -0,0 +1,111 @@
+# services/ai/app/services/rate_limiter.py
+"""
+LLM Provider Rate Limiter
+
+Token-bucket request limits per LLM provider, shared by every LLMClient in
+the process (alert triage, chat and agent sessions). Limits are configured
+with LLM_PROVIDER_RATE_LIMITS as "provider=requests_per_minute" pairs, e.g.
+"anthropic=50,openrouter=200". Providers without a limit are not throttled.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from app.config import get_settings
+
+log = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Async token bucket allowing `rate` acquisitions per `per` seconds."""
+
+    def __init__(self, rate: float, per: float = 60.0, burst: Optional[float] = None):
+        self.rate = rate
+        self.per = per
+        self.capacity = burst if burst is not None else max(1.0, rate / 10)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+        self.acquired = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate / self.per)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """Wait for a token. Returns the number of seconds waited."""
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                delay = (1 - self._tokens) * self.per / self.rate
+                self.throttled += 1
+                await asyncio.sleep(delay)
+                waited = delay
+                self._refill()
+            self._tokens -= 1
+            self.acquired += 1
+            self.wait_seconds += waited
+        return waited
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "requests_per_minute": self.rate * 60.0 / self.per,
+            "burst": self.capacity,
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "wait_seconds": round(self.wait_seconds, 3),
+        }
+
+
+def parse_rate_limits(spec: str) -> Dict[str, float]:
+    """Parse "provider=rpm,provider=rpm" into a dict, ignoring bad entries."""
+    limits = {}
+    for item in spec.split(","):
+        name, _, value = item.partition("=")
+        name = name.strip()
+        if not name or not value.strip():
+            continue
+        try:
+            rpm = float(value)
+        except ValueError:
+            log.warning(f"Ignoring invalid LLM rate limit '{item}'")
+            continue
+        if rpm > 0:
+            limits[name] = rpm
+    return limits
+
+
+_buckets: Optional[Dict[str, TokenBucket]] = None
+
+
+def _get_buckets() -> Dict[str, TokenBucket]:
+    global _buckets
+    if _buckets is None:
+        limits = parse_rate_limits(get_settings().LLM_PROVIDER_RATE_LIMITS)
+        _buckets = {name: TokenBucket(rpm) for name, rpm in limits.items()}
+        if limits:
+            log.info(f"LLM provider rate limits (requests/min): {limits}")
+    return _buckets
+
+
+async def acquire_provider_slot(provider: Optional[str]) -> float:
+    """Wait until a request to provider is allowed. Returns seconds waited."""
+    bucket = _get_buckets().get(provider or "")
+    if bucket is None:
+        return 0.0
+    waited = await bucket.acquire()
+    if waited:
+        log.debug(f"Rate limited {provider} request for {waited:.2f}s")
+    return waited
+
+
+def get_rate_limit_stats() -> Dict[str, Any]:
+    """Get per-provider rate limiter statistics."""
+    return {name: bucket.get_stats() for name, bucket in _get_buckets().items()}
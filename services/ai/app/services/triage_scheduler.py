@@ -0,0 +1,253 @@
+# services/ai/app/services/triage_scheduler.py
+"""
+Alert Triage Scheduler
+
+Runs AI triage for incoming alerts on a bounded pool of worker tasks
+instead of one unbounded background task per alert. Alerts are triaged in
+severity order (critical first, FIFO within a severity) with at most
+TRIAGE_CONCURRENCY triage runs in flight.
+
+The queue is persistent: the alerts table is the source of truth. Alerts
+waiting for triage are stored with auto_triage=True and status 'new', and
+move to 'processing' while triaged. On startup the scheduler re-queues
+recent alerts still in either state, so alerts queued or in flight when the
+service stopped are not lost.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from netstacks_core.db import get_session, Alert as AlertModel
+
+from app.config import get_settings
+from .alert_dedup import SEVERITY_RANK, severity_rank
+from .alert_processor import process_alert_async
+from .rate_limiter import get_rate_limit_stats
+
+log = logging.getLogger(__name__)
+
+# Statuses in which a queued alert no longer needs triage
+SKIP_STATUSES = ("acknowledged", "resolved", "closed", "suppressed", "noise")
+
+# Statuses re-queued on startup
+PENDING_STATUSES = ("new", "processing")
+
+
+def severity_priority(severity: Optional[str]) -> int:
+    """Queue priority for a severity; lower value = triaged first.
+
+    Inverts alert_dedup.severity_rank so both modules order severities the
+    same way (unknown severities rank as "warning").
+    """
+    return SEVERITY_RANK["critical"] - severity_rank(severity)
+
+
+# Queue priority names, one per severity rank, used in stats
+PRIORITY_NAMES = {
+    severity_priority(name): name
+    for name in ("critical", "major", "warning", "info")
+}
+
+
+class TriageScheduler:
+    """Priority queue of alerts awaiting triage, drained by a worker pool."""
+
+    def __init__(self, concurrency: int = 4, resume_max_age_hours: float = 24):
+        self.concurrency = concurrency
+        self.resume_max_age_hours = resume_max_age_hours
+
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._queued: Set[str] = set()
+        self._active: Set[str] = set()
+        self._workers: List[asyncio.Task] = []
+        self._seq = itertools.count()
+
+        self._stats = {
+            "submitted": 0,
+            "resumed": 0,
+            "started": 0,
+            "completed": 0,
+            "failed": 0,
+            "skipped": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "run_seconds_total": 0.0,
+            "run_seconds_max": 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self):
+        """Start the worker pool and re-queue alerts left pending by a restart."""
+        if self.running:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"triage-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        try:
+            pending = await asyncio.to_thread(self._load_pending)
+        except Exception as e:
+            log.error(f"Could not resume pending triage queue: {e}")
+            pending = []
+        for alert_id, severity in pending:
+            if self._put(alert_id, severity):
+                self._stats["resumed"] += 1
+        log.info(
+            f"Triage scheduler started with {self.concurrency} workers, "
+            f"resumed {self._stats['resumed']} pending alerts"
+        )
+
+    async def stop(self):
+        """Stop the workers. Unfinished alerts are resumed on next start."""
+        for worker in self._workers:
+            worker.cancel()
+        for worker in self._workers:
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        self._workers = []
+        log.info(
+            f"Triage scheduler stopped with {len(self._queued)} queued "
+            f"and {len(self._active)} in-flight alerts"
+        )
+
+    def _load_pending(self) -> List[Tuple[str, str]]:
+        """Load alerts still waiting for (or interrupted during) triage."""
+        cutoff = datetime.utcnow() - timedelta(hours=self.resume_max_age_hours)
+        session = get_session()
+        try:
+            rows = session.query(AlertModel.alert_id, AlertModel.severity).filter(
+                AlertModel.status.in_(PENDING_STATUSES),
+                AlertModel.auto_triage == True,
+                AlertModel.created_at >= cutoff,
+            ).order_by(AlertModel.created_at).all()
+            return [(row.alert_id, row.severity) for row in rows]
+        finally:
+            session.close()
+
+    def _put(self, alert_id: str, severity: Optional[str], force: bool = False) -> bool:
+        if alert_id in self._queued or alert_id in self._active:
+            return False
+        priority = severity_priority(severity)
+        self._queue.put_nowait((priority, next(self._seq), time.monotonic(), alert_id, force))
+        self._queued.add(alert_id)
+        return True
+
+    def submit(self, alert_id: str, severity: Optional[str], force: bool = False) -> bool:
+        """
+        Queue an alert for triage.
+
+        force=True triages the alert regardless of its current status (used
+        for manual re-processing). Returns False if it is already queued.
+        """
+        if self._queue is None:
+            raise RuntimeError("Triage scheduler is not started")
+        queued = self._put(alert_id, severity, force)
+        if queued:
+            self._stats["submitted"] += 1
+        return queued
+
+    def submit_many(self, alerts: Iterable[Tuple[str, Optional[str]]]) -> int:
+        """Queue (alert_id, severity) pairs. Returns the number queued."""
+        return sum(1 for alert_id, severity in alerts if self.submit(alert_id, severity))
+
+    def _current_status(self, alert_id: str) -> Optional[str]:
+        session = get_session()
+        try:
+            row = session.query(AlertModel.status).filter(
+                AlertModel.alert_id == alert_id
+            ).first()
+            return row.status if row else None
+        finally:
+            session.close()
+
+    async def _worker(self):
+        while True:
+            _, _, enqueued_at, alert_id, force = await self._queue.get()
+            self._queued.discard(alert_id)
+            wait = time.monotonic() - enqueued_at
+            self._stats["wait_seconds_total"] += wait
+            self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], wait)
+            try:
+                await self._triage(alert_id, force)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f"AI processing failed for alert {alert_id}: {e}", exc_info=True)
+                self._stats["failed"] += 1
+            finally:
+                self._queue.task_done()
+
+    async def _triage(self, alert_id: str, force: bool):
+        """Run triage for one alert unless it no longer needs it."""
+        if not force:
+            status = await asyncio.to_thread(self._current_status, alert_id)
+            if status is None or status in SKIP_STATUSES:
+                log.info(f"Skipping triage for alert {alert_id} (status={status})")
+                self._stats["skipped"] += 1
+                return
+
+        self._active.add(alert_id)
+        self._stats["started"] += 1
+        started = time.monotonic()
+        try:
+            log.info(f"Starting AI triage for alert {alert_id}")
+            result = await process_alert_async(alert_id, skip_ai=False)
+            log.info(f"AI triage completed for alert {alert_id}: status={result.status}")
+            if result.status == "error":
+                self._stats["failed"] += 1
+            else:
+                self._stats["completed"] += 1
+        finally:
+            duration = time.monotonic() - started
+            self._stats["run_seconds_total"] += duration
+            self._stats["run_seconds_max"] = max(self._stats["run_seconds_max"], duration)
+            self._active.discard(alert_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth, worker utilisation and triage counters."""
+        depth_by_severity: Dict[str, int] = {}
+        if self._queue is not None:
+            for priority, *_ in list(self._queue._queue):
+                name = PRIORITY_NAMES.get(priority, "other")
+                depth_by_severity[name] = depth_by_severity.get(name, 0) + 1
+
+        stats = dict(self._stats)
+        started = stats["started"] + stats["skipped"]
+        finished = stats["completed"] + stats["failed"]
+        stats["avg_wait_seconds"] = round(stats["wait_seconds_total"] / started, 3) if started else None
+        stats["avg_run_seconds"] = round(stats["run_seconds_total"] / finished, 3) if finished else None
+        stats.update({
+            "running": self.running,
+            "concurrency": self.concurrency,
+            "active": len(self._active),
+            "queue_depth": len(self._queued),
+            "queue_depth_by_severity": depth_by_severity,
+            "provider_rate_limits": get_rate_limit_stats(),
+        })
+        return stats
+
+
+# Singleton instance
+_scheduler: Optional[TriageScheduler] = None
+
+
+def get_triage_scheduler() -> TriageScheduler:
+    """Get or create the triage scheduler singleton."""
+    global _scheduler
+    if _scheduler is None:
+        settings = get_settings()
+        _scheduler = TriageScheduler(
+            concurrency=settings.TRIAGE_CONCURRENCY,
+            resume_max_age_hours=settings.TRIAGE_RESUME_MAX_AGE_HOURS,
+        )
+    return _scheduler
@@ -13,7 +13,7 @@ from typing import Optional
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from netstacks_core.db import init_db, get_session, Setting
+from netstacks_core.db import init_db, get_session, dispose_async_engine, Setting
 
 from app.config import settings
 from app.routes import devices, credentials, overrides, netbox, backups
@@ -111,6 +111,7 @@ async def lifespan(app: FastAPI):
         except asyncio.CancelledError:
             pass
 
+    await dispose_async_engine()
     log.info(f"Shutting down {settings.service_name}")
 
 
@@ -10,10 +10,10 @@ from datetime import datetime, timedelta
 
 from fastapi import APIRouter, HTTPException, Query, Depends
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import delete, desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from netstacks_core.db import get_db, ConfigBackup, ConfigSnapshot, BackupSchedule
+from netstacks_core.db import get_async_db, ConfigBackup, ConfigSnapshot, BackupSchedule
 
 log = logging.getLogger(__name__)
 
@@ -80,18 +80,21 @@ class CleanupRequest(BaseModel):
     retention_days: Optional[int] = Field(default=None, ge=1, le=365)
 
 
-def get_backup_summary(db: Session) -> BackupSummary:
+async def get_backup_summary(db: AsyncSession) -> BackupSummary:
     """Get summary statistics for backups."""
-    total = db.query(func.count(ConfigBackup.backup_id)).scalar() or 0
-    devices = db.query(func.count(func.distinct(ConfigBackup.device_name))).scalar() or 0
-    last = db.query(func.max(ConfigBackup.created_at)).scalar()
-    size = db.query(func.sum(ConfigBackup.file_size)).scalar() or 0
+    result = await db.execute(select(
+        func.count(ConfigBackup.backup_id),
+        func.count(func.distinct(ConfigBackup.device_name)),
+        func.max(ConfigBackup.created_at),
+        func.sum(ConfigBackup.file_size),
+    ))
+    total, devices, last, size = result.one()
 
     return BackupSummary(
-        total_backups=total,
-        total_devices=devices,
+        total_backups=total or 0,
+        total_devices=devices or 0,
         last_backup=last,
-        total_size_bytes=size
+        total_size_bytes=size or 0
     )
 
 
@@ -100,16 +103,16 @@ async def list_config_backups(
     device: Optional[str] = Query(None, description="Filter by device name"),
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List config backups with optional filters."""
-    query = db.query(ConfigBackup).order_by(desc(ConfigBackup.created_at))
+    query = select(ConfigBackup).order_by(desc(ConfigBackup.created_at))
 
     if device:
-        query = query.filter(ConfigBackup.device_name == device)
+        query = query.where(ConfigBackup.device_name == device)
 
-    backups = query.offset(offset).limit(limit).all()
-    summary = get_backup_summary(db)
+    backups = (await db.execute(query.offset(offset).limit(limit))).scalars().all()
+    summary = await get_backup_summary(db)
 
     # Convert to response dicts (exclude config_content for list view)
     backup_list = []
@@ -148,12 +151,12 @@ async def list_config_backups(
 @router.get("/{backup_id}")
 async def get_config_backup(
     backup_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific backup by ID, including full config content."""
-    backup = db.query(ConfigBackup).filter(
-        ConfigBackup.backup_id == backup_id
-    ).first()
+    backup = (await db.execute(
+        select(ConfigBackup).where(ConfigBackup.backup_id == backup_id)
+    )).scalars().first()
 
     if not backup:
         raise HTTPException(status_code=404, detail=f"Backup not found: {backup_id}")
@@ -182,18 +185,18 @@ async def get_config_backup(
 @router.delete("/{backup_id}")
 async def delete_config_backup(
     backup_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a specific backup."""
-    backup = db.query(ConfigBackup).filter(
-        ConfigBackup.backup_id == backup_id
-    ).first()
+    backup = (await db.execute(
+        select(ConfigBackup).where(ConfigBackup.backup_id == backup_id)
+    )).scalars().first()
 
     if not backup:
         raise HTTPException(status_code=404, detail=f"Backup not found: {backup_id}")
 
-    db.delete(backup)
-    db.commit()
+    await db.delete(backup)
+    await db.commit()
 
     log.info(f"Config backup deleted: {backup_id}")
     return {"message": "Backup deleted", "backup_id": backup_id}
@@ -202,12 +205,15 @@ async def delete_config_backup(
 @router.get("/device/{device_name}/latest", response_model=BackupResponse)
 async def get_latest_device_backup(
     device_name: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get the latest backup for a specific device."""
-    backup = db.query(ConfigBackup).filter(
-        ConfigBackup.device_name == device_name
-    ).order_by(desc(ConfigBackup.created_at)).first()
+    backup = (await db.execute(
+        select(ConfigBackup)
+        .where(ConfigBackup.device_name == device_name)
+        .order_by(desc(ConfigBackup.created_at))
+        .limit(1)
+    )).scalars().first()
 
     if not backup:
         raise HTTPException(
@@ -237,12 +243,16 @@ async def get_latest_device_backup(
 schedule_router = APIRouter(prefix="/api/backup-schedule", tags=["backup-schedule"])
 
 
+async def _get_default_schedule(db: AsyncSession) -> Optional[BackupSchedule]:
+    return (await db.execute(
+        select(BackupSchedule).where(BackupSchedule.schedule_id == "default")
+    )).scalars().first()
+
+
 @schedule_router.get("", response_model=ScheduleResponse)
-async def get_backup_schedule(db: Session = Depends(get_db)):
+async def get_backup_schedule(db: AsyncSession = Depends(get_async_db)):
     """Get the backup schedule configuration."""
-    schedule = db.query(BackupSchedule).filter(
-        BackupSchedule.schedule_id == "default"
-    ).first()
+    schedule = await _get_default_schedule(db)
 
     if not schedule:
         # Return defaults
@@ -264,12 +274,10 @@ async def get_backup_schedule(db: Session = Depends(get_db)):
 @schedule_router.put("", response_model=ScheduleResponse)
 async def update_backup_schedule(
     request: ScheduleUpdateRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update the backup schedule configuration."""
-    schedule = db.query(BackupSchedule).filter(
-        BackupSchedule.schedule_id == "default"
-    ).first()
+    schedule = await _get_default_schedule(db)
 
     if not schedule:
         schedule = BackupSchedule(schedule_id="default")
@@ -289,8 +297,8 @@ async def update_backup_schedule(
     if schedule.enabled:
         schedule.next_run = datetime.utcnow() + timedelta(hours=schedule.interval_hours)
 
-    db.commit()
-    db.refresh(schedule)
+    await db.commit()
+    await db.refresh(schedule)
 
     log.info(f"Backup schedule updated: enabled={schedule.enabled}, interval={schedule.interval_hours}h")
 
@@ -310,7 +318,7 @@ async def update_backup_schedule(
 @router.post("/cleanup")
 async def cleanup_old_backups(
     request: CleanupRequest = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete backups older than retention period."""
     retention_days = None
@@ -319,18 +327,16 @@ async def cleanup_old_backups(
         retention_days = request.retention_days
     else:
         # Get from schedule
-        schedule = db.query(BackupSchedule).filter(
-            BackupSchedule.schedule_id == "default"
-        ).first()
+        schedule = await _get_default_schedule(db)
         retention_days = schedule.retention_days if schedule else 30
 
     cutoff_date = datetime.utcnow() - timedelta(days=retention_days)
 
-    result = db.query(ConfigBackup).filter(
-        ConfigBackup.created_at < cutoff_date
-    ).delete()
+    result = (await db.execute(
+        delete(ConfigBackup).where(ConfigBackup.created_at < cutoff_date)
+    )).rowcount
 
-    db.commit()
+    await db.commit()
 
     log.info(f"Cleaned up {result} old backups (older than {retention_days} days)")
 
@@ -4,13 +4,15 @@ Device Routes
 CRUD operations for devices (manual and synced).
 """
 
+import json
 import logging
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from netstacks_core.db import get_db
+from netstacks_core.db import get_db, get_session
 from netstacks_core.auth import get_current_user
 from netstacks_core.utils.responses import success_response, error_response
 
@@ -21,8 +23,10 @@ from app.schemas.devices import (
     DeviceListResponse,
     DeviceFilterRequest,
     DeviceCreateOrFilter,
+    ConnectionArgsBatchRequest,
 )
 from app.services.device_service import DeviceService
+from app.services.connection_args_service import ConnectionArgsService
 
 log = logging.getLogger(__name__)
 
@@ -157,6 +161,69 @@ async def sync_devices_from_netbox(
         return success_response(data=result)
 
 
+@router.post("/connection-args")
+async def get_connection_args_batch(
+    request: ConnectionArgsBatchRequest,
+    session: Session = Depends(get_db),
+    current_user = Depends(get_current_user),
+):
+    """
+    Resolve connection args (unmasked credentials) for many devices at once.
+
+    Device records, device overrides and default credentials are merged
+    server-side, replacing the per-device device/override/default-credential
+    round trips made by bulk operations. This endpoint is intended for
+    internal service-to-service communication.
+
+    - Pass `devices` to resolve specific names, or filter by source,
+      device_type or site
+    - Use `stream=true` to receive one JSON object per line (NDJSON), which
+      keeps memory flat for large device sets
+    """
+    filters = {
+        "device_names": request.devices,
+        "source": request.source,
+        "device_type": request.device_type,
+        "site": request.site,
+    }
+
+    if request.stream:
+        def generate():
+            # Own session: the request-scoped one is closed before streaming
+            stream_session = get_session()
+            try:
+                service = ConnectionArgsService(stream_session)
+                found = set()
+                for entry in service.iter_resolved(**filters):
+                    found.add(entry["device_name"])
+                    if entry["disabled"] and not request.include_disabled:
+                        continue
+                    yield json.dumps(entry, default=str) + "\n"
+                for name in request.devices or []:
+                    if name not in found:
+                        yield json.dumps({"device_name": name, "error": "not_found"}) + "\n"
+            finally:
+                stream_session.close()
+
+        return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+    service = ConnectionArgsService(session)
+    devices = []
+    found = set()
+    for entry in service.iter_resolved(**filters):
+        found.add(entry["device_name"])
+        if entry["disabled"] and not request.include_disabled:
+            continue
+        devices.append(entry)
+
+    missing = [name for name in request.devices or [] if name not in found]
+    return success_response(data={
+        "devices": devices,
+        "missing": missing,
+        "count": len(devices),
+    })
+
+
 @router.get("/{device_name}", response_model=DeviceResponse)
 async def get_device(
     device_name: str,
@@ -103,3 +103,18 @@ class DeviceCreateOrFilter(BaseModel):
     username: Optional[str] = Field(None, max_length=255)
     password: Optional[str] = Field(None, max_length=255)
     enable_password: Optional[str] = Field(None, max_length=255)
+
+
+class ConnectionArgsBatchRequest(BaseModel):
+    """
+    Request body for batch connection-args resolution.
+
+    Either list device names explicitly or select devices with the
+    source/device_type/site filters (omit everything to resolve all devices).
+    """
+    devices: Optional[List[str]] = Field(None, description="Device names to resolve")
+    source: Optional[str] = Field(None, description="Filter by source (manual, netbox)")
+    device_type: Optional[str] = Field(None, description="Filter by device type")
+    site: Optional[str] = Field(None, description="Filter by site")
+    include_disabled: bool = Field(default=True, description="Include devices whose override disables them")
+    stream: bool = Field(default=False, description="Stream results as NDJSON")
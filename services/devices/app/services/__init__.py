@@ -3,10 +3,12 @@ from app.services.device_service import DeviceService
 from app.services.credential_service import CredentialService
 from app.services.override_service import OverrideService
 from app.services.netbox_service import NetBoxService
+from app.services.connection_args_service import ConnectionArgsService
 
 __all__ = [
     'DeviceService',
     'CredentialService',
     'OverrideService',
     'NetBoxService',
+    'ConnectionArgsService',
 ]
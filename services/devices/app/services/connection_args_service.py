@@ -0,0 +1,152 @@
+"""
+Connection Args Service
+
+Resolves fully-merged Netmiko connection args for many devices at once.
+"""
+
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+from netstacks_core.db import Device, DeviceOverride, DefaultCredential, Setting
+
+from app.services.device_service import DeviceService
+
+log = logging.getLogger(__name__)
+
+# Settings keys holding global connection defaults (managed by the auth service)
+DEFAULT_SETTING_KEYS = [
+    'default_username',
+    'default_password',
+    'default_timeout',
+    'default_conn_timeout',
+    'default_auth_timeout',
+    'default_banner_timeout',
+]
+
+TIMEOUT_DEFAULTS = {
+    'timeout': 30,
+    'conn_timeout': 10,
+    'auth_timeout': 10,
+    'banner_timeout': 15,
+}
+
+
+class ConnectionArgsService:
+    """Service for resolving device connection args in bulk."""
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.device_service = DeviceService(session)
+
+    def get_defaults(self) -> Dict[str, Any]:
+        """
+        Get global connection defaults.
+
+        Username and password come from the default_* settings, falling back
+        to the DefaultCredential marked as default when no username is set.
+        """
+        rows = self.session.query(Setting).filter(
+            Setting.key.in_(DEFAULT_SETTING_KEYS)
+        ).all()
+        values = {row.key: row.value for row in rows}
+
+        defaults = {
+            'username': values.get('default_username') or '',
+            'password': values.get('default_password') or '',
+            'secret': None,
+        }
+        for name, fallback in TIMEOUT_DEFAULTS.items():
+            value = values.get(f'default_{name}')
+            try:
+                defaults[name] = int(value) if value else fallback
+            except ValueError:
+                defaults[name] = fallback
+
+        if not defaults['username']:
+            credential = self.session.query(DefaultCredential).filter(
+                DefaultCredential.is_default == True
+            ).first()
+            if credential:
+                defaults['username'] = credential.username
+                defaults['password'] = credential.password
+                defaults['secret'] = credential.enable_password
+
+        return defaults
+
+    def iter_resolved(
+        self,
+        device_names: Optional[List[str]] = None,
+        source: Optional[str] = None,
+        device_type: Optional[str] = None,
+        site: Optional[str] = None,
+        batch_size: int = 500,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield resolved connection info for each matching device.
+
+        Devices and their overrides are loaded with a single outer join and
+        streamed from the database in batches of batch_size rows.
+
+        Precedence for each field: device override, then the device record
+        (type, host, port), then global defaults. Username and password come
+        from the override only if it sets a username, otherwise both come
+        from the defaults.
+        """
+        defaults = self.get_defaults()
+
+        query = self.session.query(Device, DeviceOverride).outerjoin(
+            DeviceOverride, DeviceOverride.device_name == Device.name
+        )
+        if device_names is not None:
+            query = query.filter(Device.name.in_(device_names))
+        if source:
+            query = query.filter(Device.source == source)
+        if device_type:
+            query = query.filter(Device.device_type == device_type)
+        if site:
+            query = query.filter(Device.site == site)
+
+        for device, override in query.order_by(Device.name).yield_per(batch_size):
+            yield self._resolve(device, override, defaults)
+
+    def _resolve(
+        self,
+        device: Device,
+        override: Optional[DeviceOverride],
+        defaults: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Merge device, override and defaults into connection args."""
+        o = override or DeviceOverride()
+
+        # Credentials are chosen as a pair: an override username is never
+        # combined with the default password (or vice versa)
+        if o.username:
+            username, password = o.username, o.password or ''
+        else:
+            username, password = defaults['username'], defaults['password']
+
+        connection_args = {
+            'device_type': o.device_type or device.device_type or 'cisco_ios',
+            'host': o.host or device.host,
+            'port': o.port or device.port or 22,
+            'username': username,
+            'password': password,
+            # Disable SSH keys/agent to force password/keyboard-interactive auth
+            'use_keys': False,
+            'allow_agent': False,
+        }
+        for name in TIMEOUT_DEFAULTS:
+            connection_args[name] = getattr(o, name) or defaults[name]
+
+        secret = o.secret or defaults['secret']
+        if secret:
+            connection_args['secret'] = secret
+
+        return {
+            'device_name': device.name,
+            'device': self.device_service._to_dict(device),
+            'connection_args': connection_args,
+            'disabled': bool(o.disabled),
+        }
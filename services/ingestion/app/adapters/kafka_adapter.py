@@ -1,13 +1,30 @@
-"""Kafka consumer adapter for ingesting alerts from Kafka topics."""
+"""Kafka consumer adapter for ingesting alerts from Kafka topics.
+
+In batch mode (the default) records are fetched with getmany(), each
+partition's records are forwarded concurrently with the other partitions but
+in offset order within the partition, and offsets are committed manually
+only once the records have been accepted by the alerts API. If the API is
+unavailable, the partition is rewound to the first undelivered record so it
+is retried (at-least-once delivery). Records the API rejects are counted and
+committed past, so a poison record cannot block its partition.
+"""
 import asyncio
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
+from ..config import settings
 from .base import BaseAdapter, DatabusSourceConfig
 
 logger = logging.getLogger(__name__)
 
 
+def _as_bool(value: Any) -> bool:
+    """Parse a boolean connection option that may arrive as a string."""
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    return bool(value)
+
+
 class KafkaAdapter(BaseAdapter):
     """Kafka consumer adapter."""
 
@@ -15,6 +32,17 @@ class KafkaAdapter(BaseAdapter):
         super().__init__(config, api_url)
         self._consumer = None
 
+        conn_config = config.connection_config or {}
+        self.batch_mode = _as_bool(conn_config.get("batch_mode", settings.kafka_batch_mode))
+        self.max_batch = int(conn_config.get("max_batch", settings.kafka_max_batch))
+        self.batch_timeout_ms = int(conn_config.get("batch_timeout_ms", settings.kafka_batch_timeout_ms))
+
+        self.commit_count = 0
+        self.redelivery_count = 0
+        self.rejected_count = 0
+        # Last committed offset per partition number
+        self._committed: Dict[int, int] = {}
+
     async def connect(self) -> bool:
         """Connect to Kafka."""
         try:
@@ -30,7 +58,8 @@ class KafkaAdapter(BaseAdapter):
                 bootstrap_servers=",".join(brokers),
                 group_id=self.config.consumer_group or f"netstacks-{self.config.source_id}",
                 auto_offset_reset=conn_config.get("auto_offset_reset", "latest"),
-                enable_auto_commit=conn_config.get("enable_auto_commit", True),
+                # Batch mode commits manually after delivery
+                enable_auto_commit=False if self.batch_mode else conn_config.get("enable_auto_commit", True),
                 # Security settings if provided
                 security_protocol=conn_config.get("security_protocol", "PLAINTEXT"),
                 sasl_mechanism=conn_config.get("sasl_mechanism"),
@@ -64,6 +93,10 @@ class KafkaAdapter(BaseAdapter):
         if not self._consumer:
             raise RuntimeError("Not connected to Kafka")
 
+        if self.batch_mode:
+            await self._consume_batches()
+            return
+
         async for message in self._consumer:
             if not self._running:
                 break
@@ -72,21 +105,101 @@ class KafkaAdapter(BaseAdapter):
                 logger.debug(f"Received Kafka message: topic={message.topic}, "
                            f"partition={message.partition}, offset={message.offset}")
 
-                # Transform message to alert
-                alert_payload = self.transform_message(message.value)
-
-                # Add Kafka-specific metadata
-                alert_payload["raw_data"]["kafka_metadata"] = {
-                    "topic": message.topic,
-                    "partition": message.partition,
-                    "offset": message.offset,
-                    "timestamp": message.timestamp,
-                    "key": message.key.decode() if message.key else None
-                }
-
                 # Send to alerts API
-                await self.send_alert(alert_payload)
+                await self.send_alert(self._to_alert(message))
 
             except Exception as e:
                 logger.error(f"Error processing Kafka message: {e}", exc_info=True)
                 self.error_count += 1
+
+    def _to_alert(self, message) -> Dict[str, Any]:
+        """Transform a Kafka record into an alert payload."""
+        alert_payload = self.transform_message(message.value)
+
+        # Add Kafka-specific metadata
+        alert_payload["raw_data"]["kafka_metadata"] = {
+            "topic": message.topic,
+            "partition": message.partition,
+            "offset": message.offset,
+            "timestamp": message.timestamp,
+            "key": message.key.decode() if message.key else None
+        }
+        return alert_payload
+
+    async def _consume_batches(self):
+        """getmany() loop: forward partitions concurrently, then commit."""
+        while self._running:
+            batches = await self._consumer.getmany(
+                timeout_ms=self.batch_timeout_ms,
+                max_records=self.max_batch,
+            )
+            if not batches:
+                continue
+
+            offsets = await asyncio.gather(*(
+                self._forward_partition(tp, records) for tp, records in batches.items()
+            ))
+            commit = {tp: offset for tp, offset in zip(batches, offsets) if offset is not None}
+            if commit:
+                await self._consumer.commit(commit)
+                self.commit_count += 1
+                for tp, offset in commit.items():
+                    self._committed[tp.partition] = offset
+
+    async def _forward_partition(self, tp, records: List[Any]) -> Optional[int]:
+        """Forward one partition's records in offset order.
+
+        Returns the offset to commit: past the last record if everything was
+        delivered or rejected, otherwise the first record that could not be
+        delivered because the API was unavailable, to which the partition is
+        rewound. Records that cannot be transformed or that the API rejected
+        are skipped.
+        """
+        deliveries = []
+        for message in records:
+            logger.debug(f"Received Kafka message: topic={message.topic}, "
+                         f"partition={message.partition}, offset={message.offset}")
+            try:
+                alert_payload = self._to_alert(message)
+            except Exception as e:
+                logger.error(f"Error processing Kafka message at offset {message.offset}: {e}", exc_info=True)
+                self.error_count += 1
+                continue
+            deliveries.append((message.offset, await self.send_alert(alert_payload)))
+
+        results = await asyncio.gather(*(delivery for _, delivery in deliveries))
+        for (offset, _), delivered in zip(deliveries, results):
+            if delivered is False:
+                # Rejected by the API; redelivering would fail the same way
+                self.rejected_count += 1
+                logger.warning(f"Alerts API rejected {tp.topic}[{tp.partition}] offset {offset}, skipping")
+                continue
+            if delivered is None:
+                logger.warning(f"Forwarding failed at {tp.topic}[{tp.partition}] offset {offset}, rewinding")
+                self._consumer.seek(tp, offset)
+                self.redelivery_count += 1
+                return offset if offset > records[0].offset else None
+        return records[-1].offset + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get adapter statistics, including per-partition consumer lag."""
+        stats = super().get_stats()
+        stats.update({
+            "batch_mode": self.batch_mode,
+            "commit_count": self.commit_count,
+            "redelivery_count": self.redelivery_count,
+            "rejected_count": self.rejected_count,
+        })
+        if self.batch_mode and self._consumer is not None:
+            partitions = {}
+            for tp in sorted(self._consumer.assignment(), key=lambda tp: tp.partition):
+                highwater = self._consumer.highwater(tp)
+                committed = self._committed.get(tp.partition)
+                partitions[str(tp.partition)] = {
+                    "committed": committed,
+                    "highwater": highwater,
+                    "lag": highwater - committed if highwater is not None and committed is not None else None,
+                }
+            stats["partitions"] = partitions
+            stats["total_lag"] = sum(p["lag"] for p in partitions.values() if p["lag"] is not None)
+        return stats
@@ -1,12 +1,31 @@
-"""Redis Streams consumer adapter for ingesting alerts."""
+"""Redis Streams consumer adapter for ingesting alerts.
+
+Each ingestion replica joins the source's consumer group under its own
+consumer name, so several replicas can share a stream. Entries are read in
+batches, forwarded through the shared alert forwarder and acknowledged with
+pipelined XACKs only once their batch has been accepted by the alerts API
+(at-least-once delivery). Entries left pending by a crashed or stopped
+replica, or that could not be forwarded because the API was unavailable, are
+reclaimed with XAUTOCLAIM once they have been idle for claim_idle_ms.
+Entries the API rejects are acknowledged and counted, since they would be
+rejected again on every redelivery.
+"""
 import asyncio
 import logging
-from typing import Optional, Dict, Any, List
+import socket
+from typing import Optional, Dict, Any, List, Tuple
 
+from ..config import settings
+from ..transforms import json_loads
 from .base import BaseAdapter, DatabusSourceConfig
 
 logger = logging.getLogger(__name__)
 
+# Message IDs per XACK command when acknowledging a batch
+ACK_CHUNK_SIZE = 1000
+
+StreamEntry = Tuple[Optional[str], Optional[Dict[str, Any]]]
+
 
 class RedisStreamsAdapter(BaseAdapter):
     """Redis Streams consumer adapter."""
@@ -14,7 +33,22 @@ class RedisStreamsAdapter(BaseAdapter):
     def __init__(self, config: DatabusSourceConfig, api_url: str):
         super().__init__(config, api_url)
         self._redis = None
-        self._last_id = ">"  # Only new messages
+
+        conn_config = config.connection_config or {}
+        instance_id = settings.instance_id or socket.gethostname()
+        self.group_name = config.consumer_group or f"netstacks-{config.source_id}"
+        self.consumer_name = conn_config.get("consumer_name") or f"ingestion-{config.source_id}-{instance_id}"
+        self.batch_size = int(conn_config.get("batch_size", settings.redis_batch_size))
+        self.block_ms = int(conn_config.get("block_ms", settings.redis_block_ms))
+        self.claim_idle_ms = int(conn_config.get("claim_idle_ms", settings.redis_claim_idle_ms))
+        self.claim_interval = float(conn_config.get("claim_interval", settings.redis_claim_interval))
+
+        self.ack_count = 0
+        self.claimed_count = 0
+        self.unacked_count = 0
+        self.rejected_count = 0
+        self._claim_cursor = "0-0"
+        self._recovered = False
 
     async def connect(self) -> bool:
         """Connect to Redis."""
@@ -35,23 +69,25 @@ class RedisStreamsAdapter(BaseAdapter):
             await self._redis.ping()
 
             # Create consumer group if it doesn't exist
-            group_name = self.config.consumer_group or f"netstacks-{self.config.source_id}"
             stream_name = self.config.topic_or_stream
 
             try:
                 await self._redis.xgroup_create(
                     stream_name,
-                    group_name,
+                    self.group_name,
                     id="0",
                     mkstream=True
                 )
-                logger.info(f"Created consumer group: {group_name}")
+                logger.info(f"Created consumer group: {self.group_name}")
             except Exception as e:
                 # Group already exists
                 if "BUSYGROUP" not in str(e):
                     raise
 
-            logger.info(f"Connected to Redis Streams: {url}, stream: {stream_name}")
+            logger.info(
+                f"Connected to Redis Streams: {url}, stream: {stream_name}, "
+                f"group: {self.group_name}, consumer: {self.consumer_name}"
+            )
             return True
 
         except ImportError:
@@ -77,72 +113,170 @@ class RedisStreamsAdapter(BaseAdapter):
             raise RuntimeError("Not connected to Redis")
 
         stream_name = self.config.topic_or_stream
-        group_name = self.config.consumer_group or f"netstacks-{self.config.source_id}"
-        consumer_name = f"ingestion-{self.config.source_id}"
+        loop = asyncio.get_running_loop()
+        next_claim = loop.time()
+
+        # Entries this consumer read but never acknowledged before a restart
+        if not self._recovered:
+            await self._recover_own_pending()
+            self._recovered = True
 
         while self._running:
             try:
-                # Read from stream using consumer group
+                if loop.time() >= next_claim:
+                    await self._claim_idle_pending()
+                    next_claim = loop.time() + self.claim_interval
+
+                # Read new entries using the consumer group
                 messages = await self._redis.xreadgroup(
-                    groupname=group_name,
-                    consumername=consumer_name,
+                    groupname=self.group_name,
+                    consumername=self.consumer_name,
                     streams={stream_name: ">"},
-                    count=10,
-                    block=5000  # Block for 5 seconds
+                    count=self.batch_size,
+                    block=self.block_ms
                 )
 
-                if not messages:
-                    continue
+                for _, entries in messages or []:
+                    await self._process_entries(entries)
 
-                for stream, stream_messages in messages:
-                    for message_id, data in stream_messages:
-                        if not self._running:
-                            break
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error reading from Redis stream: {e}", exc_info=True)
+                self.error_count += 1
+                await asyncio.sleep(5)  # Wait before retrying
+
+    async def _recover_own_pending(self):
+        """Re-process entries pending for this consumer name (e.g. after a restart)."""
+        start_id = "0"
+        while self._running:
+            messages = await self._redis.xreadgroup(
+                groupname=self.group_name,
+                consumername=self.consumer_name,
+                streams={self.config.topic_or_stream: start_id},
+                count=self.batch_size,
+            )
+            entries = messages[0][1] if messages else []
+            if not entries:
+                break
+            logger.info(f"Recovering {len(entries)} pending entries for {self.consumer_name}")
+            await self._process_entries(entries)
+            start_id = entries[-1][0]
 
-                        try:
-                            logger.debug(f"Received Redis message: stream={stream}, id={message_id}")
+    async def _claim_idle_pending(self):
+        """Take over entries left pending by any consumer for longer than claim_idle_ms."""
+        while self._running:
+            result = await self._redis.xautoclaim(
+                self.config.topic_or_stream,
+                self.group_name,
+                self.consumer_name,
+                min_idle_time=self.claim_idle_ms,
+                start_id=self._claim_cursor,
+                count=self.batch_size,
+            )
+            self._claim_cursor, entries = result[0], result[1]
+            if entries:
+                self.claimed_count += len(entries)
+                logger.info(f"Claimed {len(entries)} idle pending entries from {self.config.topic_or_stream}")
+                await self._process_entries(entries)
+            if self._claim_cursor in ("0-0", b"0-0"):
+                break
 
-                            # Transform message to alert
-                            # Redis stream data is already a dict
-                            alert_payload = self.transform_message(data)
+    async def _process_entries(self, entries: List[StreamEntry]):
+        """Forward a batch of stream entries and acknowledge the delivered ones.
 
-                            # Add Redis-specific metadata
-                            alert_payload["raw_data"]["redis_metadata"] = {
-                                "stream": stream,
-                                "message_id": message_id,
-                            }
+        Entries that could not be forwarded because the API was unavailable
+        stay pending and are retried through XAUTOCLAIM. Entries that cannot
+        be transformed or that the API rejected are acknowledged, since
+        redelivering them would fail the same way.
+        """
+        stream_name = self.config.topic_or_stream
+        ack_ids: List[str] = []
+        deliveries: List[Tuple[str, asyncio.Future]] = []
 
-                            # Send to alerts API
-                            await self.send_alert(alert_payload)
+        for message_id, data in entries:
+            if data is None:
+                # Entry was trimmed from the stream while pending
+                if message_id is not None:
+                    ack_ids.append(message_id)
+                continue
 
-                            # Acknowledge message
-                            await self._redis.xack(stream_name, group_name, message_id)
+            try:
+                logger.debug(f"Received Redis message: stream={stream_name}, id={message_id}")
 
-                        except Exception as e:
-                            logger.error(f"Error processing Redis message {message_id}: {e}", exc_info=True)
-                            self.error_count += 1
+                # Transform message to alert
+                # Redis stream data is already a dict
+                alert_payload = self.transform_message(data)
 
-            except asyncio.CancelledError:
-                break
+                # Add Redis-specific metadata
+                alert_payload["raw_data"]["redis_metadata"] = {
+                    "stream": stream_name,
+                    "message_id": message_id,
+                    "consumer": self.consumer_name,
+                }
             except Exception as e:
-                logger.error(f"Error reading from Redis stream: {e}", exc_info=True)
+                logger.error(f"Error processing Redis message {message_id}: {e}", exc_info=True)
                 self.error_count += 1
-                await asyncio.sleep(5)  # Wait before retrying
+                ack_ids.append(message_id)
+                continue
+
+            # Queue for the alerts API
+            deliveries.append((message_id, await self.send_alert(alert_payload)))
+
+        if deliveries:
+            results = await asyncio.gather(*(delivery for _, delivery in deliveries))
+            for (message_id, _), delivered in zip(deliveries, results):
+                if delivered is None:
+                    self.unacked_count += 1
+                    continue
+                if delivered is False:
+                    self.rejected_count += 1
+                    logger.warning(f"Alerts API rejected Redis message {message_id}, acknowledging")
+                ack_ids.append(message_id)
+
+        await self._ack(ack_ids)
+
+    async def _ack(self, message_ids: List[str]):
+        """Acknowledge message IDs with pipelined multi-ID XACKs."""
+        if not message_ids:
+            return
+        stream_name = self.config.topic_or_stream
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for i in range(0, len(message_ids), ACK_CHUNK_SIZE):
+                pipe.xack(stream_name, self.group_name, *message_ids[i:i + ACK_CHUNK_SIZE])
+            results = await pipe.execute()
+        self.ack_count += sum(int(n) for n in results)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get adapter statistics, including consumer group state."""
+        stats = super().get_stats()
+        stats.update({
+            "consumer_group": self.group_name,
+            "consumer_name": self.consumer_name,
+            "batch_size": self.batch_size,
+            "ack_count": self.ack_count,
+            "claimed_count": self.claimed_count,
+            "unacked_count": self.unacked_count,
+            "rejected_count": self.rejected_count,
+        })
+        return stats
 
     def transform_message(self, raw_message: Any) -> Dict[str, Any]:
         """Transform Redis stream message (already a dict) to alert payload."""
         # Redis stream messages are already dicts
         if isinstance(raw_message, dict):
-            # Check if it looks like a JSON string in a field
             if "data" in raw_message:
-                import json
+                # Syslog/CEF/raw sources carry the message text in "data"
+                if self.config.transform_type != "json":
+                    return self._transform(raw_message["data"])
+
+                # Check if it looks like a JSON string in a field
                 try:
-                    parsed = json.loads(raw_message["data"])
-                    return super()._transform_json(parsed)
-                except (json.JSONDecodeError, TypeError):
+                    return self._transform_json(json_loads(raw_message["data"]))
+                except (ValueError, TypeError):
                     pass
 
             # Use the dict directly
-            return super()._transform_json(raw_message)
+            return self._transform_json(raw_message)
 
         return super().transform_message(raw_message)
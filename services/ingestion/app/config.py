@@ -13,9 +13,71 @@ class Settings(BaseSettings):
     snmp_trap_address: str = "0.0.0.0"
     snmp_community_strings: str = "public,private"
 
+    # Number of trap receiver processes sharing the port via SO_REUSEPORT.
+    # 1 keeps the single-process pysnmp engine receiver.
+    snmp_workers: int = 1
+    snmp_worker_batch_size: int = 100  # alerts per hand-off to the main process
+    snmp_worker_flush_interval: float = 0.05  # seconds
+    snmp_worker_queue_size: int = 1000  # batches buffered between workers and main process
+    snmp_worker_rcvbuf: int = 4 * 1024 * 1024  # per-worker socket receive buffer (bytes)
+
+    # Syslog receiver settings (UDP and TCP; set a port to 0 to disable it)
+    syslog_enabled: bool = False
+    syslog_address: str = "0.0.0.0"
+    syslog_udp_port: int = 514
+    syslog_tcp_port: int = 514
+    syslog_batch_size: int = 500  # messages parsed per batch
+    syslog_flush_interval: float = 0.05  # seconds
+    syslog_max_message_size: int = 8192  # bytes, TCP framing limit
+    syslog_rcvbuf: int = 4 * 1024 * 1024  # UDP socket receive buffer (bytes)
+    syslog_max_senders: int = 10000  # senders tracked for per-sender rates
+
+    # Per-device rate limits (events/sec, 0 = unlimited; burst 0 = one second's worth).
+    # Databus sources set theirs in connection_config["rate_limit"].
+    snmp_agent_rate_limit: float = 0
+    snmp_agent_rate_burst: float = 0
+    syslog_sender_rate_limit: float = 0
+    syslog_sender_rate_burst: float = 0
+    # Adaptive sampling over the limit: keep the first N events, then 1 in K
+    rate_limit_sample_first: int = 10
+    rate_limit_sample_every: int = 100
+    rate_limit_max_keys: int = 10000  # devices tracked per limiter
+
     # NetStacks API endpoint for sending alerts
     netstacks_api_url: str = "http://ai:8000"
 
+    # Alert forwarding pipeline (batched POSTs to /api/alerts/bulk)
+    forward_queue_size: int = 10000
+    forward_batch_size: int = 200
+    forward_flush_interval: float = 0.05  # seconds to wait for a batch to fill
+    forward_concurrency: int = 2  # concurrent in-flight batches
+    forward_max_retries: int = 3
+    forward_timeout: float = 10.0
+    forward_max_connections: int = 20
+
+    # Disk spool for alerts while the NetStacks API is unavailable
+    spool_enabled: bool = True
+    spool_dir: str = "/var/spool/netstacks-ingestion"
+    spool_segment_size: int = 16 * 1024 * 1024  # bytes per segment file
+    spool_max_bytes: int = 1024 * 1024 * 1024  # oldest segments are dropped beyond this
+    spool_replay_interval: float = 5.0  # seconds between retries while the API is down
+
+    # Identity of this ingestion replica, used for per-replica databus
+    # consumer names. Defaults to the hostname.
+    instance_id: Optional[str] = None
+
+    # Redis Streams consumer defaults (overridable per source in connection_config)
+    redis_batch_size: int = 500  # entries per XREADGROUP
+    redis_block_ms: int = 2000
+    redis_claim_idle_ms: int = 60000  # reclaim pending entries idle this long
+    redis_claim_interval: float = 30.0  # seconds between XAUTOCLAIM sweeps
+
+    # Kafka consumer defaults (overridable per source in connection_config).
+    # Batch mode uses getmany() with manual commits after delivery.
+    kafka_batch_mode: bool = True
+    kafka_max_batch: int = 500  # records per getmany()
+    kafka_batch_timeout_ms: int = 1000
+
     # Default alert settings
     default_severity: str = "warning"
 
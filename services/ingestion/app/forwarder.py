@@ -0,0 +1,458 @@
+"""Shared alert forwarding pipeline.
+
+All alert sources (SNMP traps, databus adapters) hand their alert payloads to
+a single AlertForwarder. The forwarder keeps one pooled keep-alive HTTP
+client, buffers alerts in a bounded asyncio queue and micro-batches them into
+POST /api/alerts/bulk on the NetStacks API.
+
+When the queue is full, submit() waits (backpressure on the databus
+consumers) while submit_nowait() drops the alert and counts it, which is the
+right behaviour for UDP sources like SNMP traps that cannot be paused.
+
+With a DiskSpool configured, batches that cannot be delivered because the
+API is down or failing (connection errors, 5xx, 429 after retries) are
+written to the spool, and so is every later batch until the spool has been
+replayed, so nothing overtakes spooled alerts. A replay task retries the oldest
+spooled batch and drains the spool in batch_size chunks once the API
+accepts it again. Spooled alerts count as delivered. Spool I/O (segment
+writes and flushes, cursor updates) runs on one dedicated thread so it never
+blocks the event loop; running every spool call on that thread also keeps
+them serialized, since DiskSpool is not thread-safe.
+
+Delivery futures resolve to True (accepted or spooled), False (rejected by
+the API; resending will not help) or None (API unavailable and not
+spooled), so consumers can redeliver only what may still succeed. On a 207
+partial response only the alerts listed in its errors resolve to False.
+"""
+import asyncio
+import functools
+import logging
+import time
+import httpx
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from netstacks_core.metrics import Histogram
+
+from .config import settings
+from .metrics import RateMeter, LATENCY_BUCKETS, BATCH_SIZE_BUCKETS
+from .spool import DiskSpool
+
+logger = logging.getLogger(__name__)
+
+# Queue item: (payload, enqueued_at, delivery future)
+QueueItem = Tuple[Dict[str, Any], float, asyncio.Future]
+
+
+class AlertForwarder:
+    """Batches alert payloads and forwards them to the alerts bulk endpoint."""
+
+    def __init__(
+        self,
+        api_url: str,
+        queue_size: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 0.05,
+        concurrency: int = 2,
+        max_retries: int = 3,
+        timeout: float = 10.0,
+        max_connections: int = 20,
+        spool: Optional[DiskSpool] = None,
+        replay_interval: float = 5.0,
+    ):
+        self.api_url = api_url
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.spool = spool
+        self.replay_interval = replay_interval
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._workers: List[asyncio.Task] = []
+        self._replay_task: Optional[asyncio.Task] = None
+        self._spool_executor: Optional[ThreadPoolExecutor] = None
+        # Spool appends submitted but not finished yet
+        self._spool_writes = 0
+        self._running = False
+        self.downstream_healthy = True
+
+        self.enqueued_count = 0
+        self.forwarded_count = 0
+        self.failed_count = 0
+        self.dropped_count = 0
+        self.batch_count = 0
+        self.retry_count = 0
+        self.replayed_count = 0
+        self.replay_rate = RateMeter()
+
+        self.batch_size_histogram = Histogram(BATCH_SIZE_BUCKETS)
+        self.latency_histogram = Histogram(LATENCY_BUCKETS)
+        self.request_histogram = Histogram(LATENCY_BUCKETS)
+
+    @property
+    def bulk_url(self) -> str:
+        return f"{self.api_url}/api/alerts/bulk"
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def start(self):
+        """Create the HTTP client and start the batch sender tasks."""
+        if self._running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        if self.spool is not None:
+            self._spool_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alert-spool")
+            try:
+                await self._spool_call(self.spool.open)
+            except OSError as e:
+                logger.error(f"Could not open alert spool {self.spool.directory}, spooling disabled: {e}")
+                self.spool = None
+                self._spool_executor.shutdown(wait=False)
+                self._spool_executor = None
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(self.timeout, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+        )
+        self._running = True
+        self._workers = [
+            asyncio.create_task(self._run(), name=f"alert-forwarder-{i}")
+            for i in range(self.concurrency)
+        ]
+        if self.spool is not None:
+            self._replay_task = asyncio.create_task(self._replay(), name="alert-spool-replay")
+        logger.info(
+            f"Alert forwarder started: {self.bulk_url} "
+            f"(queue={self.queue_size}, batch={self.batch_size}, "
+            f"flush={self.flush_interval}s, senders={self.concurrency})"
+        )
+
+    async def stop(self, drain_timeout: float = 10.0):
+        """Flush queued alerts (up to drain_timeout) and stop the senders."""
+        if not self._running:
+            return
+
+        if self._queue is not None:
+            # join() also waits for batches already taken off the queue and
+            # still in flight; it returns at once when nothing is outstanding
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"Alert forwarder stopped with {self._queue.qsize()} alerts still queued"
+                )
+
+        self._running = False
+        tasks = self._workers + ([self._replay_task] if self._replay_task else [])
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._workers = []
+        self._replay_task = None
+
+        if self.spool is not None:
+            await self._spool_call(self.spool.close)
+            self._spool_executor.shutdown(wait=False)
+            self._spool_executor = None
+
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+        logger.info(
+            f"Alert forwarder stopped. Forwarded {self.forwarded_count} alerts in "
+            f"{self.batch_count} batches, {self.failed_count} failed, {self.dropped_count} dropped"
+        )
+
+    def _new_item(self, alert_payload: Dict[str, Any]) -> QueueItem:
+        future = asyncio.get_running_loop().create_future()
+        return (alert_payload, time.monotonic(), future)
+
+    async def submit(self, alert_payload: Dict[str, Any]) -> asyncio.Future:
+        """Queue an alert, waiting while the queue is full.
+
+        Returns a future that resolves to True once the alert's batch has been
+        accepted by the API (or written to the spool), or False if it could
+        not be delivered.
+        """
+        if self._queue is None:
+            raise RuntimeError("Alert forwarder is not started")
+        item = self._new_item(alert_payload)
+        await self._queue.put(item)
+        self.enqueued_count += 1
+        return item[2]
+
+    def submit_nowait(self, alert_payload: Dict[str, Any]) -> Optional[asyncio.Future]:
+        """Queue an alert without waiting. Returns None if it was dropped."""
+        if self._queue is None:
+            self.dropped_count += 1
+            return None
+        item = self._new_item(alert_payload)
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.dropped_count += 1
+            return None
+        self.enqueued_count += 1
+        return item[2]
+
+    async def _collect_batch(self) -> List[QueueItem]:
+        """Wait for one alert, then gather more until batch_size or flush_interval."""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _post_batch(self, payloads: List[Dict[str, Any]],
+                          max_retries: Optional[int] = None) -> Optional[List[bool]]:
+        """POST a batch, retrying transient failures with exponential backoff.
+
+        Returns one flag per payload, True if accepted and False if rejected
+        by the API (client error, or listed in a 207's errors), or None if
+        the API was unavailable.
+        """
+        if max_retries is None:
+            max_retries = self.max_retries
+        for attempt in range(max_retries + 1):
+            if attempt:
+                self.retry_count += 1
+                await asyncio.sleep(min(0.5 * (2 ** (attempt - 1)), 5.0))
+
+            started = time.monotonic()
+            try:
+                response = await self._client.post(self.bulk_url, json=payloads)
+            except httpx.HTTPError as e:
+                logger.warning(f"Error forwarding {len(payloads)} alerts: {e}")
+                continue
+            finally:
+                self.request_histogram.observe(time.monotonic() - started)
+
+            if response.status_code in (200, 201):
+                return [True] * len(payloads)
+            if response.status_code == 207:
+                # Valid alerts were stored; the invalid ones will never be accepted
+                accepted = self._partial_results(response, len(payloads))
+                logger.error(
+                    f"Alerts API rejected {accepted.count(False)} of {len(payloads)} alerts in batch"
+                )
+                return accepted
+            if response.status_code < 500 and response.status_code != 429:
+                # Client error - retrying the same batch will not help
+                logger.error(
+                    f"Alerts API rejected batch of {len(payloads)}: "
+                    f"{response.status_code} - {response.text[:500]}"
+                )
+                return [False] * len(payloads)
+            logger.warning(f"Alerts API returned {response.status_code}, retrying batch")
+
+        return None
+
+    @staticmethod
+    def _partial_results(response: httpx.Response, count: int) -> List[bool]:
+        """Per-payload flags from a 207 response: False at each errors[].index."""
+        accepted = [True] * count
+        try:
+            errors = response.json().get("errors") or []
+        except ValueError:
+            logger.warning("Unreadable 207 response from alerts API, counting batch as accepted")
+            return accepted
+        for error in errors:
+            index = error.get("index") if isinstance(error, dict) else None
+            if isinstance(index, int) and 0 <= index < count:
+                accepted[index] = False
+        return accepted
+
+    async def _spool_call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a DiskSpool method on the spool thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._spool_executor, functools.partial(fn, *args))
+
+    def _spool_busy(self) -> bool:
+        """Whether spooled alerts are pending or being written."""
+        return bool(self.spool.pending_records or self._spool_writes)
+
+    async def _spool_batch(self, payloads: List[Dict[str, Any]]) -> bool:
+        """Write a batch to the disk spool. Returns True if all payloads were spooled."""
+        self._spool_writes += 1
+        try:
+            return await self._spool_call(self.spool.append, payloads) == len(payloads)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error spooling {len(payloads)} alerts: {e}")
+            return False
+        finally:
+            self._spool_writes -= 1
+
+    def _set_healthy(self, healthy: bool):
+        if healthy != self.downstream_healthy:
+            self.downstream_healthy = healthy
+            if healthy:
+                logger.info("Alerts API recovered, spool drained")
+            else:
+                logger.warning(f"Alerts API unavailable, spooling alerts to {self.spool.directory}")
+
+    async def _replay(self):
+        """Replay spooled alerts in order once the API accepts them again."""
+        while self._running:
+            if not self.spool.pending_records:
+                await asyncio.sleep(self.flush_interval if self.downstream_healthy else self.replay_interval)
+                continue
+
+            payloads, cursor = await self._spool_call(self.spool.read_batch, self.batch_size)
+            if payloads:
+                try:
+                    result = await self._post_batch(payloads, max_retries=0)
+                except Exception as e:
+                    logger.error(f"Unexpected error replaying spooled alerts: {e}", exc_info=True)
+                    result = None
+                if result is None:
+                    self._set_healthy(False)
+                    await asyncio.sleep(self.replay_interval)
+                    continue
+                accepted = result.count(True)
+                self.forwarded_count += accepted
+                self.replayed_count += accepted
+                self.replay_rate.mark(accepted)
+                self.failed_count += len(payloads) - accepted
+            elif cursor == self.spool.cursor:
+                # Nothing readable yet
+                await asyncio.sleep(self.replay_interval)
+                continue
+
+            await self._spool_call(self.spool.commit, cursor, len(payloads))
+            if not self._spool_busy():
+                self._set_healthy(True)
+
+    async def _send_batch(self, batch: List[QueueItem]):
+        """Forward one batch and resolve the delivery futures."""
+        payloads = [payload for payload, _, _ in batch]
+        spooled = False
+        if self.spool is not None and (not self.downstream_healthy or self._spool_busy()):
+            # Keep order: nothing goes direct until the spool has been replayed
+            spooled = await self._spool_batch(payloads)
+            results = None
+        else:
+            try:
+                results = await self._post_batch(payloads)
+            except Exception as e:
+                logger.error(f"Unexpected error forwarding alerts: {e}", exc_info=True)
+                results = None
+            if results is None and self.spool is not None:
+                self._set_healthy(False)
+                spooled = await self._spool_batch(payloads)
+
+        if spooled:
+            results = [True] * len(batch)
+        elif results is None:
+            results = [None] * len(batch)
+
+        now = time.monotonic()
+        self.batch_count += 1
+        self.batch_size_histogram.observe(len(batch))
+        accepted = results.count(True)
+        if spooled:
+            logger.debug(f"Spooled batch of {len(batch)} alerts")
+        else:
+            self.forwarded_count += accepted
+            self.failed_count += len(batch) - accepted
+            logger.debug(f"Forwarded {accepted} of {len(batch)} alerts in batch")
+
+        for (_, enqueued_at, future), delivered in zip(batch, results):
+            self.latency_histogram.observe(now - enqueued_at)
+            if not future.done():
+                future.set_result(delivered)
+            self._queue.task_done()
+
+    async def _run(self):
+        """Sender loop: collect a batch, forward it, repeat."""
+        while self._running:
+            try:
+                batch = await self._collect_batch()
+            except asyncio.CancelledError:
+                break
+            try:
+                await self._send_batch(batch)
+            except asyncio.CancelledError:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+                    self._queue.task_done()
+                break
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get forwarding pipeline statistics."""
+        stats = {
+            "bulk_url": self.bulk_url,
+            "running": self._running,
+            "queue_depth": self.queue_depth,
+            "queue_capacity": self.queue_size,
+            "enqueued_count": self.enqueued_count,
+            "forwarded_count": self.forwarded_count,
+            "failed_count": self.failed_count,
+            "dropped_count": self.dropped_count,
+            "batch_count": self.batch_count,
+            "retry_count": self.retry_count,
+            "downstream_healthy": self.downstream_healthy,
+            "batch_size": self.batch_size_histogram.to_dict(),
+            "latency_seconds": self.latency_histogram.to_dict(),
+            "request_seconds": self.request_histogram.to_dict(),
+        }
+        if self.spool is not None:
+            stats["spool"] = {
+                **self.spool.get_stats(),
+                "replayed_count": self.replayed_count,
+                "replay_rate_per_second": round(self.replay_rate.rate(), 1),
+            }
+        return stats
+
+
+_forwarder: Optional[AlertForwarder] = None
+
+
+def get_forwarder() -> AlertForwarder:
+    """Get the process-wide alert forwarder, creating it from settings on first use."""
+    global _forwarder
+    if _forwarder is None:
+        _forwarder = AlertForwarder(
+            api_url=settings.netstacks_api_url,
+            queue_size=settings.forward_queue_size,
+            batch_size=settings.forward_batch_size,
+            flush_interval=settings.forward_flush_interval,
+            concurrency=settings.forward_concurrency,
+            max_retries=settings.forward_max_retries,
+            timeout=settings.forward_timeout,
+            max_connections=settings.forward_max_connections,
+            spool=DiskSpool(
+                settings.spool_dir,
+                segment_size=settings.spool_segment_size,
+                max_bytes=settings.spool_max_bytes,
+            ) if settings.spool_enabled else None,
+            replay_interval=settings.spool_replay_interval,
+        )
+    return _forwarder
@@ -2,6 +2,7 @@
 
 Unified service for ingesting alerts from multiple sources:
 - SNMP Traps
+- Syslog (UDP/TCP)
 - Kafka topics
 - Redis Streams
 - Other databus sources (configurable)
@@ -13,10 +14,13 @@ import sys
 import json
 import httpx
 from aiohttp import web
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Union
 
 from .config import settings
 from .trap_receiver import SNMPTrapReceiver
+from .trap_workers import TrapWorkerPool
+from .syslog_receiver import SyslogReceiver
+from .forwarder import get_forwarder
 from .adapters.base import BaseAdapter, DatabusSourceConfig
 from .adapters.kafka_adapter import KafkaAdapter
 from .adapters.redis_adapter import RedisStreamsAdapter
@@ -37,8 +41,11 @@ class IngestionService:
         self.health_runner: Optional[web.AppRunner] = None
         self.shutdown_event = asyncio.Event()
 
-        # SNMP trap receiver
-        self.snmp_receiver: Optional[SNMPTrapReceiver] = None
+        # SNMP trap receiver (single process or SO_REUSEPORT worker pool)
+        self.snmp_receiver: Optional[Union[SNMPTrapReceiver, TrapWorkerPool]] = None
+
+        # Syslog receiver
+        self.syslog_receiver: Optional[SyslogReceiver] = None
 
         # Databus adapters
         self.adapters: Dict[str, BaseAdapter] = {}
@@ -156,6 +163,13 @@ class IngestionService:
             stats["trap_count"] = snmp_stats.get("trap_count", 0)
             stats["snmp_errors"] = snmp_stats.get("error_count", 0)
 
+        # Syslog stats
+        if self.syslog_receiver:
+            syslog_stats = self.syslog_receiver.get_stats()
+            stats["sources"]["syslog"] = syslog_stats
+            stats["syslog_count"] = syslog_stats.get("message_count", 0)
+            stats["syslog_errors"] = syslog_stats.get("error_count", 0)
+
         # Databus adapter stats
         total_messages = 0
         total_errors = 0
@@ -168,6 +182,9 @@ class IngestionService:
         stats["databus_message_count"] = total_messages
         stats["databus_errors"] = total_errors
 
+        # Forwarding pipeline (queue depth, batch sizes, latency histograms)
+        stats["forwarder"] = get_forwarder().get_stats()
+
         return stats
 
     async def health_handler(self, request: web.Request) -> web.Response:
@@ -197,6 +214,15 @@ class IngestionService:
                 **self.snmp_receiver.get_stats()
             })
 
+        # Syslog source
+        if self.syslog_receiver:
+            sources.append({
+                "source_id": "syslog",
+                "name": "Syslog Receiver",
+                "status": "running" if self.syslog_receiver._running else "stopped",
+                **self.syslog_receiver.get_stats()
+            })
+
         # Databus sources
         for source_id, adapter in self.adapters.items():
             sources.append({
@@ -247,6 +273,10 @@ class IngestionService:
         logger.info(f"SNMP Enabled: {settings.snmp_enabled}")
         if settings.snmp_enabled:
             logger.info(f"SNMP Trap Port: {settings.snmp_trap_port}")
+            logger.info(f"SNMP Trap Workers: {settings.snmp_workers}")
+        logger.info(f"Syslog Enabled: {settings.syslog_enabled}")
+        if settings.syslog_enabled:
+            logger.info(f"Syslog Ports: {settings.syslog_udp_port}/udp, {settings.syslog_tcp_port}/tcp")
         logger.info(f"Health Port: {settings.health_port}")
         logger.info(f"API URL: {settings.netstacks_api_url}")
         logger.info("=" * 60)
@@ -260,11 +290,22 @@ class IngestionService:
             loop.add_signal_handler(sig, lambda: asyncio.create_task(self.shutdown()))
 
         try:
+            # Start the shared forwarding pipeline before any source produces alerts
+            await get_forwarder().start()
+
             # Start SNMP trap receiver if enabled
             if settings.snmp_enabled:
-                self.snmp_receiver = SNMPTrapReceiver(settings.netstacks_api_url)
+                if settings.snmp_workers > 1:
+                    self.snmp_receiver = TrapWorkerPool(settings.netstacks_api_url, settings.snmp_workers)
+                else:
+                    self.snmp_receiver = SNMPTrapReceiver(settings.netstacks_api_url)
                 await self.snmp_receiver.start(loop)
 
+            # Start syslog receiver if enabled
+            if settings.syslog_enabled:
+                self.syslog_receiver = SyslogReceiver(settings.netstacks_api_url)
+                await self.syslog_receiver.start(loop)
+
             # Start databus adapters
             await self.start_adapters()
 
@@ -285,13 +326,21 @@ class IngestionService:
         if self.snmp_receiver:
             await self.snmp_receiver.stop()
 
+        # Stop syslog receiver
+        if self.syslog_receiver:
+            await self.syslog_receiver.stop()
+
         # Stop all adapters
         await self.stop_adapters()
 
+        # Flush queued alerts once all sources have stopped
+        await get_forwarder().stop()
+
         self.shutdown_event.set()
 
     async def cleanup(self):
         """Clean up resources."""
+        await get_forwarder().stop()
         await self.stop_health_server()
         logger.info("Ingestion Service shutdown complete")
 
@@ -0,0 +1,39 @@
+"""Lightweight in-process metrics for the ingestion service.
+
+Histograms (netstacks_core.metrics.Histogram) are exposed as JSON on the
+health server's /stats endpoint.
+"""
+import time
+from collections import deque
+from typing import Deque, Tuple
+
+# Default bucket upper bounds (seconds) for latency histograms
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Default bucket upper bounds for batch size histograms
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class RateMeter:
+    """Events per second over a sliding time window."""
+
+    def __init__(self, window: float = 10.0):
+        self.window = window
+        self._events: Deque[Tuple[float, int]] = deque()
+        self._total = 0
+
+    def _prune(self, now: float):
+        while self._events and now - self._events[0][0] > self.window:
+            self._total -= self._events.popleft()[1]
+
+    def mark(self, count: int = 1):
+        """Record count events now."""
+        now = time.monotonic()
+        self._events.append((now, count))
+        self._total += count
+        self._prune(now)
+
+    def rate(self) -> float:
+        """Average events per second over the window."""
+        self._prune(time.monotonic())
+        return self._total / self.window
@@ -0,0 +1,188 @@
+"""Per-source rate limiting with adaptive sampling.
+
+Each limited source (a databus source, an SNMP agent address, a syslog
+sender) has a token bucket. While the bucket has tokens every event passes.
+Once a source is over its limit, adaptive sampling keeps the first
+sample_first events and then 1 in sample_every, and drops the rest. The
+number of events dropped since the last one that passed is returned with
+the next event that passes, so it can be recorded on the forwarded alert:
+in the top-level rate_limited_dropped field, which the alerts API adds to
+the stored alert's occurrence count even when the alert is deduplicated,
+and in raw_data["rate_limit"].
+
+Drops not yet carried by a passing event are reported in the limiter stats
+(pending_dropped), as are drops lost when a key is evicted
+(unreported_dropped).
+
+Databus sources are configured in connection_config["rate_limit"], e.g.
+{"rate": 50, "burst": 200, "sample_first": 10, "sample_every": 100}, with
+rate in events per second. SNMP agents and syslog senders use the
+INGESTION_SNMP_AGENT_RATE_* and INGESTION_SYSLOG_SENDER_RATE_* settings.
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from .config import settings
+
+
+@dataclass
+class RateLimitConfig:
+    """Token bucket and sampling parameters for one source."""
+    rate: float  # events per second
+    burst: float = 0  # bucket size; 0 = one second of events
+    sample_first: int = 10
+    sample_every: int = 100
+
+    def __post_init__(self):
+        if self.burst <= 0:
+            self.burst = max(1.0, self.rate)
+        self.sample_every = max(1, int(self.sample_every))
+        self.sample_first = max(0, int(self.sample_first))
+
+    @classmethod
+    def from_dict(cls, config: Optional[Dict[str, Any]]) -> Optional["RateLimitConfig"]:
+        """Build from a connection_config["rate_limit"] dict. None if unlimited."""
+        if not config or not float(config.get("rate") or 0) > 0:
+            return None
+        return cls(
+            rate=float(config["rate"]),
+            burst=float(config.get("burst") or 0),
+            sample_first=config.get("sample_first", settings.rate_limit_sample_first),
+            sample_every=config.get("sample_every", settings.rate_limit_sample_every),
+        )
+
+    @classmethod
+    def from_settings(cls, rate: float, burst: float) -> Optional["RateLimitConfig"]:
+        if rate <= 0:
+            return None
+        return cls(
+            rate=rate,
+            burst=burst,
+            sample_first=settings.rate_limit_sample_first,
+            sample_every=settings.rate_limit_sample_every,
+        )
+
+
+class SourceLimiter:
+    """Token bucket with adaptive sampling for one source."""
+
+    __slots__ = ("config", "_tokens", "_updated", "_over", "_pending_dropped",
+                 "passed_count", "sampled_count", "dropped_count")
+
+    def __init__(self, config: RateLimitConfig):
+        self.config = config
+        self._tokens = config.burst
+        self._updated = time.monotonic()
+        self._over = 0  # events since the source went over its limit
+        self._pending_dropped = 0
+        self.passed_count = 0
+        self.sampled_count = 0
+        self.dropped_count = 0
+
+    @property
+    def limited(self) -> bool:
+        return self._over > 0
+
+    @property
+    def pending_dropped(self) -> int:
+        """Events dropped since the last one that passed, not yet reported."""
+        return self._pending_dropped
+
+    def admit(self) -> Tuple[bool, bool, int]:
+        """Decide whether the next event passes.
+
+        Returns (passed, sampled, dropped) where sampled is True if the
+        event passed through sampling while over the limit, and dropped is
+        the number of events dropped since the previous event that passed.
+        """
+        now = time.monotonic()
+        config = self.config
+        self._tokens = min(config.burst, self._tokens + (now - self._updated) * config.rate)
+        self._updated = now
+
+        sampled = False
+        if self._tokens >= 1:
+            self._tokens -= 1
+            self._over = 0
+        else:
+            self._over += 1
+            past_first = self._over - config.sample_first
+            if past_first > 0 and past_first % config.sample_every:
+                self._pending_dropped += 1
+                self.dropped_count += 1
+                return False, False, 0
+            sampled = True
+            self.sampled_count += 1
+
+        dropped, self._pending_dropped = self._pending_dropped, 0
+        self.passed_count += 1
+        return True, sampled, dropped
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "rate": self.config.rate,
+            "burst": self.config.burst,
+            "limited": self.limited,
+            "passed_count": self.passed_count,
+            "sampled_count": self.sampled_count,
+            "dropped_count": self.dropped_count,
+            "pending_dropped": self._pending_dropped,
+        }
+
+
+class KeyedRateLimiter:
+    """One SourceLimiter per key (e.g. SNMP agent address), LRU-bounded."""
+
+    def __init__(self, config: RateLimitConfig, max_keys: int = 10000):
+        self.config = config
+        self.max_keys = max_keys
+        self._limiters: "OrderedDict[str, SourceLimiter]" = OrderedDict()
+        self.dropped_count = 0
+        # Drops still pending on keys evicted from the LRU
+        self.unreported_dropped = 0
+
+    def admit(self, key: str) -> Tuple[bool, bool, int]:
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            if len(self._limiters) >= self.max_keys:
+                _, evicted = self._limiters.popitem(last=False)
+                self.unreported_dropped += evicted.pending_dropped
+            limiter = self._limiters[key] = SourceLimiter(self.config)
+        else:
+            self._limiters.move_to_end(key)
+        result = limiter.admit()
+        if not result[0]:
+            self.dropped_count += 1
+        return result
+
+    def get_stats(self, top: int = 20) -> Dict[str, Any]:
+        limited = sorted(
+            ((key, limiter) for key, limiter in self._limiters.items() if limiter.dropped_count),
+            key=lambda item: item[1].dropped_count,
+            reverse=True,
+        )
+        return {
+            "rate": self.config.rate,
+            "burst": self.config.burst,
+            "sample_first": self.config.sample_first,
+            "sample_every": self.config.sample_every,
+            "tracked_keys": len(self._limiters),
+            "limited_keys": sum(1 for limiter in self._limiters.values() if limiter.limited),
+            "dropped_count": self.dropped_count,
+            "pending_dropped": sum(limiter.pending_dropped for limiter in self._limiters.values()),
+            "unreported_dropped": self.unreported_dropped,
+            "top_dropped": {key: limiter.get_stats() for key, limiter in limited[:top]},
+        }
+
+
+def annotate(alert_payload: Dict[str, Any], sampled: bool, dropped: int):
+    """Record rate limiting on an alert that passed the limiter."""
+    if dropped:
+        alert_payload["rate_limited_dropped"] = dropped
+    if sampled or dropped:
+        alert_payload.setdefault("raw_data", {})["rate_limit"] = {
+            "sampled": sampled,
+            "dropped_since_last": dropped,
+        }
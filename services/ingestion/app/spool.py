@@ -0,0 +1,321 @@
+"""Disk-backed alert spool.
+
+When the NetStacks alerts API is down or failing, the forwarder appends
+alert payloads to this spool instead of dropping them, and replays them in
+order once the API recovers.
+
+The spool is a directory of fixed-size, memory-mapped segment files
+(spool-<seq>.seg). Each record is a little-endian (length, crc32) header
+followed by the JSON-encoded payload; an all-zero header marks the end of
+the written part of a segment. Records are only ever appended. A small
+cursor file records the replay position, so a restart resumes replay where
+it stopped (records replayed but not yet committed may be sent twice).
+
+Disk usage is bounded by max_bytes. When a new segment would exceed it, the
+oldest segment is deleted and its unreplayed records are counted as
+dropped.
+
+Not thread-safe: the forwarder makes every call from its single spool
+thread, off the event loop.
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .transforms import json_loads
+
+try:
+    import orjson
+
+    def json_dumps(payload: Dict[str, Any]) -> bytes:
+        return orjson.dumps(payload, default=str)
+except ImportError:
+    def json_dumps(payload: Dict[str, Any]) -> bytes:
+        return json.dumps(payload, default=str).encode("utf-8")
+
+logger = logging.getLogger(__name__)
+
+RECORD_HEADER = struct.Struct("<II")  # payload length, crc32
+CURSOR_FILE = "cursor"
+SEGMENT_PREFIX = "spool-"
+SEGMENT_SUFFIX = ".seg"
+
+# (segment seq, byte offset, records consumed in that segment)
+Cursor = Tuple[int, int, int]
+
+
+class _Segment:
+    """One memory-mapped segment file."""
+
+    def __init__(self, path: str, seq: int, size: int):
+        self.path = path
+        self.seq = seq
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            self.size = os.fstat(fd).st_size
+            self.mm = mmap.mmap(fd, self.size)
+        finally:
+            os.close(fd)
+        self.write_offset = 0
+        self.record_count = 0
+
+    def read(self, offset: int) -> Optional[Tuple[bytes, int]]:
+        """Read the record at offset. Returns (payload, next offset) or None at the end."""
+        end = offset + RECORD_HEADER.size
+        if end > self.size:
+            return None
+        length, crc = RECORD_HEADER.unpack_from(self.mm, offset)
+        if length == 0 or end + length > self.size:
+            return None
+        data = self.mm[end:end + length]
+        if zlib.crc32(data) != crc:
+            return None
+        return data, end + length
+
+    def scan(self):
+        """Find the end of the written records (after reopening an existing file)."""
+        offset = count = 0
+        while True:
+            record = self.read(offset)
+            if record is None:
+                break
+            offset = record[1]
+            count += 1
+        self.write_offset = offset
+        self.record_count = count
+
+    def append(self, data: bytes) -> bool:
+        """Append a record. Returns False if the segment is full."""
+        end = self.write_offset + RECORD_HEADER.size + len(data)
+        if end > self.size:
+            return False
+        # Payload first, header last, so a partial write is never a valid record
+        self.mm[self.write_offset + RECORD_HEADER.size:end] = data
+        RECORD_HEADER.pack_into(self.mm, self.write_offset, len(data), zlib.crc32(data))
+        self.write_offset = end
+        self.record_count += 1
+        return True
+
+    def flush(self):
+        self.mm.flush()
+
+    def close(self):
+        if not self.mm.closed:
+            self.mm.flush()
+            self.mm.close()
+
+
+class DiskSpool:
+    """Append-only, segmented, memory-mapped FIFO of alert payloads."""
+
+    def __init__(self, directory: str, segment_size: int = 16 * 1024 * 1024,
+                 max_bytes: int = 1024 * 1024 * 1024):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.max_bytes = max(max_bytes, 2 * segment_size)
+
+        # seq -> record count, oldest first
+        self._segments: "OrderedDict[int, int]" = OrderedDict()
+        self._writer: Optional[_Segment] = None
+        self._reader: Optional[_Segment] = None
+        self._cursor: Cursor = (0, 0, 0)
+
+        self.pending_records = 0
+        self.spooled_count = 0
+        self.dropped_count = 0
+        self.oversize_count = 0
+
+    @property
+    def cursor(self) -> Cursor:
+        """Replay position of the oldest undelivered record."""
+        return self._cursor
+
+    def _path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{seq:012d}{SEGMENT_SUFFIX}")
+
+    def open(self):
+        """Open the spool directory, recovering segments and the replay cursor."""
+        os.makedirs(self.directory, exist_ok=True)
+        seqs = sorted(
+            int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+
+        for seq in seqs:
+            segment = _Segment(self._path(seq), seq, self.segment_size)
+            segment.scan()
+            self._segments[seq] = segment.record_count
+            if seq == seqs[-1]:
+                self._writer = segment
+            else:
+                segment.close()
+
+        cursor = self._load_cursor()
+        if not seqs:
+            cursor = (cursor[0], 0, 0)
+            self._writer = self._new_segment(cursor[0])
+        elif cursor[0] < seqs[0] or cursor[0] not in self._segments:
+            cursor = (seqs[0], 0, 0)
+        self._set_cursor(cursor)
+        self.pending_records = sum(self._segments.values()) - self._cursor[2]
+
+        if self.pending_records:
+            logger.info(
+                f"Alert spool {self.directory}: {self.pending_records} records pending "
+                f"in {len(self._segments)} segments"
+            )
+
+    def close(self):
+        """Flush and close all open segments."""
+        for segment in {id(s): s for s in (self._reader, self._writer) if s is not None}.values():
+            segment.close()
+        self._reader = self._writer = None
+
+    def _load_cursor(self) -> Cursor:
+        try:
+            with open(os.path.join(self.directory, CURSOR_FILE)) as f:
+                seq, offset, consumed = (int(v) for v in f.read().split())
+            return seq, offset, consumed
+        except (OSError, ValueError):
+            return (0, 0, 0)
+
+    def _save_cursor(self):
+        path = os.path.join(self.directory, CURSOR_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write("%d %d %d" % self._cursor)
+        os.replace(tmp, path)
+
+    def _new_segment(self, seq: int) -> _Segment:
+        segment = _Segment(self._path(seq), seq, self.segment_size)
+        self._segments[seq] = 0
+        return segment
+
+    def _segment(self, seq: int) -> _Segment:
+        if self._writer is not None and self._writer.seq == seq:
+            return self._writer
+        if self._reader is not None and self._reader.seq == seq:
+            return self._reader
+        segment = _Segment(self._path(seq), seq, self.segment_size)
+        segment.scan()
+        return segment
+
+    def _set_cursor(self, cursor: Cursor):
+        seq = cursor[0]
+        if self._reader is None or self._reader.seq != seq:
+            if self._reader is not None and self._reader is not self._writer:
+                self._reader.close()
+            self._reader = self._segment(seq)
+        self._cursor = cursor
+
+    def _remove_segment(self, seq: int):
+        self._segments.pop(seq, None)
+        try:
+            os.unlink(self._path(seq))
+        except FileNotFoundError:
+            pass
+
+    def _rotate(self):
+        """Seal the writer segment and start a new one, dropping the oldest if over budget."""
+        self._writer.flush()
+        while (len(self._segments) + 1) * self.segment_size > self.max_bytes:
+            oldest = next(iter(self._segments))
+            lost = self._segments[oldest]
+            if oldest == self._cursor[0]:
+                lost -= self._cursor[2]
+                next_seq = next(s for s in self._segments if s > oldest)
+                self._set_cursor((next_seq, 0, 0))
+                self._save_cursor()
+            self._remove_segment(oldest)
+            self.dropped_count += lost
+            self.pending_records -= lost
+            logger.warning(f"Alert spool full, dropped {lost} oldest records")
+
+        if self._writer is not self._reader:
+            self._writer.close()
+        self._writer = self._new_segment(self._writer.seq + 1)
+
+    def append(self, payloads: List[Dict[str, Any]]) -> int:
+        """Append payloads in order. Returns the number spooled."""
+        appended = 0
+        max_record = self.segment_size - RECORD_HEADER.size
+        for payload in payloads:
+            data = json_dumps(payload)
+            if len(data) > max_record:
+                self.oversize_count += 1
+                continue
+            if not self._writer.append(data):
+                self._rotate()
+                self._writer.append(data)
+            self._segments[self._writer.seq] += 1
+            appended += 1
+        self.pending_records += appended
+        self.spooled_count += appended
+        return appended
+
+    def read_batch(self, max_records: int) -> Tuple[List[Dict[str, Any]], Cursor]:
+        """Read up to max_records oldest payloads without consuming them.
+
+        Pass the returned cursor to commit() once they have been delivered.
+        """
+        seq, offset, consumed = self._cursor
+        segment = self._reader
+        payloads = []
+        while len(payloads) < max_records:
+            record = segment.read(offset)
+            if record is None:
+                later = next((s for s in self._segments if s > seq), None)
+                if later is None:
+                    # Caught up with the writer
+                    break
+                unread = self._segments.get(seq, 0) - consumed
+                if unread > 0:
+                    logger.error(f"Skipping {unread} unreadable records in spool segment {seq}")
+                    self.dropped_count += unread
+                    self.pending_records -= unread
+                if segment is not self._reader and segment is not self._writer:
+                    segment.close()
+                seq, offset, consumed = later, 0, 0
+                segment = self._segment(seq)
+                continue
+            data, offset = record
+            consumed += 1
+            try:
+                payloads.append(json_loads(data))
+            except ValueError:
+                logger.error(f"Skipping undecodable record in spool segment {seq}")
+        if segment is not self._reader and segment is not self._writer:
+            segment.close()
+        return payloads, (seq, offset, consumed)
+
+    def commit(self, cursor: Cursor, count: int):
+        """Mark records up to cursor (count of them) as delivered."""
+        if cursor[0] < self._cursor[0]:
+            # The segment was dropped while the batch was in flight
+            return
+        old_seq = self._cursor[0]
+        self._set_cursor(cursor)
+        for seq in [s for s in self._segments if old_seq <= s < cursor[0]]:
+            self._remove_segment(seq)
+        self.pending_records = max(0, self.pending_records - count)
+        self._save_cursor()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "directory": self.directory,
+            "pending_records": self.pending_records,
+            "segments": len(self._segments),
+            "disk_bytes": len(self._segments) * self.segment_size,
+            "max_bytes": self.max_bytes,
+            "spooled_count": self.spooled_count,
+            "dropped_count": self.dropped_count,
+            "oversize_count": self.oversize_count,
+        }
@@ -0,0 +1,367 @@
+"""Syslog Receiver.
+
+Listens for syslog messages over UDP and TCP and converts them to NetStacks
+alerts, without a Kafka/Redis broker in between.
+
+Built on asyncio datagram/stream protocols in the service's event loop.
+Received messages are buffered and parsed in batches (up to
+syslog_batch_size messages or every syslog_flush_interval seconds) with the
+same compiled syslog transform used by databus sources, then handed to the
+shared alert forwarder.
+
+TCP supports both RFC 6587 framings: octet counting ("<len> <msg>") and
+newline-delimited messages.
+"""
+import asyncio
+import logging
+import socket
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
+
+from .config import settings
+from .forwarder import get_forwarder
+from .adapters.base import DatabusSourceConfig
+from .transforms import compile_transform
+from .rate_limit import RateLimitConfig, KeyedRateLimiter, annotate
+
+logger = logging.getLogger(__name__)
+
+# Window over which per-sender message rates are measured (seconds)
+RATE_WINDOW = 10.0
+# Senders reported in get_stats(), busiest first
+TOP_SENDERS = 50
+
+
+class SenderStats:
+    """Message counters and rate for one syslog sender."""
+
+    __slots__ = ("address", "message_count", "byte_count", "first_seen", "last_seen",
+                 "_window_start", "_window_count", "rate")
+
+    def __init__(self, address: str, now: float):
+        self.address = address
+        self.message_count = 0
+        self.byte_count = 0
+        self.first_seen = now
+        self.last_seen = now
+        self._window_start = now
+        self._window_count = 0
+        self.rate = 0.0
+
+    def record(self, size: int, now: float):
+        self.message_count += 1
+        self.byte_count += size
+        self.last_seen = now
+        self._window_count += 1
+        elapsed = now - self._window_start
+        if elapsed >= RATE_WINDOW:
+            self.rate = self._window_count / elapsed
+            self._window_start = now
+            self._window_count = 0
+
+    def current_rate(self, now: float) -> float:
+        elapsed = now - self._window_start
+        if elapsed >= 2 * RATE_WINDOW or self._window_count == self.message_count:
+            # Nothing heard for a full window, or still in the first window
+            return self._window_count / max(elapsed, 1.0)
+        return self.rate
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            "address": self.address,
+            "message_count": self.message_count,
+            "byte_count": self.byte_count,
+            "rate_per_second": round(self.current_rate(now), 2),
+            "last_seen_seconds_ago": round(now - self.last_seen, 1),
+        }
+
+
+class _SyslogDatagramProtocol(asyncio.DatagramProtocol):
+    """UDP syslog: one message per datagram."""
+
+    def __init__(self, receiver: "SyslogReceiver"):
+        self.receiver = receiver
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]):
+        self.receiver._receive(data, addr[0])
+
+    def error_received(self, exc: Exception):
+        logger.warning(f"Syslog UDP error: {exc}")
+        self.receiver.error_count += 1
+
+
+class _SyslogStreamProtocol(asyncio.Protocol):
+    """TCP syslog with RFC 6587 octet-counting or newline framing."""
+
+    def __init__(self, receiver: "SyslogReceiver"):
+        self.receiver = receiver
+        self.transport: Optional[asyncio.Transport] = None
+        self.sender = "unknown"
+        self._buffer = bytearray()
+
+    def connection_made(self, transport: asyncio.Transport):
+        self.transport = transport
+        peer = transport.get_extra_info("peername")
+        self.sender = peer[0] if peer else "unknown"
+        self.receiver._connections.add(self)
+
+    def connection_lost(self, exc: Optional[Exception]):
+        if self._buffer.strip():
+            # Last message without a trailing newline
+            self.receiver._receive(bytes(self._buffer), self.sender)
+        self._buffer.clear()
+        self.receiver._connections.discard(self)
+        self.receiver._paused.discard(self)
+
+    def data_received(self, data: bytes):
+        self._buffer += data
+        max_size = self.receiver.max_message_size
+        buffer = self._buffer
+        pos = 0
+
+        while pos < len(buffer):
+            if buffer[pos:pos + 1].isdigit():
+                # Octet counting: MSG-LEN SP SYSLOG-MSG
+                space = buffer.find(b" ", pos, pos + 11)
+                if space < 0:
+                    if len(buffer) - pos > 10:
+                        self._protocol_error("invalid octet count")
+                        return
+                    break
+                length = int(buffer[pos:space])
+                if length > max_size:
+                    self._protocol_error(f"message of {length} bytes exceeds limit")
+                    return
+                end = space + 1 + length
+                if end > len(buffer):
+                    break
+                self.receiver._receive(bytes(buffer[space + 1:end]), self.sender)
+                pos = end
+            else:
+                # Non-transparent framing: one message per line
+                newline = buffer.find(b"\n", pos)
+                if newline < 0:
+                    if len(buffer) - pos > max_size:
+                        self._protocol_error("unterminated message exceeds limit")
+                        return
+                    break
+                line = bytes(buffer[pos:newline]).rstrip(b"\r")
+                if line:
+                    self.receiver._receive(line, self.sender)
+                pos = newline + 1
+
+        del buffer[:pos]
+
+        # Stop reading from this sender while the forwarding queue is full
+        if self.receiver._backlogged():
+            self.transport.pause_reading()
+            self.receiver._pause(self)
+
+    def _protocol_error(self, reason: str):
+        logger.warning(f"Closing syslog connection from {self.sender}: {reason}")
+        self.receiver.error_count += 1
+        self._buffer.clear()
+        self.transport.close()
+
+
+class SyslogReceiver:
+    """UDP/TCP syslog listener that forwards messages as alerts to NetStacks API."""
+
+    def __init__(self, api_url: str):
+        self.api_url = api_url
+        self.address = settings.syslog_address
+        self.udp_port = settings.syslog_udp_port
+        self.tcp_port = settings.syslog_tcp_port
+        self.batch_size = settings.syslog_batch_size
+        self.flush_interval = settings.syslog_flush_interval
+        self.max_message_size = settings.syslog_max_message_size
+        self.max_senders = settings.syslog_max_senders
+
+        self.received_count = 0
+        self.message_count = 0
+        self.error_count = 0
+        self.dropped_count = 0
+        self.paused_count = 0
+        self.rate_limited_count = 0
+        self._running = False
+        rate_limit = RateLimitConfig.from_settings(settings.syslog_sender_rate_limit, settings.syslog_sender_rate_burst)
+        self._sender_limiter = KeyedRateLimiter(rate_limit, settings.rate_limit_max_keys) if rate_limit else None
+
+        self._transform = compile_transform(DatabusSourceConfig(
+            source_id="syslog",
+            name="Syslog Receiver",
+            source_type="syslog",
+            connection_config={},
+            topic_or_stream=f"{self.address}:{self.udp_port}",
+            transform_type="syslog",
+        ))
+
+        self._pending: List[Tuple[bytes, str]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._senders: "OrderedDict[str, SenderStats]" = OrderedDict()
+        self._udp_transport: Optional[asyncio.DatagramTransport] = None
+        self._tcp_server: Optional[asyncio.AbstractServer] = None
+        self._connections = set()
+        self._paused = set()
+        self._main_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self, loop: asyncio.AbstractEventLoop):
+        """Start the UDP and TCP listeners."""
+        self._main_loop = loop
+        self._running = True
+
+        if self.udp_port:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, settings.syslog_rcvbuf)
+            except OSError as e:
+                logger.warning(f"Could not set syslog receive buffer to {settings.syslog_rcvbuf}: {e}")
+            sock.bind((self.address, self.udp_port))
+            self._udp_transport, _ = await loop.create_datagram_endpoint(
+                lambda: _SyslogDatagramProtocol(self),
+                sock=sock,
+            )
+            logger.info(f"Syslog receiver listening on {self.address}:{self.udp_port}/udp")
+
+        if self.tcp_port:
+            self._tcp_server = await loop.create_server(
+                lambda: _SyslogStreamProtocol(self),
+                host=self.address,
+                port=self.tcp_port,
+                reuse_address=True,
+            )
+            logger.info(f"Syslog receiver listening on {self.address}:{self.tcp_port}/tcp")
+
+        logger.info(f"Will forward alerts to: {get_forwarder().bulk_url}")
+
+    def _receive(self, data: bytes, sender: str):
+        """Buffer a message; parsing happens in batches in _flush()."""
+        now = time.monotonic()
+        self.received_count += 1
+        stats = self._senders.get(sender)
+        if stats is None:
+            if len(self._senders) >= self.max_senders:
+                self._senders.popitem(last=False)
+            stats = self._senders[sender] = SenderStats(sender, now)
+        else:
+            self._senders.move_to_end(sender)
+        stats.record(len(data), now)
+
+        self._pending.append((data, sender))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = self._main_loop.call_later(self.flush_interval, self._flush)
+
+    def _flush(self):
+        """Parse the buffered messages and queue them for forwarding."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+
+        forwarder = get_forwarder()
+        transform = self._transform
+        limiter = self._sender_limiter
+        for data, sender in pending:
+            if limiter is not None:
+                passed, sampled, dropped = limiter.admit(sender)
+                if not passed:
+                    self.rate_limited_count += 1
+                    continue
+            try:
+                alert_payload = transform(data.decode("utf-8", errors="replace"))
+            except Exception as e:
+                logger.debug(f"Error parsing syslog message from {sender}: {e}")
+                self.error_count += 1
+                continue
+
+            alert_payload["source"] = "syslog"
+            if alert_payload["device_name"] == "unknown":
+                alert_payload["device_name"] = sender
+            alert_payload["raw_data"]["sender"] = sender
+            if limiter is not None:
+                annotate(alert_payload, sampled, dropped)
+
+            delivery = forwarder.submit_nowait(alert_payload)
+            if delivery is None:
+                self.dropped_count += 1
+            else:
+                delivery.add_done_callback(self._on_delivered)
+
+    def _on_delivered(self, delivery: asyncio.Future):
+        if delivery.result():
+            self.message_count += 1
+        else:
+            self.error_count += 1
+
+    def _backlogged(self) -> bool:
+        forwarder = get_forwarder()
+        return forwarder.queue_depth + len(self._pending) >= forwarder.queue_size
+
+    def _pause(self, protocol: _SyslogStreamProtocol):
+        if protocol not in self._paused:
+            self._paused.add(protocol)
+            self.paused_count += 1
+            if len(self._paused) == 1:
+                self._main_loop.call_later(self.flush_interval, self._resume_paused)
+
+    def _resume_paused(self):
+        """Resume paused TCP senders once the forwarding queue has room."""
+        if not self._paused:
+            return
+        if self._backlogged():
+            self._main_loop.call_later(self.flush_interval, self._resume_paused)
+            return
+        for protocol in list(self._paused):
+            if protocol.transport is not None and not protocol.transport.is_closing():
+                protocol.transport.resume_reading()
+        self._paused.clear()
+
+    async def stop(self):
+        """Stop the listeners and flush buffered messages."""
+        logger.info("Stopping syslog receiver...")
+        self._running = False
+
+        if self._udp_transport is not None:
+            self._udp_transport.close()
+            self._udp_transport = None
+        if self._tcp_server is not None:
+            self._tcp_server.close()
+            for protocol in list(self._connections):
+                if protocol.transport is not None:
+                    protocol.transport.close()
+            await self._tcp_server.wait_closed()
+            self._tcp_server = None
+
+        self._flush()
+        logger.info(
+            f"Syslog receiver stopped. Received {self.received_count} "
+            f"messages, {self.error_count} errors, {self.dropped_count} dropped"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get receiver statistics, including per-sender message rates."""
+        now = time.monotonic()
+        senders = sorted(self._senders.values(), key=lambda s: s.current_rate(now), reverse=True)
+        stats = {
+            "source_type": "syslog",
+            "message_count": self.message_count,
+            "error_count": self.error_count,
+            "dropped_count": self.dropped_count,
+            "received_count": self.received_count,
+            "rate_per_second": round(sum(s.current_rate(now) for s in senders), 2),
+            "listening_address": self.address,
+            "udp_port": self.udp_port,
+            "tcp_port": self.tcp_port,
+            "tcp_connections": len(self._connections),
+            "paused_count": self.paused_count,
+            "running": self._running,
+            "sender_count": len(senders),
+            "senders": [s.to_dict(now) for s in senders[:TOP_SENDERS]],
+        }
+        if self._sender_limiter is not None:
+            stats["rate_limited_count"] = self.rate_limited_count
+            stats["rate_limit"] = self._sender_limiter.get_stats()
+        return stats
@@ -0,0 +1,392 @@
+"""Compiled message transforms for databus adapters.
+
+compile_transform() turns a DatabusSourceConfig into a single function that
+converts a raw databus message into an alert payload. Everything that only
+depends on the source configuration - field mapping lookups, the severity
+map, regexes and the constant parts of the payload - is resolved once when
+the adapter is created instead of on every message.
+
+Supported transform types:
+    json    JSON objects, with optional field_mappings
+    syslog  RFC 5424 and RFC 3164 (BSD) syslog lines
+    cef     ArcSight Common Event Format, including extension key/value pairs
+    raw     anything else, as text
+
+A per-source severity map can be set in connection_config["severity_map"]
+(source severity value -> critical/warning/info). It is consulted before the
+built-in mapping.
+
+JSON is decoded with orjson when it is installed.
+"""
+import json
+import re
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    json_loads = json.loads
+
+TransformFn = Callable[[Any], Dict[str, Any]]
+
+SEVERITY_MAP = {
+    "critical": "critical",
+    "high": "critical",
+    "error": "critical",
+    "err": "critical",
+    "crit": "critical",
+    "alert": "critical",
+    "emerg": "critical",
+    "emergency": "critical",
+    "warning": "warning",
+    "warn": "warning",
+    "medium": "warning",
+    "notice": "warning",
+    "info": "info",
+    "information": "info",
+    "informational": "info",
+    "low": "info",
+    "debug": "info",
+}
+
+# Syslog severity (PRI % 8) -> alert severity
+SYSLOG_SEVERITY = {
+    0: "critical", 1: "critical", 2: "critical", 3: "critical",
+    4: "warning", 5: "info", 6: "info", 7: "info"
+}
+
+# RFC 5424: <PRI>VERSION TIMESTAMP HOSTNAME APP-NAME PROCID MSGID SD [MSG]
+_SD_ELEMENT = r'\[[^\]"]*(?:"(?:[^"\\]|\\.)*"[^\]"]*)*\]'
+SYSLOG_5424_RE = re.compile(
+    r'<(\d{1,3})>(\d{1,2}) (\S+) (\S+) (\S+) (\S+) (\S+) '
+    r'(-|(?:' + _SD_ELEMENT + r')+)(?: (.*))?$',
+    re.DOTALL,
+)
+SD_ELEMENT_RE = re.compile(r'\[([^\s\]]+)((?:\s+[^\s=\]]+="(?:[^"\\]|\\.)*")*)\s*\]')
+SD_PARAM_RE = re.compile(r'([^\s=\]]+)="((?:[^"\\]|\\.)*)"')
+SD_ESCAPE_RE = re.compile(r'\\(["\\\]])')
+
+# RFC 3164: <PRI>TIMESTAMP HOSTNAME TAG: MESSAGE
+SYSLOG_3164_RE = re.compile(r'<(\d+)>(\w+ +\d+ \d+:\d+:\d+) (\S+) (\S+): (.+)', re.DOTALL)
+
+# CEF header fields are separated by unescaped pipes
+CEF_HEADER_SPLIT_RE = re.compile(r'(?<!\\)\|')
+CEF_HEADER_ESCAPE_RE = re.compile(r'\\([\\|])')
+# Extension: key=value pairs, a value runs until the next " key="
+CEF_EXTENSION_KEY_RE = re.compile(r'(?:^|\s)([\w.\[\]-]+)=')
+CEF_EXTENSION_ESCAPE_RE = re.compile(r'\\(.)', re.DOTALL)
+CEF_EXTENSION_ESCAPES = {"n": "\n", "r": "\r"}
+
+# Fallback source keys per alert field, tried after the mapped key
+JSON_FIELD_FALLBACKS = {
+    "title": ("message", "name"),
+    "severity": ("level", "priority"),
+    "description": ("details",),
+    "device_name": ("host", "hostname"),
+    "alert_type": ("type", "category"),
+}
+
+
+def _to_text(raw_message: Any, errors: str = 'strict') -> str:
+    if isinstance(raw_message, (bytes, bytearray)):
+        return raw_message.decode('utf-8', errors=errors)
+    return str(raw_message)
+
+
+def compile_severity(severity_map: Optional[Dict[str, str]] = None) -> Callable[[Any], str]:
+    """Build a severity normalizer, with optional per-source overrides."""
+    overrides = {str(k).lower(): v for k, v in (severity_map or {}).items()}
+    table = {**SEVERITY_MAP, **overrides}
+
+    def normalize(severity: Any) -> str:
+        if isinstance(severity, int):
+            override = overrides.get(str(severity))
+            if override:
+                return override
+            if severity <= 1:
+                return "critical"
+            elif severity <= 3:
+                return "warning"
+            else:
+                return "info"
+        return table.get(str(severity).lower(), "warning")
+
+    return normalize
+
+
+normalize_severity = compile_severity()
+
+
+def _raw_data_base(config) -> Dict[str, Any]:
+    return {
+        "source_id": config.source_id,
+        "source_name": config.name,
+        "source_type": config.source_type,
+        "topic": config.topic_or_stream,
+    }
+
+
+def _compile_json(config, normalize: Callable[[Any], str]) -> TransformFn:
+    mappings = config.field_mappings or {}
+    source = f"databus:{config.source_type}"
+    raw_base = _raw_data_base(config)
+    default_title = f"Alert from {config.name}"
+
+    # (alert field, source keys in lookup order, default)
+    fields: Tuple[Tuple[str, Tuple[str, ...], Any], ...] = tuple(
+        (field, (mappings.get(field, field),) + fallbacks, default)
+        for field, fallbacks, default in (
+            ("title", JSON_FIELD_FALLBACKS["title"], default_title),
+            ("severity", JSON_FIELD_FALLBACKS["severity"], "warning"),
+            ("description", JSON_FIELD_FALLBACKS["description"], None),
+            ("device_name", JSON_FIELD_FALLBACKS["device_name"], None),
+            ("alert_type", JSON_FIELD_FALLBACKS["alert_type"], "generic"),
+        )
+    )
+
+    def transform_json(raw_message: Any) -> Dict[str, Any]:
+        if isinstance(raw_message, (str, bytes, bytearray)):
+            data = json_loads(raw_message)
+        else:
+            data = raw_message
+        if not isinstance(data, dict):
+            raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+
+        alert = {}
+        for field, keys, default in fields:
+            value = default
+            for key in keys:
+                if key in data:
+                    value = data[key]
+                    break
+            alert[field] = value
+
+        alert["severity"] = normalize(alert["severity"])
+        alert["source"] = source
+        alert["raw_data"] = {**raw_base, "original_message": data}
+        return alert
+
+    return transform_json
+
+
+def parse_structured_data(sd: str) -> Dict[str, Dict[str, str]]:
+    """Parse RFC 5424 STRUCTURED-DATA into {sd_id: {param: value}}."""
+    if sd == "-":
+        return {}
+    elements = {}
+    for sd_id, params in SD_ELEMENT_RE.findall(sd):
+        elements[sd_id] = {
+            name: SD_ESCAPE_RE.sub(r'\1', value)
+            for name, value in SD_PARAM_RE.findall(params)
+        }
+    return elements
+
+
+def _compile_syslog(config, severity_map: Dict[str, str]) -> TransformFn:
+    source = f"databus:{config.source_type}"
+    raw_base = _raw_data_base(config)
+    overrides = {str(k).lower(): v for k, v in severity_map.items()}
+
+    def syslog_severity(pri: int) -> str:
+        return overrides.get(str(pri % 8)) or SYSLOG_SEVERITY[pri % 8]
+
+    def transform_syslog(raw_message: Any) -> Dict[str, Any]:
+        text = _to_text(raw_message)
+        syslog: Dict[str, Any] = {}
+
+        match = SYSLOG_5424_RE.match(text)
+        if match:
+            pri, version, timestamp, hostname, app_name, procid, msgid, sd, message = match.groups()
+            pri = int(pri)
+            tag = app_name if app_name != "-" else "syslog"
+            hostname = hostname if hostname != "-" else "unknown"
+            message = (message or "").lstrip('\ufeff')
+            severity = syslog_severity(pri)
+            syslog = {
+                "format": "rfc5424",
+                "facility": pri // 8,
+                "severity": pri % 8,
+                "timestamp": timestamp if timestamp != "-" else None,
+                "app_name": app_name if app_name != "-" else None,
+                "procid": procid if procid != "-" else None,
+                "msgid": msgid if msgid != "-" else None,
+                "structured_data": parse_structured_data(sd),
+            }
+        else:
+            match = SYSLOG_3164_RE.match(text)
+            if match:
+                pri, timestamp, hostname, tag, message = match.groups()
+                pri = int(pri)
+                severity = syslog_severity(pri)
+                syslog = {
+                    "format": "rfc3164",
+                    "facility": pri // 8,
+                    "severity": pri % 8,
+                    "timestamp": timestamp,
+                }
+            else:
+                hostname = "unknown"
+                tag = "syslog"
+                message = text
+                severity = "info"
+
+        raw_data = {**raw_base, "original_message": text}
+        if syslog:
+            raw_data["syslog"] = syslog
+        return {
+            "title": f"Syslog from {hostname}: {tag}",
+            "severity": severity,
+            "description": message,
+            "source": source,
+            "device_name": hostname,
+            "alert_type": "syslog",
+            "raw_data": raw_data,
+        }
+
+    return transform_syslog
+
+
+def _cef_unescape(match) -> str:
+    return CEF_EXTENSION_ESCAPES.get(match.group(1), match.group(1))
+
+
+def parse_cef_extension(extension: str) -> Dict[str, str]:
+    """Parse CEF extension key=value pairs, resolving custom field labels.
+
+    Custom fields such as cs1=... cs1Label=name are returned under both the
+    original key and the label.
+    """
+    # ['', key1, value1, key2, value2, ...]
+    parts = CEF_EXTENSION_KEY_RE.split(extension)
+    fields = {}
+    for key, value in zip(parts[1::2], parts[2::2]):
+        value = value.rstrip()
+        if '\\' in value:
+            value = CEF_EXTENSION_ESCAPE_RE.sub(_cef_unescape, value)
+        fields[key] = value
+    for key in [k for k in fields if k.endswith("Label")]:
+        target = key[:-len("Label")]
+        if target in fields and fields[key]:
+            fields.setdefault(fields[key], fields[target])
+    return fields
+
+
+def _cef_severity(severity: str, overrides: Dict[str, str]) -> str:
+    override = overrides.get(severity.lower())
+    if override:
+        return override
+    # CEF severity: 0-3 Low, 4-6 Medium, 7-8 High, 9-10 Very High
+    try:
+        sev_num = int(severity)
+    except ValueError:
+        return SEVERITY_MAP.get(severity.lower(), "warning")
+    if sev_num <= 3:
+        return "info"
+    elif sev_num <= 6:
+        return "warning"
+    return "critical"
+
+
+def _compile_cef(config, severity_map: Dict[str, str]) -> TransformFn:
+    mappings = config.field_mappings or {}
+    source = f"databus:{config.source_type}"
+    raw_base = _raw_data_base(config)
+    overrides = {str(k).lower(): v for k, v in severity_map.items()}
+    device_keys = (mappings["device_name"],) if "device_name" in mappings else ("dvchost", "dvc")
+    mapped = {field: key for field, key in mappings.items()
+              if field in ("title", "description", "alert_type")}
+
+    def transform_cef(raw_message: Any) -> Dict[str, Any]:
+        text = _to_text(raw_message)
+        # Tolerate a syslog header in front of the CEF message
+        start = text.find("CEF:")
+        cef = text[start:] if start > 0 else text
+
+        # CEF format: CEF:Version|Device Vendor|Device Product|Device Version|Signature ID|Name|Severity|Extension
+        parts = CEF_HEADER_SPLIT_RE.split(cef, 7)
+        if len(parts) >= 7:
+            vendor, product, _, sig_id, name, severity = (
+                CEF_HEADER_ESCAPE_RE.sub(r'\1', p) if '\\' in p else p for p in parts[1:7]
+            )
+            extension = parts[7] if len(parts) > 7 else ""
+        else:
+            vendor = "unknown"
+            product = "unknown"
+            sig_id = "unknown"
+            name = text
+            severity = "5"
+            extension = ""
+
+        fields = parse_cef_extension(extension) if extension else {}
+        device_name = None
+        for key in device_keys:
+            if fields.get(key):
+                device_name = fields[key]
+                break
+
+        alert = {
+            "title": f"{vendor} {product}: {name}",
+            "severity": _cef_severity(severity.strip(), overrides),
+            "description": f"Signature: {sig_id}. {fields.get('msg', extension)}",
+            "source": source,
+            "device_name": device_name,
+            "alert_type": "security",
+            "raw_data": {
+                **raw_base,
+                "original_message": text,
+                "cef": {
+                    "vendor": vendor,
+                    "product": product,
+                    "signature_id": sig_id,
+                    "name": name,
+                    "severity": severity,
+                    "extension": fields,
+                },
+            },
+        }
+        for field, key in mapped.items():
+            if key in fields:
+                alert[field] = fields[key]
+        return alert
+
+    return transform_cef
+
+
+def _compile_raw(config) -> TransformFn:
+    source = f"databus:{config.source_type}"
+    raw_base = _raw_data_base(config)
+    title = f"Message from {config.name}"
+
+    def transform_raw(raw_message: Any) -> Dict[str, Any]:
+        text = _to_text(raw_message, errors='replace')
+        return {
+            "title": title,
+            "severity": "info",
+            "description": text[:1000],  # Truncate
+            "source": source,
+            "device_name": None,
+            "alert_type": "generic",
+            "raw_data": {**raw_base, "original_message": text},
+        }
+
+    return transform_raw
+
+
+def compile_transform(config, transform_type: Optional[str] = None) -> TransformFn:
+    """Compile a source config into a raw message -> alert payload function.
+
+    transform_type overrides config.transform_type.
+    """
+    transform_type = transform_type or config.transform_type
+    severity_map = (config.connection_config or {}).get("severity_map") or {}
+
+    if transform_type == "json":
+        return _compile_json(config, compile_severity(severity_map))
+    elif transform_type == "syslog":
+        return _compile_syslog(config, severity_map)
+    elif transform_type == "cef":
+        return _compile_cef(config, severity_map)
+    else:
+        return _compile_raw(config)
@@ -4,7 +4,7 @@ This module defines how SNMP traps are converted to NetStacks alerts.
 OIDs can be mapped to specific alert types, severities, and titles.
 """
 import re
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass, field
 
 
@@ -133,6 +133,123 @@ DEFAULT_TRAP_MAPPINGS: List[TrapMapping] = [
 ]
 
 
+# A pattern made only of digits and escaped dots (optionally anchored with
+# ^ and/or $) matches a literal OID string and can live in the prefix trie.
+_LITERAL_OID_RE = re.compile(r"^\^?((?:\d|\\\.)+)(\$|\\Z)?$")
+
+# Maximum number of trap OID -> mapping results kept by TrapMapper
+MATCH_CACHE_SIZE = 4096
+
+
+def parse_literal_pattern(pattern: str) -> Optional[Tuple[str, bool]]:
+    """Return (literal_oid, exact) if pattern is a literal OID, else None.
+
+    exact is True when the pattern is anchored with $ (whole-OID match);
+    otherwise, like re.match, it matches any OID starting with the literal.
+    """
+    match = _LITERAL_OID_RE.match(pattern)
+    if not match:
+        return None
+    return match.group(1).replace("\\.", "."), bool(match.group(2))
+
+
+class _TrieNode:
+    """Character-level OID prefix trie node."""
+
+    __slots__ = ("children", "prefix_index", "exact_index")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.prefix_index: Optional[int] = None  # first mapping matching OIDs with this prefix
+        self.exact_index: Optional[int] = None  # first mapping matching exactly this OID
+
+
+class CompiledTrapMatcher:
+    """Finds the first matching mapping index for a trap OID.
+
+    Literal OID patterns are compiled into a character trie, so a lookup
+    walks the OID once instead of running one regex per mapping. Remaining
+    patterns are combined into a single alternation regex whose leftmost
+    matching alternative is the lowest-index regex mapping. The result is
+    the lower of the two indexes, so first-match precedence across the
+    original list is preserved exactly.
+    """
+
+    def __init__(self, patterns: List[str]):
+        self.size = len(patterns)
+        self._root = _TrieNode()
+        self.literal_count = 0
+        self._regex_indexes: List[int] = []
+        self._regexes: List[Tuple[int, "re.Pattern"]] = []
+        self._combined: Optional["re.Pattern"] = None
+
+        alternatives = []
+        for index, pattern in enumerate(patterns):
+            literal = parse_literal_pattern(pattern)
+            if literal is not None:
+                self._insert(index, *literal)
+                self.literal_count += 1
+            else:
+                self._regex_indexes.append(index)
+                self._regexes.append((index, re.compile(pattern)))
+                # Empty marker group closes last, so lastgroup names the alternative
+                alternatives.append(f"(?:{pattern})(?P<_m{index}>)")
+
+        if alternatives:
+            try:
+                self._combined = re.compile("|".join(alternatives))
+            except re.error:
+                # e.g. duplicate group names or inline flags across patterns;
+                # fall back to trying the regexes one by one
+                self._combined = None
+
+    def _insert(self, index: int, literal: str, exact: bool):
+        node = self._root
+        for char in literal:
+            node = node.children.setdefault(char, _TrieNode())
+        if exact:
+            if node.exact_index is None:
+                node.exact_index = index
+        elif node.prefix_index is None:
+            node.prefix_index = index
+
+    def _match_literal(self, oid: str) -> Optional[int]:
+        best = None
+        node = self._root
+        for char in oid:
+            node = node.children.get(char)
+            if node is None:
+                return best
+            if node.prefix_index is not None and (best is None or node.prefix_index < best):
+                best = node.prefix_index
+        if node.exact_index is not None and (best is None or node.exact_index < best):
+            best = node.exact_index
+        return best
+
+    def _match_regex(self, oid: str, before: Optional[int]) -> Optional[int]:
+        if not self._regex_indexes or (before is not None and self._regex_indexes[0] > before):
+            return None
+        if self._combined is not None:
+            match = self._combined.match(oid)
+            return int(match.lastgroup[2:]) if match else None
+        for index, regex in self._regexes:
+            if before is not None and index > before:
+                return None
+            if regex.match(oid):
+                return index
+        return None
+
+    def match(self, oid: str) -> Optional[int]:
+        """Return the index of the first pattern matching oid, or None."""
+        literal_index = self._match_literal(oid)
+        regex_index = self._match_regex(oid, literal_index)
+        if regex_index is None:
+            return literal_index
+        if literal_index is None:
+            return regex_index
+        return min(literal_index, regex_index)
+
+
 class TrapMapper:
     """Maps SNMP traps to NetStacks alerts using configured mappings."""
 
@@ -142,13 +259,31 @@ class TrapMapper:
         if custom_mappings:
             # Custom mappings take precedence (added first)
             self.mappings = custom_mappings + self.mappings
+        self._matcher: Optional[CompiledTrapMatcher] = None
+        self._cache: Dict[str, Optional[TrapMapping]] = {}
+        self.compile()
+
+    def compile(self):
+        """(Re)build the matcher after self.mappings changes."""
+        self._matcher = CompiledTrapMatcher([m.oid_pattern for m in self.mappings])
+        self._cache = {}
 
     def find_mapping(self, trap_oid: str) -> Optional[TrapMapping]:
         """Find the first matching mapping for a trap OID."""
-        for mapping in self.mappings:
-            if re.match(mapping.oid_pattern, trap_oid):
-                return mapping
-        return None
+        if len(self.mappings) != self._matcher.size:
+            self.compile()
+
+        try:
+            return self._cache[trap_oid]
+        except KeyError:
+            pass
+
+        index = self._matcher.match(trap_oid)
+        mapping = self.mappings[index] if index is not None else None
+        if len(self._cache) >= MATCH_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[trap_oid] = mapping
+        return mapping
 
     def map_trap_to_alert(
         self,
@@ -6,7 +6,6 @@ Uses pysnmp with a separate thread for the dispatcher.
 import asyncio
 import logging
 import threading
-import httpx
 from typing import Optional, Dict, Any
 from pysnmp.carrier.asyncio.dgram import udp
 from pysnmp.entity import engine, config
@@ -14,6 +13,8 @@ from pysnmp.entity.rfc3413 import ntfrcv
 
 from .config import settings
 from .trap_mappings import trap_mapper
+from .forwarder import get_forwarder
+from .rate_limit import RateLimitConfig, KeyedRateLimiter, annotate
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +27,10 @@ class SNMPTrapReceiver:
         self.snmp_engine: Optional[engine.SnmpEngine] = None
         self.trap_count = 0
         self.error_count = 0
+        self.rate_limited_count = 0
         self._running = False
+        rate_limit = RateLimitConfig.from_settings(settings.snmp_agent_rate_limit, settings.snmp_agent_rate_burst)
+        self._agent_limiter = KeyedRateLimiter(rate_limit, settings.rate_limit_max_keys) if rate_limit else None
         self._dispatcher_thread: Optional[threading.Thread] = None
         self._main_loop: Optional[asyncio.AbstractEventLoop] = None
 
@@ -61,7 +65,7 @@ class SNMPTrapReceiver:
         ntfrcv.NotificationReceiver(self.snmp_engine, self._trap_callback)
 
         logger.info("SNMP Trap Receiver started successfully")
-        logger.info(f"Will forward alerts to: {self.api_url}/api/alerts/")
+        logger.info(f"Will forward alerts to: {get_forwarder().bulk_url}")
 
         # Start dispatcher in a separate thread
         self.snmp_engine.transportDispatcher.jobStarted(1)
@@ -129,9 +133,9 @@ class SNMPTrapReceiver:
 
             logger.info(f"Mapped trap to alert: {alert_payload['title']} (severity: {alert_payload['severity']})")
 
-            # Send alert (thread-safe)
+            # Queue alert on the main loop (thread-safe)
             if self._main_loop:
-                asyncio.run_coroutine_threadsafe(self._send_alert(alert_payload), self._main_loop)
+                self._main_loop.call_soon_threadsafe(self._enqueue_alert, alert_payload)
 
             self.trap_count += 1
 
@@ -139,23 +143,30 @@ class SNMPTrapReceiver:
             logger.error(f"Error processing trap: {e}", exc_info=True)
             self.error_count += 1
 
-    async def _send_alert(self, alert_payload: Dict[str, Any]):
-        """Send alert to NetStacks API."""
-        try:
-            url = f"{self.api_url}/api/alerts/"
-            logger.debug(f"Sending alert to {url}: {alert_payload}")
-
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(url, json=alert_payload)
-
-                if response.status_code in (200, 201):
-                    logger.info(f"Alert sent successfully: {alert_payload['title']}")
-                else:
-                    logger.error(f"Failed to send alert: {response.status_code} - {response.text}")
-                    self.error_count += 1
+    def _enqueue_alert(self, alert_payload: Dict[str, Any]):
+        """Hand an alert to the forwarding pipeline (runs on the main loop).
+
+        Traps cannot be paused, so alerts are dropped (and counted as errors)
+        while the forwarding queue is full. Agents over the per-agent rate
+        limit are sampled.
+        """
+        if self._agent_limiter is not None:
+            passed, sampled, dropped = self._agent_limiter.admit(alert_payload["device_name"])
+            if not passed:
+                self.rate_limited_count += 1
+                return
+            annotate(alert_payload, sampled, dropped)
+
+        delivery = get_forwarder().submit_nowait(alert_payload)
+        if delivery is None:
+            logger.warning(f"Forwarding queue full, dropping alert: {alert_payload['title']}")
+            self.error_count += 1
+            return
+        delivery.add_done_callback(self._on_delivered)
 
-        except Exception as e:
-            logger.error(f"Error sending alert: {e}")
+    def _on_delivered(self, delivery: asyncio.Future):
+        """Count alerts that could not be delivered to the API."""
+        if not delivery.result():
             self.error_count += 1
 
     async def stop(self):
@@ -173,7 +184,7 @@ class SNMPTrapReceiver:
 
     def get_stats(self) -> Dict[str, Any]:
         """Get receiver statistics."""
-        return {
+        stats = {
             "source_type": "snmp_trap",
             "trap_count": self.trap_count,
             "error_count": self.error_count,
@@ -181,3 +192,7 @@ class SNMPTrapReceiver:
             "listening_port": settings.snmp_trap_port,
             "running": self._running
         }
+        if self._agent_limiter is not None:
+            stats["rate_limited_count"] = self.rate_limited_count
+            stats["rate_limit"] = self._agent_limiter.get_stats()
+        return stats
@@ -0,0 +1,335 @@
+"""Multi-process SNMP Trap Receiver.
+
+Runs N receiver processes that all bind the trap port with SO_REUSEPORT, so
+the kernel shards incoming datagrams across them. Each worker decodes
+SNMPv1/v2c trap PDUs and maps them to alert payloads on its own core, then
+hands batches of payloads to the main process, which feeds them into the
+shared forwarding pipeline.
+
+Workers decode messages with the low-level pysnmp message API instead of a
+full SNMP engine, so only community-based v1/v2c notifications are
+supported (the same as the single-process receiver's configuration).
+INFORM requests are mapped like traps but not acknowledged.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import socket
+import threading
+import time
+from typing import Optional, Dict, Any, List, Set, Tuple
+
+from .config import settings
+from .forwarder import get_forwarder
+from .rate_limit import RateLimitConfig, KeyedRateLimiter, annotate
+
+logger = logging.getLogger(__name__)
+
+SNMP_TRAP_OID = "1.3.6.1.6.3.1.1.4.1.0"
+SNMP_TRAP_ENTERPRISE = "1.3.6.1.6.3.1.1.4.3.0"
+SNMP_TRAPS_PREFIX = "1.3.6.1.6.3.1.1.5"
+
+# How often workers report their counters to the main process (seconds)
+STATS_INTERVAL = 1.0
+
+
+def decode_trap(whole_msg: bytes, communities: Set[str]) -> List[Tuple[str, Optional[str], Dict[str, str]]]:
+    """Decode a datagram into (trap_oid, enterprise_oid, varbinds) tuples.
+
+    SNMPv1 traps are translated to SNMPv2 trap OIDs as in RFC 3584.
+    Messages with an unknown community raise PermissionError.
+    """
+    from pyasn1.codec.ber import decoder
+    from pysnmp.proto import api
+
+    traps = []
+    while whole_msg:
+        msg_version = int(api.decodeMessageVersion(whole_msg))
+        if msg_version not in api.protoModules:
+            raise ValueError(f"Unsupported SNMP version {msg_version}")
+        p_mod = api.protoModules[msg_version]
+
+        req_msg, whole_msg = decoder.decode(whole_msg, asn1Spec=p_mod.Message())
+        community = str(p_mod.apiMessage.getCommunity(req_msg))
+        if community not in communities:
+            raise PermissionError("Unknown community string")
+
+        req_pdu = p_mod.apiMessage.getPDU(req_msg)
+        trap_oid = None
+        enterprise_oid = None
+        varbinds: Dict[str, str] = {}
+
+        if msg_version == api.protoVersion1:
+            if not req_pdu.isSameTypeWith(p_mod.TrapPDU()):
+                continue
+            enterprise_oid = str(p_mod.apiTrapPDU.getEnterprise(req_pdu))
+            generic = int(p_mod.apiTrapPDU.getGenericTrap(req_pdu))
+            specific = int(p_mod.apiTrapPDU.getSpecificTrap(req_pdu))
+            if generic < 6:
+                trap_oid = f"{SNMP_TRAPS_PREFIX}.{generic + 1}"
+            else:
+                trap_oid = f"{enterprise_oid}.0.{specific}"
+            var_binds = p_mod.apiTrapPDU.getVarBinds(req_pdu)
+        else:
+            if not (req_pdu.isSameTypeWith(p_mod.SNMPv2TrapPDU())
+                    or req_pdu.isSameTypeWith(p_mod.InformRequestPDU())):
+                continue
+            var_binds = p_mod.apiPDU.getVarBinds(req_pdu)
+
+        for oid, val in var_binds:
+            oid_str = str(oid)
+            val_str = str(val)
+            if oid_str == SNMP_TRAP_OID:
+                trap_oid = val_str
+            elif oid_str == SNMP_TRAP_ENTERPRISE:
+                enterprise_oid = val_str
+            else:
+                varbinds[oid_str] = val_str
+
+        traps.append((trap_oid or "unknown", enterprise_oid, varbinds))
+    return traps
+
+
+def run_trap_worker(worker_id: int, out_queue, stop_event, address: str, port: int,
+                    communities: List[str], batch_size: int, flush_interval: float,
+                    rcvbuf: int):
+    """Worker process entry point: receive, decode and map traps until stopped."""
+    from .trap_mappings import trap_mapper
+
+    logging.basicConfig(
+        level=getattr(logging, settings.log_level.upper()),
+        format=f'%(asctime)s - trap-worker-{worker_id} - %(levelname)s - %(message)s'
+    )
+    community_set = set(communities)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    except OSError as e:
+        logger.warning(f"Could not set receive buffer to {rcvbuf}: {e}")
+    sock.bind((address, port))
+    sock.settimeout(flush_interval)
+    logger.info(f"Trap worker {worker_id} (pid {os.getpid()}) listening on {address}:{port}")
+
+    stats = {
+        "worker_id": worker_id,
+        "pid": os.getpid(),
+        "trap_count": 0,
+        "error_count": 0,
+        "auth_failures": 0,
+    }
+    batch: List[Dict[str, Any]] = []
+    last_flush = last_stats = time.monotonic()
+
+    while not stop_event.is_set():
+        try:
+            data, (agent_address, _) = sock.recvfrom(65535)
+        except socket.timeout:
+            data = None
+        except OSError as e:
+            logger.error(f"Socket error: {e}")
+            stats["error_count"] += 1
+            data = None
+
+        if data:
+            try:
+                for trap_oid, enterprise_oid, varbinds in decode_trap(data, community_set):
+                    batch.append(trap_mapper.map_trap_to_alert(
+                        trap_oid=trap_oid,
+                        agent_address=agent_address,
+                        varbinds=varbinds,
+                        enterprise_oid=enterprise_oid
+                    ))
+                    stats["trap_count"] += 1
+            except PermissionError:
+                stats["auth_failures"] += 1
+            except Exception as e:
+                logger.debug(f"Error decoding trap from {agent_address}: {e}")
+                stats["error_count"] += 1
+
+        now = time.monotonic()
+        if batch and (len(batch) >= batch_size or now - last_flush >= flush_interval):
+            out_queue.put(("alerts", worker_id, batch))
+            batch = []
+            last_flush = now
+        if now - last_stats >= STATS_INTERVAL:
+            stats["updated_at"] = time.time()
+            out_queue.put(("stats", worker_id, dict(stats)))
+            last_stats = now
+
+    if batch:
+        out_queue.put(("alerts", worker_id, batch))
+    stats["updated_at"] = time.time()
+    out_queue.put(("stats", worker_id, dict(stats)))
+    sock.close()
+
+
+class TrapWorkerPool:
+    """SNMP trap receiver backed by N SO_REUSEPORT worker processes.
+
+    Exposes the same start/stop/get_stats interface as SNMPTrapReceiver.
+    """
+
+    def __init__(self, api_url: str, workers: int):
+        self.api_url = api_url
+        self.workers = workers
+        self.forward_errors = 0
+        self.restart_count = 0
+        self.rate_limited_count = 0
+        self._running = False
+        rate_limit = RateLimitConfig.from_settings(settings.snmp_agent_rate_limit, settings.snmp_agent_rate_burst)
+        self._agent_limiter = KeyedRateLimiter(rate_limit, settings.rate_limit_max_keys) if rate_limit else None
+        self._ctx = multiprocessing.get_context("spawn")
+        self._queue = None
+        self._stop_event = None
+        self._processes: Dict[int, multiprocessing.Process] = {}
+        self._worker_stats: Dict[int, Dict[str, Any]] = {}
+        # Counters from worker processes that have since been restarted
+        self._retired = {"trap_count": 0, "error_count": 0, "auth_failures": 0}
+        self._drain_thread: Optional[threading.Thread] = None
+        self._main_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _spawn(self, worker_id: int):
+        communities = [c.strip() for c in settings.snmp_community_strings.split(',') if c.strip()]
+        process = self._ctx.Process(
+            target=run_trap_worker,
+            name=f"trap-worker-{worker_id}",
+            args=(
+                worker_id, self._queue, self._stop_event,
+                settings.snmp_trap_address, settings.snmp_trap_port, communities,
+                settings.snmp_worker_batch_size, settings.snmp_worker_flush_interval,
+                settings.snmp_worker_rcvbuf,
+            ),
+            daemon=True,
+        )
+        process.start()
+        self._processes[worker_id] = process
+
+    async def start(self, loop: asyncio.AbstractEventLoop):
+        """Start the worker processes and the result drain thread."""
+        logger.info(
+            f"Starting {self.workers} SNMP trap workers on "
+            f"{settings.snmp_trap_address}:{settings.snmp_trap_port} (SO_REUSEPORT)"
+        )
+        self._main_loop = loop
+        self._queue = self._ctx.Queue(maxsize=settings.snmp_worker_queue_size)
+        self._stop_event = self._ctx.Event()
+        self._running = True
+
+        for worker_id in range(self.workers):
+            self._spawn(worker_id)
+
+        self._drain_thread = threading.Thread(target=self._drain, name="trap-worker-drain", daemon=True)
+        self._drain_thread.start()
+        logger.info(f"Will forward alerts to: {get_forwarder().bulk_url}")
+
+    def _drain(self):
+        """Move worker output onto the main loop and restart dead workers."""
+        last_check = time.monotonic()
+        while self._running:
+            try:
+                message = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                message = None
+            except (EOFError, OSError):
+                break
+
+            if message is not None:
+                self._main_loop.call_soon_threadsafe(self._handle_message, message)
+
+            now = time.monotonic()
+            if now - last_check >= 1.0:
+                last_check = now
+                for worker_id, process in list(self._processes.items()):
+                    if not self._stop_event.is_set() and not process.is_alive():
+                        logger.warning(
+                            f"Trap worker {worker_id} exited with code {process.exitcode}, restarting"
+                        )
+                        self.restart_count += 1
+                        self._spawn(worker_id)
+
+    def _handle_message(self, message: Tuple[str, int, Any]):
+        """Handle a worker message on the main loop."""
+        kind, worker_id, payload = message
+        if kind == "stats":
+            previous = self._worker_stats.get(worker_id)
+            if previous and previous.get("pid") != payload.get("pid"):
+                for key in self._retired:
+                    self._retired[key] += previous.get(key, 0)
+            self._worker_stats[worker_id] = payload
+            return
+
+        forwarder = get_forwarder()
+        for alert_payload in payload:
+            if self._agent_limiter is not None:
+                passed, sampled, dropped = self._agent_limiter.admit(alert_payload["device_name"])
+                if not passed:
+                    self.rate_limited_count += 1
+                    continue
+                annotate(alert_payload, sampled, dropped)
+            delivery = forwarder.submit_nowait(alert_payload)
+            if delivery is None:
+                self.forward_errors += 1
+            else:
+                delivery.add_done_callback(self._on_delivered)
+
+    def _on_delivered(self, delivery: asyncio.Future):
+        if not delivery.result():
+            self.forward_errors += 1
+
+    async def stop(self):
+        """Stop all worker processes."""
+        logger.info("Stopping SNMP trap workers...")
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+        loop = asyncio.get_running_loop()
+        for process in self._processes.values():
+            await loop.run_in_executor(None, process.join, 5.0)
+            if process.is_alive():
+                process.terminate()
+
+        # Let the drain thread pick up the workers' final batches and stats
+        await asyncio.sleep(1.0)
+        self._running = False
+        if self._drain_thread is not None:
+            await loop.run_in_executor(None, self._drain_thread.join, 2.0)
+
+        stats = self.get_stats()
+        logger.info(
+            f"Trap workers stopped. Processed {stats['trap_count']} traps, "
+            f"{stats['error_count']} errors"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get receiver statistics aggregated across worker processes."""
+        workers = []
+        for worker_id in range(self.workers):
+            process = self._processes.get(worker_id)
+            worker = dict(self._worker_stats.get(worker_id, {"worker_id": worker_id}))
+            worker["alive"] = bool(process and process.is_alive())
+            workers.append(worker)
+
+        totals = dict(self._retired)
+        for worker in workers:
+            for key in totals:
+                totals[key] += worker.get(key, 0)
+        stats = {
+            "source_type": "snmp_trap",
+            "trap_count": totals["trap_count"],
+            "error_count": totals["error_count"] + self.forward_errors,
+            "auth_failures": totals["auth_failures"],
+            "listening_address": settings.snmp_trap_address,
+            "listening_port": settings.snmp_trap_port,
+            "running": self._running,
+            "worker_count": self.workers,
+            "restart_count": self.restart_count,
+            "workers": workers,
+        }
+        if self._agent_limiter is not None:
+            stats["rate_limited_count"] = self.rate_limited_count
+            stats["rate_limit"] = self._agent_limiter.get_stats()
+        return stats
@@ -46,6 +46,15 @@ class Settings(BaseSettings):
     AUTH_SERVICE_URL: str = 'http://auth:8011'
     CONFIG_SERVICE_URL: str = 'http://config:8002'
 
+    # Inter-service HTTP client pool
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+
+    # Bulk device resolution via the devices service batch endpoint:
+    # names per request, and max requests in flight at once
+    DEVICE_RESOLVE_BATCH_SIZE: int = 500
+    DEVICE_RESOLVE_CONCURRENCY: int = 4
+
 
 @lru_cache()
 def get_settings() -> Settings:
@@ -7,11 +7,16 @@ Provides Celery task management and worker monitoring APIs.
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+
+from netstacks_core.db import dispose_async_engine
 
 from app.config import get_settings
 from app.routes import tasks, workers, deploy, bulk, config_backups, services, platform
+from app.services.device_resolver import DeviceResolveError
+from app.services.http_client import close_http_client
 
 # Configure logging
 logging.basicConfig(
@@ -34,6 +39,8 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     log.info("Shutting down tasks service")
+    await close_http_client()
+    await dispose_async_engine()
 
 
 # Create FastAPI application
@@ -64,6 +71,13 @@ app.include_router(services.router)
 app.include_router(platform.router)
 
 
+@app.exception_handler(DeviceResolveError)
+async def device_resolve_error_handler(request: Request, exc: DeviceResolveError):
+    """Report Devices service failures as such, not as missing devices."""
+    log.error(f"Device resolution failed for {request.url.path}: {exc}")
+    return JSONResponse(status_code=502, content={"detail": str(exc)})
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -5,17 +5,21 @@ Provides endpoints for executing operations on multiple devices via Celery.
 """
 
 import logging
+import uuid
+from datetime import datetime
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel, Field
 
 from fastapi import APIRouter, HTTPException, Header, Depends
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
-import httpx
 
 from netstacks_core.db import get_db, TaskHistory
 
 from app.config import get_settings
-from app.services.celery_client import celery_app
+from app.services.celery_client import submit_tasks_bulk
+from app.services.device_resolver import fetch_connection_args
+from app.services.http_client import get_http_client
 
 log = logging.getLogger(__name__)
 settings = get_settings()
@@ -54,123 +58,107 @@ class BulkDeleteRequest(BaseModel):
     devices: List[str] = Field(..., description="List of device names to delete")
 
 
-async def get_device_with_credentials(
-    device_name: str,
+async def resolve_devices(
+    device_names: List[str],
     auth_header: Optional[str] = None,
     custom_username: Optional[str] = None,
     custom_password: Optional[str] = None
-) -> Optional[Dict[str, Any]]:
+) -> List[Optional[Dict[str, Any]]]:
     """
-    Get device info and credentials from Devices and Auth services.
+    Resolve device info and credentials for many devices in one batch.
+
+    Connection args come fully resolved from the Devices service batch
+    endpoint. Credential precedence:
+    1. Custom credentials passed in request
+    2. Device-specific overrides
+    3. Default settings
+
+    Results are returned in the same order as device_names, with None
+    for devices that do not exist. DeviceResolveError propagates if the
+    Devices service could not be reached.
     """
-    devices_url = settings.DEVICES_SERVICE_URL
-    auth_url = settings.AUTH_SERVICE_URL
+    resolved = await fetch_connection_args(device_names, auth_header)
 
-    headers = {"Content-Type": "application/json"}
-    if auth_header:
-        headers["Authorization"] = auth_header
+    results = []
+    for device_name in device_names:
+        entry = resolved.get(device_name)
+        if not entry:
+            results.append(None)
+            continue
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            # Get device info
-            device_resp = await client.get(
-                f"{devices_url}/api/devices/{device_name}",
-                headers=headers
-            )
-            if device_resp.status_code != 200:
-                return None
+        connection_args = dict(entry["connection_args"])
+        if custom_username:
+            connection_args["username"] = custom_username
+        if custom_password:
+            connection_args["password"] = custom_password
 
-            device_data = device_resp.json().get("data", {}).get("device", {})
-            if not device_data:
-                return None
+        results.append({
+            "device": entry["device"],
+            "connection_args": connection_args
+        })
 
-            # Get device overrides with unmasked credentials
-            override_resp = await client.get(
-                f"{devices_url}/api/device-overrides/{device_name}/connection-args",
-                headers=headers
-            )
-            override = {}
-            if override_resp.status_code == 200:
-                resp_data = override_resp.json().get("data", {})
-                override = resp_data.get("connection_args") or {}
-
-            # Get default credentials (unmasked)
-            settings_resp = await client.get(
-                f"{auth_url}/api/settings/credentials/default",
-                headers=headers
-            )
-            default_settings = {}
-            if settings_resp.status_code == 200:
-                default_settings = settings_resp.json().get("data", {})
-
-            # Build connection args with credential precedence:
-            # 1. Custom credentials passed in request
-            # 2. Device-specific overrides
-            # 3. Default settings
-            connection_args = {
-                "device_type": override.get("device_type") or device_data.get("device_type", "cisco_ios"),
-                "host": override.get("host") or device_data.get("host"),
-                "port": override.get("port") or device_data.get("port") or 22,
-                "username": (
-                    custom_username or
-                    override.get("username") or
-                    default_settings.get("default_username", "")
-                ),
-                "password": (
-                    custom_password or
-                    override.get("password") or
-                    default_settings.get("default_password", "")
-                ),
-                # Disable SSH keys/agent to force password/keyboard-interactive auth
-                "use_keys": False,
-                "allow_agent": False,
-                # Timeout settings from device overrides or global defaults
-                "timeout": override.get("timeout") or default_settings.get("default_timeout", 30),
-                "conn_timeout": override.get("conn_timeout") or default_settings.get("default_conn_timeout", 10),
-                "auth_timeout": override.get("auth_timeout") or default_settings.get("default_auth_timeout", 10),
-                "banner_timeout": override.get("banner_timeout") or default_settings.get("default_banner_timeout", 15),
-            }
+    return results
 
-            # Add enable secret if available
-            if override.get("enable_password"):
-                connection_args["secret"] = override["enable_password"]
-            elif override.get("secret"):
-                connection_args["secret"] = override["secret"]
 
-            return {
-                "device": device_data,
-                "connection_args": connection_args
-            }
+def build_task_args(device_info: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Return cleaned connection args, or None if the device can't be used."""
+    if not device_info:
+        return None
+
+    connection_args = device_info["connection_args"]
 
-        except httpx.RequestError as e:
-            log.error(f"Error connecting to services: {e}")
-            return None
+    # Skip if no credentials
+    if not connection_args.get("username") or not connection_args.get("password"):
+        return None
 
+    # Clean None values
+    return {k: v for k, v in connection_args.items() if v is not None}
 
-def submit_celery_task(task_name: str, **kwargs) -> str:
-    """Submit a task to Celery."""
-    task = celery_app.send_task(task_name, kwargs=kwargs)
-    return task.id
 
+def record_tasks(session: Session, entries: List[Dict[str, str]], task_name: str = None, action_type: str = None):
+    """Record a batch of tasks to the database for history tracking.
 
-def record_task(session: Session, task_id: str, device_name: str, task_name: str = None, action_type: str = None):
-    """Record a task to the database for history tracking."""
+    Call this before publishing the tasks: workers only update existing rows.
+
+    Args:
+        entries: Dicts with task_id and device_name
+    """
+    if not entries:
+        return
     try:
-        entry = TaskHistory(
-            task_id=task_id,
-            device_name=device_name,
-            task_name=task_name,
-            action_type=action_type,
-            status='pending'
-        )
-        session.add(entry)
+        session.execute(insert(TaskHistory), [
+            {
+                "task_id": entry["task_id"],
+                "device_name": entry["device_name"],
+                "task_name": task_name,
+                "action_type": action_type,
+                "status": "pending",
+            }
+            for entry in entries
+        ])
         session.commit()
-        log.debug(f"Recorded task {task_id} for device {device_name} (action: {action_type})")
+        log.debug(f"Recorded {len(entries)} tasks (action: {action_type})")
     except Exception as e:
         log.error(f"Failed to record task history: {e}")
         session.rollback()
 
 
+def fail_recorded_tasks(session: Session, task_ids: List[str], error: str):
+    """Mark recorded tasks as failed when they could not be published."""
+    if not task_ids:
+        return
+    try:
+        session.execute(
+            update(TaskHistory)
+            .where(TaskHistory.task_id.in_(task_ids))
+            .values(status="failure", error=error, completed_at=datetime.utcnow())
+        )
+        session.commit()
+    except Exception as e:
+        log.error(f"Failed to update task history: {e}")
+        session.rollback()
+
+
 @router.post("/test")
 async def bulk_test_devices(
     request: BulkTestRequest,
@@ -183,29 +171,17 @@ async def bulk_test_devices(
     if not request.devices:
         raise HTTPException(status_code=400, detail="No devices specified")
 
-    task_ids = []
+    resolved = await resolve_devices(request.devices, authorization)
 
-    for device_name in request.devices:
-        device_info = await get_device_with_credentials(device_name, authorization)
-
-        if not device_info:
-            continue
-
-        connection_args = device_info["connection_args"]
-
-        # Skip if no credentials
-        if not connection_args.get("username") or not connection_args.get("password"):
+    kwargs_list = []
+    for device_info in resolved:
+        clean_args = build_task_args(device_info)
+        if clean_args is None:
             continue
+        kwargs_list.append({"connection_args": clean_args})
 
-        # Clean None values
-        clean_args = {k: v for k, v in connection_args.items() if v is not None}
-
-        task_id = submit_celery_task(
-            "tasks.device_tasks.test_connectivity",
-            connection_args=clean_args
-        )
-        task_ids.append(task_id)
-        log.info(f"Dispatched test_connectivity task {task_id} for {device_name}")
+    task_ids = submit_tasks_bulk("tasks.device_tasks.test_connectivity", kwargs_list)
+    log.info(f"Dispatched {len(task_ids)} test_connectivity tasks")
 
     return {"task_ids": task_ids}
 
@@ -222,35 +198,26 @@ async def bulk_get_config(
     if not request.devices:
         raise HTTPException(status_code=400, detail="No devices specified")
 
-    task_ids = []
-
-    for device_name in request.devices:
-        device_info = await get_device_with_credentials(
-            device_name,
-            authorization,
-            request.username,
-            request.password
-        )
-
-        if not device_info:
+    resolved = await resolve_devices(
+        request.devices,
+        authorization,
+        request.username,
+        request.password
+    )
+
+    kwargs_list = []
+    for device_info in resolved:
+        clean_args = build_task_args(device_info)
+        if clean_args is None:
             continue
+        kwargs_list.append({
+            "connection_args": clean_args,
+            "command": request.command,
+            "use_textfsm": request.use_textfsm
+        })
 
-        connection_args = device_info["connection_args"]
-
-        # Skip if no credentials
-        if not connection_args.get("username") or not connection_args.get("password"):
-            continue
-
-        clean_args = {k: v for k, v in connection_args.items() if v is not None}
-
-        task_id = submit_celery_task(
-            "tasks.device_tasks.get_config",
-            connection_args=clean_args,
-            command=request.command,
-            use_textfsm=request.use_textfsm
-        )
-        task_ids.append(task_id)
-        log.info(f"Dispatched get_config task {task_id} for {device_name}")
+    task_ids = submit_tasks_bulk("tasks.device_tasks.get_config", kwargs_list)
+    log.info(f"Dispatched {len(task_ids)} get_config tasks")
 
     return {"task_ids": task_ids}
 
@@ -278,63 +245,53 @@ async def bulk_set_config(
         if authorization:
             headers["Authorization"] = authorization
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            template_resp = await client.get(
-                f"{config_url}/api/templates/{request.template_name}",
-                headers=headers
+        template_resp = await get_http_client().get(
+            f"{config_url}/api/templates/{request.template_name}",
+            headers=headers
+        )
+        if template_resp.status_code != 200:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Template not found: {request.template_name}"
             )
-            if template_resp.status_code != 200:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Template not found: {request.template_name}"
-                )
-
-            template_data = template_resp.json().get("data", {}).get("template", {})
-            template_content = template_data.get("content", "")
-
-            # Render with Jinja2
-            from jinja2 import Template
-            try:
-                jinja_template = Template(template_content)
-                final_config = jinja_template.render(**(request.template_vars or {}))
-            except Exception as e:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Template rendering error: {str(e)}"
-                )
-
-    task_ids = []
 
-    for device_name in request.devices:
-        device_info = await get_device_with_credentials(
-            device_name,
-            authorization,
-            request.username,
-            request.password
-        )
+        template_data = template_resp.json().get("data", {}).get("template", {})
+        template_content = template_data.get("content", "")
 
-        if not device_info:
-            continue
+        # Render with Jinja2
+        from jinja2 import Template
+        try:
+            jinja_template = Template(template_content)
+            final_config = jinja_template.render(**(request.template_vars or {}))
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Template rendering error: {str(e)}"
+            )
 
-        connection_args = device_info["connection_args"]
+    resolved = await resolve_devices(
+        request.devices,
+        authorization,
+        request.username,
+        request.password
+    )
 
-        # Skip if no credentials
-        if not connection_args.get("username") or not connection_args.get("password"):
-            continue
+    # Convert config string to lines
+    config_lines = final_config.split("\n") if final_config else []
 
-        clean_args = {k: v for k, v in connection_args.items() if v is not None}
+    kwargs_list = []
+    for device_info in resolved:
+        clean_args = build_task_args(device_info)
+        if clean_args is None:
+            continue
+        kwargs_list.append({
+            "connection_args": clean_args,
+            "config_lines": config_lines,
+            "save_config": not request.dry_run
+        })
 
-        # Convert config string to lines
-        config_lines = final_config.split("\n") if final_config else []
-
-        task_id = submit_celery_task(
-            "tasks.device_tasks.set_config",
-            connection_args=clean_args,
-            config_lines=config_lines,
-            save_config=not request.dry_run
-        )
-        task_ids.append(task_id)
-        log.info(f"Dispatched set_config task {task_id} for {device_name}")
+    task_ids = submit_tasks_bulk("tasks.device_tasks.set_config", kwargs_list)
+    log.info(f"Dispatched {len(task_ids)} set_config tasks")
 
     return {"task_ids": task_ids}
 
@@ -367,37 +324,45 @@ async def bulk_backup_devices(
         except Exception:
             pass
 
-    task_ids = []
-
-    for device_name in request.devices:
-        device_info = await get_device_with_credentials(device_name, authorization)
+    resolved = await resolve_devices(request.devices, authorization)
 
-        if not device_info:
+    device_names = []
+    kwargs_list = []
+    for device_name, device_info in zip(request.devices, resolved):
+        clean_args = build_task_args(device_info)
+        if clean_args is None:
             continue
+        device_names.append(device_name)
+        kwargs_list.append({
+            "connection_args": clean_args,
+            "device_name": device_name,
+            "device_platform": device_info["device"].get("platform"),
+            "created_by": username
+        })
+
+    task_name = "tasks.backup_tasks.backup_device_config"
+    task_ids = [str(uuid.uuid4()) for _ in kwargs_list]
+
+    # Record tasks to database for monitoring before publishing them, so
+    # the worker has a row to update however quickly the task runs
+    record_tasks(
+        session,
+        [
+            {"task_id": task_id, "device_name": f"backup:{device_name}"}
+            for task_id, device_name in zip(task_ids, device_names)
+        ],
+        task_name,
+        action_type="backup"
+    )
 
-        connection_args = device_info["connection_args"]
-        device_data = device_info["device"]
-
-        # Skip if no credentials
-        if not connection_args.get("username") or not connection_args.get("password"):
-            continue
-
-        clean_args = {k: v for k, v in connection_args.items() if v is not None}
-
-        task_name = "tasks.backup_tasks.backup_device_config"
-        task_id = submit_celery_task(
-            task_name,
-            connection_args=clean_args,
-            device_name=device_name,
-            device_platform=device_data.get("platform"),
-            created_by=username
-        )
-
-        # Record task to database for monitoring
-        record_task(session, task_id, f"backup:{device_name}", task_name, action_type="backup")
+    try:
+        submit_tasks_bulk(task_name, kwargs_list, task_ids)
+    except Exception as e:
+        log.error(f"Error publishing backup tasks: {e}")
+        fail_recorded_tasks(session, task_ids, f"Failed to publish task: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to publish backup tasks: {e}")
 
-        task_ids.append(task_id)
-        log.info(f"Dispatched backup task {task_id} for {device_name}")
+    log.info(f"Dispatched {len(task_ids)} backup tasks")
 
     return {"task_ids": task_ids, "success": True}
 
@@ -422,25 +387,25 @@ async def bulk_delete_devices(
     deleted = 0
     errors = []
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        for device_name in request.devices:
-            try:
-                response = await client.delete(
-                    f"{devices_url}/api/devices/{device_name}",
-                    headers=headers
-                )
-
-                if response.status_code == 200:
-                    result = response.json()
-                    if result.get("success"):
-                        deleted += 1
-                    else:
-                        errors.append(f"{device_name}: {result.get('error', 'Unknown error')}")
+    client = get_http_client()
+    for device_name in request.devices:
+        try:
+            response = await client.delete(
+                f"{devices_url}/api/devices/{device_name}",
+                headers=headers
+            )
+
+            if response.status_code == 200:
+                result = response.json()
+                if result.get("success"):
+                    deleted += 1
                 else:
-                    errors.append(f"{device_name}: HTTP {response.status_code}")
+                    errors.append(f"{device_name}: {result.get('error', 'Unknown error')}")
+            else:
+                errors.append(f"{device_name}: HTTP {response.status_code}")
 
-            except Exception as e:
-                errors.append(f"{device_name}: {str(e)}")
+        except Exception as e:
+            errors.append(f"{device_name}: {str(e)}")
 
     return {
         "deleted": deleted,
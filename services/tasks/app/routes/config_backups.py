@@ -8,14 +8,15 @@ import logging
 import re
 import uuid
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, HTTPException, Header
 from pydantic import BaseModel, Field
-import httpx
 
 from app.config import get_settings
-from app.services.celery_client import celery_app
+from app.services.celery_client import celery_app, submit_tasks_bulk
+from app.services.device_resolver import DeviceResolveError, fetch_connection_args
+from app.services.http_client import get_http_client
 
 log = logging.getLogger(__name__)
 settings = get_settings()
@@ -47,14 +48,15 @@ async def get_all_devices(auth_header: Optional[str] = None) -> List[dict]:
     if auth_header:
         headers["Authorization"] = auth_header
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.get(f"{devices_url}/api/devices", headers=headers)
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("data", {}).get("devices", [])
-        except Exception as e:
-            log.error(f"Error fetching devices: {e}")
+    try:
+        response = await get_http_client().get(
+            f"{devices_url}/api/devices", headers=headers, timeout=30.0
+        )
+        if response.status_code == 200:
+            data = response.json()
+            return data.get("data", {}).get("devices", [])
+    except Exception as e:
+        log.error(f"Error fetching devices: {e}")
     return []
 
 
@@ -65,16 +67,51 @@ async def get_backup_schedule(auth_header: Optional[str] = None) -> dict:
     if auth_header:
         headers["Authorization"] = auth_header
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            response = await client.get(f"{devices_url}/api/backup-schedule", headers=headers)
-            if response.status_code == 200:
-                return response.json()
-        except Exception as e:
-            log.error(f"Error fetching backup schedule: {e}")
+    try:
+        response = await get_http_client().get(f"{devices_url}/api/backup-schedule", headers=headers)
+        if response.status_code == 200:
+            return response.json()
+    except Exception as e:
+        log.error(f"Error fetching backup schedule: {e}")
     return {}
 
 
+def _to_connection_info(device_name: str, entry: Optional[dict]) -> Optional[dict]:
+    """Convert a batch connection-args entry to the shape used by the backup routes."""
+    if not entry:
+        return None
+
+    # If device is disabled, return error dict to block all operations
+    if entry.get("disabled"):
+        log.info(f"Device {device_name} is disabled, skipping operation")
+        return {"error": "disabled", "message": f"Device {device_name} is disabled"}
+
+    return {
+        "device_info": entry["device"],
+        "connection_args": entry["connection_args"]
+    }
+
+
+async def resolve_device_connection_infos(
+    device_names: List[str],
+    auth_header: Optional[str] = None
+) -> List[Optional[dict]]:
+    """
+    Get connection info including credentials for many devices in one batch.
+
+    Returns:
+        One entry per device name, in order: a dict with device_info and
+        connection_args, a dict with 'error' key if the device is disabled,
+        or None if not found.
+
+    Raises:
+        DeviceResolveError: if the Devices service could not be reached
+    """
+    resolved = await fetch_connection_args(device_names, auth_header)
+
+    return [_to_connection_info(name, resolved.get(name)) for name in device_names]
+
+
 async def get_device_connection_info(
     device_name: str,
     auth_header: Optional[str] = None
@@ -84,99 +121,7 @@ async def get_device_connection_info(
     Returns:
         Dict with device_info and connection_args, or dict with 'error' key if device is disabled, or None if not found.
     """
-    devices_url = settings.DEVICES_SERVICE_URL
-    auth_url = settings.AUTH_SERVICE_URL
-    headers = {"Content-Type": "application/json"}
-    if auth_header:
-        headers["Authorization"] = auth_header
-
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            # Get device info
-            device_resp = await client.get(
-                f"{devices_url}/api/devices/{device_name}",
-                headers=headers
-            )
-            if device_resp.status_code != 200:
-                return None
-
-            device_data = device_resp.json().get("data", {}).get("device", {})
-            if not device_data:
-                return None
-
-            # Get device overrides with unmasked credentials
-            override_resp = await client.get(
-                f"{devices_url}/api/device-overrides/{device_name}/connection-args",
-                headers=headers
-            )
-            override = {}
-            device_disabled = False
-            if override_resp.status_code == 200:
-                resp_data = override_resp.json().get("data", {})
-                override = resp_data.get("connection_args") or {}
-                device_disabled = resp_data.get("disabled", False)
-
-            # If device is disabled, return error dict to block all operations
-            if device_disabled:
-                log.info(f"Device {device_name} is disabled, skipping operation")
-                return {"error": "disabled", "message": f"Device {device_name} is disabled"}
-
-            # Get default credentials (unmasked)
-            settings_resp = await client.get(
-                f"{auth_url}/api/settings/credentials/default",
-                headers=headers
-            )
-            default_settings = {}
-            if settings_resp.status_code == 200:
-                default_settings = settings_resp.json().get("data", {})
-
-            # Build connection args
-            connection_args = {
-                "device_type": override.get("device_type") or device_data.get("device_type", "cisco_ios"),
-                "host": override.get("host") or device_data.get("host"),
-                "port": override.get("port") or device_data.get("port") or 22,
-                # Disable SSH keys/agent to force password/keyboard-interactive auth
-                "use_keys": False,
-                "allow_agent": False,
-            }
-
-            # Apply credentials - override takes precedence over defaults
-            if override.get("username"):
-                connection_args["username"] = override["username"]
-                connection_args["password"] = override.get("password", "")
-            else:
-                connection_args["username"] = default_settings.get("default_username", "")
-                connection_args["password"] = default_settings.get("default_password", "")
-
-            # Apply timeout settings - device override takes precedence, then global defaults
-            connection_args["timeout"] = (
-                override.get("timeout") or
-                default_settings.get("default_timeout", 30)
-            )
-            connection_args["conn_timeout"] = (
-                override.get("conn_timeout") or
-                default_settings.get("default_conn_timeout", 10)
-            )
-            connection_args["auth_timeout"] = (
-                override.get("auth_timeout") or
-                default_settings.get("default_auth_timeout", 10)
-            )
-            connection_args["banner_timeout"] = (
-                override.get("banner_timeout") or
-                default_settings.get("default_banner_timeout", 15)
-            )
-
-            if override.get("secret"):
-                connection_args["secret"] = override["secret"]
-
-            return {
-                "device_info": device_data,
-                "connection_args": connection_args
-            }
-
-        except httpx.RequestError as e:
-            log.error(f"Error getting device connection info: {e}")
-            return None
+    return (await resolve_device_connection_infos([device_name], auth_header))[0]
 
 
 async def create_config_snapshot(
@@ -197,24 +142,21 @@ async def create_config_snapshot(
 
     # Direct DB insert since we have access to shared models
     try:
-        from netstacks_core.db import get_session, ConfigSnapshot as ConfigSnapshotModel
-
-        session = get_session()
-        snapshot = ConfigSnapshotModel(
-            snapshot_id=snapshot_id,
-            name=name,
-            description=description,
-            snapshot_type=snapshot_type,
-            status='in_progress',
-            total_devices=total_devices,
-            success_count=0,
-            failed_count=0,
-            skipped_count=0,
-            created_by=created_by
-        )
-        session.add(snapshot)
-        session.commit()
-        session.close()
+        from netstacks_core.db import async_session_scope, ConfigSnapshot as ConfigSnapshotModel
+
+        async with async_session_scope() as session:
+            session.add(ConfigSnapshotModel(
+                snapshot_id=snapshot_id,
+                name=name,
+                description=description,
+                snapshot_type=snapshot_type,
+                status='in_progress',
+                total_devices=total_devices,
+                success_count=0,
+                failed_count=0,
+                skipped_count=0,
+                created_by=created_by
+            ))
         return snapshot_id
     except Exception as e:
         log.error(f"Error creating snapshot: {e}")
@@ -226,23 +168,139 @@ async def save_task_history(
     device_name: str,
     auth_header: Optional[str] = None
 ):
-    """Save task to task_history table."""
-    try:
-        from netstacks_core.db import get_session, TaskHistory
+    """Save task to task_history table. Call before publishing the task."""
+    await save_task_histories([{"task_id": task_id, "device_name": device_name}])
 
-        session = get_session()
-        task = TaskHistory(
-            task_id=task_id,
-            device_name=device_name,
-            status='pending'
-        )
-        session.add(task)
-        session.commit()
-        session.close()
+
+async def save_task_histories(entries: List[Dict[str, str]]):
+    """Save a batch of tasks to the task_history table in one statement.
+
+    Call this before publishing the tasks: workers only update existing rows.
+
+    Args:
+        entries: Dicts with task_id and device_name
+    """
+    if not entries:
+        return
+    try:
+        from sqlalchemy import insert
+        from netstacks_core.db import async_session_scope, TaskHistory
+
+        async with async_session_scope() as session:
+            await session.execute(insert(TaskHistory), [
+                {
+                    "task_id": entry["task_id"],
+                    "device_name": entry["device_name"],
+                    "status": "pending",
+                }
+                for entry in entries
+            ])
     except Exception as e:
         log.error(f"Error saving task history: {e}")
 
 
+async def fail_task_histories(task_ids: List[str], error: str):
+    """Mark saved tasks as failed when they could not be published."""
+    if not task_ids:
+        return
+    try:
+        from sqlalchemy import update
+        from netstacks_core.db import async_session_scope, TaskHistory
+
+        async with async_session_scope() as session:
+            await session.execute(
+                update(TaskHistory)
+                .where(TaskHistory.task_id.in_(task_ids))
+                .values(status='failure', error=error, completed_at=datetime.utcnow())
+            )
+    except Exception as e:
+        log.error(f"Error updating task history: {e}")
+
+
+async def submit_snapshot_backups(
+    device_names: List[str],
+    snapshot_id: str,
+    juniper_set_format: bool,
+    created_by: Optional[str],
+    auth_header: Optional[str] = None
+) -> Tuple[List[dict], List[dict]]:
+    """
+    Resolve devices concurrently and publish their backup tasks in bulk.
+
+    Returns:
+        Tuple of (submitted, failed) lists
+    """
+    submitted = []
+    failed = []
+
+    try:
+        resolved = await resolve_device_connection_infos(device_names, auth_header)
+    except DeviceResolveError as e:
+        # Fail every device with the real cause so the snapshot is closed out
+        log.error(f"Could not resolve devices for snapshot {snapshot_id}: {e}")
+        return submitted, [{"device": name, "error": str(e)} for name in device_names]
+    queued_names = []
+    kwargs_list = []
+
+    for device_name, device_info in zip(device_names, resolved):
+        if not device_info:
+            failed.append({"device": device_name, "error": "Could not get connection info"})
+            continue
+
+        # Check if device is disabled
+        if device_info.get("error") == "disabled":
+            failed.append({"device": device_name, "error": "Device is disabled"})
+            continue
+
+        connection_args = device_info["connection_args"]
+
+        # Skip if no credentials
+        if not connection_args.get("username") or not connection_args.get("password"):
+            failed.append({"device": device_name, "error": "No credentials configured"})
+            continue
+
+        # Clean None values
+        clean_args = {k: v for k, v in connection_args.items() if v is not None}
+
+        queued_names.append(device_name)
+        kwargs_list.append({
+            "connection_args": clean_args,
+            "device_name": device_name,
+            "device_platform": device_info["device_info"].get("platform"),
+            "juniper_set_format": juniper_set_format,
+            "snapshot_id": snapshot_id,
+            "created_by": created_by
+        })
+
+    # Save task history before publishing, so the worker has a row to
+    # update however quickly the task runs
+    task_ids = [str(uuid.uuid4()) for _ in kwargs_list]
+    await save_task_histories([
+        {
+            "task_id": task_id,
+            "device_name": f"snapshot:{snapshot_id}:backup:{device_name}",
+        }
+        for task_id, device_name in zip(task_ids, queued_names)
+    ])
+
+    try:
+        submit_tasks_bulk("tasks.backup_tasks.backup_device_config", kwargs_list, task_ids)
+    except Exception as e:
+        log.error(f"Error publishing backup tasks: {e}")
+        await fail_task_histories(task_ids, f"Failed to publish task: {e}")
+        failed.extend({"device": name, "error": str(e)} for name in queued_names)
+        return submitted, failed
+
+    for task_id, device_name in zip(task_ids, queued_names):
+        submitted.append({
+            "device": device_name,
+            "task_id": task_id,
+            "snapshot_id": snapshot_id
+        })
+
+    return submitted, failed
+
+
 def get_username_from_token(auth_header: Optional[str]) -> Optional[str]:
     """Extract username from JWT token."""
     if not auth_header or not auth_header.startswith("Bearer "):
@@ -266,30 +324,28 @@ async def update_snapshot_for_skipped_devices(snapshot_id: str, skipped: int):
     Uses the skipped_count column and checks if the snapshot is now complete.
     """
     try:
-        from netstacks_core.db import get_session, ConfigSnapshot as ConfigSnapshotModel
-
-        session = get_session()
-        snapshot = session.query(ConfigSnapshotModel).filter(
-            ConfigSnapshotModel.snapshot_id == snapshot_id
-        ).first()
-
-        if snapshot:
-            # Update skipped count
-            snapshot.skipped_count = (snapshot.skipped_count or 0) + skipped
-
-            # Check if snapshot is now complete (success + failed + skipped = total)
-            total_processed = (snapshot.success_count or 0) + (snapshot.failed_count or 0) + (snapshot.skipped_count or 0)
-            if total_processed >= snapshot.total_devices:
-                # Status is 'complete' only if all succeeded, 'partial' if any failed or skipped
-                if snapshot.failed_count == 0 and snapshot.skipped_count == 0:
-                    snapshot.status = 'complete'
-                else:
-                    snapshot.status = 'partial'
-                snapshot.completed_at = datetime.utcnow()
-                log.info(f"Snapshot {snapshot_id} marked as {snapshot.status} (skipped {skipped} devices)")
-
-            session.commit()
-        session.close()
+        from sqlalchemy import select
+        from netstacks_core.db import async_session_scope, ConfigSnapshot as ConfigSnapshotModel
+
+        async with async_session_scope() as session:
+            snapshot = (await session.execute(
+                select(ConfigSnapshotModel).where(ConfigSnapshotModel.snapshot_id == snapshot_id)
+            )).scalars().first()
+
+            if snapshot:
+                # Update skipped count
+                snapshot.skipped_count = (snapshot.skipped_count or 0) + skipped
+
+                # Check if snapshot is now complete (success + failed + skipped = total)
+                total_processed = (snapshot.success_count or 0) + (snapshot.failed_count or 0) + (snapshot.skipped_count or 0)
+                if total_processed >= snapshot.total_devices:
+                    # Status is 'complete' only if all succeeded, 'partial' if any failed or skipped
+                    if snapshot.failed_count == 0 and snapshot.skipped_count == 0:
+                        snapshot.status = 'complete'
+                    else:
+                        snapshot.status = 'partial'
+                    snapshot.completed_at = datetime.utcnow()
+                    log.info(f"Snapshot {snapshot_id} marked as {snapshot.status} (skipped {skipped} devices)")
     except Exception as e:
         log.error(f"Error updating snapshot for skipped devices: {e}")
 
@@ -354,62 +410,13 @@ async def run_all_device_backups(
         log.info(f"Created snapshot {snapshot_id} for {len(devices)} devices")
 
         # Submit backup tasks
-        submitted = []
-        failed = []
-
-        for device in devices:
-            device_name = device.get("name")
-            try:
-                device_info = await get_device_connection_info(device_name, authorization)
-
-                if not device_info:
-                    failed.append({"device": device_name, "error": "Could not get connection info"})
-                    continue
-
-                # Check if device is disabled
-                if device_info.get("error") == "disabled":
-                    failed.append({"device": device_name, "error": "Device is disabled"})
-                    continue
-
-                connection_args = device_info["connection_args"]
-
-                # Skip if no credentials
-                if not connection_args.get("username") or not connection_args.get("password"):
-                    failed.append({"device": device_name, "error": "No credentials configured"})
-                    continue
-
-                # Clean None values
-                clean_args = {k: v for k, v in connection_args.items() if v is not None}
-
-                # Submit Celery task
-                task = celery_app.send_task(
-                    "tasks.backup_tasks.backup_device_config",
-                    kwargs={
-                        "connection_args": clean_args,
-                        "device_name": device_name,
-                        "device_platform": device_info["device_info"].get("platform"),
-                        "juniper_set_format": juniper_set_format,
-                        "snapshot_id": snapshot_id,
-                        "created_by": created_by
-                    }
-                )
-                task_id = task.id
-
-                # Save task history
-                await save_task_history(
-                    task_id=task_id,
-                    device_name=f"snapshot:{snapshot_id}:backup:{device_name}",
-                    auth_header=authorization
-                )
-
-                submitted.append({
-                    "device": device_name,
-                    "task_id": task_id,
-                    "snapshot_id": snapshot_id
-                })
-
-            except Exception as e:
-                failed.append({"device": device_name, "error": str(e)})
+        submitted, failed = await submit_snapshot_backups(
+            [device.get("name") for device in devices],
+            snapshot_id=snapshot_id,
+            juniper_set_format=juniper_set_format,
+            created_by=created_by,
+            auth_header=authorization
+        )
 
         # Update snapshot with actual counts (adjusting for skipped devices)
         if failed:
@@ -466,57 +473,13 @@ async def run_selected_device_backups(
         log.info(f"Created snapshot {snapshot_id} for {len(request.devices)} selected devices")
 
         # Submit backup tasks
-        submitted = []
-        failed = []
-
-        for device_name in request.devices:
-            try:
-                device_info = await get_device_connection_info(device_name, authorization)
-
-                if not device_info:
-                    failed.append({"device": device_name, "error": "Could not get connection info"})
-                    continue
-
-                # Check if device is disabled
-                if device_info.get("error") == "disabled":
-                    failed.append({"device": device_name, "error": "Device is disabled"})
-                    continue
-
-                connection_args = device_info["connection_args"]
-
-                if not connection_args.get("username") or not connection_args.get("password"):
-                    failed.append({"device": device_name, "error": "No credentials configured"})
-                    continue
-
-                clean_args = {k: v for k, v in connection_args.items() if v is not None}
-
-                task = celery_app.send_task(
-                    "tasks.backup_tasks.backup_device_config",
-                    kwargs={
-                        "connection_args": clean_args,
-                        "device_name": device_name,
-                        "device_platform": device_info["device_info"].get("platform"),
-                        "juniper_set_format": juniper_set_format,
-                        "snapshot_id": snapshot_id,
-                        "created_by": created_by
-                    }
-                )
-                task_id = task.id
-
-                await save_task_history(
-                    task_id=task_id,
-                    device_name=f"snapshot:{snapshot_id}:backup:{device_name}",
-                    auth_header=authorization
-                )
-
-                submitted.append({
-                    "device": device_name,
-                    "task_id": task_id,
-                    "snapshot_id": snapshot_id
-                })
-
-            except Exception as e:
-                failed.append({"device": device_name, "error": str(e)})
+        submitted, failed = await submit_snapshot_backups(
+            request.devices,
+            snapshot_id=snapshot_id,
+            juniper_set_format=juniper_set_format,
+            created_by=created_by,
+            auth_header=authorization
+        )
 
         # Update snapshot with actual counts (adjusting for skipped devices)
         if failed:
@@ -580,24 +543,29 @@ async def run_single_device_backup(
 
         clean_args = {k: v for k, v in connection_args.items() if v is not None}
 
-        task = celery_app.send_task(
-            "tasks.backup_tasks.backup_device_config",
-            kwargs={
-                "connection_args": clean_args,
-                "device_name": device_name,
-                "device_platform": device_info["device_info"].get("platform"),
-                "juniper_set_format": juniper_set_format,
-                "created_by": created_by
-            }
-        )
-        task_id = task.id
-
+        task_id = str(uuid.uuid4())
         await save_task_history(
             task_id=task_id,
             device_name=f"backup:{device_name}",
             auth_header=authorization
         )
 
+        try:
+            celery_app.send_task(
+                "tasks.backup_tasks.backup_device_config",
+                kwargs={
+                    "connection_args": clean_args,
+                    "device_name": device_name,
+                    "device_platform": device_info["device_info"].get("platform"),
+                    "juniper_set_format": juniper_set_format,
+                    "created_by": created_by
+                },
+                task_id=task_id
+            )
+        except Exception as e:
+            await fail_task_histories([task_id], f"Failed to publish task: {e}")
+            raise
+
         log.info(f"Started backup task {task_id} for device {device_name}")
 
         return {
@@ -608,6 +576,9 @@ async def run_single_device_backup(
 
     except HTTPException:
         raise
+    except DeviceResolveError:
+        # Mapped to a 502 with the real cause by the app's exception handler
+        raise
     except Exception as e:
         log.error(f"Error running single device backup: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -10,12 +10,12 @@ from pydantic import BaseModel, Field
 
 from fastapi import APIRouter, HTTPException, Depends, Request
 from sqlalchemy.orm import Session
-import httpx
 
 from netstacks_core.db import get_db, TaskHistory
 
 from app.config import get_settings
 from app.services.celery_client import celery_app
+from app.services.device_resolver import fetch_connection_args
 
 log = logging.getLogger(__name__)
 settings = get_settings()
@@ -80,134 +80,43 @@ async def get_device_connection_info(
     """
     Get device connection info from the Devices microservice.
 
+    Device record, overrides and default credentials are resolved by the
+    Devices service batch endpoint in a single request.
+
     Args:
         device_name: Name of the device
         credential_override: Optional credential override
         auth_header: Authorization header to forward
 
     Returns:
-        Dict with connection_args, or dict with 'error' key if device is disabled/not found, or None on error
+        Dict with connection_args, dict with 'error' key if device is disabled, or None if not found
+
+    Raises:
+        DeviceResolveError: if the Devices service could not be reached
     """
-    devices_url = settings.DEVICES_SERVICE_URL
-    auth_url = settings.AUTH_SERVICE_URL
-
-    headers = {"Content-Type": "application/json"}
-    if auth_header:
-        headers["Authorization"] = auth_header
-
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            # Get device info
-            response = await client.get(
-                f"{devices_url}/api/devices/{device_name}",
-                headers=headers
-            )
-
-            if response.status_code == 404:
-                return None
-
-            if response.status_code != 200:
-                log.error(f"Error getting device {device_name}: {response.status_code}")
-                return None
-
-            response_data = response.json()
-            # Unwrap the response: {"success": true, "data": {"device": {...}}}
-            device = response_data.get("data", {}).get("device", response_data)
-
-            # Get device overrides with unmasked credentials
-            overrides = {}
-            device_disabled = False
-            override_response = await client.get(
-                f"{devices_url}/api/device-overrides/{device_name}/connection-args",
-                headers=headers
-            )
-            if override_response.status_code == 200:
-                override_data = override_response.json()
-                if override_data.get("success"):
-                    overrides = override_data.get("data", {}).get("connection_args", {}) or {}
-                    device_disabled = override_data.get("data", {}).get("disabled", False)
-                else:
-                    overrides = override_data.get("connection_args", {}) or {}
-                    device_disabled = override_data.get("disabled", False)
-
-            # If device is disabled, return error dict to block all operations
-            if device_disabled:
-                log.info(f"Device {device_name} is disabled, blocking operation")
-                return {"error": "disabled", "message": f"Device {device_name} is disabled"}
-
-            # Get default credentials from auth service (unmasked)
-            default_settings = {}
-            try:
-                settings_resp = await client.get(
-                    f"{auth_url}/api/settings/credentials/default",
-                    headers=headers
-                )
-                if settings_resp.status_code == 200:
-                    default_settings = settings_resp.json().get("data", {})
-            except Exception as e:
-                log.warning(f"Could not fetch default credentials: {e}")
-
-            # Determine device_type for netmiko - override takes precedence
-            # Device's device_type should already be netmiko-compatible from the device service
-            device_type = overrides.get("device_type") or device.get("device_type")
-            if not device_type or not device_type.strip():
-                # Final fallback to cisco_ios
-                device_type = "cisco_ios"
-                log.warning(f"Device {device_name}: No device_type found, defaulting to cisco_ios")
-            
-            log.debug(f"Device {device_name}: Using device_type={device_type}")
-
-            # Build connection args
-            connection_args = {
-                "device_type": device_type,
-                "host": overrides.get("host") or device.get("host") or device.get("primary_ip") or device.get("hostname") or device_name,
-                "port": overrides.get("port") or device.get("port", 22),
-                # Disable SSH keys/agent to force password/keyboard-interactive auth
-                "use_keys": False,
-                "allow_agent": False,
-            }
-
-            # Apply timeout settings - device override takes precedence, then global defaults
-            connection_args["timeout"] = (
-                overrides.get("timeout") or
-                default_settings.get("default_timeout", 30)
-            )
-            connection_args["conn_timeout"] = (
-                overrides.get("conn_timeout") or
-                default_settings.get("default_conn_timeout", 10)
-            )
-            connection_args["auth_timeout"] = (
-                overrides.get("auth_timeout") or
-                default_settings.get("default_auth_timeout", 10)
-            )
-            connection_args["banner_timeout"] = (
-                overrides.get("banner_timeout") or
-                default_settings.get("default_banner_timeout", 15)
-            )
-
-            # Apply credentials (inline override takes highest precedence, then device overrides, then defaults)
-            if credential_override:
-                connection_args["username"] = credential_override.get("username")
-                connection_args["password"] = credential_override.get("password")
-            elif overrides.get("username"):
-                connection_args["username"] = overrides.get("username")
-                if overrides.get("password"):
-                    connection_args["password"] = overrides.get("password")
-                if overrides.get("secret"):
-                    connection_args["secret"] = overrides.get("secret")
-            else:
-                # Fallback to global default credentials from auth service
-                connection_args["username"] = default_settings.get("default_username", "")
-                connection_args["password"] = default_settings.get("default_password", "")
-
-            return {
-                "device": device,
-                "connection_args": connection_args
-            }
-
-        except httpx.RequestError as e:
-            log.error(f"Error connecting to devices service: {e}")
-            return None
+    resolved = await fetch_connection_args([device_name], auth_header)
+
+    entry = resolved.get(device_name)
+    if not entry:
+        return None
+
+    # If device is disabled, return error dict to block all operations
+    if entry.get("disabled"):
+        log.info(f"Device {device_name} is disabled, blocking operation")
+        return {"error": "disabled", "message": f"Device {device_name} is disabled"}
+
+    connection_args = dict(entry["connection_args"])
+    log.debug(f"Device {device_name}: Using device_type={connection_args.get('device_type')}")
+
+    # Inline credential override takes highest precedence
+    if credential_override:
+        connection_args["username"] = credential_override.get("username")
+        connection_args["password"] = credential_override.get("password")
+
+    return {
+        "device": entry["device"],
+        "connection_args": connection_args
+    }
 
 
 def submit_celery_task(task_name: str, **kwargs) -> str:
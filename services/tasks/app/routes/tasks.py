@@ -8,9 +8,10 @@ All task data is stored in DB by Celery signal handlers - no direct Celery queri
 import logging
 from typing import Optional
 from fastapi import APIRouter, HTTPException, Query, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from netstacks_core.db import get_db, TaskHistory
+from netstacks_core.db import get_async_db, TaskHistory
 
 from app.services.celery_client import cancel_task
 
@@ -19,9 +20,15 @@ log = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/tasks", tags=["tasks"])
 
 
+async def _get_task_history(session: AsyncSession, task_id: str) -> Optional[TaskHistory]:
+    return (await session.execute(
+        select(TaskHistory).where(TaskHistory.task_id == task_id)
+    )).scalars().first()
+
+
 @router.get("/metadata")
 async def get_task_metadata(
-    session: Session = Depends(get_db),
+    session: AsyncSession = Depends(get_async_db),
 ):
     """
     Get metadata about tasks including device name mappings.
@@ -30,9 +37,9 @@ async def get_task_metadata(
         Dict containing task metadata with device_name for each task_id.
     """
     try:
-        history = session.query(TaskHistory).order_by(
-            TaskHistory.created_at.desc()
-        ).limit(200).all()
+        history = (await session.execute(
+            select(TaskHistory).order_by(TaskHistory.created_at.desc()).limit(200)
+        )).scalars().all()
 
         metadata = {}
         for entry in history:
@@ -56,7 +63,7 @@ async def get_task_metadata(
 async def list_tasks(
     status: Optional[str] = Query(None, description="Filter by status"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
-    session: Session = Depends(get_db),
+    session: AsyncSession = Depends(get_async_db),
 ):
     """
     List recent tasks from task history.
@@ -64,13 +71,15 @@ async def list_tasks(
     All data comes from the database - no Celery queries.
     """
     try:
-        query = session.query(TaskHistory)
+        query = select(TaskHistory)
 
         # Filter by status if provided
         if status:
-            query = query.filter(TaskHistory.status == status.lower())
+            query = query.where(TaskHistory.status == status.lower())
 
-        tasks = query.order_by(TaskHistory.created_at.desc()).limit(limit).all()
+        tasks = (await session.execute(
+            query.order_by(TaskHistory.created_at.desc()).limit(limit)
+        )).scalars().all()
 
         return {
             "status": "success",
@@ -102,7 +111,7 @@ async def list_tasks(
 @router.get("/{task_id}")
 async def get_task(
     task_id: str,
-    session: Session = Depends(get_db),
+    session: AsyncSession = Depends(get_async_db),
 ):
     """
     Get status and details of a specific task from the database.
@@ -113,7 +122,7 @@ async def get_task(
     Returns:
         Task status information including state, result, and any errors
     """
-    task = session.query(TaskHistory).filter(TaskHistory.task_id == task_id).first()
+    task = await _get_task_history(session, task_id)
 
     if not task:
         raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
@@ -136,7 +145,7 @@ async def get_task(
 @router.get("/{task_id}/result")
 async def get_task_result_endpoint(
     task_id: str,
-    session: Session = Depends(get_db),
+    session: AsyncSession = Depends(get_async_db),
 ):
     """
     Get the result of a task from the database.
@@ -147,7 +156,7 @@ async def get_task_result_endpoint(
     Returns:
         The task result if available
     """
-    task = session.query(TaskHistory).filter(TaskHistory.task_id == task_id).first()
+    task = await _get_task_history(session, task_id)
 
     if not task:
         raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
@@ -188,7 +197,7 @@ async def get_task_result_endpoint(
 async def cancel_task_endpoint(
     task_id: str,
     terminate: bool = Query(False, description="Forcefully terminate if running"),
-    session: Session = Depends(get_db),
+    session: AsyncSession = Depends(get_async_db),
 ):
     """
     Cancel a pending or running task.
@@ -201,10 +210,10 @@ async def cancel_task_endpoint(
         Cancellation result
     """
     # Update DB status
-    task = session.query(TaskHistory).filter(TaskHistory.task_id == task_id).first()
+    task = await _get_task_history(session, task_id)
     if task and task.status in ('pending', 'started'):
         task.status = 'cancelled'
-        session.commit()
+        await session.commit()
 
     # Also tell Celery to cancel (best effort)
     result = cancel_task(task_id, terminate=terminate)
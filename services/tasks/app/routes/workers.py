@@ -11,6 +11,7 @@ from app.services.celery_client import (
     get_worker_stats,
     get_queues,
     get_registered_tasks,
+    get_connection_pool_stats,
 )
 
 router = APIRouter(prefix="/api/workers", tags=["workers"])
@@ -102,6 +103,28 @@ async def list_queues():
     return queues_info
 
 
+@router.get("/connection-pool")
+async def get_connection_pool():
+    """
+    Get SSH connection pool metrics from all worker processes.
+
+    Returns:
+        Dict containing:
+        - process_count: Number of worker processes reporting
+        - totals: Aggregate hits, misses, evictions, idle and active sessions
+        - processes: Per-process pool statistics
+    """
+    pool_stats = get_connection_pool_stats()
+
+    if 'error' in pool_stats:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Unable to get connection pool stats: {pool_stats['error']}"
+        )
+
+    return pool_stats
+
+
 @router.get("/{worker_name}")
 async def get_worker_detail(worker_name: str):
     """
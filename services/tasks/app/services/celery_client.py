@@ -4,6 +4,7 @@ Celery Client for Tasks Service
 Provides Celery app connection and task management functions.
 """
 
+import json
 import logging
 from typing import Optional, Dict, Any, List
 
@@ -32,6 +33,34 @@ celery_app.conf.update(
 )
 
 
+def submit_tasks_bulk(
+    task_name: str,
+    kwargs_list: List[Dict[str, Any]],
+    task_ids: Optional[List[str]] = None
+) -> List[str]:
+    """
+    Publish many tasks over a single broker connection.
+
+    Args:
+        task_name: Full task name (e.g., 'tasks.backup_tasks.backup_device_config')
+        kwargs_list: One kwargs dict per task
+        task_ids: Optional pre-generated task IDs, one per kwargs dict. Pass
+            these when task_history rows are written before publishing.
+
+    Returns:
+        Task IDs in the same order as kwargs_list
+    """
+    if task_ids is None:
+        task_ids = [None] * len(kwargs_list)
+
+    published = []
+    with celery_app.producer_or_acquire() as producer:
+        for kwargs, task_id in zip(kwargs_list, task_ids):
+            result = celery_app.send_task(task_name, kwargs=kwargs, task_id=task_id, producer=producer)
+            published.append(result.id)
+    return published
+
+
 def get_task_status(task_id: str) -> Dict[str, Any]:
     """
     Get the status of a Celery task.
@@ -278,3 +307,54 @@ def get_queues() -> Dict[str, Any]:
             'queue_count': 0,
             'error': str(e)
         }
+
+
+def get_connection_pool_stats() -> Dict[str, Any]:
+    """
+    Get SSH connection pool metrics published by worker processes.
+
+    Each worker process writes its pool counters to Redis under
+    netstacks:ssh_pool:<hostname>:<pid> with a short TTL, so only live
+    processes are included.
+
+    Returns:
+        Dict with aggregate totals and per-process stats
+    """
+    try:
+        import redis
+
+        client = redis.Redis.from_url(settings.CELERY_BROKER_URL, socket_timeout=2)
+        keys = list(client.scan_iter(match='netstacks:ssh_pool:*', count=500))
+        values = client.mget(keys) if keys else []
+
+        processes = []
+        for raw in values:
+            if raw:
+                try:
+                    processes.append(json.loads(raw))
+                except ValueError:
+                    continue
+
+        counters = [
+            'hits', 'misses', 'evictions_idle', 'evictions_dead',
+            'evictions_overflow', 'discarded', 'acquire_timeouts',
+            'connect_errors', 'idle', 'active',
+        ]
+        totals = {name: sum(p.get(name, 0) for p in processes) for name in counters}
+        lookups = totals['hits'] + totals['misses']
+        totals['hit_rate'] = round(totals['hits'] / lookups, 4) if lookups else 0.0
+
+        return {
+            'process_count': len(processes),
+            'totals': totals,
+            'processes': sorted(processes, key=lambda p: (p.get('worker', ''), p.get('pid', 0))),
+        }
+
+    except Exception as e:
+        log.error(f"Error getting connection pool stats: {e}")
+        return {
+            'process_count': 0,
+            'totals': {},
+            'processes': [],
+            'error': str(e)
+        }
@@ -0,0 +1,121 @@
+"""
+Device Resolver for Tasks Service
+
+Resolves device connection args through the Devices service batch endpoint
+(POST /api/devices/connection-args), which joins devices, overrides and
+default credentials server-side in a single query.
+
+Failures to reach the Devices service raise DeviceResolveError rather than
+returning an empty result, so callers can tell "device not found" apart
+from "could not resolve devices" and report the real cause.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.config import get_settings
+from app.services.http_client import get_http_client
+
+log = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class DeviceResolveError(Exception):
+    """The Devices service could not resolve connection args."""
+
+
+async def _fetch_batch(
+    payload: Dict[str, Any],
+    auth_header: Optional[str] = None
+) -> Dict[str, Dict[str, Any]]:
+    """POST one streamed batch request and collect the NDJSON results.
+
+    Raises:
+        DeviceResolveError: on a non-200 response, timeout, connection
+            failure or malformed response body
+    """
+    headers = {"Content-Type": "application/json"}
+    if auth_header:
+        headers["Authorization"] = auth_header
+
+    resolved = {}
+    try:
+        async with get_http_client().stream(
+            "POST",
+            f"{settings.DEVICES_SERVICE_URL}/api/devices/connection-args",
+            json={**payload, "stream": True},
+            headers=headers,
+            timeout=60.0
+        ) as response:
+            if response.status_code != 200:
+                body = (await response.aread()).decode(errors="replace")[:500]
+                raise DeviceResolveError(
+                    f"Devices service returned HTTP {response.status_code} "
+                    f"resolving connection args: {body}"
+                )
+
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry.get("error"):
+                    continue
+                resolved[entry["device_name"]] = entry
+    except httpx.TimeoutException as e:
+        raise DeviceResolveError(f"Timed out resolving connection args from devices service: {e!r}") from e
+    except httpx.HTTPError as e:
+        raise DeviceResolveError(f"Error reaching devices service: {e!r}") from e
+    except (ValueError, KeyError) as e:
+        raise DeviceResolveError(f"Malformed connection-args response from devices service: {e!r}") from e
+
+    return resolved
+
+
+async def fetch_connection_args(
+    device_names: Optional[List[str]] = None,
+    auth_header: Optional[str] = None,
+    **filters
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Resolve connection args for many devices.
+
+    Args:
+        device_names: Device names to resolve (None to select by filters)
+        auth_header: Authorization header to forward
+        **filters: source, device_type or site filters
+
+    Returns:
+        Dict keyed by device name with device, connection_args and disabled
+        fields. Devices that don't exist are absent from the result.
+
+    Raises:
+        DeviceResolveError: if any batch could not be resolved
+
+    Large name lists are split into DEVICE_RESOLVE_BATCH_SIZE chunks, with
+    at most DEVICE_RESOLVE_CONCURRENCY chunks in flight at once.
+    """
+    if device_names is None:
+        return await _fetch_batch(filters, auth_header)
+
+    if not device_names:
+        return {}
+
+    batch_size = settings.DEVICE_RESOLVE_BATCH_SIZE
+    chunks = [
+        device_names[i:i + batch_size]
+        for i in range(0, len(device_names), batch_size)
+    ]
+    semaphore = asyncio.Semaphore(settings.DEVICE_RESOLVE_CONCURRENCY)
+
+    async def _fetch_chunk(chunk: List[str]) -> Dict[str, Dict[str, Any]]:
+        async with semaphore:
+            return await _fetch_batch({"devices": chunk, **filters}, auth_header)
+
+    resolved = {}
+    for result in await asyncio.gather(*(_fetch_chunk(c) for c in chunks)):
+        resolved.update(result)
+    return resolved
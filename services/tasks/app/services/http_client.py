@@ -0,0 +1,41 @@
+"""
+Shared HTTP Client for Tasks Service
+
+Provides one pooled httpx.AsyncClient per process for calls to the devices,
+auth and config services, so bulk operations reuse keep-alive connections
+instead of opening a new client for every device.
+"""
+
+import logging
+from typing import Optional
+
+import httpx
+
+from app.config import get_settings
+
+log = logging.getLogger(__name__)
+settings = get_settings()
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared AsyncClient, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+async def close_http_client():
+    """Close the shared AsyncClient (called on application shutdown)."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
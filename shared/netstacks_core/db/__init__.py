@@ -4,6 +4,7 @@ Database module for NetStacks Core
 Provides:
 - SQLAlchemy models for all entities
 - Session factory for database connections
+- Async (asyncpg) session factory for FastAPI routes
 - Base class for all models
 """
 
@@ -58,6 +59,15 @@ from .session import (
     seed_defaults,
 )
 
+from .async_session import (
+    get_async_engine,
+    get_async_session,
+    get_async_db,
+    get_async_session_factory,
+    async_session_scope,
+    dispose_async_engine,
+)
+
 __all__ = [
     # Base
     "Base",
@@ -109,4 +119,11 @@ __all__ = [
     "get_session_factory",
     "init_db",
     "seed_defaults",
+    # Async session
+    "get_async_engine",
+    "get_async_session",
+    "get_async_db",
+    "get_async_session_factory",
+    "async_session_scope",
+    "dispose_async_engine",
 ]
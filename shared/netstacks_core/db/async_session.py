@@ -0,0 +1,168 @@
+"""
+Async Database Session Management for NetStacks
+
+Provides an asyncpg-backed SQLAlchemy engine and session factory for
+FastAPI routes, so database queries do not block the event loop.
+
+The async engine is bound to the event loop it is first used on. Use it
+from the service's own loop (routes, background tasks); Celery workers and
+other synchronous code keep using netstacks_core.db.session.
+"""
+
+import os
+import logging
+from typing import Optional, AsyncGenerator
+from contextlib import asynccontextmanager
+
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from .session import get_database_url
+
+log = logging.getLogger(__name__)
+
+# Module-level engine cache
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+
+def get_async_database_url(url: Optional[str] = None) -> str:
+    """
+    Get the database URL with the asyncpg driver.
+
+    Accepts the same DATABASE_URL as the sync engine
+    (postgresql://, postgres:// or postgresql+psycopg2://).
+    """
+    url = url or get_database_url()
+    scheme, sep, rest = url.partition('://')
+    if scheme in ('postgresql', 'postgres') or scheme.startswith('postgresql+'):
+        return f'postgresql+asyncpg{sep}{rest}'
+    return url
+
+
+def get_async_engine(url: Optional[str] = None) -> AsyncEngine:
+    """
+    Get or create the async database engine.
+
+    Args:
+        url: Optional database URL. If not provided, uses DATABASE_URL env var.
+
+    Returns:
+        SQLAlchemy AsyncEngine instance
+    """
+    global _async_engine
+
+    options = dict(
+        echo=False,
+        pool_pre_ping=True,
+        pool_size=int(os.environ.get('DATABASE_POOL_SIZE', 10)),
+        max_overflow=int(os.environ.get('DATABASE_MAX_OVERFLOW', 20)),
+    )
+
+    if url:
+        # Create a new engine for a specific URL
+        return create_async_engine(get_async_database_url(url), **options)
+
+    if _async_engine is None:
+        db_url = get_async_database_url()
+        _async_engine = create_async_engine(db_url, **options)
+        log.info(f"Created async database engine for: {db_url.split('@')[-1]}")
+
+    return _async_engine
+
+
+def get_async_session_factory(engine: Optional[AsyncEngine] = None) -> async_sessionmaker:
+    """
+    Get or create the async session factory.
+
+    Sessions do not expire objects on commit, so attributes stay readable
+    after commit without another (implicit, and in async code impossible)
+    refresh query.
+
+    Args:
+        engine: Optional AsyncEngine. If not provided, uses default engine.
+
+    Returns:
+        SQLAlchemy async_sessionmaker instance
+    """
+    global _async_session_factory
+
+    if engine:
+        return async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    if _async_session_factory is None:
+        _async_session_factory = async_sessionmaker(
+            bind=get_async_engine(),
+            autoflush=False,
+            expire_on_commit=False,
+        )
+
+    return _async_session_factory
+
+
+def get_async_session(engine: Optional[AsyncEngine] = None) -> AsyncSession:
+    """
+    Create a new async database session.
+
+    Note:
+        The caller is responsible for closing the session (await session.close()).
+    """
+    return get_async_session_factory(engine)()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    FastAPI dependency that provides an async database session.
+
+    Yields a session and ensures it's closed after the request.
+
+    Usage:
+        @router.get("/items")
+        async def get_items(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(Item))
+            return result.scalars().all()
+    """
+    session = get_async_session()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+@asynccontextmanager
+async def async_session_scope(engine: Optional[AsyncEngine] = None) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Provide a transactional scope around a series of async operations.
+
+    Usage:
+        async with async_session_scope() as session:
+            session.add(item)
+    """
+    session = get_async_session(engine)
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+async def dispose_async_engine() -> None:
+    """
+    Dispose the module-level async engine and session factory.
+
+    Call on application shutdown so pooled connections are closed cleanly.
+    """
+    global _async_engine, _async_session_factory
+
+    if _async_engine:
+        await _async_engine.dispose()
+
+    _async_engine = None
+    _async_session_factory = None
@@ -530,6 +530,8 @@ class AgentSession(Base):
     context = Column(JSONB, default=dict)  # Devices, incident context, handoff data
     summary = Column(Text, nullable=True)  # Final summary/resolution
     resolution_status = Column(String(20), nullable=True)  # 'resolved', 'escalated', 'unresolved'
+    history_summary = Column(Text, nullable=True)  # Rolling summary of compacted conversation turns
+    summarized_message_count = Column(Integer, default=0)  # Leading messages covered by history_summary
     token_count = Column(Integer, default=0)  # Total tokens used
     tool_call_count = Column(Integer, default=0)
     iteration_count = Column(Integer, default=0)
@@ -620,6 +622,8 @@ class WorkflowLog(Base):
     total_input_tokens = Column(Integer, default=0)
     total_output_tokens = Column(Integer, default=0)
     total_tokens = Column(Integer, default=0)
+    total_cache_read_tokens = Column(Integer, default=0)  # Prompt tokens served from provider cache
+    total_cache_write_tokens = Column(Integer, default=0)  # Prompt tokens written to provider cache
     estimated_cost_usd = Column(Float, default=0.0)  # Estimated cost in USD
 
     # Session references
@@ -866,6 +870,9 @@ class Alert(Base):
     assigned_session_id = Column(String(36), nullable=True)
     incident_id = Column(String(36), ForeignKey('incidents.incident_id', ondelete='SET NULL'), nullable=True)
     auto_triage = Column(Boolean, default=True)  # Whether to auto-trigger triage agent
+    fingerprint = Column(String(64), nullable=True)  # Dedup fingerprint (see alert_dedup)
+    occurrence_count = Column(Integer, default=1)  # Repeats folded into this alert
+    last_seen_at = Column(DateTime, nullable=True)  # Time of the latest folded repeat
     created_at = Column(DateTime, default=datetime.utcnow)
     acknowledged_at = Column(DateTime, nullable=True)
     resolved_at = Column(DateTime, nullable=True)
@@ -880,6 +887,7 @@ class Alert(Base):
         Index('idx_alerts_severity', 'severity'),
         Index('idx_alerts_created', 'created_at'),
         Index('idx_alerts_incident', 'incident_id'),
+        Index('idx_alerts_fingerprint', 'fingerprint'),
     )
 
 
@@ -0,0 +1,71 @@
+"""
+Lightweight in-process metrics shared by NetStacks services.
+
+Histograms serialize to plain dicts for the services' JSON stats endpoints.
+"""
+
+import bisect
+import threading
+from typing import Any, Dict, Optional, Sequence
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative "le" buckets, Prometheus style)."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._max: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """Record a single observation."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+            if self._max is None or value > self._max:
+                self._max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile as the upper bound of the bucket containing it."""
+        with self._lock:
+            if not self._count:
+                return None
+            target = q * self._count
+            running = 0
+            for index, count in enumerate(self._counts):
+                running += count
+                if running >= target:
+                    if index < len(self.buckets):
+                        return self.buckets[index]
+                    return self._max
+        return self._max
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the histogram for a stats endpoint."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+            total_sum = self._sum
+            max_value = self._max
+
+        buckets = {}
+        running = 0
+        for bound, count in zip(self.buckets, counts):
+            running += count
+            buckets[str(bound)] = running
+        buckets["+Inf"] = total
+
+        return {
+            "count": total,
+            "sum": round(total_sum, 6),
+            "avg": round(total_sum / total, 6) if total else None,
+            "max": max_value,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": buckets,
+        }
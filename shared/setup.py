@@ -11,8 +11,9 @@ setup(
     packages=find_packages(),
     python_requires=">=3.10",
     install_requires=[
-        "sqlalchemy>=2.0.0",
+        "sqlalchemy[asyncio]>=2.0.0",
         "psycopg2-binary>=2.9.0",
+        "asyncpg>=0.29.0",
         "pydantic>=2.0.0",
         "pydantic-settings>=2.0.0",
         "cryptography>=41.0.0",
@@ -6,10 +6,21 @@ for network automation, backups, and scheduled operations.
 """
 
 import os
+import json
 import logging
+import threading
 from datetime import datetime
+from typing import Any, Dict, List, Optional
+
 from celery import Celery
-from celery.signals import task_prerun, task_postrun, task_failure
+from celery.signals import (
+    task_prerun,
+    task_postrun,
+    task_failure,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_shutdown,
+)
 from celery.schedules import crontab
 
 log = logging.getLogger(__name__)
@@ -17,7 +28,12 @@ log = logging.getLogger(__name__)
 # Celery configuration from environment
 CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://redis:6379/0')
 CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', 'redis://redis:6379/0')
-DATABASE_URL = os.environ.get('DATABASE_URL', 'postgresql://netstacks:netstacks@db:5432/netstacks')
+
+# Task status persistence (batched writes to task_history)
+TASK_STATUS_FLUSH_INTERVAL = float(os.environ.get('TASK_STATUS_FLUSH_INTERVAL', '1.0'))
+TASK_STATUS_MAX_BUFFER = int(os.environ.get('TASK_STATUS_MAX_BUFFER', '500'))
+# Flushes a status change is retried for while its task_history row is missing
+TASK_STATUS_MISS_RETRIES = int(os.environ.get('TASK_STATUS_MISS_RETRIES', '5'))
 
 # Create Celery app
 celery_app = Celery(
@@ -91,32 +107,215 @@ logging.basicConfig(
 # Database persistence for task history
 # ============================================================================
 
-def get_db_session():
-    """Create a database session for task persistence."""
-    from sqlalchemy import create_engine
-    from sqlalchemy.orm import sessionmaker
-    engine = create_engine(DATABASE_URL)
-    Session = sessionmaker(bind=engine)
-    return Session()
+class TaskStatusBuffer:
+    """
+    In-memory buffer of task status changes, flushed as batched UPDATEs.
+
+    Signal handlers record changes here instead of writing to the database
+    directly. Changes for the same task are merged, so a task that starts
+    and finishes within one flush interval costs a single row write. A
+    background thread flushes every TASK_STATUS_FLUSH_INTERVAL seconds, and
+    the buffer is also flushed when it reaches TASK_STATUS_MAX_BUFFER
+    entries and at worker shutdown.
+
+    A change whose task_history row does not exist yet is kept and retried
+    on the next TASK_STATUS_MISS_RETRIES flushes, then dropped with a
+    warning.
+    """
+
+    def __init__(self, flush_interval: float = TASK_STATUS_FLUSH_INTERVAL,
+                 max_buffer: int = TASK_STATUS_MAX_BUFFER,
+                 miss_retries: int = TASK_STATUS_MISS_RETRIES):
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.miss_retries = miss_retries
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._misses: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def add(self, task_id: str, **fields):
+        """Merge a status change for task_id into the buffer."""
+        if not task_id:
+            return
+        if fields.get('result') is not None:
+            # Results are stored as JSONB; stringify anything json can't encode
+            # (e.g. the exception passed as retval for failed tasks)
+            fields['result'] = json.loads(json.dumps(fields['result'], default=str))
+        with self._lock:
+            self._pending.setdefault(task_id, {}).update(fields)
+            size = len(self._pending)
+        self._ensure_thread()
+        if size >= self.max_buffer:
+            self.flush()
+
+    def _ensure_thread(self):
+        # Started lazily so each forked worker process gets its own thread
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._run, name='task-status-flusher', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopping.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all buffered changes to task_history. Returns changes flushed."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            from sqlalchemy.exc import OperationalError
+
+            flushed = set()
+            unmatched = []
+            try:
+                from netstacks_core.db import get_engine, TaskHistory
+
+                engine = get_engine()
+                for rows in self._group_rows(pending, TaskHistory):
+                    try:
+                        with engine.begin() as conn:
+                            unmatched.extend(self._update(conn, TaskHistory, rows))
+                    except OperationalError:
+                        raise
+                    except Exception as e:
+                        # A bad value (e.g. a NUL byte in a result) fails the whole
+                        # statement - write the group's rows one at a time instead
+                        log.warning(f"Error flushing {len(rows)} task status updates, retrying one by one: {e}")
+                        unmatched.extend(self._update_each(engine, TaskHistory, rows))
+                    flushed.update(row['b_task_id'] for row in rows)
+
+                self._retry_unmatched(flushed, unmatched)
+                log.debug(f"Flushed {len(pending) - len(unmatched)} task status updates")
+                return len(pending) - len(unmatched)
+
+            except OperationalError as e:
+                # Connectivity problem - put the unwritten changes back for the
+                # next flush unless newer ones arrived
+                log.error(f"Error flushing {len(pending) - len(flushed)} task status updates: {e}")
+                self._retry_unmatched(flushed, unmatched)
+                with self._lock:
+                    for task_id, fields in pending.items():
+                        if task_id in flushed:
+                            continue
+                        self._requeue(task_id, fields)
+                return len(flushed) - len(unmatched)
+
+            except Exception as e:
+                log.error(f"Error flushing {len(pending) - len(flushed)} task status updates: {e}")
+                self._retry_unmatched(flushed, unmatched)
+                return len(flushed) - len(unmatched)
+
+    def _requeue(self, task_id: str, fields: Dict[str, Any]):
+        """Put a change back in the buffer under any newer one. Caller holds _lock."""
+        merged = dict(fields)
+        merged.update(self._pending.get(task_id, {}))
+        self._pending[task_id] = merged
+
+    def _retry_unmatched(self, flushed: set, unmatched: List[Dict[str, Any]]):
+        """Requeue changes whose task_history row is missing, up to miss_retries flushes."""
+        missing = {row['b_task_id'] for row in unmatched}
+        for task_id in flushed - missing:
+            self._misses.pop(task_id, None)
+
+        with self._lock:
+            for row in unmatched:
+                task_id = row['b_task_id']
+                misses = self._misses.get(task_id, 0) + 1
+                if misses > self.miss_retries:
+                    self._misses.pop(task_id, None)
+                    log.warning(
+                        f"Task {task_id} not found in database for update after "
+                        f"{misses} flushes, dropping status '{row.get('b_status', 'unknown')}'"
+                    )
+                    continue
+                self._misses[task_id] = misses
+                self._requeue(task_id, {k[2:]: v for k, v in row.items() if k != 'b_task_id'})
+
+    @staticmethod
+    def _group_rows(pending: Dict[str, Dict[str, Any]], model) -> List[List[Dict[str, Any]]]:
+        """Group changes by the set of columns they update (one statement per group)."""
+        columns = set(model.__table__.columns.keys()) - {'id', 'task_id'}
+        groups: Dict[frozenset, List[Dict[str, Any]]] = {}
+        for task_id, fields in pending.items():
+            # Bind names must differ from column names in an UPDATE
+            row = {f'b_{k}': v for k, v in fields.items() if k in columns}
+            row['b_task_id'] = task_id
+            groups.setdefault(frozenset(row.keys()), []).append(row)
+        return list(groups.values())
+
+    @staticmethod
+    def _update(conn, model, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        UPDATE existing task_history rows with one executemany.
+
+        Rows are created by the tasks service before it publishes a task.
+        Returns the rows whose task_id matched nothing, either because the
+        row is not written yet or because the task is never recorded (beat
+        and internal tasks).
+        """
+        from sqlalchemy import bindparam, select, update
+
+        table = model.__table__
+        existing = set(conn.execute(
+            select(table.c.task_id).where(table.c.task_id.in_([row['b_task_id'] for row in rows]))
+        ).scalars())
+        matched = [row for row in rows if row['b_task_id'] in existing]
+
+        if matched:
+            stmt = (
+                update(table)
+                .where(table.c.task_id == bindparam('b_task_id'))
+                .values({k[2:]: bindparam(k) for k in matched[0] if k != 'b_task_id'})
+            )
+            conn.execute(stmt, matched)
+        return [row for row in rows if row['b_task_id'] not in existing]
+
+    def _update_each(self, engine, model, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Write rows one per transaction, dropping only the ones that fail.
+
+        Returns the rows whose task_id matched nothing.
+        """
+        from sqlalchemy.exc import OperationalError
+
+        unmatched = []
+        for row in rows:
+            try:
+                with engine.begin() as conn:
+                    unmatched.extend(self._update(conn, model, [row]))
+            except OperationalError:
+                raise
+            except Exception as e:
+                log.error(f"Dropping task status update for {row['b_task_id']}: {e}")
+        return unmatched
+
+    def stop(self):
+        """Stop the flush thread and write any remaining changes."""
+        self._stopping.set()
+        self.flush()
+        with self._lock:
+            for task_id, fields in self._pending.items():
+                log.warning(
+                    f"Dropping unwritten status '{fields.get('status', 'unknown')}' "
+                    f"for task {task_id} at shutdown"
+                )
+            self._pending.clear()
+
+
+task_status_buffer = TaskStatusBuffer()
 
 
 def update_task_status(task_id: str, **kwargs):
-    """Update task status in database."""
-    try:
-        from netstacks_core.db import TaskHistory
-        session = get_db_session()
-        task = session.query(TaskHistory).filter(TaskHistory.task_id == task_id).first()
-        if task:
-            for key, value in kwargs.items():
-                if hasattr(task, key):
-                    setattr(task, key, value)
-            session.commit()
-            log.debug(f"Updated task {task_id}: {kwargs.get('status', 'unknown')}")
-        else:
-            log.warning(f"Task {task_id} not found in database for update")
-        session.close()
-    except Exception as e:
-        log.error(f"Error updating task {task_id}: {e}")
+    """Queue a task status update for the next batched database flush."""
+    task_status_buffer.add(task_id, **kwargs)
 
 
 @task_prerun.connect
@@ -163,5 +362,34 @@ def task_failed_handler(task_id=None, exception=None, traceback=None, **kwargs):
     )
 
 
+# ============================================================================
+# Worker process lifecycle (SSH pool, DB engine, task status buffer)
+# ============================================================================
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Reset per-process resources in a newly forked worker process."""
+    from netstacks_core.db import get_engine
+    from tasks.connection_pool import init_connection_pool
+
+    # Don't reuse pooled DB connections inherited from the parent process
+    get_engine().dispose(close=False)
+    init_connection_pool()
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    """Flush buffered task status and close pooled SSH sessions."""
+    from tasks.connection_pool import shutdown_connection_pool
+    task_status_buffer.stop()
+    shutdown_connection_pool()
+
+
+@worker_shutdown.connect
+def shutdown_worker(**kwargs):
+    """Flush buffered task status from the main worker process (solo/threads pools)."""
+    task_status_buffer.stop()
+
+
 if __name__ == '__main__':
     celery_app.start()
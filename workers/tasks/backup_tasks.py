@@ -11,7 +11,6 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
 from celery import shared_task
-from netmiko import ConnectHandler
 from netmiko.exceptions import NetmikoTimeoutException, NetmikoAuthenticationException
 from sqlalchemy.orm import Session
 
@@ -23,6 +22,8 @@ from netstacks_core.db import (
     Device,
 )
 
+from .connection_pool import pooled_connection
+
 log = logging.getLogger(__name__)
 
 
@@ -62,7 +63,7 @@ def backup_device_config(self, connection_args: Dict, device_name: str,
         device_type = connection_args.get('device_type', '').lower()
         is_juniper = 'juniper' in device_type or (device_platform and 'junos' in device_platform.lower())
 
-        with ConnectHandler(**connection_args) as conn:
+        with pooled_connection(connection_args) as conn:
             # Enter enable mode if needed (for Cisco/Arista devices)
             if not is_juniper and hasattr(conn, 'enable'):
                 try:
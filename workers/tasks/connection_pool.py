@@ -0,0 +1,348 @@
+"""
+SSH Connection Pool
+
+Per-process pool of Netmiko sessions shared by device and backup tasks.
+Sessions are keyed by device_type, host, port and credentials so that
+consecutive tasks against the same device reuse an authenticated session
+instead of paying the TCP/SSH/auth handshake and prompt discovery again.
+
+Each Celery worker process owns its own pool (sessions cannot be shared
+across a fork). Pool metrics are periodically published to Redis so the
+tasks service can aggregate them under /api/workers/connection-pool.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from netmiko import ConnectHandler
+
+log = logging.getLogger(__name__)
+
+# Pool configuration from environment
+SSH_POOL_ENABLED = os.environ.get('SSH_POOL_ENABLED', 'true').lower() == 'true'
+SSH_POOL_IDLE_TTL = float(os.environ.get('SSH_POOL_IDLE_TTL', '300'))
+SSH_POOL_MAX_PER_HOST = int(os.environ.get('SSH_POOL_MAX_PER_HOST', '2'))
+SSH_POOL_ACQUIRE_TIMEOUT = float(os.environ.get('SSH_POOL_ACQUIRE_TIMEOUT', '120'))
+SSH_POOL_STATS_INTERVAL = float(os.environ.get('SSH_POOL_STATS_INTERVAL', '10'))
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://redis:6379/0')
+
+# Redis key prefix for published per-process stats (read by the tasks service)
+STATS_KEY_PREFIX = 'netstacks:ssh_pool:'
+STATS_KEY_TTL = 120
+
+
+class PoolExhaustedError(Exception):
+    """Raised when a session slot for a host cannot be acquired in time."""
+    pass
+
+
+def make_pool_key(connection_args: Dict) -> Tuple:
+    """
+    Build the pool key for a set of Netmiko connection args.
+
+    The key is (device_type, host, port, username, digest) where the digest
+    covers the password, enable secret and any remaining connection options
+    (e.g. fast_cli), so sessions opened with different options never mix.
+    """
+    args = dict(connection_args)
+    device_type = args.pop('device_type', None)
+    host = args.pop('host', None)
+    port = args.pop('port', 22)
+    username = args.pop('username', None)
+    digest = hashlib.sha256(
+        json.dumps(args, sort_keys=True, default=str).encode()
+    ).hexdigest()[:16]
+    return (device_type, host, port, username, digest)
+
+
+class _PooledSession:
+    """An idle Netmiko session waiting in the pool."""
+
+    __slots__ = ('conn', 'created_at', 'last_used')
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of Netmiko sessions.
+
+    Features:
+    - Idle TTL eviction of sessions not used for idle_ttl seconds
+    - Liveness check (conn.is_alive()) before a session is handed out
+    - Per-host cap on concurrently checked-out sessions
+    - Hit/miss/evict counters exposed via get_stats()
+    """
+
+    def __init__(self, idle_ttl: float = SSH_POOL_IDLE_TTL,
+                 max_per_host: int = SSH_POOL_MAX_PER_HOST,
+                 acquire_timeout: float = SSH_POOL_ACQUIRE_TIMEOUT):
+        self.idle_ttl = idle_ttl
+        self.max_per_host = max_per_host
+        self.acquire_timeout = acquire_timeout
+
+        self._lock = threading.Lock()
+        self._idle: Dict[Tuple, List[_PooledSession]] = {}
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._active = 0
+        self._last_published = 0.0
+        self._reaper: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions_idle': 0,
+            'evictions_dead': 0,
+            'evictions_overflow': 0,
+            'discarded': 0,
+            'acquire_timeouts': 0,
+            'connect_errors': 0,
+        }
+
+    def _host_slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_per_host)
+                self._host_slots[host] = slot
+            return slot
+
+    def _pop_idle(self, key: Tuple) -> Optional[_PooledSession]:
+        with self._lock:
+            sessions = self._idle.get(key)
+            if not sessions:
+                return None
+            session = sessions.pop()
+            if not sessions:
+                del self._idle[key]
+            return session
+
+    def _close(self, conn):
+        try:
+            conn.disconnect()
+        except Exception as e:
+            log.debug(f"Error closing pooled session: {e}")
+
+    def _checkout(self, key: Tuple, connection_args: Dict):
+        """Return a live session for key, reusing an idle one when possible."""
+        self.evict_idle()
+
+        while True:
+            session = self._pop_idle(key)
+            if session is None:
+                break
+            try:
+                alive = session.conn.is_alive()
+            except Exception:
+                alive = False
+            if alive:
+                with self._lock:
+                    self._stats['hits'] += 1
+                return session.conn
+            with self._lock:
+                self._stats['evictions_dead'] += 1
+            self._close(session.conn)
+
+        with self._lock:
+            self._stats['misses'] += 1
+        try:
+            return ConnectHandler(**connection_args)
+        except Exception:
+            with self._lock:
+                self._stats['connect_errors'] += 1
+            raise
+
+    def _checkin(self, key: Tuple, conn):
+        """Return a session to the pool, resetting it to exec mode first."""
+        try:
+            if conn.check_config_mode():
+                conn.exit_config_mode()
+        except Exception as e:
+            log.debug(f"Discarding session for {key[1]} after reset failed: {e}")
+            self._discard(conn)
+            return
+
+        overflow = None
+        with self._lock:
+            sessions = self._idle.setdefault(key, [])
+            sessions.append(_PooledSession(conn))
+            host_idle = sum(
+                len(s) for k, s in self._idle.items() if k[1] == key[1]
+            )
+            if host_idle > self.max_per_host:
+                overflow = sessions.pop(0)
+                if not sessions:
+                    del self._idle[key]
+                self._stats['evictions_overflow'] += 1
+        if overflow:
+            self._close(overflow.conn)
+
+    def _discard(self, conn):
+        with self._lock:
+            self._stats['discarded'] += 1
+        self._close(conn)
+
+    @contextmanager
+    def connection(self, connection_args: Dict):
+        """
+        Context manager yielding a Netmiko session for connection_args.
+
+        The session is returned to the pool on normal exit and closed if the
+        block raises, since its state on the device is then unknown.
+        """
+        if not SSH_POOL_ENABLED:
+            with ConnectHandler(**connection_args) as conn:
+                yield conn
+            return
+
+        key = make_pool_key(connection_args)
+        slot = self._host_slot(key[1])
+        if not slot.acquire(timeout=self.acquire_timeout):
+            with self._lock:
+                self._stats['acquire_timeouts'] += 1
+            raise PoolExhaustedError(
+                f"Timed out waiting for a session slot to {key[1]} "
+                f"(max {self.max_per_host} per host)"
+            )
+
+        conn = None
+        try:
+            conn = self._checkout(key, connection_args)
+            with self._lock:
+                self._active += 1
+            try:
+                yield conn
+            except BaseException:
+                self._discard(conn)
+                raise
+            else:
+                self._checkin(key, conn)
+            finally:
+                with self._lock:
+                    self._active -= 1
+        finally:
+            slot.release()
+            self._maybe_publish_stats()
+
+    def evict_idle(self) -> int:
+        """Close sessions idle for longer than idle_ttl. Returns count evicted."""
+        cutoff = time.monotonic() - self.idle_ttl
+        expired = []
+        with self._lock:
+            for key in list(self._idle.keys()):
+                sessions = self._idle[key]
+                keep = [s for s in sessions if s.last_used >= cutoff]
+                expired.extend(s for s in sessions if s.last_used < cutoff)
+                if keep:
+                    self._idle[key] = keep
+                else:
+                    del self._idle[key]
+            self._stats['evictions_idle'] += len(expired)
+        for session in expired:
+            self._close(session.conn)
+        return len(expired)
+
+    def start_reaper(self):
+        """Start a daemon thread that evicts idle sessions and publishes stats."""
+        if self._reaper is not None:
+            return
+        interval = max(1.0, min(self.idle_ttl / 2, SSH_POOL_STATS_INTERVAL))
+
+        def _run():
+            while not self._stopping.wait(interval):
+                try:
+                    self.evict_idle()
+                    self._maybe_publish_stats()
+                except Exception as e:
+                    log.debug(f"SSH pool reaper error: {e}")
+
+        self._reaper = threading.Thread(target=_run, name='ssh-pool-reaper', daemon=True)
+        self._reaper.start()
+
+    def close_all(self):
+        """Close every idle session (called on worker process shutdown)."""
+        self._stopping.set()
+        with self._lock:
+            sessions = [s for group in self._idle.values() for s in group]
+            self._idle.clear()
+        for session in sessions:
+            self._close(session.conn)
+        if sessions:
+            log.info(f"Closed {len(sessions)} pooled SSH sessions")
+
+    def get_stats(self) -> Dict:
+        """Get pool counters and current occupancy."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['idle'] = sum(len(s) for s in self._idle.values())
+            stats['active'] = self._active
+            stats['hosts'] = len({k[1] for k in self._idle.keys()})
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['enabled'] = SSH_POOL_ENABLED
+        stats['idle_ttl'] = self.idle_ttl
+        stats['max_per_host'] = self.max_per_host
+        return stats
+
+    def _maybe_publish_stats(self, force: bool = False):
+        """Publish stats to Redis at most every SSH_POOL_STATS_INTERVAL seconds."""
+        now = time.monotonic()
+        if not force and now - self._last_published < SSH_POOL_STATS_INTERVAL:
+            return
+        self._last_published = now
+        try:
+            import redis
+            client = redis.Redis.from_url(CELERY_BROKER_URL, socket_timeout=1)
+            key = f"{STATS_KEY_PREFIX}{socket.gethostname()}:{os.getpid()}"
+            payload = self.get_stats()
+            payload['worker'] = socket.gethostname()
+            payload['pid'] = os.getpid()
+            payload['updated_at'] = time.time()
+            client.setex(key, STATS_KEY_TTL, json.dumps(payload))
+        except Exception as e:
+            log.debug(f"Could not publish SSH pool stats: {e}")
+
+
+_pool: Optional[ConnectionPool] = None
+
+
+def get_connection_pool() -> ConnectionPool:
+    """Get the connection pool for the current worker process."""
+    global _pool
+    if _pool is None:
+        _pool = ConnectionPool()
+    return _pool
+
+
+def init_connection_pool():
+    """Create a fresh pool for a newly forked worker process."""
+    global _pool
+    _pool = ConnectionPool()
+    if SSH_POOL_ENABLED:
+        _pool.start_reaper()
+
+
+def shutdown_connection_pool():
+    """Close all pooled sessions and publish final stats."""
+    global _pool
+    if _pool is not None:
+        _pool.close_all()
+        _pool._maybe_publish_stats(force=True)
+        _pool = None
+
+
+def pooled_connection(connection_args: Dict):
+    """Shortcut for get_connection_pool().connection(connection_args)."""
+    return get_connection_pool().connection(connection_args)
@@ -14,6 +14,8 @@ from netmiko import ConnectHandler
 from netmiko.exceptions import NetmikoTimeoutException, NetmikoAuthenticationException
 from jinja2 import Environment, BaseLoader
 
+from .connection_pool import pooled_connection
+
 log = logging.getLogger(__name__)
 
 
@@ -73,7 +75,7 @@ def get_config(self, connection_args: Dict, command: str,
     try:
         log.info(f"Connecting to {connection_args.get('host')} for get_config")
 
-        with ConnectHandler(**connection_args) as conn:
+        with pooled_connection(connection_args) as conn:
             output = conn.send_command(command)
 
             result['output'] = output
@@ -160,7 +162,7 @@ def set_config(self, connection_args: Dict, config_lines: List[str] = None,
             connection_args['fast_cli'] = False
             log.debug(f"Disabled fast_cli for Arista device {connection_args.get('host')}")
 
-        with ConnectHandler(**connection_args) as conn:
+        with pooled_connection(connection_args) as conn:
             # Enter enable mode if not already there (some devices need this)
             if not conn.check_enable_mode():
                 conn.enable()
@@ -216,7 +218,7 @@ def run_commands(self, connection_args: Dict, commands: List[str],
     try:
         log.info(f"Connecting to {connection_args.get('host')} for run_commands")
 
-        with ConnectHandler(**connection_args) as conn:
+        with pooled_connection(connection_args) as conn:
             device_type = connection_args.get('device_type', 'cisco_ios')
 
             for command in commands:
@@ -273,7 +275,7 @@ def validate_config(self, connection_args: Dict, expected_patterns: List[str],
     try:
         log.info(f"Connecting to {connection_args.get('host')} for validate_config")
 
-        with ConnectHandler(**connection_args) as conn:
+        with pooled_connection(connection_args) as conn:
             output = conn.send_command(validation_command)
 
             for pattern in expected_patterns:
@@ -318,6 +320,8 @@ def test_connectivity(self, connection_args: Dict) -> Dict:
     try:
         log.info(f"Testing connectivity to {connection_args.get('host')}")
 
+        # Always a fresh connection: a pooled session that is still alive
+        # would not notice SSH service or credential changes on the device
         with ConnectHandler(**connection_args) as conn:
             # Try to get prompt to verify connection
             prompt = conn.find_prompt()